@@ -29,6 +29,8 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
+from llm_http_pool import get_shared_sync_client
+from llm_rate_limiter import get_rate_limiter_for, estimate_prompt_tokens
 
 
 class ForumHost:
@@ -60,11 +62,15 @@ class ForumHost:
 
         self.base_url = base_url or get_config_value('LLM_BASE_URL')
 
+        # 与各引擎的LLM客户端共用进程级连接池
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url=self.base_url
+            base_url=self.base_url,
+            http_client=get_shared_sync_client()
         )
         self.model = model_name or get_config_value('DEFAULT_MODEL_NAME', 'qwen-plus-latest')
+        # 与各引擎共享同一服务商API Key的跨进程限流器(未启用时为None)
+        self.rate_limiter = get_rate_limiter_for(self.base_url, self.api_key)
 
         # Track previous summaries to avoid duplicates
         self.previous_summaries = []
@@ -275,6 +281,11 @@ class ForumHost:
     def _call_qwen_api(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
         """调用Qwen API"""
         try:
+            estimated_tokens = 0
+            if self.rate_limiter is not None:
+                estimated_tokens = estimate_prompt_tokens(system_prompt, user_prompt)
+                self.rate_limiter.acquire(estimated_tokens)
+
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
@@ -284,6 +295,8 @@ class ForumHost:
                 temperature=0.6,
                 top_p=0.9,
             )
+            if self.rate_limiter is not None and getattr(response, "usage", None) is not None:
+                self.rate_limiter.settle(estimated_tokens, response.usage.total_tokens)
 
             if response.choices:
                 content = response.choices[0].message.content
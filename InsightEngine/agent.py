@@ -7,8 +7,10 @@ Sports Scientist Agent (运动科学家Agent)主类
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Callable
 
 from .llms import LLMClient
 from .nodes import (
@@ -21,7 +23,14 @@ from .nodes import (
 )
 from .state import State
 from .tools import create_training_data_search, DBResponse
-from .utils import Config, load_config, format_search_results_for_prompt
+from .utils import (
+    Config,
+    load_config,
+    pack_search_results_for_prompt,
+    compute_result_novelty,
+    text_similarity,
+    SearchResultDeduplicator
+)
 
 
 class SportsScientistAgent:
@@ -45,6 +54,11 @@ class SportsScientistAgent:
         # 初始化LLM客户端
         self.llm_client = self._initialize_llm()
 
+        # LLM用量统计(按节点归属,每次运行重新计数)
+        from utils.llm_usage import LLMUsageTracker, get_usage_path
+        self.usage_tracker = LLMUsageTracker("insight", get_usage_path("insight"))
+        self.llm_client.usage_tracker = self.usage_tracker
+
         # 从根目录config.py读取数据库配置并设置环境变量
         # 注意: 这里优先使用self.config中的配置,如果为空则从根目录config.py读取
         import sys
@@ -81,6 +95,21 @@ class SportsScientistAgent:
         # 状态
         self.state = State()
 
+        # 并行处理段落时保护State写入
+        self._state_lock = threading.Lock()
+        
+        # 单次运行内跨轮次、跨段落的搜索结果去重
+        self.result_deduplicator = SearchResultDeduplicator(
+            simhash_distance=self.config.dedup_simhash_distance,
+            collapsed_length=self.config.dedup_collapsed_length
+        )
+
+        # 当前运行的检查点文件路径
+        self._checkpoint_path: Optional[str] = None
+
+        # 总结阶段的流式增量回调(可选),由前端设置以便首个token到达即刷新进度
+        self.stream_callback: Optional[Callable[[str], None]] = None
+
         # 确保输出目录存在
         os.makedirs(self.config.output_dir, exist_ok=True)
 
@@ -128,10 +157,22 @@ class SportsScientistAgent:
     
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
+        cache = None
+        if self.config.llm_cache_enabled:
+            from utils.llm_cache import get_llm_cache
+            cache = get_llm_cache(
+                db_path=self.config.llm_cache_path,
+                memory_size=self.config.llm_cache_memory_size,
+                ttl_seconds=self.config.llm_cache_ttl,
+                allow_sampling=self.config.llm_cache_allow_sampling,
+                default_temperature=self.config.llm_cache_default_temperature,
+            )
+
         return LLMClient(
             api_key=self.config.llm_api_key,
             model_name=self.config.llm_model_name,
             base_url=self.config.llm_base_url,
+            cache=cache,
         )
     
     def _initialize_nodes(self):
@@ -181,14 +222,17 @@ class SportsScientistAgent:
                 - "search_by_training_load": 按训练负荷查询 (Garmin专属)
                 - "search_by_power_zone": 按功率区间查询 (Garmin专属)
                 - "get_training_effect_analysis": 训练效果分析 (Garmin专属)
+                - "get_load_trend": 训练负荷趋势 (ATL/CTL/TSB、ACWR)
+                - "get_heart_rate_analysis": 心率序列分析 (Keep专属)
             query: 查询描述（用于日志记录）
             **kwargs: 额外参数：
-                - days: 最近天数
-                - start_date, end_date: 日期范围
+                - days: 最近天数 (get_load_trend为摘要覆盖的天数)
+                - start_date, end_date: 日期范围 (get_load_trend只使用end_date)
                 - min_distance_km, max_distance_km: 距离范围
                 - min_avg_hr, max_avg_hr: 心率范围
                 - min_load, max_load: 训练负荷范围 (Garmin)
                 - min_avg_power, max_avg_power: 功率范围 (Garmin)
+                - max_heart_rate: 划分心率区间的最大心率 (Keep)
                 - limit: 结果数量限制
 
         Returns:
@@ -304,6 +348,28 @@ class SportsScientistAgent:
                     end_date=end_date
                 )
 
+            elif tool_name == "get_load_trend":
+                # 训练负荷趋势: 可选days和end_date
+                days = kwargs.get("days") or 42
+                end_date = kwargs.get("end_date")
+
+                response = self.search_agency.get_load_trend(
+                    days=days,
+                    end_date=end_date
+                )
+
+            elif tool_name == "get_heart_rate_analysis":
+                # Keep专属: 心率序列分析
+                days = kwargs.get("days") or 30
+                max_heart_rate = kwargs.get("max_heart_rate")
+                limit = kwargs.get("limit", 20)
+
+                response = self.search_agency.get_heart_rate_analysis(
+                    days=days,
+                    max_heart_rate=max_heart_rate,
+                    limit=limit
+                )
+
             else:
                 print(f"    ⚠️ 未知的查询工具: {tool_name}")
                 raise ValueError(f"不支持的工具类型: {tool_name}")
@@ -321,13 +387,14 @@ class SportsScientistAgent:
             raise
     
     
-    def research(self, query: str, save_report: bool = True) -> str:
+    def research(self, query: str, save_report: bool = True, resume_from: Optional[str] = None) -> str:
         """
         执行训练数据科学分析
 
         Args:
             query: 分析查询 (例如: "分析我最近的训练状态和进步趋势")
             save_report: 是否保存分析报告到文件
+            resume_from: 检查点文件路径(可选)，提供时从该检查点恢复，跳过已完成的段落和反思轮次
 
         Returns:
             最终分析报告内容 (基于科学数据的训练建议)
@@ -338,14 +405,32 @@ class SportsScientistAgent:
         print(f"{'='*60}")
         
         try:
+            self.usage_tracker.reset()
+            # 本次运行的LLM时间预算: 各节点调用的超时会被裁剪到剩余预算内
+            self.llm_client.set_deadline(self.config.research_time_budget)
+
+            # Step 0: 从检查点恢复或为本次运行创建检查点
+            resumed = self._prepare_checkpoint(query, resume_from)
+            self._reset_result_dedup()
+            
             # Step 1: 生成报告结构
-            self._generate_report_structure(query)
+            if resumed and self.state.paragraphs:
+                print(f"已从检查点恢复报告结构,共 {len(self.state.paragraphs)} 个段落")
+            else:
+                self._generate_report_structure(query)
             
             # Step 2: 处理每个段落
             self._process_paragraphs()
             
+            # 最终报告不受研究预算限制，保证总能产出报告
+            self.llm_client.set_deadline(None)
+            
             # Step 3: 生成最终报告
-            final_report = self._generate_final_report()
+            if resumed and self.state.is_completed and self.state.final_report:
+                print("检查点中已有最终报告,直接复用")
+                final_report = self.state.final_report
+            else:
+                final_report = self._generate_final_report()
             
             # Step 4: 保存报告
             if save_report:
@@ -354,13 +439,103 @@ class SportsScientistAgent:
             print(f"\n{'='*60}")
             print("Sports Scientist: 训练数据分析完成")
             print(f"{'='*60}")
+            if self.llm_client.cache is not None:
+                print(f"LLM缓存统计: {self.llm_client.get_cache_stats()}")
 
             return final_report
 
         except Exception as e:
             print(f"Sports Scientist: 分析过程中发生错误: {str(e)}")
+            self.llm_client.set_deadline(None)
             raise e
     
+    def _prepare_checkpoint(self, query: str, resume_from: Optional[str] = None) -> bool:
+        """
+        准备检查点: 提供resume_from时从检查点恢复状态并继续写入该文件，
+        否则在启用检查点时为本次运行创建新的检查点文件
+
+        Args:
+            query: 研究查询
+            resume_from: 检查点文件路径
+
+        Returns:
+            是否从检查点恢复
+        """
+        if resume_from:
+            if not os.path.exists(resume_from):
+                raise FileNotFoundError(f"检查点文件不存在: {resume_from}")
+            self.load_state(resume_from)
+            self._checkpoint_path = resume_from
+            if self.state.query and self.state.query != query:
+                print(f"警告: 检查点中的查询与本次查询不一致,以检查点为准: {self.state.query}")
+            print(f"检查点进度: {self.state.get_completed_paragraphs_count()}/{len(self.state.paragraphs)} 个段落已完成")
+            return True
+
+        # 新的运行从空状态开始
+        self.state = State()
+        self._checkpoint_path = None
+        if self.config.enable_checkpoint:
+            checkpoint_dir = os.path.join(self.config.output_dir, "checkpoints")
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            query_safe = "".join(c for c in query if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            query_safe = query_safe.replace(' ', '_')[:30]
+            self._checkpoint_path = os.path.join(checkpoint_dir, f"checkpoint_{query_safe}_{timestamp}.json")
+            print(f"检查点文件: {self._checkpoint_path}")
+        return False
+
+    def _save_checkpoint(self):
+        """原子写入检查点,在每个节点mutate_state之后调用"""
+        if not self._checkpoint_path:
+            return
+        try:
+            with self._state_lock:
+                self.state.save_to_file(self._checkpoint_path)
+        except Exception as e:
+            print(f"检查点保存失败: {str(e)}")
+    
+    def _budget_exhausted(self) -> bool:
+        """剩余时间预算是否已低于保留比例(未设置预算时始终为False)"""
+        remaining = self.llm_client.remaining_budget()
+        if remaining is None:
+            return False
+        return remaining < self.config.research_time_budget * self.config.research_budget_reserve
+    
+    def _reset_result_dedup(self):
+        """重置去重器，并登记检查点中已有的搜索历史"""
+        self.result_deduplicator.reset()
+        for index, paragraph in enumerate(self.state.paragraphs):
+            self.result_deduplicator.remember(
+                index, [search.to_dict() for search in paragraph.research.search_history]
+            )
+    
+    def _statistics_to_search_result(self, response: DBResponse) -> Dict[str, Any]:
+        """把统计类工具(get_training_stats、get_load_trend等)的statistics转换为一条搜索结果"""
+        params = {key: value for key, value in (response.parameters or {}).items() if value is not None}
+        content = json.dumps(response.statistics, ensure_ascii=False, default=str)
+        return {
+            'title': f"[统计] {response.tool_name} {json.dumps(params, ensure_ascii=False, sort_keys=True)}",
+            'url': "",
+            'content': content,
+            'score': None,
+            'raw_content': content,
+            'published_date': None,
+            'platform': "训练记录数据库",
+            'content_type': "statistics",
+            'author': None,
+            'engagement': None,
+            'record_id': None
+        }
+
+    def _deduplicate_results(self, paragraph_index: int, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """丢弃本段落已见过的结果，折叠其他段落已出现的结果，在构建提示词之前调用"""
+        if not self.config.enable_result_dedup:
+            return search_results
+        kept, stats = self.result_deduplicator.filter(paragraph_index, search_results)
+        if stats["dropped"] or stats["collapsed"]:
+            print(f"    去重: 丢弃 {stats['dropped']} 条重复结果, 折叠 {stats['collapsed']} 条其他段落已出现的结果")
+        return kept
+
     def _generate_report_structure(self, query: str):
         """生成训练分析报告结构"""
         print(f"\n[步骤 1] 构建科学分析框架...")
@@ -370,6 +545,7 @@ class SportsScientistAgent:
         
         # 生成结构并更新状态
         self.state = report_structure_node.mutate_state(state=self.state)
+        self._save_checkpoint()
 
         print(f"分析框架已生成，共 {len(self.state.paragraphs)} 个数据模块:")
         for i, paragraph in enumerate(self.state.paragraphs, 1):
@@ -378,23 +554,61 @@ class SportsScientistAgent:
     def _process_paragraphs(self):
         """处理所有数据分析模块"""
         total_paragraphs = len(self.state.paragraphs)
+        max_workers = max(1, min(self.config.max_parallel_paragraphs, total_paragraphs))
+
+        if max_workers == 1:
+            for i in range(total_paragraphs):
+                print(f"\n[步骤 2.{i+1}] 数据模块分析: {self.state.paragraphs[i].title}")
+                print("-" * 50)
+
+                self._process_single_paragraph(i)
+
+                progress = (i + 1) / total_paragraphs * 100
+                print(f"数据模块分析完成 ({progress:.1f}%)")
+            return
+
+        # 各数据模块之间互不依赖，并行执行 搜索→总结→反思 流水线
+        print(f"\n[步骤 2] 并行处理 {total_paragraphs} 个数据模块 (并发数: {max_workers})")
+        completed = 0
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="paragraph") as executor:
+            futures = {
+                executor.submit(self._process_single_paragraph, i): i
+                for i in range(total_paragraphs)
+            }
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    future.result()
+                    completed += 1
+                    progress = completed / total_paragraphs * 100
+                    print(f"[数据模块 {i+1}] {self.state.paragraphs[i].title} 数据模块分析完成 ({progress:.1f}%)")
+            except Exception:
+                # 任一数据模块失败时取消尚未开始的任务
+                for pending in futures:
+                    pending.cancel()
+                raise
+
+    def _process_single_paragraph(self, paragraph_index: int):
+        """执行单个数据模块的完整流水线：初始搜索和总结 → 反思循环 → 标记完成"""
+        research = self.state.paragraphs[paragraph_index].research
+        if research.is_completed:
+            print(f"  - 检查点中该段落已完成,跳过")
+            return
+
+        # 初始搜索和总结
+        if research.latest_summary:
+            print("  - 检查点中已有初始总结,跳过初始搜索")
+        else:
+            self._initial_search_and_summary(paragraph_index)
 
-        for i in range(total_paragraphs):
-            print(f"\n[步骤 2.{i+1}] 数据模块分析: {self.state.paragraphs[i].title}")
-            print("-" * 50)
-            
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
-            
-            # 反思循环
-            self._reflection_loop(i)
-            
-            # 标记模块完成
-            self.state.paragraphs[i].research.mark_completed()
+        # 反思循环
+        self._reflection_loop(paragraph_index)
+
+        # 标记模块完成
+        with self._state_lock:
+            self.state.paragraphs[paragraph_index].research.mark_completed()
+        self._save_checkpoint()
 
-            progress = (i + 1) / total_paragraphs * 100
-            print(f"数据模块分析完成 ({progress:.1f}%)")
-    
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始数据查询和量化分析"""
         paragraph = self.state.paragraphs[paragraph_index]
@@ -524,6 +738,21 @@ class SportsScientistAgent:
                 search_kwargs["end_date"] = end_date
             print(f"  - 获取训练效果分析")
 
+        # get_load_trend: 可选days和end_date
+        elif search_tool == "get_load_trend":
+            search_kwargs["days"] = search_output.get("days") or 42
+            end_date = search_output.get("end_date")
+            if end_date and self._validate_date_format(end_date):
+                search_kwargs["end_date"] = end_date
+            print(f"  - 获取最近 {search_kwargs['days']} 天训练负荷趋势")
+
+        # get_heart_rate_analysis: 可选days、max_heart_rate和limit (Keep专属)
+        elif search_tool == "get_heart_rate_analysis":
+            search_kwargs["days"] = search_output.get("days") or 30
+            search_kwargs["max_heart_rate"] = search_output.get("max_heart_rate")
+            search_kwargs["limit"] = search_output.get("limit") or 20
+            print(f"  - 分析最近 {search_kwargs['days']} 天心率序列")
+
         else:
             print(f"    ⚠️ 未知工具 {search_tool},使用search_recent_trainings")
             search_tool = "search_recent_trainings"
@@ -566,14 +795,17 @@ class SportsScientistAgent:
                     'title': title,
                     'url': "",
                     'content': content,
-                    'score': result.avg_heart_rate or 0,  # 使用心率作为评分
+                    'score': None,  # 训练记录没有检索相关度, 打包时按中性权重处理
                     'raw_content': content,
                     'published_date': start_time.isoformat(),
                     'platform': "训练记录数据库",
                     'content_type': sport_type,
                     'author': result.user_id,
-                    'engagement': calories or 0
+                    'engagement': calories or 0,
+                    'record_id': getattr(result, 'id', None)
                 })
+        if search_response and search_response.statistics:
+            search_results.append(self._statistics_to_search_result(search_response))
         
         if search_results:
             print(f"  - 找到 {len(search_results)} 个搜索结果")
@@ -583,8 +815,10 @@ class SportsScientistAgent:
         else:
             print("  - 未找到搜索结果")
         
-        # 更新状态中的搜索历史
-        paragraph.research.add_search_results(search_query, search_results)
+        # 去重后更新状态中的搜索历史
+        search_results = self._deduplicate_results(paragraph_index, search_results)
+        with self._state_lock:
+            paragraph.research.add_search_results(search_query, search_results)
         
         # 生成初始总结
         print("  - 生成初始总结...")
@@ -592,15 +826,18 @@ class SportsScientistAgent:
             "title": paragraph.title,
             "content": paragraph.content,
             "search_query": search_query,
-            "search_results": format_search_results_for_prompt(
-                search_results, self.config.max_content_length
+            "search_results": pack_search_results_for_prompt(
+                search_results, self.config.first_summary_token_budget, self.config.max_content_length
             )
         }
         
         # 更新状态
         self.state = self.first_summary_node.mutate_state(
-            summary_input, self.state, paragraph_index
+            summary_input, self.state, paragraph_index,
+            stream_callback=self.stream_callback,
+            state_lock=self._state_lock
         )
+        self._save_checkpoint()
         
         print("  - 初始总结完成")
     
@@ -608,7 +845,21 @@ class SportsScientistAgent:
         """执行反思循环"""
         paragraph = self.state.paragraphs[paragraph_index]
         
-        for reflection_i in range(self.config.max_reflections):
+        if paragraph.research.skipped_reflections > 0:
+            # 检查点中该段落已判定收敛
+            return
+        
+        # 从检查点恢复时跳过已完成的反思轮次
+        for reflection_i in range(paragraph.research.reflection_iteration, self.config.max_reflections):
+            # 时间预算即将耗尽时跳过剩余反思，把时间留给其余段落的首轮研究
+            if self._budget_exhausted():
+                skipped = self.config.max_reflections - reflection_i
+                with self._state_lock:
+                    paragraph.research.skipped_reflections = skipped
+                self._save_checkpoint()
+                print(f"  - 研究时间预算即将耗尽，跳过剩余 {skipped} 轮反思")
+                break
+            
             print(f"  - 反思 {reflection_i + 1}/{self.config.max_reflections}...")
             
             # 准备反思输入
@@ -734,6 +985,21 @@ class SportsScientistAgent:
                     search_kwargs["end_date"] = end_date
                 print(f"    获取训练效果分析")
 
+            # get_load_trend: 可选days和end_date
+            elif search_tool == "get_load_trend":
+                search_kwargs["days"] = reflection_output.get("days") or 42
+                end_date = reflection_output.get("end_date")
+                if end_date and self._validate_date_format(end_date):
+                    search_kwargs["end_date"] = end_date
+                print(f"    获取最近 {search_kwargs['days']} 天训练负荷趋势")
+
+            # get_heart_rate_analysis: 可选days、max_heart_rate和limit (Keep专属)
+            elif search_tool == "get_heart_rate_analysis":
+                search_kwargs["days"] = reflection_output.get("days") or 30
+                search_kwargs["max_heart_rate"] = reflection_output.get("max_heart_rate")
+                search_kwargs["limit"] = reflection_output.get("limit") or 20
+                print(f"    分析最近 {search_kwargs['days']} 天心率序列")
+
             else:
                 print(f"      ⚠️ 未知工具 {search_tool},使用search_recent_trainings")
                 search_tool = "search_recent_trainings"
@@ -776,14 +1042,17 @@ class SportsScientistAgent:
                         'title': title,
                         'url': "",
                         'content': content,
-                        'score': result.avg_heart_rate or 0,  # 使用心率作为评分
+                        'score': None,  # 训练记录没有检索相关度, 打包时按中性权重处理
                         'raw_content': content,
                         'published_date': start_time.isoformat(),
                         'platform': "训练记录数据库",
                         'content_type': sport_type,
                         'author': result.user_id,
-                        'engagement': calories or 0
+                        'engagement': calories or 0,
+                        'record_id': getattr(result, 'id', None)
                     })
+            if search_response and search_response.statistics:
+                search_results.append(self._statistics_to_search_result(search_response))
             
             if search_results:
                 print(f"    找到 {len(search_results)} 个反思搜索结果")
@@ -793,26 +1062,57 @@ class SportsScientistAgent:
             else:
                 print("    未找到反思搜索结果")
             
-            # 更新搜索历史
-            paragraph.research.add_search_results(search_query, search_results)
+            # 更新搜索历史，同时计算本轮结果相对已有历史的新颖度
+            with self._state_lock:
+                novelty = compute_result_novelty(search_results, paragraph.research.get_seen_result_keys())
+            # 丢弃/折叠已出现过的结果，只把新内容写入历史并发送给LLM
+            search_results = self._deduplicate_results(paragraph_index, search_results)
+            with self._state_lock:
+                paragraph.research.add_search_results(search_query, search_results)
+            
+            # 收敛检测: 本轮几乎没有带来新结果时，跳过本轮总结及剩余反思
+            if self.config.enable_reflection_early_exit and novelty < self.config.reflection_min_novelty:
+                skipped = self.config.max_reflections - reflection_i
+                with self._state_lock:
+                    paragraph.research.skipped_reflections = skipped
+                self._save_checkpoint()
+                print(f"    新结果占比 {novelty:.0%} 低于阈值，判定已收敛，跳过剩余 {skipped} 轮反思")
+                break
             
             # 生成反思总结
             reflection_summary_input = {
                 "title": paragraph.title,
                 "content": paragraph.content,
                 "search_query": search_query,
-                "search_results": format_search_results_for_prompt(
-                    search_results, self.config.max_content_length
+                "search_results": pack_search_results_for_prompt(
+                    search_results, self.config.reflection_summary_token_budget, self.config.max_content_length
                 ),
                 "paragraph_latest_state": paragraph.research.latest_summary
             }
             
             # 更新状态
             self.state = self.reflection_summary_node.mutate_state(
-                reflection_summary_input, self.state, paragraph_index
+                reflection_summary_input, self.state, paragraph_index,
+                stream_callback=self.stream_callback,
+                state_lock=self._state_lock
             )
+            self._save_checkpoint()
             
             print(f"    反思 {reflection_i + 1} 完成")
+            
+            # 收敛检测: 总结与上一轮几乎相同时，不再继续反思
+            remaining = self.config.max_reflections - reflection_i - 1
+            if self.config.enable_reflection_early_exit and remaining > 0:
+                similarity = text_similarity(
+                    reflection_summary_input["paragraph_latest_state"],
+                    paragraph.research.latest_summary
+                )
+                if similarity >= self.config.reflection_similarity_threshold:
+                    with self._state_lock:
+                        paragraph.research.skipped_reflections = remaining
+                    self._save_checkpoint()
+                    print(f"    总结与上一轮相似度 {similarity:.0%}，判定已收敛，跳过剩余 {remaining} 轮反思")
+                    break
     
     def _generate_final_report(self) -> str:
         """生成最终报告"""
@@ -838,6 +1138,7 @@ class SportsScientistAgent:
         # 更新状态
         self.state.final_report = final_report
         self.state.mark_completed()
+        self._save_checkpoint()
         
         print("最终报告生成完成")
         return final_report
@@ -866,8 +1167,19 @@ class SportsScientistAgent:
             print(f"状态已保存到: {state_filepath}")
     
     def get_progress_summary(self) -> Dict[str, Any]:
-        """获取进度摘要"""
-        return self.state.get_progress_summary()
+        """获取进度摘要（含本次运行的LLM用量与耗时）"""
+        summary = self.state.get_progress_summary()
+        summary["llm_usage"] = self.usage_tracker.get_summary()
+        try:
+            # 与 llms/base.py 一样按扁平模块名导入，才能拿到LLM客户端实际写入的统计器
+            from llm_latency import get_latency_tracker
+            summary["llm_latency"] = get_latency_tracker().get_stats()
+        except ImportError:
+            pass
+        query_cache_stats = self.search_agency.get_query_cache_stats()
+        if query_cache_stats is not None:
+            summary["query_cache"] = query_cache_stats
+        return summary
     
     def load_state(self, filepath: str):
         """从文件加载状态"""
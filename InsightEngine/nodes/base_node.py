@@ -4,7 +4,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from ..llms.base import LLMClient
 from ..state.state import State
 
@@ -61,6 +61,28 @@ class BaseNode(ABC):
         """
         return output
     
+    def call_llm(self, system_prompt: str, user_prompt: str,
+                 stream_callback: Optional[Callable[[str], None]] = None, **kwargs) -> str:
+        """
+        调用LLM，提供stream_callback时以流式方式调用并逐个回调增量文本
+        
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户输入
+            stream_callback: 增量文本回调，为None时使用普通调用
+            **kwargs: 透传给LLM客户端的采样参数
+            
+        Returns:
+            LLM完整输出
+        """
+        # 用量统计按节点归属
+        kwargs.setdefault("usage_label", self.node_name)
+        if stream_callback is not None and hasattr(self.llm_client, "stream_invoke"):
+            return self.llm_client.stream_invoke(
+                system_prompt, user_prompt, on_delta=stream_callback, **kwargs
+            )
+        return self.llm_client.invoke(system_prompt, user_prompt, **kwargs)
+    
     def log_info(self, message: str):
         """记录信息日志"""
         print(f"[{self.node_name}] {message}")
@@ -68,7 +68,7 @@ class ReportFormattingNode(BaseNode):
             self.log_info("正在格式化最终报告")
             
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_REPORT_FORMATTING, message)
+            response = self.call_llm(SYSTEM_PROMPT_REPORT_FORMATTING, message)
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -70,7 +70,7 @@ class FirstSearchNode(BaseNode):
             self.log_info("正在生成首次搜索查询")
 
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_FIRST_SEARCH, time_context)
+            response = self.call_llm(SYSTEM_PROMPT_FIRST_SEARCH, time_context)
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -151,7 +151,9 @@ class FirstSearchNode(BaseNode):
                     "search_by_training_load": "训练负荷范围查询",
                     "search_by_power_zone": "功率区间训练查询",
                     "get_training_stats": "训练统计数据查询",
-                    "get_training_effect_analysis": "训练效果分析查询"
+                    "get_training_effect_analysis": "训练效果分析查询",
+                    "get_load_trend": "训练负荷趋势查询",
+                    "get_heart_rate_analysis": "心率序列分析查询"
                 }
                 search_query = tool_name_map.get(search_tool, f"{search_tool}查询")
                 reasoning = f"基于{search_tool}工具进行数据查询"
@@ -173,6 +175,7 @@ class FirstSearchNode(BaseNode):
                 "max_distance_km": result.get("max_distance_km"),
                 "min_avg_hr": result.get("min_avg_hr"),
                 "max_avg_hr": result.get("max_avg_hr"),
+                "max_heart_rate": result.get("max_heart_rate"),
                 "limit": result.get("limit")
             }
 
@@ -250,7 +253,7 @@ class ReflectionNode(BaseNode):
             self.log_info("正在进行反思并生成新搜索查询")
 
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_REFLECTION, time_context)
+            response = self.call_llm(SYSTEM_PROMPT_REFLECTION, time_context)
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -331,7 +334,9 @@ class ReflectionNode(BaseNode):
                     "search_by_training_load": "训练负荷范围查询",
                     "search_by_power_zone": "功率区间训练查询",
                     "get_training_stats": "训练统计数据查询",
-                    "get_training_effect_analysis": "训练效果分析查询"
+                    "get_training_effect_analysis": "训练效果分析查询",
+                    "get_load_trend": "训练负荷趋势查询",
+                    "get_heart_rate_analysis": "心率序列分析查询"
                 }
                 search_query = tool_name_map.get(search_tool, f"{search_tool}查询")
                 reasoning = f"基于{search_tool}工具进行数据查询"
@@ -353,6 +358,7 @@ class ReflectionNode(BaseNode):
                 "max_distance_km": result.get("max_distance_km"),
                 "min_avg_hr": result.get("min_avg_hr"),
                 "max_avg_hr": result.get("max_avg_hr"),
+                "max_heart_rate": result.get("max_heart_rate"),
                 "limit": result.get("limit")
             }
 
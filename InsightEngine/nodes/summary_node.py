@@ -4,6 +4,7 @@
 """
 
 import json
+from contextlib import nullcontext
 from typing import Dict, Any, List
 from json.decoder import JSONDecodeError
 
@@ -99,7 +100,11 @@ class FirstSummaryNode(StateMutationNode):
             self.log_info("正在生成首次段落总结")
             
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_FIRST_SUMMARY, message)
+            response = self.call_llm(
+                SYSTEM_PROMPT_FIRST_SUMMARY,
+                message,
+                stream_callback=kwargs.get("stream_callback"),
+            )
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -171,23 +176,25 @@ class FirstSummaryNode(StateMutationNode):
             input_data: 输入数据
             state: 当前状态
             paragraph_index: 段落索引
-            **kwargs: 额外参数
+            **kwargs: 额外参数（state_lock: 并行处理段落时用于保护状态写入的锁）
             
         Returns:
             更新后的状态
         """
+        state_lock = kwargs.pop("state_lock", None)
         try:
             # 生成总结
             summary = self.run(input_data, **kwargs)
             
             # 更新状态
-            if 0 <= paragraph_index < len(state.paragraphs):
-                state.paragraphs[paragraph_index].research.latest_summary = summary
-                self.log_info(f"已更新段落 {paragraph_index} 的首次总结")
-            else:
-                raise ValueError(f"段落索引 {paragraph_index} 超出范围")
-            
-            state.update_timestamp()
+            with state_lock or nullcontext():
+                if 0 <= paragraph_index < len(state.paragraphs):
+                    state.paragraphs[paragraph_index].research.latest_summary = summary
+                    self.log_info(f"已更新段落 {paragraph_index} 的首次总结")
+                else:
+                    raise ValueError(f"段落索引 {paragraph_index} 超出范围")
+                
+                state.update_timestamp()
             return state
             
         except Exception as e:
@@ -264,7 +271,11 @@ class ReflectionSummaryNode(StateMutationNode):
             self.log_info("正在生成反思总结")
             
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_REFLECTION_SUMMARY, message)
+            response = self.call_llm(
+                SYSTEM_PROMPT_REFLECTION_SUMMARY,
+                message,
+                stream_callback=kwargs.get("stream_callback"),
+            )
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -336,24 +347,26 @@ class ReflectionSummaryNode(StateMutationNode):
             input_data: 输入数据
             state: 当前状态
             paragraph_index: 段落索引
-            **kwargs: 额外参数
+            **kwargs: 额外参数（state_lock: 并行处理段落时用于保护状态写入的锁）
             
         Returns:
             更新后的状态
         """
+        state_lock = kwargs.pop("state_lock", None)
         try:
             # 生成更新后的总结
             updated_summary = self.run(input_data, **kwargs)
             
             # 更新状态
-            if 0 <= paragraph_index < len(state.paragraphs):
-                state.paragraphs[paragraph_index].research.latest_summary = updated_summary
-                state.paragraphs[paragraph_index].research.increment_reflection()
-                self.log_info(f"已更新段落 {paragraph_index} 的反思总结")
-            else:
-                raise ValueError(f"段落索引 {paragraph_index} 超出范围")
-            
-            state.update_timestamp()
+            with state_lock or nullcontext():
+                if 0 <= paragraph_index < len(state.paragraphs):
+                    state.paragraphs[paragraph_index].research.latest_summary = updated_summary
+                    state.paragraphs[paragraph_index].research.increment_reflection()
+                    self.log_info(f"已更新段落 {paragraph_index} 的反思总结")
+                else:
+                    raise ValueError(f"段落索引 {paragraph_index} 超出范围")
+                
+                state.update_timestamp()
             return state
             
         except Exception as e:
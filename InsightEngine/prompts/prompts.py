@@ -20,8 +20,10 @@ from .tool_descriptions import (
     get_report_modules_suggestion,
     COMMON_PARAM_REQUIREMENTS,
     GARMIN_PARAM_REQUIREMENTS,
+    KEEP_PARAM_REQUIREMENTS,
     COMMON_QUERY_EXAMPLES,
-    GARMIN_QUERY_EXAMPLES
+    GARMIN_QUERY_EXAMPLES,
+    KEEP_QUERY_EXAMPLES
 )
 
 # ===== JSON Schema 定义 =====
@@ -54,13 +56,14 @@ output_schema_first_search = {
         "search_query": {"type": "string"},
         "search_tool": {"type": "string"},
         "reasoning": {"type": "string"},
-        "days": {"type": "integer", "description": "最近N天,search_recent_trainings工具必需"},
+        "days": {"type": "integer", "description": "最近N天,search_recent_trainings工具必需,get_load_trend和get_heart_rate_analysis工具可选"},
         "start_date": {"type": "string", "description": "开始日期,格式YYYY-MM-DD,search_by_date_range和get_training_stats工具可能需要"},
-        "end_date": {"type": "string", "description": "结束日期,格式YYYY-MM-DD,search_by_date_range和get_training_stats工具可能需要"},
+        "end_date": {"type": "string", "description": "结束日期,格式YYYY-MM-DD,search_by_date_range、get_training_stats和get_load_trend工具可能需要"},
         "min_distance_km": {"type": "number", "description": "最小距离(公里),search_by_distance_range工具必需"},
         "max_distance_km": {"type": "number", "description": "最大距离(公里),search_by_distance_range工具可选"},
         "min_avg_hr": {"type": "integer", "description": "最小平均心率,search_by_heart_rate工具必需"},
         "max_avg_hr": {"type": "integer", "description": "最大平均心率,search_by_heart_rate工具可选"},
+        "max_heart_rate": {"type": "integer", "description": "最大心率(划分心率区间),get_heart_rate_analysis工具可选"},
         "limit": {"type": "integer", "description": "返回记录数量限制,所有工具可选"}
     },
     "required": ["search_query", "search_tool", "reasoning"]
@@ -112,6 +115,7 @@ output_schema_reflection = {
         "max_distance_km": {"type": "number", "description": "最大距离(公里)"},
         "min_avg_hr": {"type": "integer", "description": "最小平均心率"},
         "max_avg_hr": {"type": "integer", "description": "最大平均心率"},
+        "max_heart_rate": {"type": "integer", "description": "最大心率(划分心率区间)"},
         "limit": {"type": "integer", "description": "返回记录数量限制"}
     },
     "required": ["search_query", "search_tool", "reasoning"]
@@ -170,6 +174,9 @@ def _get_param_requirements() -> str:
     # 如果是Garmin数据源,添加专属参数要求
     if data_source == 'garmin':
         param_text += GARMIN_PARAM_REQUIREMENTS
+    # 如果是Keep数据源,添加专属参数要求
+    elif data_source == 'keep':
+        param_text += KEEP_PARAM_REQUIREMENTS
 
     return param_text
 
@@ -189,6 +196,9 @@ def _get_query_examples() -> str:
     # 如果是Garmin数据源,添加专属查询示例
     if data_source == 'garmin':
         examples_text += "\n" + GARMIN_QUERY_EXAMPLES
+    # 如果是Keep数据源,添加专属查询示例
+    elif data_source == 'keep':
+        examples_text += "\n" + KEEP_QUERY_EXAMPLES
 
     return examples_text
 
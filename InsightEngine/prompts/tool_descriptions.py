@@ -10,7 +10,7 @@ from typing import Dict, List
 # ===== 通用工具描述(所有数据源都支持) =====
 
 COMMON_TOOLS_DESCRIPTION = """
-你可以使用以下5种专业的训练数据库查询工具来挖掘真实的训练记录:
+你可以使用以下6种专业的训练数据库查询工具来挖掘真实的训练记录:
 
 1. **search_recent_trainings** - 🔥 查询最近N天训练记录 (推荐用于"最近"、"近期"查询)
    - 适用于:了解最近的训练状态、识别训练规律、分析短期进步
@@ -38,6 +38,34 @@ COMMON_TOOLS_DESCRIPTION = """
    - 适用于:心率训练分析、有氧/无氧训练分布、训练强度评估
    - 特点:基于心率数据筛选,分析训练强度
    - 参数:min_avg_hr(必需,最小平均心率)、max_avg_hr(可选,最大平均心率)、limit(可选,默认50)
+
+6. **get_load_trend** - 训练负荷趋势分析 (推荐用于"疲劳"、"状态"、"负荷是否过大"类问题)
+   - 适用于:体能/疲劳状态评估、过度训练与受伤风险预警、训练周期负荷变化
+   - 特点:基于全部历史计算每日负荷序列,返回紧凑的数值摘要而非原始记录
+   - 参数:days(可选,摘要覆盖的最近天数,默认42)、end_date(可选,YYYY-MM-DD,默认今天)
+   - **返回指标**:
+     * current: 当前ATL(急性负荷,7天指数加权)、CTL(慢性负荷/体能,42天指数加权)、TSB(状态=CTL-ATL)、ACWR(急性:慢性负荷比)、monotony(单调性)、strain(训练压力)
+     * period_summary: 期间总负荷、训练天数、CTL变化与周增幅、ACWR>1.5天数等
+     * weekly: 每周负荷、里程、单调性、训练压力与周末的ACWR/CTL/TSB
+   - **解读**: ACWR 0.8-1.3(最佳区间)、>1.5(受伤高风险); TSB < -30(疲劳累积)、-30~-10(有效训练)、>5(状态新鲜)
+"""
+
+
+# ===== Keep专属扩展工具描述 =====
+
+KEEP_EXTENDED_TOOLS_DESCRIPTION = """
+**Keep数据源专属扩展工具**:
+
+7. **get_heart_rate_analysis** - 心率序列分析 (基于逐次训练的心率采样heart_rate_data)
+   - 适用于:心率区间分布、强度结构(80/20)评估、有氧耐力(心率漂移)分析
+   - 特点:直接返回计算好的区间时长和分位数,无需自行从原始心率数据计算
+   - 参数:days(可选,最近N天,默认30)、max_heart_rate(可选,划分区间的最大心率,默认由历史最大心率估计)、limit(可选,返回的单次训练明细数,默认20)
+   - **返回指标**:
+     * zone_bounds_bpm: 5个心率区间的心率范围(按最大心率的60%/70%/80%/90%划分)
+     * overall: 期间各区间总时长(分钟)与占比、按时长加权的P10/P50/P90心率
+     * hr_drift: 心率漂移(去掉前10%热身段后, 后半段相对前半段平均心率的变化百分比)统计
+     * sessions: 最近训练的单次区间分布、分位数与心率漂移
+   - **解读**: 心率漂移 < 5%(有氧基础良好)、> 5%(耐力不足、脱水或高温影响)
 """
 
 
@@ -46,19 +74,19 @@ COMMON_TOOLS_DESCRIPTION = """
 GARMIN_EXTENDED_TOOLS_DESCRIPTION = """
 **Garmin数据源专属扩展工具**:
 
-6. **search_by_training_load** - 按Garmin训练负荷查询
+7. **search_by_training_load** - 按Garmin训练负荷查询
    - 适用于:训练负荷趋势分析、过度训练检测、训练强度评估
    - 特点:基于Garmin科学算法的训练负荷指标(Training Load)
    - 参数:min_load(必需,最小负荷值)、max_load(可选,最大负荷值)、limit(可选,默认50)
    - **解读**: Training Load < 75(低强度)、75-150(中等强度)、150-300(高强度)、>300(极高强度)
 
-7. **search_by_power_zone** - 按功率区间查询
+8. **search_by_power_zone** - 按功率区间查询
    - 适用于:功率训练分析、跑步效率评估、配速-功率关系研究
    - 特点:基于Garmin Running Power指标,更科学地量化跑步强度
    - 参数:min_avg_power(必需,最小平均功率/瓦)、max_avg_power(可选,最大平均功率/瓦)、limit(可选,默认50)
    - **解读**: 功率指标综合了速度、坡度、风阻、体重等因素,比配速更准确反映运动强度
 
-8. **get_training_effect_analysis** - 获取Garmin训练效果分析
+9. **get_training_effect_analysis** - 获取Garmin训练效果分析
    - 适用于:训练效果评估、有氧/无氧能力分析、训练计划优化
    - 特点:基于Garmin Firstbeat算法,量化训练对有氧/无氧能力的影响
    - 参数:start_date(可选,YYYY-MM-DD)、end_date(可选,YYYY-MM-DD)
@@ -102,6 +130,10 @@ COMMON_PARAM_REQUIREMENTS = """
      * ⚠️ 全部可选: start_date, end_date (默认查询全部历史数据)
      * 示例: `"start_date": "2025-01-01", "end_date": "2025-01-31"`
 
+   - **get_load_trend**:
+     * ⚠️ 全部可选: days (整数,默认42), end_date (字符串,格式YYYY-MM-DD,默认今天)
+     * 示例: `"days": 56`
+
    - **通用可选参数**: limit (整数,默认50条,建议范围10-200)
 """
 
@@ -125,6 +157,15 @@ GARMIN_PARAM_REQUIREMENTS = """
 """
 
 
+# ===== Keep专属参数配置要求 =====
+
+KEEP_PARAM_REQUIREMENTS = """
+   - **get_heart_rate_analysis** (Keep专属):
+     * ⚠️ 全部可选: days (整数,默认30), max_heart_rate (整数,默认由历史数据估计), limit (整数,默认20)
+     * 示例: `"days": 60`
+"""
+
+
 # ===== 通用查询优化示例(所有数据源) =====
 
 COMMON_QUERY_EXAMPLES = """
@@ -134,6 +175,7 @@ COMMON_QUERY_EXAMPLES = """
 - ✅ 正确: 如果需要补充2025年1-3月的历史数据 → search_by_date_range, start_date="2025-01-01", end_date="2025-03-31"
 - ✅ 正确: 如果需要长距离训练数据 → search_by_distance_range, min_distance_km=15
 - ✅ 正确: 如果需要强度分析 → search_by_heart_rate, min_avg_hr=150, max_avg_hr=170
+- ✅ 正确: 如果需要评估疲劳状态或负荷增长是否过快 → get_load_trend, days=42
 """
 
 
@@ -147,12 +189,20 @@ GARMIN_QUERY_EXAMPLES = """
 """
 
 
+# ===== Keep专属查询优化示例 =====
+
+KEEP_QUERY_EXAMPLES = """
+**Keep专属查询示例**:
+- ✅ 正确: 如果需要心率区间分布或心率漂移分析 → get_heart_rate_analysis, days=60
+"""
+
+
 # ===== Keep专属数据特征说明 =====
 
 KEEP_DATA_FEATURES_DESCRIPTION = """
 **Keep数据源特征说明**:
 - **核心指标**: 距离、配速、时长、心率(平均/最大)、卡路里
-- **心率数据**: 提供逐秒心率序列数据(heart_rate_data),可用于心率漂移分析
+- **心率数据**: 提供逐次训练的心率序列数据(heart_rate_data),可通过get_heart_rate_analysis获取区间分布、分位数与心率漂移
 - **数据来源**: Keep APP训练��录
 - **数据特点**: 适合基础训练分析,心率数据较为详细
 """
@@ -162,7 +212,7 @@ KEEP_REPORT_MODULES_SUGGESTION = """
 **建议分析模块(Keep数据源)**:
 - ✅ 训练负荷量化 (频次、里程、周平均)
 - ✅ 配速表现评估 (配速趋势、区间分布)
-- ✅ 心率强度监测 (平均心率、心率区间)
+- ✅ 心率强度监测 (平均心率、心率区间分布、心率漂移)
 - ✅ 长距离耐力评估 (长距离训练统计)
 - ✅ 训练节奏分析 (频次稳定性、恢复间隔)
 """
@@ -212,10 +262,10 @@ GARMIN_REPORT_MODULES_SUGGESTION = """
 
 DATA_SOURCE_CONFIGS: Dict[str, Dict[str, str]] = {
     'keep': {
-        'tools_description': COMMON_TOOLS_DESCRIPTION,
+        'tools_description': COMMON_TOOLS_DESCRIPTION + KEEP_EXTENDED_TOOLS_DESCRIPTION,
         'data_features': KEEP_DATA_FEATURES_DESCRIPTION,
         'report_modules': KEEP_REPORT_MODULES_SUGGESTION,
-        'extended_tools': '',  # Keep没有扩展工具
+        'extended_tools': KEEP_EXTENDED_TOOLS_DESCRIPTION,
         'available_metrics': '距离、配速、时长、心率、卡路里',
         'advanced_capabilities': ''
     },
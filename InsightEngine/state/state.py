@@ -4,8 +4,10 @@ Deep Search Agent状态管理
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 import json
+import os
+import tempfile
 from datetime import datetime
 
 
@@ -18,6 +20,7 @@ class Search:
     content: str = ""                  # 搜索返回的内容
     score: Optional[float] = None      # 相关度评分
     platform: str = "训练记录数据库"     # 数据来源平台
+    record_id: Optional[int] = None    # 训练记录ID(用于跨轮次去重)
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
     
     def to_dict(self) -> Dict[str, Any]:
@@ -29,6 +32,7 @@ class Search:
             "content": self.content,
             "score": self.score,
             "platform": self.platform,
+            "record_id": self.record_id,
             "timestamp": self.timestamp
         }
     
@@ -42,6 +46,7 @@ class Search:
             content=data.get("content", ""),
             score=data.get("score"),
             platform=data.get("platform", "训练记录数据库"),
+            record_id=data.get("record_id"),
             timestamp=data.get("timestamp", datetime.now().isoformat())
         )
 
@@ -53,6 +58,7 @@ class Research:
     latest_summary: str = ""                                       # 当前段落的最新总结
     reflection_iteration: int = 0                                  # 反思迭代次数
     is_completed: bool = False                                     # 是否完成研究
+    skipped_reflections: int = 0                                   # 因收敛提前跳过的反思轮数
     
     def add_search(self, search: Search):
         """添加搜索记录"""
@@ -67,10 +73,23 @@ class Research:
                 title=result.get("title", ""),
                 content=result.get("content", ""),
                 score=result.get("score"),
-                platform=result.get("platform", "训练记录数据库")
+                platform=result.get("platform", "训练记录数据库"),
+                record_id=result.get("record_id")
             )
             self.add_search(search)
     
+    def get_seen_result_keys(self) -> Set[str]:
+        """获取已出现过的搜索结果键（训练记录ID，其次URL，都没有时使用标题）"""
+        keys = set()
+        for search in self.search_history:
+            if search.record_id is not None:
+                keys.add(f"record:{search.record_id}")
+                continue
+            key = (search.url or "").strip() or (search.title or "").strip()
+            if key:
+                keys.add(key)
+        return keys
+    
     def get_search_count(self) -> int:
         """获取搜索次数"""
         return len(self.search_history)
@@ -89,7 +108,8 @@ class Research:
             "search_history": [search.to_dict() for search in self.search_history],
             "latest_summary": self.latest_summary,
             "reflection_iteration": self.reflection_iteration,
-            "is_completed": self.is_completed
+            "is_completed": self.is_completed,
+            "skipped_reflections": self.skipped_reflections
         }
     
     @classmethod
@@ -100,7 +120,8 @@ class Research:
             search_history=search_history,
             latest_summary=data.get("latest_summary", ""),
             reflection_iteration=data.get("reflection_iteration", 0),
-            is_completed=data.get("is_completed", False)
+            is_completed=data.get("is_completed", False),
+            skipped_reflections=data.get("skipped_reflections", 0)
         )
 
 
@@ -207,6 +228,8 @@ class State:
             "total_paragraphs": total,
             "completed_paragraphs": completed,
             "progress_percentage": (completed / total * 100) if total > 0 else 0,
+            "skipped_reflections": sum(p.research.skipped_reflections for p in self.paragraphs),
+            "skipped_reflections_by_paragraph": [p.research.skipped_reflections for p in self.paragraphs],
             "is_completed": self.is_completed,
             "created_at": self.created_at,
             "updated_at": self.updated_at
@@ -250,9 +273,20 @@ class State:
         return cls.from_dict(data)
     
     def save_to_file(self, filepath: str):
-        """保存状态到文件"""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(self.to_json())
+        """保存状态到文件（先写临时文件再原子替换，避免中途崩溃留下不完整的文件）"""
+        directory = os.path.dirname(os.path.abspath(filepath))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".state_", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.to_json())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
     
     @classmethod
     def load_from_file(cls, filepath: str) -> "State":
@@ -4,9 +4,21 @@
 定义所有数据源工具必须实现的接口
 """
 
+import os
+import sys
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
+from datetime import datetime
+
+# 添加utils目录到Python路径, 与 QueryEngine/MediaEngine 的搜索工具共用同一个 search_recorder 模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(os.path.dirname(current_dir))
+utils_dir = os.path.join(root_dir, 'utils')
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from search_recorder import install_search_recorder, is_replaying
 
 
 @dataclass
@@ -44,6 +56,41 @@ class BaseTrainingDataSearch(ABC):
         self.data_source = data_source
         self.db_config = self._load_db_config()
         self._validate_config()
+        self._install_query_cache()
+        self._install_recorder()
+
+    def _install_query_cache(self):
+        """
+        为所有查询工具安装进程内结果缓存(按数据版本号失效)
+        回放模式下不安装: 工具不连接数据库, 也就无法读取版本号
+        """
+        from .query_cache import get_query_cache
+
+        cache = get_query_cache()
+        if cache is not None and not is_replaying():
+            cache.install(self, self.data_source, self.get_supported_tools())
+
+    def get_query_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """获取查询结果缓存的命中统计(未开启缓存时返回None)"""
+        from .query_cache import get_query_cache
+
+        cache = get_query_cache()
+        return cache.get_stats() if cache is not None else None
+
+    def _install_recorder(self):
+        """
+        SEARCH_RECORD_MODE 开启时为所有查询工具安装录制/回放包装
+        回放模式下工具直接返回归档中的DBResponse,不连接数据库
+        """
+        def on_miss(method: str, params: Dict[str, Any]) -> DBResponse:
+            return DBResponse(
+                tool_name=method,
+                parameters=params,
+                data_source=self.data_source,
+                error_message="回放归档中没有该查询"
+            )
+
+        install_search_recorder(self, self.data_source, self.get_supported_tools(), on_miss=on_miss)
 
     @abstractmethod
     def _load_db_config(self) -> Dict[str, Any]:
@@ -179,6 +226,24 @@ class BaseTrainingDataSearch(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_load_trend(
+        self,
+        days: int = 42,
+        end_date: Optional[str] = None
+    ) -> DBResponse:
+        """
+        获取训练负荷趋势(ATL/CTL/TSB、ACWR、单调性与训练压力)
+
+        Args:
+            days: 摘要覆盖的最近天数
+            end_date: 截止日期 'YYYY-MM-DD' (默认今天)
+
+        Returns:
+            DBResponse对象,statistics字段包含负荷趋势摘要
+        """
+        pass
+
     # ===== 工具辅助方法 =====
 
     def _calculate_pace(self, duration_seconds: int, distance_meters: Optional[float]) -> Optional[float]:
@@ -189,6 +254,38 @@ class BaseTrainingDataSearch(ABC):
         duration = float(duration_seconds)
         return duration / distance_km
 
+    def _get_start_column(self):
+        """训练记录的开始时间列(子类覆盖), 用于核对训练汇总表是否完整覆盖查询范围; 返回None时不核对"""
+        return None
+
+    def _load_rollup_totals(self, start_date: Optional[str], end_date: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        从训练汇总表合计日期范围内的指标(供统计工具使用)
+
+        Returns:
+            合计结果; 日期格式错误、汇总表尚未建立(或未完整覆盖该范围)或查询失败时返回None, 调用方回退到全表聚合
+        """
+        from .training_rollup import load_rollup_totals
+
+        try:
+            start_day = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+            end_day = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        except ValueError:
+            return None
+
+        try:
+            with self.db_manager.get_session() as session:
+                totals = load_rollup_totals(
+                    session, self.data_source, start_day, end_day, start_column=self._get_start_column()
+                )
+        except Exception as e:
+            print(f"训练汇总表不可用,回退到全表聚合: {e}")
+            return None
+
+        if totals is not None:
+            print("  使用训练汇总表回答统计查询")
+        return totals
+
     def get_supported_tools(self) -> List[str]:
         """
         获取当前数据源支持的工具列表
@@ -201,5 +298,6 @@ class BaseTrainingDataSearch(ABC):
             "search_by_date_range",
             "get_training_stats",
             "search_by_distance_range",
-            "search_by_heart_rate"
+            "search_by_heart_rate",
+            "get_load_trend"
         ]
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 """
 训练数据库ORM模型定义
-使用SQLAlchemy定义training_records_keep和training_records_garmin表结构
+使用SQLAlchemy定义training_records_keep和training_records_garmin表结构,
+以及training_daily_agg/training_weekly_agg汇总表(由导入脚本和训练数据管理接口增量刷新)
+和training_data_version数据版本号表
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, BigInteger, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, BigInteger, Text
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -121,3 +123,83 @@ class TrainingRecordGarmin(Base):
 
     def __repr__(self):
         return f"<GarminTraining(id={self.id}, type={self.sport_type}, time={self.start_time_gmt})>"
+
+
+class TrainingAggColumns:
+    """
+    训练汇总表公共字段
+    均值类指标存储"总和 + 非空计数",使任意多个日/周汇总行可以直接相加后再求均值
+    """
+    sessions = Column(Integer, nullable=False, default=0)
+    total_duration = Column(BigInteger, nullable=False, default=0)
+    total_distance = Column(Float, nullable=False, default=0)
+    distance_count = Column(Integer, nullable=False, default=0)
+    heart_rate_sum = Column(BigInteger, nullable=False, default=0)
+    heart_rate_count = Column(Integer, nullable=False, default=0)
+    peak_heart_rate = Column(Integer, nullable=True)
+    total_calories = Column(BigInteger, nullable=False, default=0)
+
+    # Garmin扩展指标 (Keep数据源为0)
+    cadence_sum = Column(BigInteger, nullable=False, default=0)
+    cadence_count = Column(Integer, nullable=False, default=0)
+    power_sum = Column(BigInteger, nullable=False, default=0)
+    power_count = Column(Integer, nullable=False, default=0)
+    training_load_sum = Column(BigInteger, nullable=False, default=0)
+    training_load_count = Column(Integer, nullable=False, default=0)
+    aerobic_effect_sum = Column(Float, nullable=False, default=0)
+    aerobic_effect_count = Column(Integer, nullable=False, default=0)
+    anaerobic_effect_sum = Column(Float, nullable=False, default=0)
+    anaerobic_effect_count = Column(Integer, nullable=False, default=0)
+    stride_length_sum = Column(Float, nullable=False, default=0)
+    stride_length_count = Column(Integer, nullable=False, default=0)
+    vertical_oscillation_sum = Column(Float, nullable=False, default=0)
+    vertical_oscillation_count = Column(Integer, nullable=False, default=0)
+    ground_contact_time_sum = Column(BigInteger, nullable=False, default=0)
+    ground_contact_time_count = Column(Integer, nullable=False, default=0)
+    hr_zone_1_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_2_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_3_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_4_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_5_seconds = Column(BigInteger, nullable=False, default=0)
+    maintaining_count = Column(Integer, nullable=False, default=0)
+    improving_count = Column(Integer, nullable=False, default=0)
+    highly_improving_count = Column(Integer, nullable=False, default=0)
+    moderate_intensity_minutes = Column(BigInteger, nullable=False, default=0)
+    vigorous_intensity_minutes = Column(BigInteger, nullable=False, default=0)
+
+    # 元数据
+    last_modify_ts = Column(BigInteger, nullable=False)
+
+
+class TrainingDailyAgg(TrainingAggColumns, Base):
+    """训练日汇总表 (按开始时间所在日期聚合)"""
+    __tablename__ = 'training_daily_agg'
+
+    data_source = Column(String(16), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    def __repr__(self):
+        return f"<TrainingDailyAgg(data_source={self.data_source}, day={self.day}, sessions={self.sessions})>"
+
+
+class TrainingWeeklyAgg(TrainingAggColumns, Base):
+    """训练周汇总表 (week_start为周一)"""
+    __tablename__ = 'training_weekly_agg'
+
+    data_source = Column(String(16), primary_key=True)
+    week_start = Column(Date, primary_key=True)
+
+    def __repr__(self):
+        return f"<TrainingWeeklyAgg(data_source={self.data_source}, week_start={self.week_start}, sessions={self.sessions})>"
+
+
+class TrainingDataVersion(Base):
+    """训练数据版本号表: 导入或增删改训练记录后递增, 供InsightEngine的查询结果缓存判断是否失效"""
+    __tablename__ = 'training_data_version'
+
+    data_source = Column(String(16), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    last_modify_ts = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<TrainingDataVersion(data_source={self.data_source}, version={self.version})>"
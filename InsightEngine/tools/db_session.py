@@ -6,6 +6,7 @@ SQLAlchemy数据库会话管理器
 
 import sys
 import os
+import threading
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool
@@ -24,6 +25,7 @@ class DatabaseSessionManager:
     _instance: Optional['DatabaseSessionManager'] = None
     _engine = None
     _session_factory = None
+    _init_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -31,12 +33,25 @@ class DatabaseSessionManager:
         return cls._instance
 
     def __init__(self):
-        """初始化数据库连接"""
-        if self._engine is None:
-            self._initialize_engine()
+        """数据库连接在首次使用时才建立(搜索回放模式下不访问数据库,也无需数据库配置)"""
+        pass
+
+    def _ensure_engine(self):
+        """首次使用时初始化数据库连接"""
+        # 会话工厂最后创建,以它判断初始化是否完成
+        if self._session_factory is None:
+            with self._init_lock:
+                if self._session_factory is None:
+                    self._initialize_engine()
 
     def _initialize_engine(self):
         """初始化SQLAlchemy引擎"""
+        # 显式指定完整连接URL时(如基准测试使用的本地SQLite合成数据集)直接使用,跳过MySQL配置
+        override_url = os.getenv("TRAINING_DB_URL")
+        if override_url:
+            self._create_engine(override_url)
+            return
+
         # 从config.py读取数据库配置
         try:
             import config
@@ -67,6 +82,10 @@ class DatabaseSessionManager:
             f"?charset={db_charset}"
         )
 
+        self._create_engine(database_url)
+
+    def _create_engine(self, database_url: str):
+        """根据连接URL创建引擎与会话工厂"""
         # 创建引擎
         self._engine = create_engine(
             database_url,
@@ -99,6 +118,7 @@ class DatabaseSessionManager:
             results = session.query(Model).all()
         ```
         """
+        self._ensure_engine()
         session = self._session_factory()
         try:
             yield session
@@ -111,6 +131,7 @@ class DatabaseSessionManager:
 
     def get_engine(self):
         """获取SQLAlchemy引擎"""
+        self._ensure_engine()
         return self._engine
 
     def close_all(self):
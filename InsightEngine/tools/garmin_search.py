@@ -2,32 +2,54 @@
 """
 Garmin设备训练数据搜索工具 (ORM版本)
 基于SQLAlchemy ORM实现,替代原生SQL,避免SQL注入风险
+
+记录查询按列投影: 每个工具声明自己需要的列,以元组形式读取(select(...)),直接构建带__slots__的记录,
+不再加载完整的ORM对象(也就不经过Session的identity map),未读取的字段为None
 """
 
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
-from sqlalchemy import func, case
+from sqlalchemy import func, case, select
 from sqlalchemy.orm import Session
 
 from .base_search import BaseTrainingDataSearch, DBResponse
 from .db_models import TrainingRecordGarmin
 from .db_session import db_session_manager
+from .training_rollup import build_training_stats, build_training_effect_stats
+from .load_analytics import session_loads, analyze_training_load
 
 
 @dataclass
 class GarminTrainingRecord:
-    """Garmin训练记录数据类"""
-    id: int
-    user_id: str
+    """Garmin训练记录数据类 (未投影读取的字段为None)"""
+    # 显式声明__slots__(dataclass的slots参数需要Python 3.10+), 字段因此不能带默认值,
+    # 由 _row_to_record 为未投影的字段补None
+    __slots__ = (
+        "id", "user_id", "activity_id", "activity_name", "sport_type", "start_time_gmt",
+        "end_time_gmt", "duration_seconds", "distance_meters", "avg_heart_rate", "max_heart_rate",
+        "hr_zone_1_seconds", "hr_zone_2_seconds", "hr_zone_3_seconds", "hr_zone_4_seconds",
+        "hr_zone_5_seconds", "avg_cadence", "max_cadence", "avg_stride_length_cm",
+        "avg_vertical_oscillation_cm", "avg_ground_contact_time_ms", "vertical_ratio_percent",
+        "total_steps", "avg_power_watts", "max_power_watts", "normalized_power_watts",
+        "power_zone_1_seconds", "power_zone_2_seconds", "power_zone_3_seconds",
+        "power_zone_4_seconds", "power_zone_5_seconds", "avg_speed_mps", "max_speed_mps",
+        "aerobic_training_effect", "anaerobic_training_effect", "training_effect_label",
+        "training_load", "activity_calories", "basal_metabolism_calories",
+        "estimated_sweat_loss_ml", "moderate_intensity_minutes", "vigorous_intensity_minutes",
+        "body_battery_change", "add_ts", "last_modify_ts", "data_source", "pace_per_km",
+    )
+
+    id: Optional[int]
+    user_id: Optional[str]
 
     # 基础训练信息
     activity_id: Optional[str]
     activity_name: Optional[str]
-    sport_type: str
-    start_time_gmt: datetime
-    end_time_gmt: datetime
-    duration_seconds: int
+    sport_type: Optional[str]
+    start_time_gmt: Optional[datetime]
+    end_time_gmt: Optional[datetime]
+    duration_seconds: Optional[int]
     distance_meters: Optional[float]
 
     # 心率指标
@@ -81,12 +103,37 @@ class GarminTrainingRecord:
     body_battery_change: Optional[int]
 
     # 元数据
-    add_ts: int
-    last_modify_ts: int
-    data_source: str
+    add_ts: Optional[int]
+    last_modify_ts: Optional[int]
+    data_source: Optional[str]
 
     # 计算字段
-    pace_per_km: Optional[float] = None
+    pace_per_km: Optional[float]
+
+
+# 各工具读取的列 (列名与GarminTrainingRecord字段一致)
+SUMMARY_COLUMNS = (
+    "id", "user_id", "activity_id", "activity_name", "sport_type",
+    "start_time_gmt", "end_time_gmt", "duration_seconds", "distance_meters",
+    "avg_heart_rate", "max_heart_rate", "activity_calories",
+    "training_load", "aerobic_training_effect", "anaerobic_training_effect", "training_effect_label",
+)
+HEART_RATE_COLUMNS = SUMMARY_COLUMNS + (
+    "hr_zone_1_seconds", "hr_zone_2_seconds", "hr_zone_3_seconds", "hr_zone_4_seconds", "hr_zone_5_seconds",
+)
+RUNNING_DYNAMICS_COLUMNS = SUMMARY_COLUMNS + (
+    "avg_speed_mps", "max_speed_mps", "avg_cadence", "max_cadence", "avg_stride_length_cm",
+    "avg_vertical_oscillation_cm", "avg_ground_contact_time_ms", "vertical_ratio_percent", "total_steps",
+)
+TRAINING_EFFECT_COLUMNS = SUMMARY_COLUMNS + (
+    "moderate_intensity_minutes", "vigorous_intensity_minutes", "body_battery_change",
+)
+POWER_COLUMNS = SUMMARY_COLUMNS + (
+    "avg_power_watts", "max_power_watts", "normalized_power_watts",
+    "power_zone_1_seconds", "power_zone_2_seconds", "power_zone_3_seconds",
+    "power_zone_4_seconds", "power_zone_5_seconds",
+)
+ALL_COLUMNS = tuple(f.name for f in fields(GarminTrainingRecord) if f.name != "pace_per_km")
 
 
 class GarminDataSearch(BaseTrainingDataSearch):
@@ -108,67 +155,28 @@ class GarminDataSearch(BaseTrainingDataSearch):
         """ORM方式不使用原生SQL,此方法保留仅为兼容基类"""
         raise NotImplementedError("ORM方式不使用_execute_query方法")
 
-    def _orm_to_record(self, orm_obj: TrainingRecordGarmin) -> GarminTrainingRecord:
-        """将ORM对象转换为GarminTrainingRecord数据类"""
-        pace = self._calculate_pace(orm_obj.duration_seconds, orm_obj.distance_meters)
-        return GarminTrainingRecord(
-            id=orm_obj.id,
-            user_id=orm_obj.user_id,
-            activity_id=orm_obj.activity_id,
-            activity_name=orm_obj.activity_name,
-            sport_type=orm_obj.sport_type,
-            start_time_gmt=orm_obj.start_time_gmt,
-            end_time_gmt=orm_obj.end_time_gmt,
-            duration_seconds=orm_obj.duration_seconds,
-            distance_meters=orm_obj.distance_meters,
-            # 心率指标
-            avg_heart_rate=orm_obj.avg_heart_rate,
-            max_heart_rate=orm_obj.max_heart_rate,
-            hr_zone_1_seconds=orm_obj.hr_zone_1_seconds,
-            hr_zone_2_seconds=orm_obj.hr_zone_2_seconds,
-            hr_zone_3_seconds=orm_obj.hr_zone_3_seconds,
-            hr_zone_4_seconds=orm_obj.hr_zone_4_seconds,
-            hr_zone_5_seconds=orm_obj.hr_zone_5_seconds,
-            # 步频步幅指标
-            avg_cadence=orm_obj.avg_cadence,
-            max_cadence=orm_obj.max_cadence,
-            avg_stride_length_cm=orm_obj.avg_stride_length_cm,
-            avg_vertical_oscillation_cm=orm_obj.avg_vertical_oscillation_cm,
-            avg_ground_contact_time_ms=orm_obj.avg_ground_contact_time_ms,
-            vertical_ratio_percent=orm_obj.vertical_ratio_percent,
-            total_steps=orm_obj.total_steps,
-            # 功率指标
-            avg_power_watts=orm_obj.avg_power_watts,
-            max_power_watts=orm_obj.max_power_watts,
-            normalized_power_watts=orm_obj.normalized_power_watts,
-            power_zone_1_seconds=orm_obj.power_zone_1_seconds,
-            power_zone_2_seconds=orm_obj.power_zone_2_seconds,
-            power_zone_3_seconds=orm_obj.power_zone_3_seconds,
-            power_zone_4_seconds=orm_obj.power_zone_4_seconds,
-            power_zone_5_seconds=orm_obj.power_zone_5_seconds,
-            # 速度指标
-            avg_speed_mps=orm_obj.avg_speed_mps,
-            max_speed_mps=orm_obj.max_speed_mps,
-            # 训练效果指标
-            aerobic_training_effect=orm_obj.aerobic_training_effect,
-            anaerobic_training_effect=orm_obj.anaerobic_training_effect,
-            training_effect_label=orm_obj.training_effect_label,
-            training_load=orm_obj.training_load,
-            # 卡路里和代谢指标
-            activity_calories=orm_obj.activity_calories,
-            basal_metabolism_calories=orm_obj.basal_metabolism_calories,
-            estimated_sweat_loss_ml=orm_obj.estimated_sweat_loss_ml,
-            # 强度时长
-            moderate_intensity_minutes=orm_obj.moderate_intensity_minutes,
-            vigorous_intensity_minutes=orm_obj.vigorous_intensity_minutes,
-            # 其他指标
-            body_battery_change=orm_obj.body_battery_change,
-            # 元数据
-            add_ts=orm_obj.add_ts,
-            last_modify_ts=orm_obj.last_modify_ts,
-            data_source=orm_obj.data_source,
-            pace_per_km=pace
-        )
+    def _load_records(
+        self,
+        session: Session,
+        columns: Sequence[str],
+        *criteria,
+        order_by=None,
+        limit: Optional[int] = None
+    ) -> List[GarminTrainingRecord]:
+        """按列投影查询训练记录: 只读取columns中的列,以元组返回后直接构建记录"""
+        statement = select(*(getattr(TrainingRecordGarmin, name) for name in columns)).where(*criteria)
+        if order_by is not None:
+            statement = statement.order_by(order_by)
+        if limit:
+            statement = statement.limit(limit)
+        return [self._row_to_record(columns, row) for row in session.execute(statement)]
+
+    def _row_to_record(self, columns: Sequence[str], row: Sequence[Any]) -> GarminTrainingRecord:
+        """将投影查询的一行元组转换为GarminTrainingRecord"""
+        values = dict.fromkeys(GarminTrainingRecord.__slots__)
+        values.update(zip(columns, row))
+        values["pace_per_km"] = self._calculate_pace(values["duration_seconds"], values["distance_meters"])
+        return GarminTrainingRecord(**values)
 
     def search_recent_trainings(
         self,
@@ -183,13 +191,13 @@ class GarminDataSearch(BaseTrainingDataSearch):
 
         try:
             with self.db_manager.get_session() as session:
-                query = session.query(TrainingRecordGarmin)\
-                    .filter(TrainingRecordGarmin.start_time_gmt >= start_time)\
-                    .order_by(TrainingRecordGarmin.start_time_gmt.desc())\
-                    .limit(limit)
-
-                orm_results = query.all()
-                records = [self._orm_to_record(obj) for obj in orm_results]
+                records = self._load_records(
+                    session,
+                    SUMMARY_COLUMNS,
+                    TrainingRecordGarmin.start_time_gmt >= start_time,
+                    order_by=TrainingRecordGarmin.start_time_gmt.desc(),
+                    limit=limit
+                )
 
             return DBResponse(
                 tool_name="search_recent_trainings",
@@ -233,16 +241,14 @@ class GarminDataSearch(BaseTrainingDataSearch):
 
         try:
             with self.db_manager.get_session() as session:
-                query = session.query(TrainingRecordGarmin)\
-                    .filter(
-                        TrainingRecordGarmin.start_time_gmt >= start_dt,
-                        TrainingRecordGarmin.start_time_gmt < end_dt
-                    )\
-                    .order_by(TrainingRecordGarmin.start_time_gmt.desc())\
-                    .limit(limit)
-
-                orm_results = query.all()
-                records = [self._orm_to_record(obj) for obj in orm_results]
+                records = self._load_records(
+                    session,
+                    SUMMARY_COLUMNS,
+                    TrainingRecordGarmin.start_time_gmt >= start_dt,
+                    TrainingRecordGarmin.start_time_gmt < end_dt,
+                    order_by=TrainingRecordGarmin.start_time_gmt.desc(),
+                    limit=limit
+                )
 
             return DBResponse(
                 tool_name="search_by_date_range",
@@ -271,6 +277,18 @@ class GarminDataSearch(BaseTrainingDataSearch):
         }
         print(f"--- Garmin数据源(ORM): 获取训练统计 (params: {params_for_log}) ---")
 
+        # 优先从训练汇总表回答
+        totals = self._load_rollup_totals(start_date, end_date)
+        if totals is not None:
+            stats = build_training_stats(totals, extended=True)
+            return DBResponse(
+                tool_name="get_training_stats",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                statistics=stats,
+                error_message=None if stats else "未找到数据"
+            )
+
         try:
             with self.db_manager.get_session() as session:
                 query = session.query(
@@ -387,17 +405,19 @@ class GarminDataSearch(BaseTrainingDataSearch):
 
         try:
             with self.db_manager.get_session() as session:
-                query = session.query(TrainingRecordGarmin)\
-                    .filter(TrainingRecordGarmin.distance_meters >= min_meters)
+                criteria = [TrainingRecordGarmin.distance_meters >= min_meters]
 
                 if max_distance_km:
                     max_meters = max_distance_km * 1000
-                    query = query.filter(TrainingRecordGarmin.distance_meters <= max_meters)
-
-                query = query.order_by(TrainingRecordGarmin.distance_meters.desc()).limit(limit)
-
-                orm_results = query.all()
-                records = [self._orm_to_record(obj) for obj in orm_results]
+                    criteria.append(TrainingRecordGarmin.distance_meters <= max_meters)
+
+                records = self._load_records(
+                    session,
+                    RUNNING_DYNAMICS_COLUMNS,
+                    *criteria,
+                    order_by=TrainingRecordGarmin.distance_meters.desc(),
+                    limit=limit
+                )
 
             return DBResponse(
                 tool_name="search_by_distance_range",
@@ -430,16 +450,18 @@ class GarminDataSearch(BaseTrainingDataSearch):
 
         try:
             with self.db_manager.get_session() as session:
-                query = session.query(TrainingRecordGarmin)\
-                    .filter(TrainingRecordGarmin.avg_heart_rate >= min_avg_hr)
+                criteria = [TrainingRecordGarmin.avg_heart_rate >= min_avg_hr]
 
                 if max_avg_hr:
-                    query = query.filter(TrainingRecordGarmin.avg_heart_rate <= max_avg_hr)
-
-                query = query.order_by(TrainingRecordGarmin.start_time_gmt.desc()).limit(limit)
-
-                orm_results = query.all()
-                records = [self._orm_to_record(obj) for obj in orm_results]
+                    criteria.append(TrainingRecordGarmin.avg_heart_rate <= max_avg_hr)
+
+                records = self._load_records(
+                    session,
+                    HEART_RATE_COLUMNS,
+                    *criteria,
+                    order_by=TrainingRecordGarmin.start_time_gmt.desc(),
+                    limit=limit
+                )
 
             return DBResponse(
                 tool_name="search_by_heart_rate",
@@ -474,16 +496,18 @@ class GarminDataSearch(BaseTrainingDataSearch):
 
         try:
             with self.db_manager.get_session() as session:
-                query = session.query(TrainingRecordGarmin)\
-                    .filter(TrainingRecordGarmin.training_load >= min_load)
+                criteria = [TrainingRecordGarmin.training_load >= min_load]
 
                 if max_load:
-                    query = query.filter(TrainingRecordGarmin.training_load <= max_load)
-
-                query = query.order_by(TrainingRecordGarmin.training_load.desc()).limit(limit)
-
-                orm_results = query.all()
-                records = [self._orm_to_record(obj) for obj in orm_results]
+                    criteria.append(TrainingRecordGarmin.training_load <= max_load)
+
+                records = self._load_records(
+                    session,
+                    TRAINING_EFFECT_COLUMNS,
+                    *criteria,
+                    order_by=TrainingRecordGarmin.training_load.desc(),
+                    limit=limit
+                )
 
             return DBResponse(
                 tool_name="search_by_training_load",
@@ -516,16 +540,18 @@ class GarminDataSearch(BaseTrainingDataSearch):
 
         try:
             with self.db_manager.get_session() as session:
-                query = session.query(TrainingRecordGarmin)\
-                    .filter(TrainingRecordGarmin.avg_power_watts >= min_avg_power)
+                criteria = [TrainingRecordGarmin.avg_power_watts >= min_avg_power]
 
                 if max_avg_power:
-                    query = query.filter(TrainingRecordGarmin.avg_power_watts <= max_avg_power)
-
-                query = query.order_by(TrainingRecordGarmin.avg_power_watts.desc()).limit(limit)
-
-                orm_results = query.all()
-                records = [self._orm_to_record(obj) for obj in orm_results]
+                    criteria.append(TrainingRecordGarmin.avg_power_watts <= max_avg_power)
+
+                records = self._load_records(
+                    session,
+                    POWER_COLUMNS,
+                    *criteria,
+                    order_by=TrainingRecordGarmin.avg_power_watts.desc(),
+                    limit=limit
+                )
 
             return DBResponse(
                 tool_name="search_by_power_zone",
@@ -551,6 +577,18 @@ class GarminDataSearch(BaseTrainingDataSearch):
         params_for_log = {'start_date': start_date, 'end_date': end_date}
         print(f"--- Garmin数据源(ORM): 训练效果分析 (params: {params_for_log}) ---")
 
+        # 优先从训练汇总表回答
+        totals = self._load_rollup_totals(start_date, end_date)
+        if totals is not None:
+            stats = build_training_effect_stats(totals)
+            return DBResponse(
+                tool_name="get_training_effect_analysis",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                statistics=stats,
+                error_message=None if stats else "未找到数据"
+            )
+
         try:
             with self.db_manager.get_session() as session:
                 query = session.query(
@@ -641,6 +679,72 @@ class GarminDataSearch(BaseTrainingDataSearch):
                 error_message=str(e)
             )
 
+    def get_load_trend(
+        self,
+        days: int = 42,
+        end_date: Optional[str] = None
+    ) -> DBResponse:
+        """训练负荷趋势 (单次负荷优先使用Garmin training_load, 缺失时按TRIMP估算)"""
+        params_for_log = {'days': days, 'end_date': end_date}
+        print(f"--- Garmin数据源(ORM): 训练负荷趋势 (params: {params_for_log}) ---")
+
+        try:
+            end_day = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else datetime.now().date()
+        except ValueError:
+            return DBResponse(
+                tool_name="get_load_trend",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                error_message="日期格式错误,请使用 'YYYY-MM-DD' 格式"
+            )
+
+        try:
+            # 指数加权需要完整历史预热, 一次性读取截止日期前的全部记录(只取计算所需的列)
+            with self.db_manager.get_session() as session:
+                rows = session.execute(
+                    select(
+                        TrainingRecordGarmin.start_time_gmt,
+                        TrainingRecordGarmin.duration_seconds,
+                        TrainingRecordGarmin.distance_meters,
+                        TrainingRecordGarmin.avg_heart_rate,
+                        TrainingRecordGarmin.max_heart_rate,
+                        TrainingRecordGarmin.training_load
+                    ).where(
+                        TrainingRecordGarmin.start_time_gmt < datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+                    )
+                ).all()
+
+            if not rows:
+                return DBResponse(
+                    tool_name="get_load_trend",
+                    parameters=params_for_log,
+                    data_source=self.data_source,
+                    error_message="未找到数据"
+                )
+
+            start_times, durations, distances, avg_heart_rates, max_heart_rates, device_loads = zip(*rows)
+            loads = session_loads(durations, avg_heart_rates, max_heart_rates, device_loads)
+            stats = analyze_training_load(start_times, loads, distances, days=days, end_day=end_day)
+            stats['load_source'] = "Garmin training_load(缺失时按TRIMP估算)"
+
+            return DBResponse(
+                tool_name="get_load_trend",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                statistics=stats
+            )
+        except Exception as e:
+            print(f"Garmin数据源(ORM)查询错误: {e}")
+            return DBResponse(
+                tool_name="get_load_trend",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                error_message=str(e)
+            )
+
+    def _get_start_column(self):
+        return TrainingRecordGarmin.start_time_gmt
+
     def get_supported_tools(self) -> List[str]:
         """获取Garmin数据源支持的所有工具"""
         base_tools = super().get_supported_tools()
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Keep心率序列分析 (NumPy实现)
+heart_rate_data 列保存整次训练的心率采样(JSON数组), 这里把多条记录一次性解码为一个扁平数组 + 每条记录的采样数,
+按记录分段向量化计算:
+- 心率区间时长(按最大心率百分比划分5个区间, 与Garmin默认区间一致, 低于60%计入区间1)
+- 心率分位数(P10/P50/P90)
+- 心率漂移: 去掉前10%热身段后, 后半段相对前半段平均心率的变化百分比(配速稳定时反映有氧耐力的脱耦程度)
+
+每条记录的采样按训练时长均匀分布, 单个采样代表 时长/采样数 秒
+
+分析结果按 (记录ID, last_modify_ts, 最大心率) 缓存在进程内, 记录被修改后last_modify_ts变化, 自然不再命中;
+工具只对未命中的记录读取heart_rate_data(LONGTEXT)
+
+通过环境变量配置:
+- INSIGHT_HR_CACHE_MAX_ENTRIES: 最多缓存的单次训练分析结果数（默认 4096，超过时淘汰最久未使用的）
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 区间1~5的下边界(最大心率百分比), 区间1包含低于60%的部分
+ZONE_BOUNDS = (0.6, 0.7, 0.8, 0.9)
+ZONE_COUNT = len(ZONE_BOUNDS) + 1
+
+# 有效心率范围, 超出视为传感器异常值
+MIN_VALID_HEART_RATE = 30
+MAX_VALID_HEART_RATE = 250
+
+# 心率漂移: 跳过的热身比例 与 参与计算的最短时长(秒)
+DRIFT_WARMUP_RATIO = 0.1
+DRIFT_MIN_DURATION = 20 * 60
+
+
+def _parse_text(text: Optional[str]) -> List:
+    """解析单条heart_rate_data, 无法解析时返回空列表"""
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, ValueError, TypeError):
+        return []
+    return data if isinstance(data, list) else []
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def _round(value, digits: int = 1) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), digits)
+
+
+def decode_heart_rate_batch(hr_texts: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    批量解码多条记录的heart_rate_data
+
+    所有记录拼接为一个JSON数组只调用一次json.loads(其中有格式错误的记录时退回逐条解析)
+
+    Returns:
+        (values, lengths, raw_lengths):
+        values 为全部有效心率的扁平数组(按记录顺序), lengths 为每条记录的有效采样数,
+        raw_lengths 为每条记录的原始采样数(用于换算单个采样代表的秒数)
+    """
+    texts = [text.strip() if isinstance(text, str) else '' for text in hr_texts]
+    try:
+        rows = json.loads('[' + ','.join(text or 'null' for text in texts) + ']')
+        rows = [row if isinstance(row, list) else [] for row in rows]
+    except (json.JSONDecodeError, ValueError):
+        rows = [_parse_text(text) for text in texts]
+
+    raw_lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    flat = [value for row in rows for value in row]
+    try:
+        values = np.array(flat, dtype=np.float64)
+    except (ValueError, TypeError):
+        # 混有空字符串等无法直接转换的元素
+        values = np.fromiter((_to_float(value) for value in flat), dtype=np.float64, count=len(flat))
+
+    valid = np.isfinite(values) & (values >= MIN_VALID_HEART_RATE) & (values <= MAX_VALID_HEART_RATE)
+    segments = np.repeat(np.arange(len(rows)), raw_lengths)
+    lengths = np.bincount(segments[valid], minlength=len(rows)).astype(np.int64)
+    return values[valid], lengths, raw_lengths
+
+
+def _segment_percentiles(sorted_values: np.ndarray, starts: np.ndarray, lengths: np.ndarray, q: float) -> np.ndarray:
+    """对已按段排序的扁平数组计算每段的分位数(线性插值), 空段为NaN"""
+    result = np.full(len(lengths), np.nan)
+    has_data = lengths > 0
+    position = starts[has_data] + q / 100.0 * (lengths[has_data] - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    fraction = position - low
+    result[has_data] = sorted_values[low] * (1 - fraction) + sorted_values[high] * fraction
+    return result
+
+
+def analyze_heart_rate_batch(
+    hr_texts: Sequence[Optional[str]],
+    duration_seconds: Sequence,
+    max_heart_rate: float
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    批量分析多条记录的心率序列
+
+    Args:
+        hr_texts: 每条记录的heart_rate_data
+        duration_seconds: 每条记录的训练时长(秒)
+        max_heart_rate: 划分心率区间使用的最大心率
+
+    Returns:
+        与输入等长的列表; 有心率数据的记录为分析结果字典(其中 "histogram" 为按1bpm分桶的时长数组), 否则为None
+    """
+    count = len(hr_texts)
+    if count == 0:
+        return []
+
+    values, lengths, raw_lengths = decode_heart_rate_batch(hr_texts)
+    durations = np.array([float(value or 0) for value in duration_seconds], dtype=np.float64)
+    # 单个采样代表的秒数
+    interval = np.where(raw_lengths > 0, durations / np.maximum(raw_lengths, 1), 0.0)
+
+    segments = np.repeat(np.arange(count), lengths)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    sample_seconds = interval[segments]
+
+    # 区间时长
+    zones = np.digitize(values / float(max_heart_rate), ZONE_BOUNDS)
+    zone_seconds = np.bincount(
+        segments * ZONE_COUNT + zones, weights=sample_seconds, minlength=count * ZONE_COUNT
+    ).reshape(count, ZONE_COUNT)
+
+    # 1bpm分桶的时长直方图(用于合并多次训练后的整体分位数)
+    bins = np.rint(values).astype(np.int64) - MIN_VALID_HEART_RATE
+    bin_count = MAX_VALID_HEART_RATE - MIN_VALID_HEART_RATE + 1
+    histograms = np.bincount(
+        segments * bin_count + bins, weights=sample_seconds, minlength=count * bin_count
+    ).reshape(count, bin_count)
+
+    # 均值、最大值与分位数
+    sums = np.bincount(segments, weights=values, minlength=count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / lengths
+    sorted_values = values[np.lexsort((values, segments))]
+    percentiles = {q: _segment_percentiles(sorted_values, starts, lengths, q) for q in (10, 50, 90)}
+    peaks = np.full(count, np.nan)
+    has_data = lengths > 0
+    peaks[has_data] = sorted_values[starts[has_data] + lengths[has_data] - 1]
+
+    # 心率漂移: 热身段之后的前后两半
+    position = np.arange(len(values)) - starts[segments]
+    segment_lengths = lengths[segments]
+    warmup = np.floor(segment_lengths * DRIFT_WARMUP_RATIO)
+    steady = position >= warmup
+    second_half = (position - warmup) * 2 >= (segment_lengths - warmup)
+    half_index = segments * 2 + second_half.astype(np.int64)
+    half_sums = np.bincount(half_index[steady], weights=values[steady], minlength=count * 2).reshape(count, 2)
+    half_counts = np.bincount(half_index[steady], minlength=count * 2).reshape(count, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half_means = half_sums / half_counts
+        drift = (half_means[:, 1] - half_means[:, 0]) / half_means[:, 0] * 100.0
+    drift[(durations < DRIFT_MIN_DURATION) | (half_counts.min(axis=1) == 0)] = np.nan
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for i in range(count):
+        if lengths[i] == 0:
+            results.append(None)
+            continue
+        total = float(zone_seconds[i].sum())
+        results.append({
+            "samples": int(lengths[i]),
+            "avg_heart_rate": _round(means[i]),
+            "p10_heart_rate": _round(percentiles[10][i]),
+            "p50_heart_rate": _round(percentiles[50][i]),
+            "p90_heart_rate": _round(percentiles[90][i]),
+            "peak_heart_rate": _round(peaks[i]),
+            "zone_seconds": [int(round(seconds)) for seconds in zone_seconds[i]],
+            "zone_percent": [_round(seconds / total * 100.0) if total > 0 else None for seconds in zone_seconds[i]],
+            "hr_drift_pct": _round(drift[i], 2),
+            "histogram": histograms[i].astype(np.float32),
+        })
+    return results
+
+
+def histogram_percentile(histogram: np.ndarray, q: float) -> Optional[float]:
+    """由1bpm分桶的时长直方图计算按时长加权的分位数"""
+    cumulative = np.cumsum(histogram)
+    if cumulative.size == 0 or cumulative[-1] <= 0:
+        return None
+    index = int(np.searchsorted(cumulative, q / 100.0 * cumulative[-1]))
+    return float(min(index, len(histogram) - 1) + MIN_VALID_HEART_RATE)
+
+
+def zone_bounds_bpm(max_heart_rate: float) -> Dict[str, str]:
+    """各心率区间对应的心率范围(bpm), 用于结果说明"""
+    edges = [int(round(bound * max_heart_rate)) for bound in ZONE_BOUNDS]
+    bounds = {"zone_1": f"<{edges[0]}"}
+    for i in range(1, ZONE_COUNT - 1):
+        bounds[f"zone_{i + 1}"] = f"{edges[i - 1]}-{edges[i] - 1}"
+    bounds[f"zone_{ZONE_COUNT}"] = f">={edges[-1]}"
+    return bounds
+
+
+class HeartRateAnalyticsCache:
+    """单次训练心率分析结果的LRU缓存"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get_many(self, keys: Sequence[Hashable]) -> Dict[Hashable, Optional[Dict[str, Any]]]:
+        """返回已缓存的结果(按键), 同时记录命中统计; 没有心率数据的记录缓存为None, 同样算命中"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[Hashable, Optional[Dict[str, Any]]]):
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[HeartRateAnalyticsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_heart_rate_cache() -> HeartRateAnalyticsCache:
+    """获取进程级共享的心率分析缓存"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                max_entries = int(os.getenv("INSIGHT_HR_CACHE_MAX_ENTRIES", "4096") or 4096)
+            except ValueError:
+                max_entries = 4096
+            _cache = HeartRateAnalyticsCache(max_entries=max_entries)
+        return _cache
@@ -13,6 +13,11 @@ from sqlalchemy import func
 from .base_search import BaseTrainingDataSearch, DBResponse
 from .db_models import TrainingRecordKeep
 from .db_session import db_session_manager
+from .training_rollup import build_training_stats
+from .load_analytics import session_loads, analyze_training_load, estimate_max_heart_rate
+from .hr_analytics import (
+    analyze_heart_rate_batch, histogram_percentile, zone_bounds_bpm, get_heart_rate_cache, ZONE_COUNT
+)
 
 
 @dataclass
@@ -206,6 +211,18 @@ class KeepDataSearch(BaseTrainingDataSearch):
         }
         print(f"--- Keep数据源(ORM): 获取训练统计 (params: {params_for_log}) ---")
 
+        # 优先从训练汇总表回答
+        totals = self._load_rollup_totals(start_date, end_date)
+        if totals is not None:
+            stats = build_training_stats(totals)
+            return DBResponse(
+                tool_name="get_training_stats",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                statistics=stats,
+                error_message=None if stats else "未找到数据"
+            )
+
         try:
             with self.db_manager.get_session() as session:
                 query = session.query(
@@ -374,3 +391,199 @@ class KeepDataSearch(BaseTrainingDataSearch):
                 data_source=self.data_source,
                 error_message=str(e)
             )
+
+    def get_load_trend(
+        self,
+        days: int = 42,
+        end_date: Optional[str] = None
+    ) -> DBResponse:
+        """训练负荷趋势 (Keep没有设备负荷, 按TRIMP由时长与平均心率估算单次负荷)"""
+        params_for_log = {
+            'days': days,
+            'end_date': end_date
+        }
+        print(f"--- Keep数据源(ORM): 训练负荷趋势 (params: {params_for_log}) ---")
+
+        try:
+            end_day = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else datetime.now().date()
+        except ValueError:
+            return DBResponse(
+                tool_name="get_load_trend",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                error_message="日期格式错误,请使用 'YYYY-MM-DD' 格式"
+            )
+
+        try:
+            # 指数加权需要完整历史预热, 一次性读取截止日期前的全部记录(只取计算所需的列)
+            with self.db_manager.get_session() as session:
+                rows = session.query(
+                    TrainingRecordKeep.start_time,
+                    TrainingRecordKeep.duration_seconds,
+                    TrainingRecordKeep.distance_meters,
+                    TrainingRecordKeep.avg_heart_rate,
+                    TrainingRecordKeep.max_heart_rate
+                ).filter(
+                    TrainingRecordKeep.start_time < datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+                ).all()
+
+            if not rows:
+                return DBResponse(
+                    tool_name="get_load_trend",
+                    parameters=params_for_log,
+                    data_source=self.data_source,
+                    error_message="未找到数据"
+                )
+
+            start_times, durations, distances, avg_heart_rates, max_heart_rates = zip(*rows)
+            loads = session_loads(durations, avg_heart_rates, max_heart_rates)
+            stats = analyze_training_load(start_times, loads, distances, days=days, end_day=end_day)
+            stats['load_source'] = "TRIMP(由时长与平均心率估算)"
+
+            return DBResponse(
+                tool_name="get_load_trend",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                statistics=stats
+            )
+        except Exception as e:
+            print(f"Keep数据源(ORM)查询错误: {e}")
+            return DBResponse(
+                tool_name="get_load_trend",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                error_message=str(e)
+            )
+
+    def get_heart_rate_analysis(
+        self,
+        days: int = 30,
+        max_heart_rate: Optional[int] = None,
+        limit: int = 20
+    ) -> DBResponse:
+        """心率序列分析 (Keep专属): 心率区间时长、分位数与心率漂移, 单次训练的分析结果按记录缓存"""
+        params_for_log = {
+            'days': days,
+            'max_heart_rate': max_heart_rate,
+            'limit': limit
+        }
+        print(f"--- Keep数据源(ORM): 心率序列分析 (params: {params_for_log}) ---")
+
+        start_dt = datetime.now() - timedelta(days=days)
+
+        try:
+            with self.db_manager.get_session() as session:
+                if not max_heart_rate:
+                    # 未指定时由全部历史记录的最大心率估计
+                    history = session.query(TrainingRecordKeep.max_heart_rate)\
+                        .filter(TrainingRecordKeep.max_heart_rate.isnot(None))\
+                        .all()
+                    max_hr = int(round(estimate_max_heart_rate([row[0] for row in history])))
+                else:
+                    max_hr = int(max_heart_rate)
+
+                sessions = session.query(
+                    TrainingRecordKeep.id,
+                    TrainingRecordKeep.last_modify_ts,
+                    TrainingRecordKeep.start_time,
+                    TrainingRecordKeep.duration_seconds,
+                    TrainingRecordKeep.distance_meters
+                ).filter(TrainingRecordKeep.start_time >= start_dt)\
+                    .order_by(TrainingRecordKeep.start_time.desc())\
+                    .all()
+
+                # 只为缓存未命中的记录读取heart_rate_data并批量分析
+                cache = get_heart_rate_cache()
+                keys = [(row.id, row.last_modify_ts, max_hr) for row in sessions]
+                analyses = cache.get_many(keys)
+                missing = [row for row, key in zip(sessions, keys) if key not in analyses]
+                if missing:
+                    hr_texts = dict(session.query(TrainingRecordKeep.id, TrainingRecordKeep.heart_rate_data)
+                                    .filter(TrainingRecordKeep.id.in_([row.id for row in missing]))
+                                    .all())
+                    results = analyze_heart_rate_batch(
+                        [hr_texts.get(row.id) for row in missing],
+                        [row.duration_seconds for row in missing],
+                        max_hr
+                    )
+                    computed = {(row.id, row.last_modify_ts, max_hr): result for row, result in zip(missing, results)}
+                    cache.put_many(computed)
+                    analyses.update(computed)
+                print(f"  心率分析缓存: 命中 {len(sessions) - len(missing)} 条, 新计算 {len(missing)} 条")
+
+            analyzed = [(row, analyses[key]) for row, key in zip(sessions, keys) if analyses[key] is not None]
+            if not analyzed:
+                return DBResponse(
+                    tool_name="get_heart_rate_analysis",
+                    parameters=params_for_log,
+                    data_source=self.data_source,
+                    error_message="未找到数据"
+                )
+
+            histogram = sum(result["histogram"] for _, result in analyzed)
+            zone_seconds = [sum(result["zone_seconds"][i] for _, result in analyzed) for i in range(ZONE_COUNT)]
+            total_seconds = sum(zone_seconds)
+            drifts = [result["hr_drift_pct"] for _, result in analyzed if result["hr_drift_pct"] is not None]
+
+            stats = {
+                'period': {
+                    'start_date': start_dt.strftime('%Y-%m-%d'),
+                    'end_date': datetime.now().strftime('%Y-%m-%d'),
+                    'days': days
+                },
+                'max_heart_rate': max_hr,
+                'max_heart_rate_source': '参数指定' if max_heart_rate else '由历史最大心率估计',
+                'zone_bounds_bpm': zone_bounds_bpm(max_hr),
+                'sessions_analyzed': len(analyzed),
+                'sessions_without_hr_data': len(sessions) - len(analyzed),
+                'overall': {
+                    'total_minutes': round(total_seconds / 60.0, 1),
+                    'zone_minutes': [round(seconds / 60.0, 1) for seconds in zone_seconds],
+                    'zone_percent': [round(seconds / total_seconds * 100.0, 1) if total_seconds else None
+                                     for seconds in zone_seconds],
+                    'p10_heart_rate': histogram_percentile(histogram, 10),
+                    'p50_heart_rate': histogram_percentile(histogram, 50),
+                    'p90_heart_rate': histogram_percentile(histogram, 90),
+                },
+                'hr_drift': {
+                    'sessions': len(drifts),
+                    'avg_drift_pct': round(sum(drifts) / len(drifts), 2) if drifts else None,
+                    'sessions_above_5pct': sum(1 for drift in drifts if drift > 5),
+                },
+                'sessions': [
+                    {
+                        'record_id': row.id,
+                        'start_time': row.start_time.strftime('%Y-%m-%d %H:%M'),
+                        'duration_minutes': round((row.duration_seconds or 0) / 60.0, 1),
+                        'distance_km': round(float(row.distance_meters) / 1000.0, 2) if row.distance_meters else None,
+                        **{name: value for name, value in result.items() if name != 'histogram'}
+                    }
+                    for row, result in analyzed[:limit]
+                ],
+            }
+
+            return DBResponse(
+                tool_name="get_heart_rate_analysis",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                statistics=stats
+            )
+        except Exception as e:
+            print(f"Keep数据源(ORM)查询错误: {e}")
+            return DBResponse(
+                tool_name="get_heart_rate_analysis",
+                parameters=params_for_log,
+                data_source=self.data_source,
+                error_message=str(e)
+            )
+
+    def _get_start_column(self):
+        return TrainingRecordKeep.start_time
+
+    def get_supported_tools(self) -> List[str]:
+        """获取Keep数据源支持的所有工具"""
+        base_tools = super().get_supported_tools()
+        keep_tools = [
+            "get_heart_rate_analysis"
+        ]
+        return base_tools + keep_tools
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+训练负荷时间序列分析 (NumPy实现)
+把训练记录一次性装载为按天对齐的负荷数组, 向量化计算:
+- ATL(急性负荷, 7天指数加权) / CTL(慢性负荷, 42天指数加权) / TSB(训练压力平衡 = 前一天的CTL - ATL)
+- ACWR(急性:慢性负荷比, 7天日均负荷 / 28天日均负荷)
+- Monotony(训练单调性, 7天日负荷均值 / 标准差) 与 Strain(训练压力, 7天总负荷 x 单调性)
+
+单次训练负荷: Garmin记录优先使用设备给出的training_load, 缺失时(以及Keep记录)按Banister TRIMP由时长和平均心率估算,
+结果作为紧凑的数值摘要交给LLM, 代替数百行原始训练记录
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+ATL_TIME_CONSTANT = 7
+CTL_TIME_CONSTANT = 42
+ACUTE_WINDOW = 7
+CHRONIC_WINDOW = 28
+
+RESTING_HEART_RATE = 60
+DEFAULT_MAX_HEART_RATE = 190
+# 没有心率数据时按中等强度(心率储备的60%)估算
+DEFAULT_HEART_RATE_RESERVE = 0.6
+
+
+def _to_float_array(values: Sequence) -> np.ndarray:
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+def estimate_max_heart_rate(max_heart_rates: Sequence) -> float:
+    """由记录中的最大心率估计个人最大心率(取98分位数, 限制在160~220之间)"""
+    observed = _to_float_array(max_heart_rates)
+    observed = observed[np.isfinite(observed) & (observed > 0)]
+    if observed.size == 0:
+        return float(DEFAULT_MAX_HEART_RATE)
+    return float(np.clip(np.percentile(observed, 98), 160, 220))
+
+
+def estimate_trimp(
+    duration_seconds: Sequence,
+    avg_heart_rates: Sequence,
+    max_heart_rate: float = DEFAULT_MAX_HEART_RATE,
+    resting_heart_rate: float = RESTING_HEART_RATE
+) -> np.ndarray:
+    """
+    Banister TRIMP: 时长(分钟) x 心率储备比例 x 0.64 x e^(1.92 x 心率储备比例)
+
+    Returns:
+        每次训练的负荷估计
+    """
+    minutes = np.nan_to_num(_to_float_array(duration_seconds)) / 60.0
+    heart_rates = _to_float_array(avg_heart_rates)
+    reserve = (heart_rates - resting_heart_rate) / max(max_heart_rate - resting_heart_rate, 1.0)
+    reserve = np.where(np.isfinite(reserve) & (heart_rates > 0), np.clip(reserve, 0.0, 1.0), DEFAULT_HEART_RATE_RESERVE)
+    return minutes * reserve * 0.64 * np.exp(1.92 * reserve)
+
+
+def session_loads(
+    duration_seconds: Sequence,
+    avg_heart_rates: Sequence,
+    max_heart_rates: Sequence,
+    device_loads: Optional[Sequence] = None
+) -> np.ndarray:
+    """每次训练的负荷: 设备负荷优先, 缺失时使用TRIMP估算"""
+    trimp = estimate_trimp(duration_seconds, avg_heart_rates, estimate_max_heart_rate(max_heart_rates))
+    if device_loads is None:
+        return trimp
+    device = _to_float_array(device_loads)
+    return np.where(np.isfinite(device) & (device > 0), device, trimp)
+
+
+def ewma(values: np.ndarray, time_constant: float, initial: float = 0.0, block: int = 128) -> np.ndarray:
+    """
+    指数加权移动平均 y[t] = decay * y[t-1] + (1 - decay) * x[t], decay = e^(-1/时间常数)
+
+    分块向量化: 块内 y[i] = decay^(i+1) * (y0 + (1-decay) * cumsum(x[j] / decay^(j+1))),
+    块长度有限, decay的负幂不会溢出
+    """
+    decay = np.exp(-1.0 / time_constant)
+    alpha = 1.0 - decay
+    result = np.empty(len(values), dtype=np.float64)
+    state = float(initial)
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        result[start:start + len(chunk)] = powers * (state + alpha * np.cumsum(chunk / powers))
+        state = result[start + len(chunk) - 1]
+    return result
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """截至每天(含当天)的window天滑动和, 序列开头不足window天时按已有天数求和"""
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    index = np.arange(1, len(values) + 1)
+    return cumulative[index] - cumulative[np.maximum(index - window, 0)]
+
+
+def build_daily_series(
+    start_times: Sequence,
+    loads: np.ndarray,
+    distances: Sequence,
+    end_day: date
+) -> Dict[str, Any]:
+    """
+    把训练记录按开始日期装入按天对齐的数组(从最早一次训练到end_day, 无训练的日期为0)
+
+    Returns:
+        {"first_day", "loads", "sessions", "distances"}
+    """
+    ordinals = np.fromiter((value.toordinal() for value in start_times), dtype=np.int64, count=len(start_times))
+    first = int(ordinals.min())
+    length = end_day.toordinal() - first + 1
+    index = ordinals - first
+    return {
+        "first_day": date.fromordinal(first),
+        "loads": np.bincount(index, weights=loads, minlength=length)[:length],
+        "sessions": np.bincount(index, minlength=length)[:length],
+        "distances": np.bincount(index, weights=np.nan_to_num(_to_float_array(distances)), minlength=length)[:length],
+    }
+
+
+def compute_load_metrics(daily_loads: np.ndarray) -> Dict[str, np.ndarray]:
+    """对日负荷序列计算ATL/CTL/TSB、ACWR、单调性与训练压力(与输入等长的数组, 无法计算处为NaN)"""
+    atl = ewma(daily_loads, ATL_TIME_CONSTANT)
+    ctl = ewma(daily_loads, CTL_TIME_CONSTANT)
+    # TSB反映"今天开始训练前"的状态, 取前一天的CTL - ATL
+    tsb = np.concatenate(([0.0], (ctl - atl)[:-1]))
+
+    acute = rolling_sum(daily_loads, ACUTE_WINDOW) / ACUTE_WINDOW
+    chronic = rolling_sum(daily_loads, CHRONIC_WINDOW) / CHRONIC_WINDOW
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+        mean_square = rolling_sum(daily_loads ** 2, ACUTE_WINDOW) / ACUTE_WINDOW
+        std = np.sqrt(np.maximum(mean_square - acute ** 2, 0.0))
+        monotony = np.where(std > 1e-9, acute / std, np.nan)
+    strain = acute * ACUTE_WINDOW * monotony
+
+    return {
+        "atl": atl,
+        "ctl": ctl,
+        "tsb": tsb,
+        "acute_load": acute,
+        "chronic_load": chronic,
+        "acwr": acwr,
+        "monotony": monotony,
+        "strain": strain,
+    }
+
+
+def _round(value, digits: int = 1) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), digits)
+
+
+def _assess(current: Dict[str, Optional[float]], ramp_rate: Optional[float], history_days: int) -> List[str]:
+    """按常用阈值给出负荷状态判断"""
+    notes = []
+    acwr = current["acwr"]
+    if acwr is not None:
+        if acwr > 1.5:
+            notes.append(f"ACWR={acwr} > 1.5: 近期负荷增长过快, 处于受伤高风险区")
+        elif acwr > 1.3:
+            notes.append(f"ACWR={acwr} 处于1.3~1.5: 负荷偏高, 需关注恢复")
+        elif acwr >= 0.8:
+            notes.append(f"ACWR={acwr} 处于0.8~1.3: 负荷增长处于最佳区间")
+        else:
+            notes.append(f"ACWR={acwr} < 0.8: 近期负荷低于长期水平(减量或训练不足)")
+
+    tsb = current["tsb"]
+    if tsb is not None:
+        if tsb < -30:
+            notes.append(f"TSB={tsb} < -30: 疲劳累积明显, 建议安排恢复")
+        elif tsb < -10:
+            notes.append(f"TSB={tsb} 处于-30~-10: 有效训练负荷区, 体能在积累")
+        elif tsb <= 5:
+            notes.append(f"TSB={tsb} 处于-10~5: 疲劳与体能基本平衡")
+        elif tsb <= 25:
+            notes.append(f"TSB={tsb} > 5: 状态新鲜, 适合比赛或高质量课")
+        else:
+            notes.append(f"TSB={tsb} > 25: 长时间低负荷, 体能(CTL)可能下降")
+
+    monotony = current["monotony"]
+    if monotony is not None and monotony > 2.0:
+        notes.append(f"单调性={monotony} > 2.0: 每日负荷变化太小, 建议拉开强度差异")
+
+    if ramp_rate is not None:
+        if ramp_rate > 8:
+            notes.append(f"CTL周增幅={ramp_rate} > 8: 体能上升过快")
+        elif ramp_rate < 0:
+            notes.append(f"CTL周增幅={ramp_rate}: 体能(CTL)处于下降趋势")
+
+    if history_days < CTL_TIME_CONSTANT:
+        notes.append(f"历史数据仅{history_days}天(< {CTL_TIME_CONSTANT}天), CTL尚未收敛, 数值偏低")
+    return notes
+
+
+def analyze_training_load(
+    start_times: Sequence,
+    loads: np.ndarray,
+    distances: Sequence,
+    days: int = 42,
+    end_day: Optional[date] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    计算训练负荷趋势摘要
+
+    Args:
+        start_times: 每次训练的开始时间(截至end_day的全部历史, 用于指数加权的预热)
+        loads: 每次训练的负荷(与start_times等长)
+        distances: 每次训练的距离(米)
+        days: 摘要覆盖的最近天数
+        end_day: 摘要截止日期(默认今天)
+
+    Returns:
+        统计摘要字典; 没有训练记录时返回None
+    """
+    if len(start_times) == 0:
+        return None
+    end_day = end_day or date.today()
+    series = build_daily_series(start_times, np.asarray(loads, dtype=np.float64), distances, end_day)
+    daily_loads = series["loads"]
+    metrics = compute_load_metrics(daily_loads)
+
+    history_days = len(daily_loads)
+    window = max(1, min(int(days), history_days))
+    window_start = history_days - window
+    period_loads = daily_loads[window_start:]
+
+    current = {
+        "atl": _round(metrics["atl"][-1]),
+        "ctl": _round(metrics["ctl"][-1]),
+        "tsb": _round(metrics["tsb"][-1]),
+        "acwr": _round(metrics["acwr"][-1], 2),
+        "monotony": _round(metrics["monotony"][-1], 2),
+        "strain": _round(metrics["strain"][-1]),
+        "acute_daily_load_7d": _round(metrics["acute_load"][-1]),
+        "chronic_daily_load_28d": _round(metrics["chronic_load"][-1]),
+    }
+
+    ctl_start = metrics["ctl"][window_start - 1] if window_start > 0 else 0.0
+    ctl_change = metrics["ctl"][-1] - ctl_start
+    ramp_rate = _round(ctl_change / window * 7)
+    period_acwr = metrics["acwr"][window_start:]
+    period_tsb = metrics["tsb"][window_start:]
+    period_summary = {
+        "total_load": _round(period_loads.sum()),
+        "sessions": int(series["sessions"][window_start:].sum()),
+        "training_days": int(np.count_nonzero(period_loads)),
+        "total_distance_km": _round(series["distances"][window_start:].sum() / 1000.0),
+        "avg_daily_load": _round(period_loads.mean()),
+        "ctl_change": _round(ctl_change),
+        "ctl_ramp_rate_per_week": ramp_rate,
+        "atl_peak": _round(metrics["atl"][window_start:].max()),
+        "tsb_min": _round(period_tsb.min()),
+        "tsb_max": _round(period_tsb.max()),
+        "acwr_max": _round(np.nanmax(period_acwr), 2) if np.isfinite(period_acwr).any() else None,
+        "days_acwr_above_1_5": int(np.count_nonzero(np.nan_to_num(period_acwr) > 1.5)),
+        "days_tsb_below_minus_30": int(np.count_nonzero(period_tsb < -30)),
+    }
+
+    # 按自然周(周一开始)汇总窗口内的负荷, 周末指标取该周在窗口内最后一天的值
+    first_ordinal = series["first_day"].toordinal()
+    day_index = np.arange(window_start, history_days)
+    week_keys = (first_ordinal + day_index - 1) // 7  # date.toordinal(周一) - 1 可被7整除
+    weekly = []
+    for key in np.unique(week_keys):
+        positions = day_index[week_keys == key]
+        last = positions[-1]
+        weekly.append({
+            "week_start": date.fromordinal(int(key) * 7 + 1).isoformat(),
+            "sessions": int(series["sessions"][positions].sum()),
+            "load": _round(daily_loads[positions].sum()),
+            "distance_km": _round(series["distances"][positions].sum() / 1000.0),
+            "monotony": _round(metrics["monotony"][last], 2),
+            "strain": _round(metrics["strain"][last]),
+            "acwr": _round(metrics["acwr"][last], 2),
+            "ctl": _round(metrics["ctl"][last]),
+            "tsb": _round(metrics["tsb"][last]),
+        })
+
+    return {
+        "period": {
+            "start_date": (end_day - timedelta(days=window - 1)).isoformat(),
+            "end_date": end_day.isoformat(),
+            "days": window,
+        },
+        "history_days": history_days,
+        "current": current,
+        "period_summary": period_summary,
+        "weekly": weekly,
+        "assessment": _assess(current, ramp_rate, history_days),
+    }
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+训练数据查询结果缓存 (进程内)
+Agent在首次搜索与多轮反思中经常以相同参数调用同一工具(如 search_recent_trainings(days=30)、get_training_stats),
+这里按 (数据源, 工具, 规范化后的参数) 缓存成功的DBResponse, 相同调用直接返回缓存结果, 不再打开会话查询数据库
+
+失效: 导入脚本与训练数据管理接口在写入训练记录后递增 training_data_version 表中的版本号,
+缓存读取版本号(间隔 INSIGHT_QUERY_CACHE_VERSION_TTL 秒内复用上次读取的值), 版本号变化时丢弃该数据源的全部缓存;
+版本号表不可用时不缓存, 每次都查询数据库;
+以当天为窗口终点的工具(search_recent_trainings、get_heart_rate_analysis, 以及未指定 end_date 的 get_load_trend)
+的缓存键额外包含当天日期, 跨天后不会再返回前一天窗口的结果
+
+通过环境变量配置:
+- INSIGHT_QUERY_CACHE: 是否开启（默认 true）
+- INSIGHT_QUERY_CACHE_MAX_ENTRIES: 最多缓存的结果数（默认 256，超过时淘汰最久未使用的）
+- INSIGHT_QUERY_CACHE_VERSION_TTL: 版本号的复用时间（秒，默认 2，0 表示每次查询前都读取）
+"""
+
+import os
+import json
+import time
+import inspect
+import threading
+import dataclasses
+from datetime import date
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# 以 datetime.now() 为窗口终点的工具(get_load_trend 仅在 end_date 为空时)
+RELATIVE_WINDOW_TOOLS = ("search_recent_trainings", "get_heart_rate_analysis", "get_load_trend")
+
+
+class TrainingQueryCache:
+    """以数据版本号失效的查询结果缓存"""
+
+    def __init__(
+        self,
+        version_loader: Callable[[str], Optional[int]],
+        max_entries: int = 256,
+        version_ttl: float = 2.0,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            version_loader: 读取数据源当前版本号的函数，不可用时返回None
+            max_entries: 最多缓存的结果数
+            version_ttl: 版本号的复用时间（秒）
+        """
+        self.version_loader = version_loader
+        self.max_entries = max(1, int(max_entries))
+        self.version_ttl = float(version_ttl)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[int, Any]]" = OrderedDict()
+        self._versions: Dict[str, Tuple[Optional[int], float]] = {}
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "bypassed": 0, "invalidations": 0, "stores": 0}
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+
+    def current_version(self, data_source: str) -> Optional[int]:
+        """获取数据源的版本号(在version_ttl内复用)，版本号变化时丢弃该数据源的缓存"""
+        now = time.time()
+        with self._lock:
+            cached = self._versions.get(data_source)
+            if cached is not None and now - cached[1] < self.version_ttl:
+                return cached[0]
+
+        version = self.version_loader(data_source)
+
+        with self._lock:
+            previous = self._versions.get(data_source)
+            self._versions[data_source] = (version, now)
+            if previous is not None and previous[0] != version:
+                stale = [key for key in self._entries if key[0] == data_source]
+                for key in stale:
+                    del self._entries[key]
+                if stale:
+                    self._stats["invalidations"] += 1
+                    print(f"训练数据版本已变化({data_source}: {previous[0]} -> {version})，丢弃 {len(stale)} 条缓存结果")
+        return version
+
+    @staticmethod
+    def _copy(response: Any) -> Any:
+        """浅拷贝响应及其列表/字典字段，调用方修改返回值不会影响缓存"""
+        if not dataclasses.is_dataclass(response):
+            return response
+        changes = {}
+        for name in ("parameters", "statistics"):
+            value = getattr(response, name, None)
+            if isinstance(value, dict):
+                changes[name] = dict(value)
+        if isinstance(getattr(response, "results", None), list):
+            changes["results"] = list(response.results)
+        return dataclasses.replace(response, **changes)
+
+    @staticmethod
+    def _key_params(tool: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """相对窗口的调用在缓存键中加入当天日期"""
+        if tool in RELATIVE_WINDOW_TOOLS and params.get("end_date") is None:
+            return dict(params, __today__=date.today().isoformat())
+        return params
+
+    def call(self, data_source: str, tool: str, params: Dict[str, Any], invoke: Callable[[], Any]) -> Any:
+        """命中时返回缓存结果，否则执行查询并缓存成功的结果"""
+        key_params = self._key_params(tool, params)
+        key = (data_source, tool, json.dumps(key_params, ensure_ascii=False, sort_keys=True, default=str))
+        version = self.current_version(data_source)
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            tool_stats = self._tool_stats.setdefault(tool, {"lookups": 0, "hits": 0})
+            tool_stats["lookups"] += 1
+            if version is None:
+                self._stats["bypassed"] += 1
+                entry = None
+            else:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    tool_stats["hits"] += 1
+                else:
+                    entry = None
+                    self._stats["misses"] += 1
+        if entry is not None:
+            print(f"  查询缓存命中: {tool} (数据版本 {version})")
+            return self._copy(entry[1])
+
+        response = invoke()
+        if version is not None and getattr(response, "error_message", None) is None:
+            with self._lock:
+                self._entries[key] = (version, self._copy(response))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._stats["stores"] += 1
+        return response
+
+    def wrap(self, data_source: str, func: Callable) -> Callable:
+        """包装一个(绑定的)工具方法，参数按签名规范化(补齐默认值)后参与缓存键计算"""
+        tool = func.__name__
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = dict(bound.arguments)
+            except TypeError:
+                return func(*args, **kwargs)
+            return self.call(data_source, tool, params, lambda: func(*args, **kwargs))
+
+        wrapper.__wrapped_by_query_cache__ = True
+        return wrapper
+
+    def install(self, obj: Any, data_source: str, methods: Iterable[str]):
+        """在实例上用缓存包装替换指定方法(不影响类本身及其他实例)"""
+        for name in methods:
+            func = getattr(obj, name, None)
+            if func is None or getattr(func, "__wrapped_by_query_cache__", False):
+                continue
+            setattr(obj, name, self.wrap(data_source, func))
+
+    def clear(self):
+        """清空缓存(统计保留)"""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计，hits 即节省的数据库查询次数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["versions"] = {source: version for source, (version, _) in self._versions.items()}
+            tools = {tool: dict(values) for tool, values in self._tool_stats.items()}
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+        for values in tools.values():
+            values["hit_rate"] = round(values["hits"] / values["lookups"], 4) if values["lookups"] else 0.0
+        stats["tools"] = tools
+        return stats
+
+
+def load_data_version(data_source: str) -> Optional[int]:
+    """从training_data_version表读取数据源的版本号(尚无记录时为0)，表不可用时返回None"""
+    from .db_models import TrainingDataVersion
+    from .db_session import db_session_manager
+
+    try:
+        with db_session_manager.get_session() as session:
+            version = session.query(TrainingDataVersion.version)\
+                .filter(TrainingDataVersion.data_source == data_source)\
+                .scalar()
+        return int(version or 0)
+    except Exception as e:
+        print(f"训练数据版本号不可用，查询结果不缓存: {e}")
+        return None
+
+
+_cache: Optional[TrainingQueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def is_query_cache_enabled() -> bool:
+    return str(os.getenv("INSIGHT_QUERY_CACHE", "true")).strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_query_cache() -> Optional[TrainingQueryCache]:
+    """获取进程级共享的查询结果缓存(切换数据源重建工具实例后仍然有效)；未开启时返回None"""
+    global _cache
+    if not is_query_cache_enabled():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                max_entries = int(os.getenv("INSIGHT_QUERY_CACHE_MAX_ENTRIES", "256") or 256)
+                version_ttl = float(os.getenv("INSIGHT_QUERY_CACHE_VERSION_TTL", "2") or 0)
+            except ValueError:
+                max_entries, version_ttl = 256, 2.0
+            _cache = TrainingQueryCache(load_data_version, max_entries=max_entries, version_ttl=version_ttl)
+        return _cache
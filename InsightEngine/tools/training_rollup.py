@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+训练汇总表读取
+training_daily_agg / training_weekly_agg 由导入脚本和训练数据管理接口增量刷新(models/training_aggregates.py),
+统计工具优先从汇总表合计结果: 范围内的整周读取周汇总, 首尾不足一周的部分读取日汇总,
+只需读取几十行汇总数据, 不必对训练记录全表聚合
+
+日期范围按天对齐(工具参数均为 'YYYY-MM-DD'), 与全表聚合时 start_time >= 开始日期 且 < 结束日期+1天 的过滤条件一致;
+汇总表可能只覆盖部分日期(例如已有数据的库只做过增量刷新), 因此合计后用范围内的记录条数(走start_time索引)核对,
+不一致时返回None, 由工具回退到全表聚合
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+from sqlalchemy import func, and_, or_
+
+from .db_models import TrainingDailyAgg, TrainingWeeklyAgg
+
+# 可以跨行相加的汇总字段
+ADDITIVE_FIELDS = tuple(
+    column.name for column in TrainingDailyAgg.__table__.columns
+    if column.name not in ('data_source', 'day', 'peak_heart_rate', 'last_modify_ts')
+)
+
+
+def _to_day(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _ratio(total, count) -> Optional[float]:
+    return float(total) / count if count else None
+
+
+def load_rollup_totals(
+    session,
+    data_source: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    start_column: Optional[InstrumentedAttribute] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    合计日期范围内(含首尾两天, None表示不限)的汇总指标
+
+    Args:
+        start_column: 训练记录的开始时间列; 传入时核对范围内的记录条数与汇总的sessions是否一致
+
+    Returns:
+        合计后的汇总字段字典(含peak_heart_rate); 汇总表中还没有该数据源的数据、
+        或汇总表没有完整覆盖该范围(记录条数不一致)时返回None
+    """
+    first_day, last_day, day_count = session.query(
+        func.min(TrainingDailyAgg.day),
+        func.max(TrainingDailyAgg.day),
+        func.count(TrainingDailyAgg.day)
+    ).filter(TrainingDailyAgg.data_source == data_source).one()
+    if not day_count:
+        return None
+
+    start = max(start_date, _to_day(first_day)) if start_date else _to_day(first_day)
+    end = min(end_date, _to_day(last_day)) if end_date else _to_day(last_day)
+    totals: Dict[str, Any] = {name: 0 for name in ADDITIVE_FIELDS}
+    totals['peak_heart_rate'] = None
+    if start <= end:
+        _add_rollup_rows(session, data_source, start, end, totals)
+
+    if start_column is not None and _count_records(session, start_column, start_date, end_date) != totals['sessions']:
+        return None
+    return totals
+
+
+def _count_records(session, start_column: InstrumentedAttribute, start_date: Optional[date], end_date: Optional[date]) -> int:
+    """统计日期范围内(不按汇总表覆盖范围裁剪)的训练记录条数"""
+    query = session.query(func.count()).select_from(start_column.class_)
+    if start_date:
+        query = query.filter(start_column >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        query = query.filter(start_column < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    return query.scalar() or 0
+
+
+def _add_rollup_rows(session, data_source: str, start: date, end: date, totals: Dict[str, Any]):
+    """把[start, end]内的周汇总(整周)与日汇总(首尾不足一周的部分)累加到totals"""
+    # 范围内第一个周一 与 最后一个完整周(止于end或之前的周日)的周一
+    first_week = start + timedelta(days=(7 - start.weekday()) % 7)
+    last_week = end - timedelta(days=(end.weekday() + 1) % 7 + 6)
+
+    rows = []
+    if first_week <= last_week:
+        rows.extend(session.query(TrainingWeeklyAgg).filter(
+            TrainingWeeklyAgg.data_source == data_source,
+            TrainingWeeklyAgg.week_start >= first_week,
+            TrainingWeeklyAgg.week_start <= last_week
+        ).all())
+        day_filter = or_(
+            and_(TrainingDailyAgg.day >= start, TrainingDailyAgg.day < first_week),
+            and_(TrainingDailyAgg.day >= last_week + timedelta(days=7), TrainingDailyAgg.day <= end)
+        )
+    else:
+        day_filter = and_(TrainingDailyAgg.day >= start, TrainingDailyAgg.day <= end)
+    rows.extend(session.query(TrainingDailyAgg).filter(
+        TrainingDailyAgg.data_source == data_source,
+        day_filter
+    ).all())
+
+    for row in rows:
+        for name in ADDITIVE_FIELDS:
+            totals[name] += getattr(row, name) or 0
+        if row.peak_heart_rate is not None:
+            totals['peak_heart_rate'] = max(totals['peak_heart_rate'] or 0, row.peak_heart_rate)
+
+
+def build_training_stats(totals: Dict[str, Any], extended: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    由汇总合计构建与get_training_stats相同字段的统计结果
+
+    Args:
+        totals: load_rollup_totals的返回值
+        extended: 是否包含Garmin扩展指标
+
+    Returns:
+        统计字典; 范围内没有训练记录时返回None
+    """
+    sessions = totals['sessions']
+    if not sessions:
+        return None
+
+    distance_count = totals['distance_count']
+    stats = {
+        'total_sessions': sessions,
+        'total_duration': totals['total_duration'],
+        'avg_duration': _ratio(totals['total_duration'], sessions),
+        'total_distance': totals['total_distance'] if distance_count else None,
+        'avg_distance': _ratio(totals['total_distance'], distance_count),
+        'overall_avg_heart_rate': _ratio(totals['heart_rate_sum'], totals['heart_rate_count']),
+        'peak_heart_rate': totals['peak_heart_rate'],
+    }
+    if extended:
+        stats.update({
+            'overall_avg_cadence': _ratio(totals['cadence_sum'], totals['cadence_count']),
+            'overall_avg_power': _ratio(totals['power_sum'], totals['power_count']),
+            'avg_training_load': _ratio(totals['training_load_sum'], totals['training_load_count']),
+            'avg_aerobic_effect': _ratio(totals['aerobic_effect_sum'], totals['aerobic_effect_count']),
+            'avg_anaerobic_effect': _ratio(totals['anaerobic_effect_sum'], totals['anaerobic_effect_count']),
+        })
+    stats['total_calories'] = totals['total_calories']
+    if extended:
+        stats.update({
+            'avg_stride_length': _ratio(totals['stride_length_sum'], totals['stride_length_count']),
+            'avg_vertical_oscillation': _ratio(totals['vertical_oscillation_sum'], totals['vertical_oscillation_count']),
+            'avg_ground_contact_time': _ratio(totals['ground_contact_time_sum'], totals['ground_contact_time_count']),
+        })
+
+    if stats['total_distance'] and stats['total_distance'] > 0:
+        total_distance_km = float(stats['total_distance']) / 1000.0
+        stats['avg_pace_per_km'] = round(float(stats['total_duration'] or 0) / total_distance_km, 2)
+    else:
+        stats['avg_pace_per_km'] = None
+    return stats
+
+
+def build_training_effect_stats(totals: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """由汇总合计构建与get_training_effect_analysis相同字段的统计结果; 没有训练记录时返回None"""
+    if not totals['sessions']:
+        return None
+    return {
+        'total_sessions': totals['sessions'],
+        'avg_aerobic_effect': _ratio(totals['aerobic_effect_sum'], totals['aerobic_effect_count']),
+        'avg_anaerobic_effect': _ratio(totals['anaerobic_effect_sum'], totals['anaerobic_effect_count']),
+        'avg_training_load': _ratio(totals['training_load_sum'], totals['training_load_count']),
+        'maintaining_count': totals['maintaining_count'],
+        'improving_count': totals['improving_count'],
+        'highly_improving_count': totals['highly_improving_count'],
+        'total_moderate_minutes': totals['moderate_intensity_minutes'],
+        'total_vigorous_minutes': totals['vigorous_intensity_minutes'],
+    }
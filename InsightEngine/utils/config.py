@@ -23,6 +23,11 @@ def _get_value(source, key: str, default=None):
     return value if value not in ("", None) else default
 
 
+def _optional_float(value) -> Optional[float]:
+    """将可选配置转换为float，未配置时返回None"""
+    return float(value) if value not in (None, "") else None
+
+
 @dataclass
 class Config:
     """Insight Engine configuration."""
@@ -54,6 +59,38 @@ class Config:
     output_dir: str = "reports"
     save_intermediate_states: bool = True
 
+    # LLM response cache
+    llm_cache_enabled: bool = False
+    llm_cache_path: str = "cache/llm_cache.db"
+    llm_cache_ttl: int = 86400
+    llm_cache_memory_size: int = 256
+    llm_cache_allow_sampling: bool = False
+    llm_cache_default_temperature: Optional[float] = None  # 调用未显式传温度时服务端使用的默认温度
+
+    # Paragraph concurrency
+    max_parallel_paragraphs: int = 1
+
+    # Reflection convergence
+    enable_reflection_early_exit: bool = True
+    reflection_min_novelty: float = 0.1
+    reflection_similarity_threshold: float = 0.9
+
+    # Checkpoint / resume
+    enable_checkpoint: bool = True
+
+    # Time budget
+    research_time_budget: int = 0
+    research_budget_reserve: float = 0.2
+
+    # Search result dedup
+    enable_result_dedup: bool = True
+    dedup_simhash_distance: int = 3
+    dedup_collapsed_length: int = 300
+
+    # Prompt token budget (search results, 0 = only per-result truncation)
+    first_summary_token_budget: int = 60000
+    reflection_summary_token_budget: int = 40000
+
     def __post_init__(self):
         if not self.llm_provider and self.llm_model_name:
             # Provider is no longer used, but keep the attribute for compatibility.
@@ -105,6 +142,41 @@ class Config:
                     _get_value(config_module, "SAVE_INTERMEDIATE_STATES", "true")
                 ).lower()
                 in ("true", "1", "yes"),
+                llm_cache_enabled=str(
+                    _get_value(config_module, "INSIGHT_LLM_CACHE_ENABLED", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                llm_cache_path=_get_value(config_module, "LLM_CACHE_PATH", "cache/llm_cache.db"),
+                llm_cache_ttl=int(_get_value(config_module, "LLM_CACHE_TTL", 86400)),
+                llm_cache_memory_size=int(_get_value(config_module, "LLM_CACHE_MEMORY_SIZE", 256)),
+                llm_cache_allow_sampling=str(
+                    _get_value(config_module, "LLM_CACHE_ALLOW_SAMPLING", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                llm_cache_default_temperature=_optional_float(
+                    _get_value(config_module, "LLM_CACHE_DEFAULT_TEMPERATURE")
+                ),
+                max_parallel_paragraphs=int(_get_value(config_module, "MAX_PARALLEL_PARAGRAPHS", 1)),
+                enable_reflection_early_exit=str(
+                    _get_value(config_module, "REFLECTION_EARLY_EXIT", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                reflection_min_novelty=float(_get_value(config_module, "REFLECTION_MIN_NOVELTY", 0.1)),
+                reflection_similarity_threshold=float(_get_value(config_module, "REFLECTION_SIMILARITY_THRESHOLD", 0.9)),
+                enable_checkpoint=str(
+                    _get_value(config_module, "ENABLE_CHECKPOINT", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                research_time_budget=int(_get_value(config_module, "RESEARCH_TIME_BUDGET", 0)),
+                research_budget_reserve=float(_get_value(config_module, "RESEARCH_BUDGET_RESERVE", 0.2)),
+                enable_result_dedup=str(
+                    _get_value(config_module, "RESULT_DEDUP_ENABLED", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                dedup_simhash_distance=int(_get_value(config_module, "DEDUP_SIMHASH_DISTANCE", 3)),
+                dedup_collapsed_length=int(_get_value(config_module, "DEDUP_COLLAPSED_LENGTH", 300)),
+                first_summary_token_budget=int(_get_value(config_module, "FIRST_SUMMARY_TOKEN_BUDGET", 60000)),
+                reflection_summary_token_budget=int(_get_value(config_module, "REFLECTION_SUMMARY_TOKEN_BUDGET", 40000)),
             )
 
         # .env style configuration
@@ -137,6 +209,41 @@ class Config:
                 _get_value(config_dict, "SAVE_INTERMEDIATE_STATES", "true")
             ).lower()
             in ("true", "1", "yes"),
+            llm_cache_enabled=str(
+                _get_value(config_dict, "INSIGHT_LLM_CACHE_ENABLED", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            llm_cache_path=_get_value(config_dict, "LLM_CACHE_PATH", "cache/llm_cache.db"),
+            llm_cache_ttl=int(_get_value(config_dict, "LLM_CACHE_TTL", 86400)),
+            llm_cache_memory_size=int(_get_value(config_dict, "LLM_CACHE_MEMORY_SIZE", 256)),
+            llm_cache_allow_sampling=str(
+                _get_value(config_dict, "LLM_CACHE_ALLOW_SAMPLING", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            llm_cache_default_temperature=_optional_float(
+                _get_value(config_dict, "LLM_CACHE_DEFAULT_TEMPERATURE")
+            ),
+            max_parallel_paragraphs=int(_get_value(config_dict, "MAX_PARALLEL_PARAGRAPHS", 1)),
+            enable_reflection_early_exit=str(
+                _get_value(config_dict, "REFLECTION_EARLY_EXIT", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            reflection_min_novelty=float(_get_value(config_dict, "REFLECTION_MIN_NOVELTY", 0.1)),
+            reflection_similarity_threshold=float(_get_value(config_dict, "REFLECTION_SIMILARITY_THRESHOLD", 0.9)),
+            enable_checkpoint=str(
+                _get_value(config_dict, "ENABLE_CHECKPOINT", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            research_time_budget=int(_get_value(config_dict, "RESEARCH_TIME_BUDGET", 0)),
+            research_budget_reserve=float(_get_value(config_dict, "RESEARCH_BUDGET_RESERVE", 0.2)),
+            enable_result_dedup=str(
+                _get_value(config_dict, "RESULT_DEDUP_ENABLED", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            dedup_simhash_distance=int(_get_value(config_dict, "DEDUP_SIMHASH_DISTANCE", 3)),
+            dedup_collapsed_length=int(_get_value(config_dict, "DEDUP_COLLAPSED_LENGTH", 300)),
+            first_summary_token_budget=int(_get_value(config_dict, "FIRST_SUMMARY_TOKEN_BUDGET", 60000)),
+            reflection_summary_token_budget=int(_get_value(config_dict, "REFLECTION_SUMMARY_TOKEN_BUDGET", 40000)),
         )
 
 
@@ -179,6 +286,8 @@ def load_config(config_file: Optional[str] = None) -> Config:
                     snapshot = get_config_snapshot()
                     if not snapshot:
                         raise ValueError("无法获取配置快照")
+                    # 快照只包含固定的基础配置项, 其余可选配置从(已由快照重载的)根目录config模块读取, 未设置时回退到环境变量
+                    root_config = sys.modules.get("config")
 
                     # 从配置快照创建Config对象
                     config = Config(
@@ -191,6 +300,41 @@ def load_config(config_file: Optional[str] = None) -> Config:
                         db_name=snapshot.DB_NAME,
                         db_port=snapshot.DB_PORT,
                         db_charset=snapshot.DB_CHARSET,
+                        first_summary_token_budget=int(_get_value(root_config, "FIRST_SUMMARY_TOKEN_BUDGET", 60000)),
+                        reflection_summary_token_budget=int(_get_value(root_config, "REFLECTION_SUMMARY_TOKEN_BUDGET", 40000)),
+                        enable_result_dedup=str(
+                            _get_value(root_config, "RESULT_DEDUP_ENABLED", "true")
+                        ).lower()
+                        in ("true", "1", "yes"),
+                        dedup_simhash_distance=int(_get_value(root_config, "DEDUP_SIMHASH_DISTANCE", 3)),
+                        dedup_collapsed_length=int(_get_value(root_config, "DEDUP_COLLAPSED_LENGTH", 300)),
+                        research_time_budget=int(_get_value(root_config, "RESEARCH_TIME_BUDGET", 0)),
+                        research_budget_reserve=float(_get_value(root_config, "RESEARCH_BUDGET_RESERVE", 0.2)),
+                        enable_checkpoint=str(
+                            _get_value(root_config, "ENABLE_CHECKPOINT", "true")
+                        ).lower()
+                        in ("true", "1", "yes"),
+                        enable_reflection_early_exit=str(
+                            _get_value(root_config, "REFLECTION_EARLY_EXIT", "true")
+                        ).lower()
+                        in ("true", "1", "yes"),
+                        reflection_min_novelty=float(_get_value(root_config, "REFLECTION_MIN_NOVELTY", 0.1)),
+                        reflection_similarity_threshold=float(_get_value(root_config, "REFLECTION_SIMILARITY_THRESHOLD", 0.9)),
+                        max_parallel_paragraphs=int(_get_value(root_config, "MAX_PARALLEL_PARAGRAPHS", 1)),
+                        llm_cache_enabled=str(
+                            _get_value(root_config, "INSIGHT_LLM_CACHE_ENABLED", "false")
+                        ).lower()
+                        in ("true", "1", "yes"),
+                        llm_cache_path=_get_value(root_config, "LLM_CACHE_PATH", "cache/llm_cache.db"),
+                        llm_cache_ttl=int(_get_value(root_config, "LLM_CACHE_TTL", 86400)),
+                        llm_cache_memory_size=int(_get_value(root_config, "LLM_CACHE_MEMORY_SIZE", 256)),
+                        llm_cache_allow_sampling=str(
+                            _get_value(root_config, "LLM_CACHE_ALLOW_SAMPLING", "false")
+                        ).lower()
+                        in ("true", "1", "yes"),
+                        llm_cache_default_temperature=_optional_float(
+                            _get_value(root_config, "LLM_CACHE_DEFAULT_TEMPERATURE")
+                        ),
                     )
 
                     if not config.validate():
@@ -224,4 +368,22 @@ def print_config(config: Config):
     print(f"保存中间状态: {config.save_intermediate_states}")
     print(f"LLM API Key: {'已配置' if config.llm_api_key else '未配置'}")
     print(f"数据库连接: {'已配置' if all([config.db_host, config.db_user, config.db_password, config.db_name]) else '未配置'}")
+    print(f"LLM响应缓存: {config.llm_cache_enabled}")
+    print(f"LLM缓存文件: {config.llm_cache_path}")
+    print(f"LLM缓存有效期(秒): {config.llm_cache_ttl}")
+    print(f"LLM缓存内存条目数: {config.llm_cache_memory_size}")
+    print(f"允许缓存采样调用: {config.llm_cache_allow_sampling}")
+    print(f"缓存判定使用的默认温度: {config.llm_cache_default_temperature}")
+    print(f"段落并发数: {config.max_parallel_paragraphs}")
+    print(f"反思收敛提前退出: {config.enable_reflection_early_exit}")
+    print(f"反思最低新结果占比: {config.reflection_min_novelty}")
+    print(f"反思总结相似度阈值: {config.reflection_similarity_threshold}")
+    print(f"自动检查点: {config.enable_checkpoint}")
+    print(f"研究时间预算(秒,0为不限): {config.research_time_budget}")
+    print(f"预算保留比例(停止反思): {config.research_budget_reserve}")
+    print(f"搜索结果跨轮去重: {config.enable_result_dedup}")
+    print(f"内容指纹去重距离: {config.dedup_simhash_distance}")
+    print(f"跨段落重复结果折叠长度: {config.dedup_collapsed_length}")
+    print(f"初始总结搜索结果token预算: {config.first_summary_token_budget}")
+    print(f"反思总结搜索结果token预算: {config.reflection_summary_token_budget}")
     print("========================\n")
@@ -51,7 +51,7 @@ class ReportStructureNode(StateMutationNode):
             self.log_info(f"正在为查询生成报告结构: {self.query}")
             
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_REPORT_STRUCTURE, self.query)
+            response = self.call_llm(SYSTEM_PROMPT_REPORT_STRUCTURE, self.query)
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -5,18 +5,26 @@
 
 from .search import (
     BochaMultimodalSearch,
+    BackendMultimodalSearch,
     WebpageResult,
     ImageResult,
     ModalCardResult,
     BochaResponse,
+    merge_bocha_responses,
     print_response_summary
 )
+from .rerank import BM25Reranker, tokenize
+
 
 __all__ = [
     "BochaMultimodalSearch",
+    "BackendMultimodalSearch",
     "WebpageResult", 
     "ImageResult",
     "ModalCardResult",
     "BochaResponse",
-    "print_response_summary"
+    "merge_bocha_responses",
+    "print_response_summary",
+    "BM25Reranker",
+    "tokenize"
 ]
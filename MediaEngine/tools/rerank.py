@@ -0,0 +1,138 @@
+"""
+搜索结果本地重排 (BM25)
+
+搜索API按提供方的顺序返回结果，这里在进程内按BM25对结果与"段落标题 + 搜索查询"的相关度重新排序，
+只把前k个结果送入总结提示词，不产生额外的网络请求。
+
+分词: 中文使用jieba，英文使用小写化、去停用词和简单复数还原的轻量分析器。
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List, Tuple
+
+try:
+    import jieba
+    jieba.setLogLevel(60)  # 关闭加载词典时的日志输出
+    JIEBA_AVAILABLE = True
+except ImportError:
+    JIEBA_AVAILABLE = False
+
+
+# 中文字符片段与英文/数字片段
+_CJK_RUN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]+')
+_WORD_PATTERN = re.compile(r'[a-z0-9]+(?:[.\-][a-z0-9]+)*')
+
+ENGLISH_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "how", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "what",
+    "when", "which", "who", "why", "will", "with", "you", "your", "can", "do", "does", "vs",
+}
+
+CHINESE_STOPWORDS = {
+    "的", "了", "和", "与", "及", "是", "在", "对", "中", "或", "等", "也", "就", "都", "而",
+    "及其", "以及", "如何", "什么", "哪些", "怎么", "怎样", "为什么", "一个", "这个", "那个",
+    "我们", "你们", "他们", "可以", "进行", "通过", "关于", "对于", "相关", "方面",
+}
+
+
+def _analyze_english(text: str) -> List[str]:
+    """英文分析器: 小写化、去停用词、去掉常见复数后缀"""
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if word in ENGLISH_STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def _analyze_chinese(text: str) -> List[str]:
+    """中文分析器: jieba分词，未安装jieba时退化为字符二元组"""
+    if JIEBA_AVAILABLE:
+        words = jieba.lcut(text)
+    else:
+        words = [text[i:i + 2] for i in range(max(1, len(text) - 1))]
+    return [word for word in words if word.strip() and word not in CHINESE_STOPWORDS]
+
+
+def tokenize(text: str) -> List[str]:
+    """对中英文混合文本分词"""
+    if not text:
+        return []
+    tokens = []
+    position = 0
+    for match in _CJK_RUN_PATTERN.finditer(text):
+        tokens.extend(_analyze_english(text[position:match.start()]))
+        tokens.extend(_analyze_chinese(match.group()))
+        position = match.end()
+    tokens.extend(_analyze_english(text[position:]))
+    return tokens
+
+
+class BM25Reranker:
+    """以候选结果集合自身为语料计算IDF的BM25重排器"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        """
+        计算每个文档相对查询的BM25得分
+
+        Args:
+            query: 查询文本(段落标题 + 搜索查询)
+            documents: 文档文本列表(标题 + 摘要)
+
+        Returns:
+            与documents等长的得分列表
+        """
+        query_terms = set(tokenize(query))
+        doc_terms = [Counter(tokenize(document)) for document in documents]
+        if not query_terms or not doc_terms:
+            return [0.0] * len(documents)
+
+        total = len(doc_terms)
+        avg_length = sum(sum(terms.values()) for terms in doc_terms) / total or 1.0
+        idf = {}
+        for term in query_terms:
+            frequency = sum(1 for terms in doc_terms if term in terms)
+            idf[term] = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+
+        scores = []
+        for terms in doc_terms:
+            length = sum(terms.values())
+            norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if tf:
+                    score += idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def rerank(self, query: str, documents: List[str], top_k: int = 0) -> List[Tuple[int, float]]:
+        """
+        按BM25得分降序重排，得分相同时保持原始顺序
+
+        Args:
+            query: 查询文本
+            documents: 文档文本列表
+            top_k: 保留的结果数，<=0 表示全部保留
+
+        Returns:
+            [(原始下标, 得分), ...]
+        """
+        scores = self.score(query, documents)
+        ranked = sorted(enumerate(scores), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k] if top_k > 0 else ranked
@@ -18,16 +18,22 @@
 - web_search_only: 执行纯网页搜索，不请求AI总结，速度更快。
 - search_last_24_hours: 获取过去24小时内的最新信息。
 - search_last_week: 获取过去一周内的主要报道。
+
+批量接口:
+- search_many: 在共享连接池上并发执行多个 (工具, 查询)，按查询合并为一个 BochaResponse。
 """
 
 import os
 import json
 import sys
-from typing import List, Dict, Any, Optional, Literal
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Literal, Sequence, Tuple
 
 # 运行前请确保已安装 requests 库: pip install requests
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     raise ImportError("requests 库未安装，请运行 `pip install requests` 进行安装。")
 
@@ -39,37 +45,160 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
+from search_recorder import install_search_recorder, is_replaying
+from search_backend import SearchBackend, SearchHit
 
 # --- 1. 数据结构定义 ---
 from dataclasses import dataclass, field
 
-@dataclass
-class WebpageResult:
+
+class _RawField:
+    """惰性记录的字段描述符: 访问时才从原始数据中按API字段名取值"""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj._data().get(self.key)
+
+
+class _LazyRecord:
+    """
+    按需解析的只读记录(使用 __slots__，不为每个实例创建 __dict__)
+
+    解析响应时只保存原始数据(API返回的字典，或尚未json.loads的字符串)，
+    字段在首次访问时才解析；用不到的记录(如纯网页搜索中的图片)不会产生任何解析开销。
+    也可像原来的数据类一样按字段构造。
+    """
+
+    __slots__ = ("_raw",)
+
+    # 字段名 -> API原始字段名，顺序即位置参数顺序
+    _FIELDS: Tuple[Tuple[str, str], ...] = ()
+
+    def __init__(self, *args, **kwargs):
+        names = [name for name, _ in self._FIELDS]
+        values = dict(zip(names, args))
+        values.update(kwargs)
+        self._raw = {key: values.get(name) for name, key in self._FIELDS}
+
+    @classmethod
+    def from_raw(cls, raw: Any):
+        """包装原始数据(字典或JSON字符串)，不做任何解析"""
+        record = cls.__new__(cls)
+        record._raw = raw
+        return record
+
+    def _data(self) -> Dict[str, Any]:
+        if isinstance(self._raw, str):
+            try:
+                parsed = json.loads(self._raw)
+            except json.JSONDecodeError:
+                parsed = None
+            self._raw = parsed if isinstance(parsed, dict) else {}
+        return self._raw
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name, _ in self._FIELDS}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class WebpageResult(_LazyRecord):
     """网页搜索结果"""
-    name: str
-    url: str
-    snippet: str
-    display_url: Optional[str] = None
-    date_last_crawled: Optional[str] = None
+    __slots__ = ()
+    _FIELDS = (
+        ("name", "name"),
+        ("url", "url"),
+        ("snippet", "snippet"),
+        ("display_url", "displayUrl"),
+        ("date_last_crawled", "dateLastCrawled"),
+    )
+    name = _RawField("name")
+    url = _RawField("url")
+    snippet = _RawField("snippet")
+    display_url = _RawField("displayUrl")
+    date_last_crawled = _RawField("dateLastCrawled")
+
+
+class ImageResult(_LazyRecord):
+    """图片搜索结果(原始数据为消息中的JSON字符串，首次访问字段时才解析)"""
+    __slots__ = ()
+    _FIELDS = (
+        ("name", "name"),
+        ("content_url", "contentUrl"),
+        ("host_page_url", "hostPageUrl"),
+        ("thumbnail_url", "thumbnailUrl"),
+        ("width", "width"),
+        ("height", "height"),
+    )
+    name = _RawField("name")
+    content_url = _RawField("contentUrl")
+    host_page_url = _RawField("hostPageUrl")
+    thumbnail_url = _RawField("thumbnailUrl")
+    width = _RawField("width")
+    height = _RawField("height")
 
-@dataclass
-class ImageResult:
-    """图片搜索结果"""
-    name: str
-    content_url: str
-    host_page_url: Optional[str] = None
-    thumbnail_url: Optional[str] = None
-    width: Optional[int] = None
-    height: Optional[int] = None
 
-@dataclass
 class ModalCardResult:
     """
     模态卡结构化数据结果
     这是 Bocha 搜索的核心特色，用于返回特定类型的结构化信息。
+    content 在首次访问时才从原始JSON字符串解析(非法JSON时保留原字符串)。
     """
-    card_type: str  # 例如: weather_china, stock, baike_pro, medical_common
-    content: Dict[str, Any]  # 解析后的JSON内容
+
+    __slots__ = ("card_type", "_content", "_raw")
+
+    def __init__(self, card_type: str, content: Any):
+        self.card_type = card_type  # 例如: weather_china, stock, baike_pro, medical_common
+        self._content = content
+        self._raw = None
+
+    @classmethod
+    def from_raw(cls, card_type: str, raw: str) -> "ModalCardResult":
+        card = cls.__new__(cls)
+        card.card_type = card_type
+        card._content = None
+        card._raw = raw
+        return card
+
+    @property
+    def content(self) -> Any:
+        """解析后的JSON内容"""
+        if self._raw is not None:
+            try:
+                self._content = json.loads(self._raw)
+            except json.JSONDecodeError:
+                self._content = self._raw
+            self._raw = None
+        return self._content
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"card_type": self.card_type, "content": self.content}
+
+    def __eq__(self, other):
+        if not isinstance(other, ModalCardResult):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"ModalCardResult(card_type={self.card_type!r}, content={self.content!r})"
+
+
+# 解析响应时可投影的结果部分(AI总结与追问总是解析)
+ALL_SECTIONS = ("webpages", "images", "modal_cards")
+TEXT_SECTIONS = ("webpages",)
 
 @dataclass
 class BochaResponse:
@@ -83,25 +212,77 @@ class BochaResponse:
     modal_cards: List[ModalCardResult] = field(default_factory=list)
 
 
+def merge_bocha_responses(query: str, responses: List[BochaResponse]) -> BochaResponse:
+    """
+    将同一查询的多个搜索结果合并为一个 BochaResponse。
+    网页按URL、图片按图片地址、模态卡按类型与内容去重，AI总结按出现顺序拼接。
+    """
+    if len(responses) == 1:
+        return responses[0]
+
+    merged = BochaResponse(query=query)
+    answers: List[str] = []
+    seen_webpages = set()
+    seen_images = set()
+    seen_cards = set()
+    for response in responses:
+        if merged.conversation_id is None:
+            merged.conversation_id = response.conversation_id
+        if response.answer and response.answer not in answers:
+            answers.append(response.answer)
+        for follow_up in response.follow_ups:
+            if follow_up not in merged.follow_ups:
+                merged.follow_ups.append(follow_up)
+        for page in response.webpages:
+            if page.url not in seen_webpages:
+                seen_webpages.add(page.url)
+                merged.webpages.append(page)
+        for image in response.images:
+            if image.content_url not in seen_images:
+                seen_images.add(image.content_url)
+                merged.images.append(image)
+        for card in response.modal_cards:
+            card_key = (card.card_type, json.dumps(card.content, ensure_ascii=False, sort_keys=True, default=str))
+            if card_key not in seen_cards:
+                seen_cards.add(card_key)
+                merged.modal_cards.append(card)
+    merged.answer = "\n\n".join(answers) if answers else None
+    return merged
+
+
 # --- 2. 核心客户端与专用工具集 ---
 
 class BochaMultimodalSearch:
     """
     一个包含多种专用多模态搜索工具的客户端。
     每个公共方法都设计为供 AI Agent 独立调用的工具。
+    同时实现 SearchBackend 接口(search)，可与其他搜索后端互换使用。
     """
     
+    name = "bocha"
+
     BASE_URL = "https://api.bocha.cn/v1/ai-search"
 
-    def __init__(self, api_key: Optional[str] = None):
+    # search_many 可调度的工具
+    TOOL_NAMES = (
+        "comprehensive_search",
+        "web_search_only",
+        "search_for_structured_data",
+        "search_last_24_hours",
+        "search_last_week",
+    )
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 4, semantic_cache=None):
         """
         初始化客户端。
         Args:
             api_key: Bocha API密钥，若不提供则从环境变量 BOCHA_API_KEY 读取。
+            max_concurrency: search_many 的最大并发请求数，同时决定连接池大小。
+            semantic_cache: 可选的语义查询缓存(utils/semantic_cache.SemanticQueryCache)，相近的改写查询复用结果。
         """
         if api_key is None:
             api_key = os.getenv("BOCHA_API_KEY")
-            if not api_key:
+            if not api_key and not is_replaying():
                 raise ValueError("Bocha API Key未找到！请设置 BOCHA_API_KEY 环境变量或在初始化时提供")
         
         self._headers = {
@@ -109,84 +290,105 @@ class BochaMultimodalSearch:
             'Content-Type': 'application/json',
             'Accept': '*/*'
         }
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.semantic_cache = semantic_cache
+
+        # 复用TCP/TLS连接的会话，连接池大小与并发上限一致
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        # SEARCH_RECORD_MODE 开启时录制/回放原始API响应，回放时解析逻辑照常执行且不发出网络请求
+        install_search_recorder(self, "bocha", ["_post_search"])
+
+    def _post_search(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """向Bocha发起一次搜索请求，返回原始响应字典"""
+        response = self._session.post(self.BASE_URL, headers=self._headers, json=payload, timeout=30)
+        response.raise_for_status()  # 如果HTTP状态码是4xx或5xx，则抛出异常
+        return response.json()
+
+    def _parse_search_response(
+        self,
+        response_dict: Dict[str, Any],
+        query: str,
+        sections: Optional[Sequence[str]] = None,
+    ) -> BochaResponse:
+        """
+        从API的原始字典响应中解析出结构化的BochaResponse对象
 
-    def _parse_search_response(self, response_dict: Dict[str, Any], query: str) -> BochaResponse:
-        """从API的原始字典响应中解析出结构化的BochaResponse对象"""
-        
+        图片与模态卡只包装原始JSON字符串，字段在首次访问时才解析；
+        不在 sections 中的部分直接跳过，连惰性记录也不创建(如纯网页搜索不需要图片)；sections为None时解析全部
+        """
+        if sections is None:
+            sections = ALL_SECTIONS
         final_response = BochaResponse(query=query)
         final_response.conversation_id = response_dict.get('conversation_id')
+        include_webpages = "webpages" in sections
+        include_images = "images" in sections
+        include_cards = "modal_cards" in sections
 
         messages = response_dict.get('messages', [])
         for msg in messages:
-            role = msg.get('role')
-            if role != 'assistant':
+            if msg.get('role') != 'assistant':
                 continue
 
             msg_type = msg.get('type')
             content_type = msg.get('content_type')
             content_str = msg.get('content', '{}')
-            
-            try:
-                content_data = json.loads(content_str)
-            except json.JSONDecodeError:
-                # 如果内容不是合法的JSON字符串（例如纯文本的answer），则直接使用
-                content_data = content_str
 
             if msg_type == 'answer' and content_type == 'text':
-                final_response.answer = content_data
-            
+                final_response.answer = self._parse_text_content(content_str)
+
             elif msg_type == 'follow_up' and content_type == 'text':
-                final_response.follow_ups.append(content_data)
+                final_response.follow_ups.append(self._parse_text_content(content_str))
 
             elif msg_type == 'source':
                 if content_type == 'webpage':
-                    web_results = content_data.get('value', [])
-                    for item in web_results:
-                        final_response.webpages.append(WebpageResult(
-                            name=item.get('name'),
-                            url=item.get('url'),
-                            snippet=item.get('snippet'),
-                            display_url=item.get('displayUrl'),
-                            date_last_crawled=item.get('dateLastCrawled')
-                        ))
+                    if not include_webpages:
+                        continue
+                    try:
+                        content_data = json.loads(content_str)
+                    except json.JSONDecodeError:
+                        continue
+                    web_results = content_data.get('value', []) if isinstance(content_data, dict) else []
+                    final_response.webpages.extend(WebpageResult.from_raw(item) for item in web_results)
                 elif content_type == 'image':
-                    final_response.images.append(ImageResult(
-                        name=content_data.get('name'),
-                        content_url=content_data.get('contentUrl'),
-                        host_page_url=content_data.get('hostPageUrl'),
-                        thumbnail_url=content_data.get('thumbnailUrl'),
-                        width=content_data.get('width'),
-                        height=content_data.get('height')
-                    ))
+                    if include_images:
+                        final_response.images.append(ImageResult.from_raw(content_str))
                 # 所有其他 content_type 都视为模态卡
-                else:
-                    final_response.modal_cards.append(ModalCardResult(
-                        card_type=content_type,
-                        content=content_data
-                    ))
-                    
+                elif include_cards:
+                    final_response.modal_cards.append(ModalCardResult.from_raw(content_type, content_str))
+
         return final_response
 
+    @staticmethod
+    def _parse_text_content(content_str: str) -> Any:
+        """文本消息的内容可能是JSON字符串，也可能是纯文本"""
+        try:
+            return json.loads(content_str)
+        except json.JSONDecodeError:
+            # 如果内容不是合法的JSON字符串（例如纯文本的answer），则直接使用
+            return content_str
+
 
     @with_graceful_retry(SEARCH_API_RETRY_CONFIG, default_return=BochaResponse(query="搜索失败"))
     def _search_internal(self, **kwargs) -> BochaResponse:
         """内部通用的搜索执行器，所有工具最终都调用此方法"""
         query = kwargs.get("query", "Unknown Query")
+        sections = kwargs.pop("sections", None)
         payload = {
             "stream": False,  # Agent工具通常使用非流式以获取完整结果
         }
         payload.update(kwargs)
         
         try:
-            response = requests.post(self.BASE_URL, headers=self._headers, json=payload, timeout=30)
-            response.raise_for_status()  # 如果HTTP状态码是4xx或5xx，则抛出异常
-            
-            response_dict = response.json()
+            response_dict = self._post_search(payload)
             if response_dict.get("code") != 200:
                 print(f"API返回错误: {response_dict.get('msg', '未知错误')}")
                 return BochaResponse(query=query)
 
-            return self._parse_search_response(response_dict, query)
+            return self._parse_search_response(response_dict, query, sections)
 
         except requests.exceptions.RequestException as e:
             print(f"搜索时发生网络错误: {str(e)}")
@@ -195,6 +397,21 @@ class BochaMultimodalSearch:
             print(f"处理响应时发生未知错误: {str(e)}")
             raise e  # 让重试机制捕获并处理
 
+    def _cached_search(self, **kwargs) -> BochaResponse:
+        """经过可选的语义缓存执行搜索，除查询外的请求参数完全相同的调用才可互相复用"""
+        if self.semantic_cache is None:
+            return self._search_internal(**kwargs)
+
+        query = kwargs.get("query", "")
+        options = ",".join(f"{key}={kwargs[key]}" for key in sorted(kwargs) if key != "query")
+        return self.semantic_cache.fetch(
+            f"{self.name}:{options}",
+            query,
+            lambda: self._search_internal(**kwargs),
+            # 重试耗尽后的默认返回值与API错误时的空响应不写入缓存
+            cacheable=lambda response: bool(response.webpages or response.answer or response.modal_cards),
+        )
+
     # --- Agent 可用的工具方法 ---
 
     def comprehensive_search(self, query: str, max_results: int = 10) -> BochaResponse:
@@ -204,7 +421,7 @@ class BochaMultimodalSearch:
         Agent可提供搜索查询(query)和可选的最大结果数(max_results)。
         """
         print(f"--- TOOL: 全面综合搜索 (query: {query}) ---")
-        return self._search_internal(
+        return self._cached_search(
             query=query,
             count=max_results,
             answer=True  # 开启AI总结
@@ -216,10 +433,11 @@ class BochaMultimodalSearch:
         适用于需要快速获取原始网页信息，而不需要AI额外分析的场景。速度更快，成本更低。
         """
         print(f"--- TOOL: 纯网页搜索 (query: {query}) ---")
-        return self._search_internal(
+        return self._cached_search(
             query=query,
             count=max_results,
-            answer=False # 关闭AI总结
+            answer=False, # 关闭AI总结
+            sections=TEXT_SECTIONS  # 只解析网页，不创建图片与模态卡记录
         )
 
     def search_for_structured_data(self, query: str) -> BochaResponse:
@@ -230,7 +448,7 @@ class BochaMultimodalSearch:
         """
         print(f"--- TOOL: 结构化数据查询 (query: {query}) ---")
         # 实现上与 comprehensive_search 相同，但通过命名和文档引导Agent的意图
-        return self._search_internal(
+        return self._cached_search(
             query=query,
             count=5, # 结构化查询通常不需要太多网页结果
             answer=True
@@ -242,7 +460,7 @@ class BochaMultimodalSearch:
         此工具专门查找过去24小时内发布的内容。适用于追踪突发事件或最新进展。
         """
         print(f"--- TOOL: 搜索24小时内信息 (query: {query}) ---")
-        return self._search_internal(query=query, freshness='oneDay', answer=True)
+        return self._cached_search(query=query, freshness='oneDay', answer=True)
 
     def search_last_week(self, query: str) -> BochaResponse:
         """
@@ -250,7 +468,117 @@ class BochaMultimodalSearch:
         适用于进行周度舆情总结或回顾。
         """
         print(f"--- TOOL: 搜索本周信息 (query: {query}) ---")
-        return self._search_internal(query=query, freshness='oneWeek', answer=True)
+        return self._cached_search(query=query, freshness='oneWeek', answer=True)
+
+    # --- 批量接口 ---
+
+    def search_many(
+        self,
+        searches: Sequence[Tuple[str, str]],
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[str, BochaResponse]:
+        """
+        并发执行多个搜索，适用于一轮反思需要从多个角度检索的场景。
+        总耗时约等于最慢的一次请求，而不是各请求耗时之和。
+
+        Args:
+            searches: [(工具名称, 查询), ...]，工具名称见 TOOL_NAMES，未知工具按综合搜索处理
+            max_concurrency: 本次调用的并发上限，默认使用初始化时的 max_concurrency
+
+        Returns:
+            {查询: BochaResponse}，按查询首次出现的顺序排列；同一查询的多个工具结果合并为一个响应
+        """
+        if not searches:
+            return {}
+
+        limit = min(len(searches), max(1, int(max_concurrency or self.max_concurrency)))
+        print(f"--- TOOL: 批量搜索 ({len(searches)} 个请求, 并发 {limit}) ---")
+
+        def run_one(tool_name: str, query: str) -> BochaResponse:
+            if tool_name not in self.TOOL_NAMES:
+                print(f"  ⚠️  未知的搜索工具: {tool_name}，使用默认综合搜索")
+                tool_name = "comprehensive_search"
+            return getattr(self, tool_name)(query)
+
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="bocha-search") as executor:
+            futures = [executor.submit(run_one, tool_name, query) for tool_name, query in searches]
+            responses = [future.result() for future in futures]
+
+        grouped: Dict[str, List[BochaResponse]] = {}
+        for (_, query), response in zip(searches, responses):
+            grouped.setdefault(query, []).append(response)
+        return {query: merge_bocha_responses(query, items) for query, items in grouped.items()}
+
+    # --- SearchBackend 接口 ---
+
+    def search(self, query: str, max_results: int = 10) -> List[SearchHit]:
+        """SearchBackend接口: 纯网页搜索并返回后端无关的结果列表"""
+        response = self.web_search_only(query, max_results)
+        return [
+            SearchHit(
+                title=page.name,
+                url=page.url,
+                content=page.snippet,
+                published_date=page.date_last_crawled,
+                source=self.name
+            )
+            for page in response.webpages[:max_results]
+        ]
+
+
+class BackendMultimodalSearch(BochaMultimodalSearch):
+    """
+    以任意 SearchBackend(如 utils/search_backend.LocalCorpusSearch 本地语料库)作为数据源的搜索客户端。
+    工具集、批量接口与语义缓存均与 BochaMultimodalSearch 相同，只把实际检索交给后端；
+    后端只提供网页类结果，没有AI总结、图片与模态卡。时效性工具按发布日期过滤。
+    """
+
+    # 时效性参数对应的天数
+    FRESHNESS_DAYS = {"oneDay": 1, "oneWeek": 7, "oneMonth": 30, "oneYear": 365}
+
+    def __init__(self, backend: SearchBackend, max_concurrency: int = 4, semantic_cache=None):
+        """
+        Args:
+            backend: 实际执行检索的搜索后端
+            max_concurrency: search_many 的最大并发数
+            semantic_cache: 可选的语义查询缓存
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.semantic_cache = semantic_cache
+
+    def _search_internal(self, **kwargs) -> BochaResponse:
+        query = kwargs.get("query", "Unknown Query")
+        count = int(kwargs.get("count") or 10)
+        days = self.FRESHNESS_DAYS.get(kwargs.get("freshness"))
+        try:
+            # 需要按日期过滤时多取一些候选
+            hits = self.backend.search(query, count * 3 if days else count)
+        except Exception as e:
+            print(f"搜索时发生错误: {str(e)}")
+            return BochaResponse(query="搜索失败")
+
+        if days:
+            since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+            hits = [hit for hit in hits if hit.published_date and hit.published_date[:10] >= since]
+
+        response = BochaResponse(query=query)
+        response.webpages = [
+            WebpageResult(
+                name=hit.title,
+                url=hit.url,
+                snippet=hit.content,
+                display_url=hit.url,
+                date_last_crawled=hit.published_date
+            )
+            for hit in hits[:count]
+        ]
+        return response
+
+    def search(self, query: str, max_results: int = 10) -> List[SearchHit]:
+        """直接透传给后端"""
+        return self.backend.search(query, max_results)
 
 
 # --- 3. 测试与使用示例 ---
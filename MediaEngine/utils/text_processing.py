@@ -5,7 +5,13 @@
 
 import re
 import json
-from typing import Dict, Any, List
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Set, Optional, Tuple, Callable
+from urllib.parse import urlsplit, parse_qsl, urlencode
 from json.decoder import JSONDecodeError
 
 
@@ -306,3 +312,414 @@ def format_search_results_for_prompt(search_results: List[Dict[str, Any]],
             formatted_results.append(truncated_content)
     
     return formatted_results
+
+
+# 中日韩字符及全角标点(约每字1个token)
+_CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]')
+# 句子边界：中英文句末标点或换行
+_SENTENCE_END_PATTERN = re.compile(r'[。！？；!?;]|\.(?=\s)|\n')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    快速估算文本token数：中日韩字符按每字1个token计，其余字符按每4个字符1个token计
+    
+    Args:
+        text: 文本
+        
+    Returns:
+        估算的token数
+    """
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int,
+                       tokenizer: Optional[Callable[[str], int]] = None) -> str:
+    """
+    按token预算截断文本，优先在句子边界处截断
+    
+    Args:
+        text: 文本
+        max_tokens: token预算
+        tokenizer: 计算token数的函数，默认使用 estimate_tokens
+        
+    Returns:
+        截断后的文本（被截断时以"..."结尾）
+    """
+    count_tokens = tokenizer or estimate_tokens
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    
+    # 二分查找预算内的最长前缀（为省略号预留1个token）
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens - 1:
+            low = mid
+        else:
+            high = mid - 1
+    prefix = text[:low]
+    
+    # 回退到最后一个句子边界，边界过于靠前时保留完整前缀
+    cut = None
+    for match in _SENTENCE_END_PATTERN.finditer(prefix):
+        cut = match.end()
+    if cut is not None and cut >= len(prefix) * 0.5:
+        prefix = prefix[:cut]
+    return prefix.rstrip() + "..."
+
+
+def _parse_published_date(value: Any) -> Optional[datetime]:
+    """解析发布时间（ISO格式或RFC 2822格式），统一为不带时区的时间"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value).strip()
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(text)
+            except (TypeError, ValueError, IndexError):
+                return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _result_weight(result: Dict[str, Any], max_score: float, now: datetime) -> float:
+    """
+    计算搜索结果在预算分配中的权重 = 相关度 × 时效性 × 新颖度
+    
+    - 相关度: 按本批结果的最高score归一化，没有score时取中间值
+    - 时效性: 按发布时间以一年为半衰期衰减，最低为0.5
+    - 新颖度: 去重时被折叠的结果（其他段落已出现）降权
+    """
+    score = result.get('score')
+    relevance = 0.5
+    if isinstance(score, (int, float)) and max_score > 0:
+        relevance = 0.2 + 0.8 * max(0.0, float(score)) / max_score
+    
+    recency = 1.0
+    published = _parse_published_date(result.get('published_date'))
+    if published is not None:
+        age_days = max(0.0, (now - published).total_seconds() / 86400)
+        recency = 0.5 + 0.5 * 0.5 ** (age_days / 365)
+    
+    novelty = 0.3 if result.get('collapsed') else 1.0
+    return relevance * recency * novelty
+
+
+def pack_search_results_for_prompt(search_results: List[Dict[str, Any]],
+                                   token_budget: int,
+                                   max_length: int = 20000,
+                                   tokenizer: Optional[Callable[[str], int]] = None,
+                                   min_tokens: int = 64) -> List[str]:
+    """
+    在总token预算内格式化搜索结果用于提示词
+    
+    预算按结果权重(相关度、时效性、新颖度)分配：需求小于份额的结果完整保留，
+    剩余预算继续在其他结果间按权重分配；分到的预算过少的低权重结果整体舍弃。
+    被截断的结果在句子边界处截断。输出保持搜索结果的原始顺序。
+    
+    Args:
+        search_results: 搜索结果列表
+        token_budget: 搜索结果部分的总token预算，<=0 时等同于 format_search_results_for_prompt
+        max_length: 每个结果的最大长度（字符）
+        tokenizer: 计算token数的函数，默认使用 estimate_tokens
+        min_tokens: 被截断的结果至少保留的token数
+        
+    Returns:
+        格式化后的内容列表
+    """
+    if token_budget <= 0:
+        return format_search_results_for_prompt(search_results, max_length)
+    
+    count_tokens = tokenizer or estimate_tokens
+    candidates = [result for result in search_results if result.get('content')]
+    if not candidates:
+        return []
+    
+    contents = [truncate_content(result['content'], max_length) for result in candidates]
+    needs = [count_tokens(content) for content in contents]
+    scores = [result.get('score') for result in candidates]
+    max_score = max([float(score) for score in scores if isinstance(score, (int, float))] or [0.0])
+    now = datetime.now()
+    weights = [max(_result_weight(result, max_score, now), 1e-6) for result in candidates]
+    
+    active = set(range(len(candidates)))
+    while True:
+        allocation = {}
+        pending = set(active)
+        budget = float(token_budget)
+        # 注水式分配：需求不超过按权重所得份额的结果先完整保留
+        while pending and budget > 0:
+            total_weight = sum(weights[i] for i in pending)
+            satisfied = [i for i in pending if needs[i] <= budget * weights[i] / total_weight]
+            if not satisfied:
+                for i in pending:
+                    allocation[i] = int(budget * weights[i] / total_weight)
+                break
+            for i in satisfied:
+                allocation[i] = needs[i]
+                budget -= needs[i]
+                pending.discard(i)
+        for i in pending:
+            allocation.setdefault(i, 0)
+        
+        too_small = [i for i in active if allocation[i] < min(min_tokens, needs[i])]
+        if not too_small:
+            break
+        # 舍弃权重最低的结果后重新分配
+        active.discard(min(too_small, key=lambda i: weights[i]))
+        if not active:
+            return []
+    
+    formatted_results = []
+    for i, content in enumerate(contents):
+        if i not in active:
+            continue
+        if allocation[i] >= needs[i]:
+            formatted_results.append(content)
+        else:
+            formatted_results.append(truncate_to_tokens(content, allocation[i], count_tokens))
+    return formatted_results
+
+
+def get_result_key(result: Dict[str, Any]) -> str:
+    """
+    获取搜索结果的去重键：训练记录使用记录ID，其次使用规范化URL，都没有时使用标题
+    
+    Args:
+        result: 搜索结果字典
+        
+    Returns:
+        去重键，无法识别时返回空字符串
+    """
+    if result.get('record_id') is not None:
+        return f"record:{result['record_id']}"
+    key = normalize_url(result.get('url') or '')
+    if not key:
+        key = (result.get('title') or '').strip()
+    return key
+
+
+def compute_result_novelty(search_results: List[Dict[str, Any]], seen_keys: Set[str]) -> float:
+    """
+    计算本轮搜索结果的新颖度（此前未出现过的结果所占比例）
+    
+    Args:
+        search_results: 本轮搜索结果列表
+        seen_keys: 此前已见过的结果键集合
+        
+    Returns:
+        0~1之间的新颖度，没有结果时返回0
+    """
+    keys = [get_result_key(result) for result in search_results]
+    keys = [key for key in keys if key]
+    if not keys:
+        return 0.0
+    seen_keys = {normalize_url(key) for key in seen_keys}
+    new_keys = {key for key in keys if key not in seen_keys}
+    return len(new_keys) / len(set(keys))
+
+
+def text_similarity(text_a: str, text_b: str, ngram: int = 3) -> float:
+    """
+    计算两段文本的字符n-gram Jaccard相似度，中英文均适用
+    
+    Args:
+        text_a: 文本A
+        text_b: 文本B
+        ngram: n-gram长度
+        
+    Returns:
+        0~1之间的相似度
+    """
+    normalized_a = re.sub(r'\s+', '', text_a or '')
+    normalized_b = re.sub(r'\s+', '', text_b or '')
+    if not normalized_a or not normalized_b:
+        return 1.0 if normalized_a == normalized_b else 0.0
+    
+    grams_a = {normalized_a[i:i + ngram] for i in range(max(1, len(normalized_a) - ngram + 1))}
+    grams_b = {normalized_b[i:i + ngram] for i in range(max(1, len(normalized_b) - ngram + 1))}
+    union = grams_a | grams_b
+    return len(grams_a & grams_b) / len(union) if union else 1.0
+
+
+# URL中不影响页面内容的跟踪参数
+_TRACKING_PARAMS = {"fbclid", "gclid", "yclid", "msclkid", "spm", "from", "share_token", "ref", "ref_src"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL用于去重：忽略协议、www前缀、默认端口、锚点、跟踪参数、查询参数顺序和末尾斜杠
+    
+    Args:
+        url: 原始URL
+        
+    Returns:
+        规范化后的URL；不是http(s)链接时原样返回（去除首尾空白）
+    """
+    url = (url or '').strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+        return url
+    
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or ''
+    normalized = f"{host}{path}"
+    if query:
+        normalized += f"?{urlencode(query)}"
+    return normalized
+
+
+def simhash(text: str, ngram: int = 3, max_chars: int = 4000) -> int:
+    """
+    计算文本的64位simhash指纹（字符n-gram特征，中英文均适用）
+    
+    Args:
+        text: 文本
+        ngram: n-gram长度
+        max_chars: 参与计算的最大字符数
+        
+    Returns:
+        64位整数指纹，空文本返回0
+    """
+    normalized = re.sub(r'\s+', '', (text or '')[:max_chars]).lower()
+    if not normalized:
+        return 0
+    
+    features = Counter(normalized[i:i + ngram] for i in range(max(1, len(normalized) - ngram + 1)))
+    weights = [0] * 64
+    for feature, count in features.items():
+        feature_hash = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += count if feature_hash >> bit & 1 else -count
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个指纹之间的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+class SearchResultDeduplicator:
+    """
+    单次运行内跨轮次、跨段落的搜索结果去重器
+    
+    - 本段落此前已出现过的结果（规范化URL/记录ID相同，或内容指纹相近）直接丢弃，
+      其内容已体现在段落总结中
+    - 其他段落已出现过的结果折叠为简短摘录，避免在多个提示词中重复发送全文
+    """
+    
+    # 内容过短时指纹不可靠，不参与相似度判断
+    MIN_FINGERPRINT_CHARS = 50
+    
+    def __init__(self, simhash_distance: int = 3, collapsed_length: int = 300):
+        """
+        Args:
+            simhash_distance: 指纹汉明距离不超过该值时视为重复内容，<0 表示关闭内容指纹
+            collapsed_length: 折叠后保留的内容长度
+        """
+        self.simhash_distance = simhash_distance
+        self.collapsed_length = collapsed_length
+        self._lock = threading.Lock()
+        self._paragraphs_by_key: Dict[str, Set[int]] = {}
+        self._fingerprints: List[Tuple[int, int]] = []
+    
+    def reset(self):
+        """清空已见集合（每次运行开始时调用）"""
+        with self._lock:
+            self._paragraphs_by_key.clear()
+            self._fingerprints.clear()
+    
+    def _fingerprint(self, result: Dict[str, Any]) -> Optional[int]:
+        # 训练记录以记录ID为准，模板化的记录文本指纹过于相似，不参与比较
+        if self.simhash_distance < 0 or result.get('record_id') is not None:
+            return None
+        content = result.get('content') or ''
+        if len(content) < self.MIN_FINGERPRINT_CHARS:
+            return None
+        return simhash(content)
+    
+    def _match(self, key: str, fingerprint: Optional[int], paragraph_index: int) -> Optional[str]:
+        """返回 'paragraph'(本段落已见) / 'run'(其他段落已见) / None（调用方持有锁）"""
+        paragraphs = set(self._paragraphs_by_key.get(key, ())) if key else set()
+        if fingerprint is not None:
+            for seen_fingerprint, seen_paragraph in self._fingerprints:
+                if hamming_distance(fingerprint, seen_fingerprint) <= self.simhash_distance:
+                    paragraphs.add(seen_paragraph)
+        if paragraph_index in paragraphs:
+            return 'paragraph'
+        return 'run' if paragraphs else None
+    
+    def _remember(self, key: str, fingerprint: Optional[int], paragraph_index: int):
+        if key:
+            self._paragraphs_by_key.setdefault(key, set()).add(paragraph_index)
+        if fingerprint is not None:
+            self._fingerprints.append((fingerprint, paragraph_index))
+    
+    def remember(self, paragraph_index: int, results: List[Dict[str, Any]]):
+        """登记已有结果而不做过滤（如从检查点恢复的搜索历史）"""
+        with self._lock:
+            for result in results:
+                self._remember(get_result_key(result), self._fingerprint(result), paragraph_index)
+    
+    def filter(
+        self, paragraph_index: int, results: List[Dict[str, Any]], limit: int = 0
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        过滤本轮搜索结果
+        
+        Args:
+            paragraph_index: 段落索引
+            results: 本轮搜索结果列表(按优先级排序)
+            limit: 最多保留的结果数，0表示不限；达到上限后剩余结果既不保留也不登记
+            
+        Returns:
+            (保留的结果列表, {"dropped": 丢弃数, "collapsed": 折叠数})
+        """
+        kept = []
+        stats = {"dropped": 0, "collapsed": 0}
+        fingerprints = [self._fingerprint(result) for result in results]
+        with self._lock:
+            for result, fingerprint in zip(results, fingerprints):
+                if limit > 0 and len(kept) >= limit:
+                    break
+                key = get_result_key(result)
+                match = self._match(key, fingerprint, paragraph_index)
+                if match == 'paragraph':
+                    stats["dropped"] += 1
+                    continue
+                if match == 'run':
+                    result = dict(result)
+                    result['content'] = truncate_content(result.get('content') or '', self.collapsed_length)
+                    if result.get('raw_content'):
+                        result['raw_content'] = result['content']
+                    result['collapsed'] = True
+                    stats["collapsed"] += 1
+                self._remember(key, fingerprint, paragraph_index)
+                kept.append(result)
+        return kept, stats
@@ -5,8 +5,12 @@ Theory Expert Agent主类
 
 import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from itertools import zip_longest
+from typing import Optional, Dict, Any, List, Callable
 
 from .llms import LLMClient
 from .nodes import (
@@ -18,8 +22,16 @@ from .nodes import (
     ReportFormattingNode
 )
 from .state import State
-from .tools import TavilyNewsAgency, TavilyResponse
-from .utils import Config, load_config, format_search_results_for_prompt
+from .tools import TavilyNewsAgency, BackendNewsAgency, TavilyResponse, BM25Reranker
+from .tools.search import ACADEMIC_ENHANCEMENT_KEYWORDS
+from .utils import (
+    Config,
+    load_config,
+    pack_search_results_for_prompt,
+    compute_result_novelty,
+    text_similarity,
+    SearchResultDeduplicator
+)
 
 
 class TheoryExpertAgent:
@@ -43,8 +55,58 @@ class TheoryExpertAgent:
         # 初始化LLM客户端
         self.llm_client = self._initialize_llm()
 
-        # 初始化搜索工具集
-        self.search_agency = TavilyNewsAgency(api_key=self.config.tavily_api_key)
+        # LLM用量统计(按节点归属,每次运行重新计数)
+        from utils.llm_usage import LLMUsageTracker, get_usage_path
+        self.usage_tracker = LLMUsageTracker("query", get_usage_path("query"))
+        self.llm_client.usage_tracker = self.usage_tracker
+
+        # 初始化搜索工具集(可选的持久化搜索结果缓存)
+        search_cache = None
+        if self.config.search_cache_enabled:
+            from utils.search_cache import get_search_cache
+            search_cache = get_search_cache(
+                db_path=self.config.search_cache_path,
+                ttl_seconds=self.config.search_cache_ttl,
+                stale_seconds=self.config.search_cache_stale_ttl,
+                max_entries=self.config.search_cache_max_entries,
+            )
+        # 可选的语义查询缓存: 时间窗口内相近的改写查询复用结果
+        semantic_cache = None
+        if self.config.enable_semantic_cache:
+            from utils.semantic_cache import get_semantic_cache
+            semantic_cache = get_semantic_cache(
+                threshold=self.config.semantic_cache_threshold,
+                ttl_seconds=self.config.semantic_cache_ttl,
+                max_entries=self.config.semantic_cache_max_entries,
+            )
+        if self.config.search_backend == "local":
+            # 本地语料库后端(SQLite FTS5): 离线、无限流、结果确定
+            from utils.search_backend import get_local_corpus_search
+            self.search_agency = BackendNewsAgency(
+                get_local_corpus_search(self.config.local_corpus_dir, self.config.local_corpus_index),
+                cache=search_cache,
+                semantic_cache=semantic_cache,
+            )
+        else:
+            self.search_agency = TavilyNewsAgency(
+                api_key=self.config.tavily_api_key,
+                cache=search_cache,
+                semantic_cache=semantic_cache,
+            )
+
+        # 搜索结果本地重排(BM25)
+        self.reranker = BM25Reranker()
+
+        # 推测式搜索预取(可选): 总结节点等待LLM生成期间，后台预先执行下一轮反思可能使用的查询
+        self.prefetcher = None
+        if self.config.enable_speculative_prefetch:
+            from utils.search_prefetch import SearchPrefetcher
+            self.prefetcher = SearchPrefetcher(
+                fetch=self.search_agency.deep_search_news,
+                similarity=text_similarity,
+                threshold=self.config.prefetch_similarity_threshold,
+                ttl_seconds=self.config.prefetch_ttl
+            )
 
         # 初始化节点
         self._initialize_nodes()
@@ -52,6 +114,21 @@ class TheoryExpertAgent:
         # 状态
         self.state = State()
 
+        # 并行处理段落时保护State写入
+        self._state_lock = threading.Lock()
+
+        # 单次运行内跨轮次、跨段落的搜索结果去重
+        self.result_deduplicator = SearchResultDeduplicator(
+            simhash_distance=self.config.dedup_simhash_distance,
+            collapsed_length=self.config.dedup_collapsed_length
+        )
+
+        # 当前运行的检查点文件路径
+        self._checkpoint_path: Optional[str] = None
+
+        # 总结阶段的流式增量回调(可选),由前端设置以便首个token到达即刷新进度
+        self.stream_callback: Optional[Callable[[str], None]] = None
+
         # 确保输出目录存在
         os.makedirs(self.config.output_dir, exist_ok=True)
 
@@ -61,10 +138,22 @@ class TheoryExpertAgent:
 
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
+        cache = None
+        if self.config.llm_cache_enabled:
+            from utils.llm_cache import get_llm_cache
+            cache = get_llm_cache(
+                db_path=self.config.llm_cache_path,
+                memory_size=self.config.llm_cache_memory_size,
+                ttl_seconds=self.config.llm_cache_ttl,
+                allow_sampling=self.config.llm_cache_allow_sampling,
+                default_temperature=self.config.llm_cache_default_temperature,
+            )
+
         return LLMClient(
             api_key=self.config.llm_api_key,
             model_name=self.config.llm_model_name,
             base_url=self.config.llm_base_url,
+            cache=cache,
         )
 
     def _initialize_nodes(self):
@@ -88,13 +177,14 @@ class TheoryExpertAgent:
         print(f"  → 执行深度理论搜索")
         return self.search_agency.deep_search_news(query)
 
-    def research(self, query: str, save_report: bool = True) -> str:
+    def research(self, query: str, save_report: bool = True, resume_from: Optional[str] = None) -> str:
         """
         执行理论研究(中长跑运动科学理论专家)
 
         Args:
             query: 研究查询
             save_report: 是否保存报告到文件
+            resume_from: 检查点文件路径(可选)，提供时从该检查点恢复，跳过已完成的段落和反思轮次
 
         Returns:
             最终理论分析报告内容
@@ -104,14 +194,34 @@ class TheoryExpertAgent:
         print(f"{'='*60}")
 
         try:
+            self.usage_tracker.reset()
+            # 本次运行的LLM时间预算: 各节点调用的超时会被裁剪到剩余预算内
+            self.llm_client.set_deadline(self.config.research_time_budget)
+
+            # Step 0: 从检查点恢复或为本次运行创建检查点
+            resumed = self._prepare_checkpoint(query, resume_from)
+            self._reset_result_dedup()
+            if self.prefetcher is not None:
+                self.prefetcher.clear()
+
             # Step 1: 生成报告结构
-            self._generate_report_structure(query)
+            if resumed and self.state.paragraphs:
+                print(f"已从检查点恢复报告结构,共 {len(self.state.paragraphs)} 个段落")
+            else:
+                self._generate_report_structure(query)
 
             # Step 2: 处理每个段落
             self._process_paragraphs()
 
+            # 最终报告不受研究预算限制，保证总能产出报告
+            self.llm_client.set_deadline(None)
+
             # Step 3: 生成最终报告
-            final_report = self._generate_final_report()
+            if resumed and self.state.is_completed and self.state.final_report:
+                print("检查点中已有最终报告,直接复用")
+                final_report = self.state.final_report
+            else:
+                final_report = self._generate_final_report()
 
             # Step 4: 保存报告
             if save_report:
@@ -120,13 +230,149 @@ class TheoryExpertAgent:
             print(f"\n{'='*60}")
             print("理论研究完成!")
             print(f"{'='*60}")
+            if self.llm_client.cache is not None:
+                print(f"LLM缓存统计: {self.llm_client.get_cache_stats()}")
 
             return final_report
 
         except Exception as e:
             print(f"研究过程中发生错误: {str(e)}")
+            self.llm_client.set_deadline(None)
             raise e
 
+    def _prepare_checkpoint(self, query: str, resume_from: Optional[str] = None) -> bool:
+        """
+        准备检查点: 提供resume_from时从检查点恢复状态并继续写入该文件，
+        否则在启用检查点时为本次运行创建新的检查点文件
+
+        Args:
+            query: 研究查询
+            resume_from: 检查点文件路径
+
+        Returns:
+            是否从检查点恢复
+        """
+        if resume_from:
+            if not os.path.exists(resume_from):
+                raise FileNotFoundError(f"检查点文件不存在: {resume_from}")
+            self.load_state(resume_from)
+            self._checkpoint_path = resume_from
+            if self.state.query and self.state.query != query:
+                print(f"警告: 检查点中的查询与本次查询不一致,以检查点为准: {self.state.query}")
+            print(f"检查点进度: {self.state.get_completed_paragraphs_count()}/{len(self.state.paragraphs)} 个段落已完成")
+            return True
+
+        # 新的运行从空状态开始
+        self.state = State()
+        self._checkpoint_path = None
+        if self.config.enable_checkpoint:
+            checkpoint_dir = os.path.join(self.config.output_dir, "checkpoints")
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            query_safe = "".join(c for c in query if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            query_safe = query_safe.replace(' ', '_')[:30]
+            self._checkpoint_path = os.path.join(checkpoint_dir, f"checkpoint_{query_safe}_{timestamp}.json")
+            print(f"检查点文件: {self._checkpoint_path}")
+        return False
+
+    def _save_checkpoint(self):
+        """原子写入检查点,在每个节点mutate_state之后调用"""
+        if not self._checkpoint_path:
+            return
+        try:
+            with self._state_lock:
+                self.state.save_to_file(self._checkpoint_path)
+        except Exception as e:
+            print(f"检查点保存失败: {str(e)}")
+
+    def _budget_exhausted(self) -> bool:
+        """剩余时间预算是否已低于保留比例(未设置预算时始终为False)"""
+        remaining = self.llm_client.remaining_budget()
+        if remaining is None:
+            return False
+        return remaining < self.config.research_time_budget * self.config.research_budget_reserve
+
+    def _reset_result_dedup(self):
+        """重置去重器，并登记检查点中已有的搜索历史"""
+        self.result_deduplicator.reset()
+        for index, paragraph in enumerate(self.state.paragraphs):
+            self.result_deduplicator.remember(
+                index, [search.to_dict() for search in paragraph.research.search_history]
+            )
+
+    def _deduplicate_results(self, paragraph_index: int, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        丢弃本段落已见过的结果，折叠其他段落已出现的结果，在构建提示词之前调用
+
+        启用重排时在去重之后截断到 rerank_top_k，已见过的结果不占用名额
+        """
+        limit = self.config.rerank_top_k if self.config.enable_result_rerank else 0
+        if not self.config.enable_result_dedup:
+            return search_results[:limit] if limit > 0 else search_results
+        kept, stats = self.result_deduplicator.filter(paragraph_index, search_results, limit=limit)
+        if stats["dropped"] or stats["collapsed"]:
+            print(f"    去重: 丢弃 {stats['dropped']} 条重复结果, 折叠 {stats['collapsed']} 条其他段落已出现的结果")
+        return kept
+
+    def _rerank_results(self, paragraph_title: str, search_query: str,
+                        search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按与段落标题和搜索查询的BM25相关度本地重排搜索结果(只排序，截断在 _deduplicate_results 中去重后进行)"""
+        if not self.config.enable_result_rerank or not search_results:
+            return search_results
+        ranked = self.reranker.rerank(
+            f"{paragraph_title} {search_query}",
+            [f"{result.get('title') or ''} {result.get('content') or ''}" for result in search_results],
+            top_k=0
+        )
+        return [dict(search_results[index], rerank_score=round(score, 4)) for index, score in ranked]
+
+    def _prefetch_candidates(self, paragraph_index: int, search_query: str) -> List[str]:
+        """推测下一轮反思可能使用的查询: 段落大纲中尚未检索的要点与学术关键词扩展交替排列"""
+        paragraph = self.state.paragraphs[paragraph_index]
+        searched = [search.query for search in paragraph.research.search_history] + [search_query]
+        outline = [
+            f"{paragraph.title} {point.strip()}"
+            for point in re.split(r'[。；;，,、\n]', paragraph.content or '')
+            if len(point.strip()) >= 4
+        ]
+        # 与已检索查询最不相似的大纲要点优先
+        outline.sort(key=lambda candidate: max(text_similarity(candidate, query) for query in searched))
+
+        # 学术关键词扩展: 与当前查询同类别、但尚未出现在查询中的术语
+        query_lower = search_query.lower()
+        expansions = []
+        for category, keywords in ACADEMIC_ENHANCEMENT_KEYWORDS.items():
+            if category in query_lower or any(keyword.lower() in query_lower for keyword in keywords):
+                expansions.extend(
+                    f"{search_query} {keyword}" for keyword in keywords if keyword.lower() not in query_lower
+                )
+
+        candidates = []
+        for pair in zip_longest(outline, expansions):
+            for candidate in pair:
+                if candidate and candidate not in searched and candidate not in candidates:
+                    candidates.append(candidate)
+        return candidates[:self.config.prefetch_max_candidates]
+
+    def _speculative_prefetch(self, paragraph_index: int, search_query: str):
+        """在总结节点调用LLM之前提交预取，使搜索请求与LLM生成并行"""
+        if self.prefetcher is None:
+            return
+        candidates = self._prefetch_candidates(paragraph_index, search_query)
+        submitted = self.prefetcher.prefetch(paragraph_index, candidates)
+        if submitted:
+            print(f"  - 推测预取 {submitted} 个候选查询")
+
+    def _search_with_prefetch(self, paragraph_index: int, search_query: str) -> TavilyResponse:
+        """优先使用与查询足够相似的预取结果，否则正常执行搜索"""
+        if self.prefetcher is not None:
+            prefetched = self.prefetcher.take(paragraph_index, search_query)
+            if prefetched is not None:
+                response, prefetched_query, similarity = prefetched
+                print(f"    使用预取的搜索结果: {prefetched_query} (相似度 {similarity:.0%})")
+                return response
+        return self.execute_search_tool(search_query)
+
     def _generate_report_structure(self, query: str):
         """生成报告结构"""
         print(f"\n[步骤 1] 生成报告结构...")
@@ -136,6 +382,7 @@ class TheoryExpertAgent:
 
         # 生成结构并更新状态
         self.state = report_structure_node.mutate_state(state=self.state)
+        self._save_checkpoint()
 
         print(f"报告结构已生成,共 {len(self.state.paragraphs)} 个段落:")
         for i, paragraph in enumerate(self.state.paragraphs, 1):
@@ -144,22 +391,64 @@ class TheoryExpertAgent:
     def _process_paragraphs(self):
         """处理所有段落"""
         total_paragraphs = len(self.state.paragraphs)
+        max_workers = max(1, min(self.config.max_parallel_paragraphs, total_paragraphs))
+
+        if max_workers == 1:
+            for i in range(total_paragraphs):
+                print(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
+                print("-" * 50)
+
+                self._process_single_paragraph(i)
+
+                progress = (i + 1) / total_paragraphs * 100
+                print(f"段落处理完成 ({progress:.1f}%)")
+            return
+
+        # 各段落之间互不依赖，并行执行 搜索→总结→反思 流水线
+        print(f"\n[步骤 2] 并行处理 {total_paragraphs} 个段落 (并发数: {max_workers})")
+        completed = 0
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="paragraph") as executor:
+            futures = {
+                executor.submit(self._process_single_paragraph, i): i
+                for i in range(total_paragraphs)
+            }
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    future.result()
+                    completed += 1
+                    progress = completed / total_paragraphs * 100
+                    print(f"[段落 {i+1}] {self.state.paragraphs[i].title} 段落处理完成 ({progress:.1f}%)")
+            except Exception:
+                # 任一段落失败时取消尚未开始的任务
+                for pending in futures:
+                    pending.cancel()
+                raise
+
+    def _process_single_paragraph(self, paragraph_index: int):
+        """执行单个段落的完整流水线：初始搜索和总结 → 反思循环 → 标记完成"""
+        research = self.state.paragraphs[paragraph_index].research
+        if research.is_completed:
+            print(f"  - 检查点中该段落已完成,跳过")
+            return
+
+        # 初始搜索和总结
+        if research.latest_summary:
+            print("  - 检查点中已有初始总结,跳过初始搜索")
+        else:
+            self._initial_search_and_summary(paragraph_index)
 
-        for i in range(total_paragraphs):
-            print(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
-            print("-" * 50)
-
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
-
-            # 反思循环
-            self._reflection_loop(i)
+        # 反思循环
+        self._reflection_loop(paragraph_index)
 
-            # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
+        # 标记段落完成
+        with self._state_lock:
+            self.state.paragraphs[paragraph_index].research.mark_completed()
+        self._save_checkpoint()
 
-            progress = (i + 1) / total_paragraphs * 100
-            print(f"段落处理完成 ({progress:.1f}%)")
+        # 丢弃该段落未被使用的预取
+        if self.prefetcher is not None:
+            self.prefetcher.discard(paragraph_index)
 
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
@@ -187,8 +476,8 @@ class TheoryExpertAgent:
         # 转换为兼容格式
         search_results = []
         if search_response and search_response.results:
-            # 深度搜索最多返回20个结果,这里取前10个
-            max_results = min(len(search_response.results), 10)
+            # 深度搜索最多返回20个结果: 启用本地重排时全部参与重排,否则取前10个
+            max_results = len(search_response.results) if self.config.enable_result_rerank else min(len(search_response.results), 10)
             for result in search_response.results[:max_results]:
                 search_results.append({
                     'title': result.title,
@@ -199,6 +488,9 @@ class TheoryExpertAgent:
                     'published_date': result.published_date
                 })
 
+        search_results = self._rerank_results(paragraph.title, search_query, search_results)
+        search_results = self._deduplicate_results(paragraph_index, search_results)
+
         if search_results:
             print(f"  - 找到 {len(search_results)} 个搜索结果")
             for j, result in enumerate(search_results, 1):
@@ -208,7 +500,8 @@ class TheoryExpertAgent:
             print("  - 未找到搜索结果")
 
         # 更新状态中的搜索历史
-        paragraph.research.add_search_results(search_query, search_results)
+        with self._state_lock:
+            paragraph.research.add_search_results(search_query, search_results)
 
         # 生成初始总结
         print("  - 生成初始总结...")
@@ -216,15 +509,21 @@ class TheoryExpertAgent:
             "title": paragraph.title,
             "content": paragraph.content,
             "search_query": search_query,
-            "search_results": format_search_results_for_prompt(
-                search_results, self.config.max_content_length
+            "search_results": pack_search_results_for_prompt(
+                search_results, self.config.first_summary_token_budget, self.config.max_content_length
             )
         }
 
+        # 总结期间推测预取下一轮反思的搜索
+        self._speculative_prefetch(paragraph_index, search_query)
+
         # 更新状态
         self.state = self.first_summary_node.mutate_state(
-            summary_input, self.state, paragraph_index
+            summary_input, self.state, paragraph_index,
+            stream_callback=self.stream_callback,
+            state_lock=self._state_lock
         )
+        self._save_checkpoint()
 
         print("  - 初始总结完成")
 
@@ -232,7 +531,21 @@ class TheoryExpertAgent:
         """执行反思循环"""
         paragraph = self.state.paragraphs[paragraph_index]
 
-        for reflection_i in range(self.config.max_reflections):
+        if paragraph.research.skipped_reflections > 0:
+            # 检查点中该段落已判定收敛
+            return
+
+        # 从检查点恢复时跳过已完成的反思轮次
+        for reflection_i in range(paragraph.research.reflection_iteration, self.config.max_reflections):
+            # 时间预算即将耗尽时跳过剩余反思，把时间留给其余段落的首轮研究
+            if self._budget_exhausted():
+                skipped = self.config.max_reflections - reflection_i
+                with self._state_lock:
+                    paragraph.research.skipped_reflections = skipped
+                self._save_checkpoint()
+                print(f"  - 研究时间预算即将耗尽，跳过剩余 {skipped} 轮反思")
+                break
+
             print(f"  - 反思 {reflection_i + 1}/{self.config.max_reflections}...")
 
             # 准备反思输入
@@ -250,13 +563,13 @@ class TheoryExpertAgent:
             print(f"    反思查询: {search_query}")
             print(f"    反思推理: {reasoning}")
 
-            # 执行反思搜索
-            search_response = self.execute_search_tool(search_query)
+            # 执行反思搜索(与预取查询足够相似时直接使用预取结果)
+            search_response = self._search_with_prefetch(paragraph_index, search_query)
 
             # 转换为兼容格式
             search_results = []
             if search_response and search_response.results:
-                max_results = min(len(search_response.results), 10)
+                max_results = len(search_response.results) if self.config.enable_result_rerank else min(len(search_response.results), 10)
                 for result in search_response.results[:max_results]:
                     search_results.append({
                         'title': result.title,
@@ -267,6 +580,13 @@ class TheoryExpertAgent:
                         'published_date': result.published_date
                     })
 
+            search_results = self._rerank_results(paragraph.title, search_query, search_results)
+            # 计算本轮结果相对已有历史的新颖度
+            with self._state_lock:
+                novelty = compute_result_novelty(search_results, paragraph.research.get_seen_result_keys())
+            # 丢弃/折叠已出现过的结果，只把新内容写入历史并发送给LLM
+            search_results = self._deduplicate_results(paragraph_index, search_results)
+
             if search_results:
                 print(f"    找到 {len(search_results)} 个反思搜索结果")
                 for j, result in enumerate(search_results, 1):
@@ -276,26 +596,57 @@ class TheoryExpertAgent:
                 print("    未找到反思搜索结果")
 
             # 更新搜索历史
-            paragraph.research.add_search_results(search_query, search_results)
+            with self._state_lock:
+                paragraph.research.add_search_results(search_query, search_results)
+
+            # 收敛检测: 本轮几乎没有带来新结果时，跳过本轮总结及剩余反思
+            if self.config.enable_reflection_early_exit and novelty < self.config.reflection_min_novelty:
+                skipped = self.config.max_reflections - reflection_i
+                with self._state_lock:
+                    paragraph.research.skipped_reflections = skipped
+                self._save_checkpoint()
+                print(f"    新结果占比 {novelty:.0%} 低于阈值，判定已收敛，跳过剩余 {skipped} 轮反思")
+                break
 
             # 生成反思总结
             reflection_summary_input = {
                 "title": paragraph.title,
                 "content": paragraph.content,
                 "search_query": search_query,
-                "search_results": format_search_results_for_prompt(
-                    search_results, self.config.max_content_length
+                "search_results": pack_search_results_for_prompt(
+                    search_results, self.config.reflection_summary_token_budget, self.config.max_content_length
                 ),
                 "paragraph_latest_state": paragraph.research.latest_summary
             }
 
+            # 总结期间推测预取下一轮反思的搜索
+            if reflection_i + 1 < self.config.max_reflections:
+                self._speculative_prefetch(paragraph_index, search_query)
+
             # 更新状态
             self.state = self.reflection_summary_node.mutate_state(
-                reflection_summary_input, self.state, paragraph_index
+                reflection_summary_input, self.state, paragraph_index,
+                stream_callback=self.stream_callback,
+                state_lock=self._state_lock
             )
+            self._save_checkpoint()
 
             print(f"    反思 {reflection_i + 1} 完成")
 
+            # 收敛检测: 总结与上一轮几乎相同时，不再继续反思
+            remaining = self.config.max_reflections - reflection_i - 1
+            if self.config.enable_reflection_early_exit and remaining > 0:
+                similarity = text_similarity(
+                    reflection_summary_input["paragraph_latest_state"],
+                    paragraph.research.latest_summary
+                )
+                if similarity >= self.config.reflection_similarity_threshold:
+                    with self._state_lock:
+                        paragraph.research.skipped_reflections = remaining
+                    self._save_checkpoint()
+                    print(f"    总结与上一轮相似度 {similarity:.0%}，判定已收敛，跳过剩余 {remaining} 轮反思")
+                    break
+
     def _generate_final_report(self) -> str:
         """生成最终报告"""
         print(f"\n[步骤 3] 生成最终报告...")
@@ -320,6 +671,7 @@ class TheoryExpertAgent:
         # 更新状态
         self.state.final_report = final_report
         self.state.mark_completed()
+        self._save_checkpoint()
 
         print("最终报告生成完成")
         return final_report
@@ -348,8 +700,22 @@ class TheoryExpertAgent:
             print(f"状态已保存到: {state_filepath}")
 
     def get_progress_summary(self) -> Dict[str, Any]:
-        """获取进度摘要"""
-        return self.state.get_progress_summary()
+        """获取进度摘要（含本次运行的LLM用量与耗时）"""
+        summary = self.state.get_progress_summary()
+        summary["llm_usage"] = self.usage_tracker.get_summary()
+        try:
+            # 与 llms/base.py 一样按扁平模块名导入，才能拿到LLM客户端实际写入的统计器
+            from llm_latency import get_latency_tracker
+            summary["llm_latency"] = get_latency_tracker().get_stats()
+        except ImportError:
+            pass
+        if self.search_agency.cache is not None:
+            summary["search_cache"] = self.search_agency.cache.get_stats()
+        if self.search_agency.semantic_cache is not None:
+            summary["semantic_cache"] = self.search_agency.semantic_cache.get_stats()
+        if self.prefetcher is not None:
+            summary["search_prefetch"] = self.prefetcher.get_stats()
+        return summary
 
     def load_state(self, filepath: str):
         """从文件加载状态"""
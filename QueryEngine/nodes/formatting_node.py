@@ -68,7 +68,7 @@ class ReportFormattingNode(BaseNode):
             self.log_info("正在格式化最终报告")
             
             # 调用LLM生成Markdown格式
-            response = self.llm_client.invoke(
+            response = self.call_llm(
                 SYSTEM_PROMPT_REPORT_FORMATTING,
                 message,
             )
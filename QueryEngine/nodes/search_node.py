@@ -70,7 +70,7 @@ class FirstSearchNode(BaseNode):
             enhanced_message = f"{time_context}\n\n---\n\n{message}"
 
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_FIRST_SEARCH, enhanced_message)
+            response = self.call_llm(SYSTEM_PROMPT_FIRST_SEARCH, enhanced_message)
             
             # 处理响应
             processed_response = self.process_output(response)
@@ -209,7 +209,7 @@ class ReflectionNode(BaseNode):
             enhanced_message = f"{time_context}\n\n---\n\n{message}"
 
             # 调用LLM
-            response = self.llm_client.invoke(SYSTEM_PROMPT_REFLECTION, enhanced_message)
+            response = self.call_llm(SYSTEM_PROMPT_REFLECTION, enhanced_message)
             
             # 处理响应
             processed_response = self.process_output(response)
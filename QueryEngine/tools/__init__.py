@@ -5,16 +5,22 @@
 
 from .search import (
     TavilyNewsAgency, 
+    BackendNewsAgency,
     SearchResult, 
     TavilyResponse, 
     ImageResult,
     print_response_summary
 )
+from .rerank import BM25Reranker, tokenize
+
 
 __all__ = [
     "TavilyNewsAgency", 
+    "BackendNewsAgency",
     "SearchResult", 
     "TavilyResponse", 
     "ImageResult",
-    "print_response_summary"
+    "print_response_summary",
+    "BM25Reranker",
+    "tokenize"
 ]
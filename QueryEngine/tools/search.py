@@ -25,7 +25,9 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
-from dataclasses import dataclass, field
+from search_recorder import install_search_recorder, is_replaying
+from search_backend import SearchBackend, SearchHit
+from dataclasses import dataclass, field, asdict
 
 # 运行前请确保已安装Tavily库: pip install tavily-python
 try:
@@ -211,6 +213,17 @@ class TavilyResponse:
     images: List[ImageResult] = field(default_factory=list)
     response_time: Optional[float] = None
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TavilyResponse":
+        """从字典(如缓存中的JSON)重建响应对象"""
+        return cls(
+            query=data.get('query'),
+            answer=data.get('answer'),
+            results=[SearchResult(**item) for item in data.get('results', [])],
+            images=[ImageResult(**item) for item in data.get('images', [])],
+            response_time=data.get('response_time')
+        )
+
 
 # --- 2. 核心客户端与搜索工具 ---
 
@@ -218,19 +231,34 @@ class TavilyNewsAgency:
     """
     中长跑理论搜索客户端
     提供单一的深度搜索工具,专注于理论研究
+
+    同时实现 SearchBackend 接口(search),可与其他搜索后端互换使用
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    name = "tavily"
+
+    def __init__(self, api_key: Optional[str] = None, cache=None, semantic_cache=None):
         """
         初始化客户端
         Args:
             api_key: Tavily API密钥,若不提供则从环境变量 TAVILY_API_KEY 读取
+            cache: 可选的搜索结果缓存(utils/search_cache.SearchResultCache)
+            semantic_cache: 可选的语义查询缓存(utils/semantic_cache.SemanticQueryCache),相近的改写查询复用结果
         """
         if api_key is None:
             api_key = os.getenv("TAVILY_API_KEY")
-            if not api_key:
+            if not api_key and not is_replaying():
                 raise ValueError("Tavily API Key未找到!请设置TAVILY_API_KEY环境变量或在初始化时提供")
-        self._client = TavilyClient(api_key=api_key)
+        # 回放模式下所有请求都由录制归档提供，不创建API客户端
+        self._client = None if is_replaying() else TavilyClient(api_key=api_key)
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        # SEARCH_RECORD_MODE 开启时录制/回放原始API响应(内容安全过滤在回放时照常执行)
+        install_search_recorder(self, "tavily", ["_request"])
+
+    def _request(self, api_params: Dict[str, Any]) -> Dict[str, Any]:
+        """向Tavily发起一次搜索请求,返回原始响应字典"""
+        return self._client.search(**api_params)
 
     @with_graceful_retry(SEARCH_API_RETRY_CONFIG, default_return=TavilyResponse(query="搜索失败"))
     def _search_internal(self, **kwargs) -> TavilyResponse:
@@ -238,7 +266,7 @@ class TavilyNewsAgency:
         try:
             kwargs['topic'] = 'general'
             api_params = {k: v for k, v in kwargs.items() if v is not None}
-            response_dict = self._client.search(**api_params)
+            response_dict = self._request(api_params)
 
             # 过滤掉不安全的搜索结果
             filtered_results = []
@@ -335,7 +363,98 @@ class TavilyNewsAgency:
             search_params["include_domains"] = RUNNING_SCIENCE_WHITELIST
             print(f"已启用学术白名单过滤 ({len(RUNNING_SCIENCE_WHITELIST)} 个权威域名)")
 
-        return self._search_internal(**search_params)
+        if self.semantic_cache is None:
+            return self._fetch_deep_search(search_params)
+
+        # 语义缓存按原始查询匹配,其余参数相同的调用才可互相复用
+        return self.semantic_cache.fetch(
+            f"{self.name}.deep_search_news:enhance={enable_query_enhancement}:whitelist={use_whitelist}",
+            query,
+            lambda: self._fetch_deep_search(search_params),
+            cacheable=lambda response: bool(response.results or response.answer),
+        )
+
+    def _fetch_deep_search(self, search_params: Dict[str, Any]) -> TavilyResponse:
+        """执行深度搜索(经过可选的持久化缓存)"""
+        if self.cache is None:
+            return self._search_internal(**search_params)
+
+        # 缓存键包含增强后的查询与全部API参数(白名单、max_results等)
+        namespace = f"{self.name}.deep_search_news"  # 不同后端的结果互不复用
+        cache_key = self.cache.make_key(namespace, search_params)
+        data = self.cache.fetch(
+            cache_key,
+            lambda: asdict(self._search_internal(**search_params)),
+            namespace=namespace,
+            # 重试耗尽后的默认返回值不写入缓存
+            cacheable=lambda result: bool(result.get('results') or result.get('answer')),
+        )
+        return TavilyResponse.from_dict(data)
+
+    # --- SearchBackend 接口 ---
+
+    def search(self, query: str, max_results: int = 10) -> List[SearchHit]:
+        """SearchBackend接口: 深度搜索并返回后端无关的结果列表"""
+        response = self.deep_search_news(query)
+        return [
+            SearchHit(
+                title=result.title,
+                url=result.url,
+                content=result.content,
+                score=result.score,
+                published_date=result.published_date,
+                source=self.name
+            )
+            for result in response.results[:max_results]
+        ]
+
+
+class BackendNewsAgency(TavilyNewsAgency):
+    """
+    以任意 SearchBackend(如 utils/search_backend.LocalCorpusSearch 本地语料库)作为数据源的理论搜索客户端
+
+    工具接口、查询增强、内容安全过滤与缓存均与 TavilyNewsAgency 相同,只把实际检索交给后端;
+    白名单等Tavily专有参数被忽略
+    """
+
+    def __init__(self, backend: SearchBackend, cache=None, semantic_cache=None):
+        """
+        Args:
+            backend: 实际执行检索的搜索后端
+            cache: 可选的搜索结果缓存
+            semantic_cache: 可选的语义查询缓存
+        """
+        self.backend = backend
+        self.name = backend.name
+        self._client = None
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+
+    def _search_internal(self, **kwargs) -> TavilyResponse:
+        """交给后端检索,并执行与Tavily结果相同的内容安全过滤"""
+        query = kwargs.get('query', '')
+        try:
+            hits = self.backend.search(query, kwargs.get('max_results') or 10)
+        except Exception as e:
+            print(f"搜索时发生错误: {str(e)}")
+            return TavilyResponse(query="搜索失败")
+
+        results = [
+            SearchResult(
+                title=hit.title,
+                url=hit.url,
+                content=hit.content,
+                score=hit.score,
+                published_date=hit.published_date
+            )
+            for hit in hits
+            if is_content_safe(hit.title, hit.url) and is_content_safe(hit.content, hit.url)
+        ]
+        return TavilyResponse(query=query, results=results)
+
+    def search(self, query: str, max_results: int = 10) -> List[SearchHit]:
+        """直接透传给后端(不做查询增强)"""
+        return self.backend.search(query, max_results)
 
 
 # --- 3. 测试与使用示例 ---
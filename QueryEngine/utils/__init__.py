@@ -9,7 +9,15 @@ from .text_processing import (
     remove_reasoning_from_output,
     extract_clean_response,
     update_state_with_search_results,
-    format_search_results_for_prompt
+    format_search_results_for_prompt,
+    pack_search_results_for_prompt,
+    estimate_tokens,
+    truncate_to_tokens,
+    compute_result_novelty,
+    text_similarity,
+    normalize_url,
+    simhash,
+    SearchResultDeduplicator
 )
 
 from .config import Config, load_config
@@ -21,6 +29,14 @@ __all__ = [
     "extract_clean_response",
     "update_state_with_search_results",
     "format_search_results_for_prompt",
+    "pack_search_results_for_prompt",
+    "estimate_tokens",
+    "truncate_to_tokens",
+    "compute_result_novelty",
+    "text_similarity",
+    "normalize_url",
+    "simhash",
+    "SearchResultDeduplicator",
     "Config",
     "load_config"
 ]
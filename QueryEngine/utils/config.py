@@ -26,6 +26,11 @@ def _get_value(source, key: str, default=None, *fallback_keys: str):
     return value if value not in (None, "") else default
 
 
+def _optional_float(value) -> Optional[float]:
+    """将可选配置转换为float，未配置时返回None"""
+    return float(value) if value not in (None, "") else None
+
+
 @dataclass
 class Config:
     """Query Engine configuration."""
@@ -46,6 +51,72 @@ class Config:
     output_dir: str = "reports"
     save_intermediate_states: bool = True
 
+    # LLM response cache
+    llm_cache_enabled: bool = False
+    llm_cache_path: str = "cache/llm_cache.db"
+    llm_cache_ttl: int = 86400
+    llm_cache_memory_size: int = 256
+    llm_cache_allow_sampling: bool = False
+    llm_cache_default_temperature: Optional[float] = None  # 调用未显式传温度时服务端使用的默认温度
+
+    # Paragraph concurrency
+    max_parallel_paragraphs: int = 1
+
+    # Reflection convergence
+    enable_reflection_early_exit: bool = True
+    reflection_min_novelty: float = 0.1
+    reflection_similarity_threshold: float = 0.9
+
+    # Checkpoint / resume
+    enable_checkpoint: bool = True
+
+    # Time budget
+    research_time_budget: int = 0
+    research_budget_reserve: float = 0.2
+
+    # Search result cache
+    search_cache_enabled: bool = True
+    search_cache_path: str = "cache/search_cache.db"
+    search_cache_ttl: int = 604800
+    search_cache_stale_ttl: int = 86400
+    search_cache_max_entries: int = 2000
+
+    # Search result dedup
+    enable_result_dedup: bool = True
+    dedup_simhash_distance: int = 3
+    dedup_collapsed_length: int = 300
+
+    # Prompt token budget (search results, 0 = only per-result truncation)
+    first_summary_token_budget: int = 12000
+    reflection_summary_token_budget: int = 8000
+
+    # Local BM25 rerank
+    enable_result_rerank: bool = True
+    rerank_top_k: int = 8
+
+    # Speculative search prefetch
+    enable_speculative_prefetch: bool = False
+    prefetch_max_candidates: int = 2
+    # Character 3-gram Jaccard. Lower values reuse more prefetches but also match different
+    # queries ("5km race pacing" vs "10km race pacing" scores 0.77); at 0.85 only near-identical
+    # rewordings (case, spacing, punctuation) reuse a prefetch, other reflections search normally
+    prefetch_similarity_threshold: float = 0.85
+    prefetch_ttl: int = 120
+
+    # Semantic query cache
+    enable_semantic_cache: bool = False
+    # Char n-gram TF-IDF cosine. Lower values save more API calls but return another query's
+    # results ("lactate threshold training" vs "testing" scores ~0.63-0.69); at 0.85 paraphrases
+    # that add words ("马拉松配速策略" vs "马拉松比赛配速策略研究") miss and run a real search
+    semantic_cache_threshold: float = 0.85
+    semantic_cache_ttl: int = 3600
+    semantic_cache_max_entries: int = 500
+
+    # Search backend (api = Tavily/Bocha, local = SQLite FTS5 corpus)
+    search_backend: str = "api"
+    local_corpus_dir: str = "corpus"
+    local_corpus_index: str = "cache/local_corpus.db"
+
     def __post_init__(self):
         if not self.llm_provider and self.llm_model_name:
             self.llm_provider = self.llm_model_name
@@ -57,7 +128,7 @@ class Config:
         if not self.llm_model_name:
             print("错误: Query Engine 模型名称未设置 (DEFAULT_MODEL_NAME)。")
             return False
-        if not self.tavily_api_key:
+        if not self.tavily_api_key and self.search_backend != "local":
             print("错误: Tavily API Key 未设置 (TAVILY_API_KEY)。")
             return False
         return True
@@ -86,6 +157,71 @@ class Config:
                     _get_value(config_module, "SAVE_INTERMEDIATE_STATES", "true")
                 ).lower()
                 in ("true", "1", "yes"),
+                llm_cache_enabled=str(
+                    _get_value(config_module, "QUERY_LLM_CACHE_ENABLED", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                llm_cache_path=_get_value(config_module, "LLM_CACHE_PATH", "cache/llm_cache.db"),
+                llm_cache_ttl=int(_get_value(config_module, "LLM_CACHE_TTL", 86400)),
+                llm_cache_memory_size=int(_get_value(config_module, "LLM_CACHE_MEMORY_SIZE", 256)),
+                llm_cache_allow_sampling=str(
+                    _get_value(config_module, "LLM_CACHE_ALLOW_SAMPLING", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                llm_cache_default_temperature=_optional_float(
+                    _get_value(config_module, "LLM_CACHE_DEFAULT_TEMPERATURE")
+                ),
+                max_parallel_paragraphs=int(_get_value(config_module, "MAX_PARALLEL_PARAGRAPHS", 1)),
+                enable_reflection_early_exit=str(
+                    _get_value(config_module, "REFLECTION_EARLY_EXIT", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                reflection_min_novelty=float(_get_value(config_module, "REFLECTION_MIN_NOVELTY", 0.1)),
+                reflection_similarity_threshold=float(_get_value(config_module, "REFLECTION_SIMILARITY_THRESHOLD", 0.9)),
+                enable_checkpoint=str(
+                    _get_value(config_module, "ENABLE_CHECKPOINT", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                research_time_budget=int(_get_value(config_module, "RESEARCH_TIME_BUDGET", 0)),
+                research_budget_reserve=float(_get_value(config_module, "RESEARCH_BUDGET_RESERVE", 0.2)),
+                search_cache_enabled=str(
+                    _get_value(config_module, "SEARCH_CACHE_ENABLED", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                search_cache_path=_get_value(config_module, "SEARCH_CACHE_PATH", "cache/search_cache.db"),
+                search_cache_ttl=int(_get_value(config_module, "SEARCH_CACHE_TTL", 604800)),
+                search_cache_stale_ttl=int(_get_value(config_module, "SEARCH_CACHE_STALE_TTL", 86400)),
+                search_cache_max_entries=int(_get_value(config_module, "SEARCH_CACHE_MAX_ENTRIES", 2000)),
+                enable_result_dedup=str(
+                    _get_value(config_module, "RESULT_DEDUP_ENABLED", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                dedup_simhash_distance=int(_get_value(config_module, "DEDUP_SIMHASH_DISTANCE", 3)),
+                dedup_collapsed_length=int(_get_value(config_module, "DEDUP_COLLAPSED_LENGTH", 300)),
+                first_summary_token_budget=int(_get_value(config_module, "FIRST_SUMMARY_TOKEN_BUDGET", 12000)),
+                reflection_summary_token_budget=int(_get_value(config_module, "REFLECTION_SUMMARY_TOKEN_BUDGET", 8000)),
+                enable_result_rerank=str(
+                    _get_value(config_module, "RESULT_RERANK_ENABLED", "true")
+                ).lower()
+                in ("true", "1", "yes"),
+                rerank_top_k=int(_get_value(config_module, "RERANK_TOP_K", 8)),
+                enable_speculative_prefetch=str(
+                    _get_value(config_module, "SPECULATIVE_PREFETCH_ENABLED", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                prefetch_max_candidates=int(_get_value(config_module, "PREFETCH_MAX_CANDIDATES", 2)),
+                prefetch_similarity_threshold=float(_get_value(config_module, "PREFETCH_SIMILARITY_THRESHOLD", 0.85)),
+                prefetch_ttl=int(_get_value(config_module, "PREFETCH_TTL", 120)),
+                enable_semantic_cache=str(
+                    _get_value(config_module, "SEMANTIC_CACHE_ENABLED", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                semantic_cache_threshold=float(_get_value(config_module, "SEMANTIC_CACHE_THRESHOLD", 0.85)),
+                semantic_cache_ttl=int(_get_value(config_module, "SEMANTIC_CACHE_TTL", 3600)),
+                semantic_cache_max_entries=int(_get_value(config_module, "SEMANTIC_CACHE_MAX_ENTRIES", 500)),
+                search_backend=_get_value(config_module, "QUERY_SEARCH_BACKEND", "api"),
+                local_corpus_dir=_get_value(config_module, "LOCAL_CORPUS_DIR", "corpus"),
+                local_corpus_index=_get_value(config_module, "LOCAL_CORPUS_INDEX", "cache/local_corpus.db"),
             )
 
         config_dict = {}
@@ -112,6 +248,71 @@ class Config:
                 _get_value(config_dict, "SAVE_INTERMEDIATE_STATES", "true")
             ).lower()
             in ("true", "1", "yes"),
+            llm_cache_enabled=str(
+                _get_value(config_dict, "QUERY_LLM_CACHE_ENABLED", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            llm_cache_path=_get_value(config_dict, "LLM_CACHE_PATH", "cache/llm_cache.db"),
+            llm_cache_ttl=int(_get_value(config_dict, "LLM_CACHE_TTL", 86400)),
+            llm_cache_memory_size=int(_get_value(config_dict, "LLM_CACHE_MEMORY_SIZE", 256)),
+            llm_cache_allow_sampling=str(
+                _get_value(config_dict, "LLM_CACHE_ALLOW_SAMPLING", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            llm_cache_default_temperature=_optional_float(
+                _get_value(config_dict, "LLM_CACHE_DEFAULT_TEMPERATURE")
+            ),
+            max_parallel_paragraphs=int(_get_value(config_dict, "MAX_PARALLEL_PARAGRAPHS", 1)),
+            enable_reflection_early_exit=str(
+                _get_value(config_dict, "REFLECTION_EARLY_EXIT", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            reflection_min_novelty=float(_get_value(config_dict, "REFLECTION_MIN_NOVELTY", 0.1)),
+            reflection_similarity_threshold=float(_get_value(config_dict, "REFLECTION_SIMILARITY_THRESHOLD", 0.9)),
+            enable_checkpoint=str(
+                _get_value(config_dict, "ENABLE_CHECKPOINT", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            research_time_budget=int(_get_value(config_dict, "RESEARCH_TIME_BUDGET", 0)),
+            research_budget_reserve=float(_get_value(config_dict, "RESEARCH_BUDGET_RESERVE", 0.2)),
+            search_cache_enabled=str(
+                _get_value(config_dict, "SEARCH_CACHE_ENABLED", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            search_cache_path=_get_value(config_dict, "SEARCH_CACHE_PATH", "cache/search_cache.db"),
+            search_cache_ttl=int(_get_value(config_dict, "SEARCH_CACHE_TTL", 604800)),
+            search_cache_stale_ttl=int(_get_value(config_dict, "SEARCH_CACHE_STALE_TTL", 86400)),
+            search_cache_max_entries=int(_get_value(config_dict, "SEARCH_CACHE_MAX_ENTRIES", 2000)),
+            enable_result_dedup=str(
+                _get_value(config_dict, "RESULT_DEDUP_ENABLED", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            dedup_simhash_distance=int(_get_value(config_dict, "DEDUP_SIMHASH_DISTANCE", 3)),
+            dedup_collapsed_length=int(_get_value(config_dict, "DEDUP_COLLAPSED_LENGTH", 300)),
+            first_summary_token_budget=int(_get_value(config_dict, "FIRST_SUMMARY_TOKEN_BUDGET", 12000)),
+            reflection_summary_token_budget=int(_get_value(config_dict, "REFLECTION_SUMMARY_TOKEN_BUDGET", 8000)),
+            enable_result_rerank=str(
+                _get_value(config_dict, "RESULT_RERANK_ENABLED", "true")
+            ).lower()
+            in ("true", "1", "yes"),
+            rerank_top_k=int(_get_value(config_dict, "RERANK_TOP_K", 8)),
+            enable_speculative_prefetch=str(
+                _get_value(config_dict, "SPECULATIVE_PREFETCH_ENABLED", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            prefetch_max_candidates=int(_get_value(config_dict, "PREFETCH_MAX_CANDIDATES", 2)),
+            prefetch_similarity_threshold=float(_get_value(config_dict, "PREFETCH_SIMILARITY_THRESHOLD", 0.85)),
+            prefetch_ttl=int(_get_value(config_dict, "PREFETCH_TTL", 120)),
+            enable_semantic_cache=str(
+                _get_value(config_dict, "SEMANTIC_CACHE_ENABLED", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            semantic_cache_threshold=float(_get_value(config_dict, "SEMANTIC_CACHE_THRESHOLD", 0.85)),
+            semantic_cache_ttl=int(_get_value(config_dict, "SEMANTIC_CACHE_TTL", 3600)),
+            semantic_cache_max_entries=int(_get_value(config_dict, "SEMANTIC_CACHE_MAX_ENTRIES", 500)),
+            search_backend=_get_value(config_dict, "QUERY_SEARCH_BACKEND", "api"),
+            local_corpus_dir=_get_value(config_dict, "LOCAL_CORPUS_DIR", "corpus"),
+            local_corpus_index=_get_value(config_dict, "LOCAL_CORPUS_INDEX", "cache/local_corpus.db"),
         )
 
 
@@ -147,4 +348,40 @@ def print_config(config: Config):
     print(f"输出目录: {config.output_dir}")
     print(f"保存中间状态: {config.save_intermediate_states}")
     print(f"LLM API Key: {'已配置' if config.llm_api_key else '未配置'}")
+    print(f"LLM响应缓存: {config.llm_cache_enabled}")
+    print(f"LLM缓存文件: {config.llm_cache_path}")
+    print(f"LLM缓存有效期(秒): {config.llm_cache_ttl}")
+    print(f"LLM缓存内存条目数: {config.llm_cache_memory_size}")
+    print(f"允许缓存采样调用: {config.llm_cache_allow_sampling}")
+    print(f"缓存判定使用的默认温度: {config.llm_cache_default_temperature}")
+    print(f"段落并发数: {config.max_parallel_paragraphs}")
+    print(f"反思收敛提前退出: {config.enable_reflection_early_exit}")
+    print(f"反思最低新结果占比: {config.reflection_min_novelty}")
+    print(f"反思总结相似度阈值: {config.reflection_similarity_threshold}")
+    print(f"自动检查点: {config.enable_checkpoint}")
+    print(f"研究时间预算(秒,0为不限): {config.research_time_budget}")
+    print(f"预算保留比例(停止反思): {config.research_budget_reserve}")
+    print(f"搜索结果缓存: {config.search_cache_enabled}")
+    print(f"搜索缓存文件: {config.search_cache_path}")
+    print(f"搜索缓存有效期(秒): {config.search_cache_ttl}")
+    print(f"过期后台刷新宽限期(秒): {config.search_cache_stale_ttl}")
+    print(f"搜索缓存最大条目数: {config.search_cache_max_entries}")
+    print(f"搜索结果跨轮去重: {config.enable_result_dedup}")
+    print(f"内容指纹去重距离: {config.dedup_simhash_distance}")
+    print(f"跨段落重复结果折叠长度: {config.dedup_collapsed_length}")
+    print(f"初始总结搜索结果token预算: {config.first_summary_token_budget}")
+    print(f"反思总结搜索结果token预算: {config.reflection_summary_token_budget}")
+    print(f"搜索结果BM25重排: {config.enable_result_rerank}")
+    print(f"重排后保留结果数: {config.rerank_top_k}")
+    print(f"推测式搜索预取: {config.enable_speculative_prefetch}")
+    print(f"每轮预取候选查询数: {config.prefetch_max_candidates}")
+    print(f"预取结果复用相似度阈值: {config.prefetch_similarity_threshold}")
+    print(f"预取结果有效期(秒): {config.prefetch_ttl}")
+    print(f"语义查询缓存: {config.enable_semantic_cache}")
+    print(f"语义缓存相似度阈值: {config.semantic_cache_threshold}")
+    print(f"语义缓存时间窗口(秒): {config.semantic_cache_ttl}")
+    print(f"语义缓存最大查询数: {config.semantic_cache_max_entries}")
+    print(f"搜索后端: {config.search_backend}")
+    print(f"本地语料目录: {config.local_corpus_dir}")
+    print(f"本地语料索引文件: {config.local_corpus_index}")
     print("========================\n")
@@ -7,7 +7,7 @@ import json
 import os
 import logging
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 
 from .llms import LLMClient
 from .nodes import (
@@ -131,6 +131,11 @@ class ReportAgent:
         
         # 初始化LLM客户端
         self.llm_client = self._initialize_llm()
+
+        # LLM用量统计(按节点归属,每次运行重新计数)
+        from utils.llm_usage import LLMUsageTracker, get_usage_path
+        self.usage_tracker = LLMUsageTracker("report", get_usage_path("report"))
+        self.llm_client.usage_tracker = self.usage_tracker
         
         # 初始化节点
         self._initialize_nodes()
@@ -192,10 +197,22 @@ class ReportAgent:
     
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
+        cache = None
+        if self.config.llm_cache_enabled:
+            from utils.llm_cache import get_llm_cache
+            cache = get_llm_cache(
+                db_path=self.config.llm_cache_path,
+                memory_size=self.config.llm_cache_memory_size,
+                ttl_seconds=self.config.llm_cache_ttl,
+                allow_sampling=self.config.llm_cache_allow_sampling,
+                default_temperature=self.config.llm_cache_default_temperature,
+            )
+
         return LLMClient(
             api_key=self.config.llm_api_key,
             model_name=self.config.llm_model_name,
             base_url=self.config.llm_base_url,
+            cache=cache,
         )
     
     def _initialize_nodes(self):
@@ -207,7 +224,8 @@ class ReportAgent:
         self.html_generation_node = HTMLGenerationNode(self.llm_client)
     
     def generate_report(self, query: str, reports: List[Any], forum_logs: str = "", 
-                       custom_template: str = "", save_report: bool = True) -> str:
+                       custom_template: str = "", save_report: bool = True,
+                       stream_callback: Optional[Callable[[str], None]] = None) -> str:
         """
         生成综合报告
         
@@ -217,11 +235,13 @@ class ReportAgent:
             forum_logs: 论坛日志内容
             custom_template: 用户自定义模板（可选）
             save_report: 是否保存报告到文件
+            stream_callback: HTML生成阶段的增量文本回调（可选），提供时以流式方式调用LLM
             
         Returns:
             最终HTML报告内容
         """
         start_time = datetime.now()
+        self.usage_tracker.reset()
         
         self.logger.info(f"开始生成报告: {query}")
         self.logger.info(f"输入数据 - 报告数量: {len(reports)}, 论坛日志长度: {len(forum_logs)}")
@@ -231,7 +251,9 @@ class ReportAgent:
             template_result = self._select_template(query, reports, forum_logs, custom_template)
             
             # Step 2: 直接生成HTML报告
-            html_report = self._generate_html_report(query, reports, forum_logs, template_result)
+            html_report = self._generate_html_report(
+                query, reports, forum_logs, template_result, stream_callback=stream_callback
+            )
             
             # Step 3: 保存报告
             if save_report:
@@ -243,6 +265,8 @@ class ReportAgent:
             self.state.metadata.generation_time = generation_time
             
             self.logger.info(f"报告生成完成，耗时: {generation_time:.2f} 秒")
+            if self.llm_client.cache is not None:
+                self.logger.info(f"LLM缓存统计: {self.llm_client.get_cache_stats()}")
             
             return html_report
             
@@ -290,7 +314,8 @@ class ReportAgent:
             self.state.metadata.template_used = fallback_template['template_name']
             return fallback_template
     
-    def _generate_html_report(self, query: str, reports: List[Any], forum_logs: str, template_result: Dict[str, Any]) -> str:
+    def _generate_html_report(self, query: str, reports: List[Any], forum_logs: str, template_result: Dict[str, Any],
+                              stream_callback: Optional[Callable[[str], None]] = None) -> str:
         """生成HTML报告"""
         self.logger.info("多轮生成HTML报告...")
         
@@ -314,7 +339,7 @@ class ReportAgent:
         }
         
         # 使用HTML生成节点生成报告
-        html_content = self.html_generation_node.run(html_input)
+        html_content = self.html_generation_node.run(html_input, stream_callback=stream_callback)
         
         # 更新状态
         self.state.html_content = html_content
@@ -395,8 +420,10 @@ class ReportAgent:
         self.logger.info(f"状态已保存到: {state_filepath}")
     
     def get_progress_summary(self) -> Dict[str, Any]:
-        """获取进度摘要"""
-        return self.state.to_dict()
+        """获取进度摘要（含本次运行的LLM用量与耗时）"""
+        summary = self.state.to_dict()
+        summary["llm_usage"] = self.usage_tracker.get_summary()
+        return summary
     
     def load_state(self, filepath: str):
         """从文件加载状态"""
@@ -51,7 +51,19 @@ class ReportTask:
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
         self.html_content = ""
-        
+        # 流式生成进度
+        self.first_token_at = None
+        self.streamed_chars = 0
+        
+    def on_stream_delta(self, delta: str):
+        """HTML流式生成的增量回调：首个token到达即推进进度"""
+        if self.first_token_at is None:
+            self.first_token_at = datetime.now()
+        self.streamed_chars += len(delta)
+        # 50%为开始调用LLM，收到首token后推进到60%，之后按已生成字符数缓慢逼近90%
+        self.progress = max(self.progress, min(89, 60 + self.streamed_chars // 1000))
+        self.updated_at = datetime.now()
+    
     def update_status(self, status: str, progress: int = None, error_message: str = ""):
         """更新任务状态"""
         self.status = status
@@ -71,7 +83,9 @@ class ReportTask:
             'error_message': self.error_message,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'has_result': bool(self.html_content)
+            'has_result': bool(self.html_content),
+            'first_token_at': self.first_token_at.isoformat() if self.first_token_at else None,
+            'streamed_chars': self.streamed_chars
         }
 
 
@@ -125,7 +139,8 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
             reports=content['reports'],
             forum_logs=content['forum_logs'],
             custom_template=custom_template,
-            save_report=True
+            save_report=True,
+            stream_callback=task.on_stream_delta
         )
         
         task.update_status("running", 90)
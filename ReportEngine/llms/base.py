@@ -2,11 +2,15 @@
 Unified OpenAI-compatible LLM client for the Report Engine, with retry support.
 """
 
+import asyncio
 import os
 import sys
-from typing import Any, Dict, Optional
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Generator, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
@@ -15,20 +19,50 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 try:
-    from retry_helper import with_retry, LLM_RETRY_CONFIG
+    from retry_helper import (
+        with_retry, with_async_retry, LLM_RETRY_CONFIG, DeadlineExceededError, StreamInterruptedError
+    )
 except ImportError:
     def with_retry(config=None):
         def decorator(func):
             return func
         return decorator
 
+    with_async_retry = with_retry
     LLM_RETRY_CONFIG = None
+    DeadlineExceededError = TimeoutError
 
+    class StreamInterruptedError(Exception):
+        retryable = False
 
-class LLMClient:
-    """Minimal wrapper around the OpenAI-compatible chat completion API."""
+try:
+    from llm_http_pool import get_shared_sync_client, get_shared_async_client
+except ImportError:
+    get_shared_sync_client = None
+    get_shared_async_client = None
 
-    def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None):
+try:
+    from llm_rate_limiter import get_rate_limiter_for, estimate_prompt_tokens
+except ImportError:
+    get_rate_limiter_for = None
+    estimate_prompt_tokens = None
+
+try:
+    from llm_latency import get_latency_tracker, run_hedged, arun_hedged, HedgeCancelledError
+except ImportError:
+    get_latency_tracker = None
+
+
+class _LLMClientBase:
+    """LLMClient 与 AsyncLLMClient 共用的配置、时间预算、缓存、用量统计与限流辅助方法"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        base_url: Optional[str] = None,
+        cache: Optional[Any] = None,
+    ):
         if not api_key:
             raise ValueError("Report Engine LLM API key is required.")
         if not model_name:
@@ -38,18 +72,127 @@ class LLMClient:
         self.base_url = base_url
         self.model_name = model_name
         self.provider = model_name
+        # 可选的响应缓存（utils/llm_cache.LLMResponseCache）
+        self.cache = cache
+        # 可选的用量统计器（utils/llm_usage.LLMUsageTracker），由agent按运行注入
+        self.usage_tracker = None
+        # 跨进程共享的限流器（utils/llm_rate_limiter），未配置 LLM_RATE_LIMIT_RPM 时为None
+        self.rate_limiter = get_rate_limiter_for(base_url, api_key) if get_rate_limiter_for is not None else None
+        # 调用截止时间（time.monotonic），由agent按本次运行的剩余预算设置，None表示不限
+        self.deadline: Optional[float] = None
         timeout_fallback = os.getenv("LLM_REQUEST_TIMEOUT") or os.getenv("REPORT_ENGINE_REQUEST_TIMEOUT") or "180"
         try:
             self.timeout = float(timeout_fallback)
         except ValueError:
             self.timeout = 300.0
 
+    def set_deadline(self, budget_seconds: Optional[float]):
+        """
+        设置后续调用的截止时间
+
+        Args:
+            budget_seconds: 从现在起的剩余预算秒数，None或<=0表示不限
+        """
+        self.deadline = time.monotonic() + budget_seconds if budget_seconds and budget_seconds > 0 else None
+
+    def remaining_budget(self) -> Optional[float]:
+        """剩余预算秒数，未设置截止时间时返回None（重试装饰器据此放弃等待不完的重试）"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def _resolve_timeout(self, timeout: float) -> float:
+        """把单次调用超时裁剪到剩余预算内，预算已耗尽时抛出DeadlineExceededError"""
+        remaining = self.remaining_budget()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            if get_latency_tracker is not None:
+                get_latency_tracker().count(self.model_name, "deadline_exceeded")
+            raise DeadlineExceededError("LLM调用时间预算已耗尽")
+        return min(timeout, remaining)
+
+    def _get_cache_key(self, system_prompt: str, user_prompt: str, params: Dict[str, Any]) -> Optional[str]:
+        """计算缓存键；未启用缓存或本次调用需绕过缓存时返回None"""
+        if self.cache is None:
+            return None
+        params = {key: value for key, value in params.items() if key != "stream"}
+        if self.cache.should_bypass(params):
+            return None
+        return self.cache.make_key(self.model_name, system_prompt, user_prompt, params, base_url=self.base_url)
+
+    def _record_usage(
+        self,
+        usage_label: Optional[str],
+        usage: Any,
+        latency_seconds: float,
+        cached: bool = False,
+        first_token_seconds: Optional[float] = None,
+    ):
+        """将一次调用的token用量与耗时记入统计器"""
+        if self.usage_tracker is None:
+            return
+        try:
+            self.usage_tracker.record(
+                usage_label,
+                self.model_name,
+                usage,
+                latency_seconds,
+                cached=cached,
+                first_token_seconds=first_token_seconds,
+            )
+        except Exception:
+            # 统计失败不影响正常调用
+            pass
+
+    def _settle_rate_limit(self, estimated_tokens: int, usage: Any):
+        """按响应中的实际token用量修正限流令牌桶"""
+        if self.rate_limiter is None or usage is None:
+            return
+        try:
+            self.rate_limiter.settle(estimated_tokens, getattr(usage, "total_tokens", None))
+        except Exception:
+            pass
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取响应缓存命中统计，未启用缓存时返回空字典"""
+        return self.cache.get_stats() if self.cache is not None else {}
+
+    @staticmethod
+    def validate_response(response: Optional[str]) -> str:
+        if response is None:
+            return ""
+        return response.strip()
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model_name,
+            "api_base": self.base_url or "default",
+        }
+
+
+class LLMClient(_LLMClientBase):
+    """Minimal wrapper around the OpenAI-compatible chat completion API."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        base_url: Optional[str] = None,
+        cache: Optional[Any] = None,
+    ):
+        super().__init__(api_key, model_name, base_url=base_url, cache=cache)
+
         client_kwargs: Dict[str, Any] = {
             "api_key": api_key,
             "max_retries": 0,
         }
         if base_url:
             client_kwargs["base_url"] = base_url
+        if get_shared_sync_client is not None:
+            # 复用进程级共享连接池
+            client_kwargs["http_client"] = get_shared_sync_client()
         self.client = OpenAI(**client_kwargs)
 
     @with_retry(LLM_RETRY_CONFIG)
@@ -62,28 +205,329 @@ class LLMClient:
         allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty", "stream"}
         extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
 
-        timeout = kwargs.pop("timeout", self.timeout)
+        timeout = self._resolve_timeout(kwargs.pop("timeout", self.timeout))
+
+        usage_label = kwargs.get("usage_label")
 
-        response = self.client.chat.completions.create(
+        cache_key = self._get_cache_key(system_prompt, user_prompt, extra_params)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record_usage(usage_label, None, 0.0, cached=True)
+                return cached
+
+        estimated_tokens = self._acquire_rate_limit(system_prompt, user_prompt)
+        start_time = time.perf_counter()
+        response = self._create_completion(messages, timeout, extra_params, estimated_tokens)
+        self._record_usage(usage_label, getattr(response, "usage", None), time.perf_counter() - start_time)
+        self._settle_rate_limit(estimated_tokens, getattr(response, "usage", None))
+
+        if response.choices and response.choices[0].message:
+            result = self.validate_response(response.choices[0].message.content)
+            if cache_key:
+                self.cache.set(cache_key, result, self.model_name)
+            return result
+        return ""
+
+    def invoke_stream(self, system_prompt: str, user_prompt: str, **kwargs) -> Generator[str, None, str]:
+        """
+        以流式方式调用LLM，逐个产出增量文本，生成器结束时返回聚合后的完整文本。
+
+        注意：本方法本身不做重试（已产出的增量无法撤回），需要重试语义时请使用 stream_invoke。
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+        allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
+        extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+
+        timeout = self._resolve_timeout(kwargs.pop("timeout", self.timeout))
+
+        usage_label = kwargs.get("usage_label")
+
+        cache_key = self._get_cache_key(system_prompt, user_prompt, extra_params)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record_usage(usage_label, None, 0.0, cached=True)
+                if cached:
+                    yield cached
+                return cached
+
+        estimated_tokens = self._acquire_rate_limit(system_prompt, user_prompt)
+        start_time = time.perf_counter()
+        stream = self.client.chat.completions.create(
             model=self.model_name,
             messages=messages,
             timeout=timeout,
+            stream=True,
+            # 让服务端在最后一个chunk中返回token用量
+            stream_options={"include_usage": True},
             **extra_params,
         )
 
+        chunks = []
+        usage = None
+        first_token_seconds = None
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            content = getattr(delta, "content", None) if delta else None
+            if content:
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - start_time
+                chunks.append(content)
+                yield content
+
+        elapsed = time.perf_counter() - start_time
+        self._record_usage(usage_label, usage, elapsed, first_token_seconds=first_token_seconds)
+        self._settle_rate_limit(estimated_tokens, usage)
+        if get_latency_tracker is not None:
+            get_latency_tracker().record(self.model_name, elapsed)
+        result = self.validate_response("".join(chunks))
+        if cache_key:
+            self.cache.set(cache_key, result, self.model_name)
+        return result
+
+    @with_retry(LLM_RETRY_CONFIG)
+    def stream_invoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_delta: Optional[Callable[[str], None]] = None,
+        **kwargs,
+    ) -> str:
+        """
+        消费 invoke_stream 并返回完整文本，每收到一个增量时回调 on_delta。
+
+        尚未产出任何增量时失败按 LLM_RETRY_CONFIG 重新发起请求；已向 on_delta 产出部分内容后失败则抛出
+        StreamInterruptedError 不再重试，避免回调方收到重复的文本。
+        """
+        stream = self.invoke_stream(system_prompt, user_prompt, **kwargs)
+        emitted = False
+        while True:
+            try:
+                delta = next(stream)
+            except StopIteration as stop:
+                return stop.value or ""
+            except DeadlineExceededError:
+                raise
+            except Exception as e:
+                if emitted:
+                    raise StreamInterruptedError(f"流式输出在产出部分内容后中断: {str(e)}") from e
+                raise
+            emitted = True
+            if on_delta is not None:
+                try:
+                    on_delta(delta)
+                except Exception:
+                    # 回调异常不应中断生成
+                    pass
+
+    def _create_completion(
+        self,
+        messages: list,
+        timeout: float,
+        extra_params: Dict[str, Any],
+        estimated_tokens: int = 0,
+    ) -> Any:
+        """
+        发起非流式请求并记录该模型的耗时
+
+        启用对冲(LLM_HEDGE_ENABLED)且样本充足时，请求超过p95耗时仍未返回则发起一个重复请求，取先返回者；
+        对冲时两路请求都以流式方式发起(见 _hedgeable_completion)，落败的一方会关闭连接而不是在后台跑完
+        """
+        def call():
+            return self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                timeout=timeout,
+                **extra_params,
+            )
+
+        if get_latency_tracker is None:
+            return call()
+
+        tracker = get_latency_tracker()
+        hedge_delay = tracker.get_hedge_delay(self.model_name)
+        start_time = time.perf_counter()
+        if hedge_delay is not None and hedge_delay < timeout:
+            before_hedge = None
+            if self.rate_limiter is not None:
+                before_hedge = lambda: self.rate_limiter.acquire(estimated_tokens)
+            response, _ = run_hedged(
+                lambda cancelled: self._hedgeable_completion(messages, timeout, extra_params, cancelled),
+                hedge_delay,
+                self.model_name,
+                before_hedge=before_hedge,
+            )
+        else:
+            response = call()
+        tracker.record(self.model_name, time.perf_counter() - start_time)
+        return response
+
+    def _hedgeable_completion(
+        self,
+        messages: list,
+        timeout: float,
+        extra_params: Dict[str, Any],
+        cancelled: threading.Event,
+    ) -> Any:
+        """
+        以流式请求获取完整回复，供同步对冲使用
+
+        每收到一个chunk检查一次取消事件，落败时关闭流(释放连接)并抛出 HedgeCancelledError；
+        返回值与非流式响应的 choices[0].message.content / usage 结构一致
+        """
+        params = {key: value for key, value in extra_params.items() if key != "stream"}
+        stream = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            timeout=timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params,
+        )
+        chunks = []
+        usage = None
+        try:
+            for chunk in stream:
+                if cancelled.is_set():
+                    raise HedgeCancelledError("对冲请求已落败，关闭连接")
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                content = getattr(delta, "content", None) if delta else None
+                if content:
+                    chunks.append(content)
+        finally:
+            stream.close()
+        message = SimpleNamespace(content="".join(chunks))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    def _acquire_rate_limit(self, system_prompt: str, user_prompt: str) -> int:
+        """按预计的prompt token数排队获取限流配额，返回预计token数（未启用限流时为0）"""
+        if self.rate_limiter is None:
+            return 0
+        estimated_tokens = estimate_prompt_tokens(system_prompt, user_prompt)
+        self.rate_limiter.acquire(estimated_tokens)
+        return estimated_tokens
+
+
+class AsyncLLMClient(_LLMClientBase):
+    """
+    Asyncio-native counterpart of LLMClient backed by the process-wide httpx pool.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        base_url: Optional[str] = None,
+        cache: Optional[Any] = None,
+    ):
+        super().__init__(api_key, model_name, base_url=base_url, cache=cache)
+
+        # AsyncOpenAI 实例绑定到共享的 httpx.AsyncClient，后者按事件循环区分
+        self._clients: Dict[int, AsyncOpenAI] = {}
+
+    def _get_client(self) -> AsyncOpenAI:
+        http_client = get_shared_async_client() if get_shared_async_client is not None else None
+        key = id(http_client) if http_client is not None else id(asyncio.get_running_loop())
+        client = self._clients.get(key)
+        if client is None:
+            client_kwargs: Dict[str, Any] = {
+                "api_key": self.api_key,
+                "max_retries": 0,
+            }
+            if self.base_url:
+                client_kwargs["base_url"] = self.base_url
+            if http_client is not None:
+                client_kwargs["http_client"] = http_client
+            client = AsyncOpenAI(**client_kwargs)
+            self._clients[key] = client
+        return client
+
+    @with_async_retry(LLM_RETRY_CONFIG)
+    async def ainvoke(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+        allowed_keys = {"temperature", "top_p", "presence_penalty", "frequency_penalty"}
+        extra_params = {key: value for key, value in kwargs.items() if key in allowed_keys and value is not None}
+
+        timeout = self._resolve_timeout(kwargs.pop("timeout", self.timeout))
+
+        usage_label = kwargs.get("usage_label")
+
+        cache_key = self._get_cache_key(system_prompt, user_prompt, extra_params)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record_usage(usage_label, None, 0.0, cached=True)
+                return cached
+
+        estimated_tokens = await self._aacquire_rate_limit(system_prompt, user_prompt)
+        start_time = time.perf_counter()
+        response = await self._create_completion(messages, timeout, extra_params, estimated_tokens)
+        self._record_usage(usage_label, getattr(response, "usage", None), time.perf_counter() - start_time)
+        if self.rate_limiter is not None:
+            await asyncio.to_thread(self._settle_rate_limit, estimated_tokens, getattr(response, "usage", None))
+
         if response.choices and response.choices[0].message:
-            return self.validate_response(response.choices[0].message.content)
+            result = self.validate_response(response.choices[0].message.content)
+            if cache_key:
+                self.cache.set(cache_key, result, self.model_name)
+            return result
         return ""
 
-    @staticmethod
-    def validate_response(response: Optional[str]) -> str:
-        if response is None:
-            return ""
-        return response.strip()
+    async def _aacquire_rate_limit(self, system_prompt: str, user_prompt: str) -> int:
+        """_acquire_rate_limit 的异步版本，等待配额时不阻塞事件循环"""
+        if self.rate_limiter is None:
+            return 0
+        estimated_tokens = estimate_prompt_tokens(system_prompt, user_prompt)
+        await self.rate_limiter.aacquire(estimated_tokens)
+        return estimated_tokens
 
-    def get_model_info(self) -> Dict[str, Any]:
-        return {
-            "provider": self.provider,
-            "model": self.model_name,
-            "api_base": self.base_url or "default",
-        }
+    async def _create_completion(
+        self,
+        messages: list,
+        timeout: float,
+        extra_params: Dict[str, Any],
+        estimated_tokens: int = 0,
+    ) -> Any:
+        """发起非流式请求并记录耗时，启用对冲时落败的请求会被取消"""
+        async def call():
+            return await self._get_client().chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                timeout=timeout,
+                **extra_params,
+            )
+
+        if get_latency_tracker is None:
+            return await call()
+
+        tracker = get_latency_tracker()
+        hedge_delay = tracker.get_hedge_delay(self.model_name)
+        start_time = time.perf_counter()
+        if hedge_delay is not None and hedge_delay < timeout:
+            before_hedge = None
+            if self.rate_limiter is not None:
+                async def acquire_hedge_quota():
+                    await self.rate_limiter.aacquire(estimated_tokens)
+                before_hedge = acquire_hedge_quota
+            response, _ = await arun_hedged(call, hedge_delay, self.model_name, before_hedge=before_hedge)
+        else:
+            response = await call()
+        tracker.record(self.model_name, time.perf_counter() - start_time)
+        return response
@@ -59,7 +59,11 @@ class HTMLGenerationNode(StateMutationNode):
             message = json.dumps(llm_input, ensure_ascii=False, indent=2)
             
             # 调用LLM生成HTML
-            response = self.llm_client.invoke(SYSTEM_PROMPT_HTML_GENERATION, message)
+            response = self.call_llm(
+                SYSTEM_PROMPT_HTML_GENERATION,
+                message,
+                stream_callback=kwargs.get("stream_callback"),
+            )
             
             # 处理响应（简化版）
             processed_response = self.process_output(response)
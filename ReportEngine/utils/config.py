@@ -26,6 +26,11 @@ def _get_value(source, key: str, default=None, *fallback_keys: str):
     return value if value not in (None, "") else default
 
 
+def _optional_float(value) -> Optional[float]:
+    """将可选配置转换为float，未配置时返回None"""
+    return float(value) if value not in (None, "") else None
+
+
 @dataclass
 class Config:
     """Report Engine configuration."""
@@ -47,6 +52,14 @@ class Config:
     enable_pdf_export: bool = True
     chart_style: str = "modern"
 
+    # LLM response cache
+    llm_cache_enabled: bool = False
+    llm_cache_path: str = "cache/llm_cache.db"
+    llm_cache_ttl: int = 86400
+    llm_cache_memory_size: int = 256
+    llm_cache_allow_sampling: bool = False
+    llm_cache_default_temperature: Optional[float] = None  # 调用未显式传温度时服务端使用的默认温度
+
     def __post_init__(self):
         if not self.llm_provider and self.llm_model_name:
             self.llm_provider = self.llm_model_name
@@ -85,6 +98,20 @@ class Config:
                 ).lower()
                 in ("true", "1", "yes"),
                 chart_style=_get_value(config_module, "CHART_STYLE", "modern"),
+                llm_cache_enabled=str(
+                    _get_value(config_module, "REPORT_LLM_CACHE_ENABLED", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                llm_cache_path=_get_value(config_module, "LLM_CACHE_PATH", "cache/llm_cache.db"),
+                llm_cache_ttl=int(_get_value(config_module, "LLM_CACHE_TTL", 86400)),
+                llm_cache_memory_size=int(_get_value(config_module, "LLM_CACHE_MEMORY_SIZE", 256)),
+                llm_cache_allow_sampling=str(
+                    _get_value(config_module, "LLM_CACHE_ALLOW_SAMPLING", "false")
+                ).lower()
+                in ("true", "1", "yes"),
+                llm_cache_default_temperature=_optional_float(
+                    _get_value(config_module, "LLM_CACHE_DEFAULT_TEMPERATURE")
+                ),
             )
 
         config_dict = {}
@@ -112,6 +139,20 @@ class Config:
             ).lower()
             in ("true", "1", "yes"),
             chart_style=_get_value(config_dict, "CHART_STYLE", "modern"),
+            llm_cache_enabled=str(
+                _get_value(config_dict, "REPORT_LLM_CACHE_ENABLED", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            llm_cache_path=_get_value(config_dict, "LLM_CACHE_PATH", "cache/llm_cache.db"),
+            llm_cache_ttl=int(_get_value(config_dict, "LLM_CACHE_TTL", 86400)),
+            llm_cache_memory_size=int(_get_value(config_dict, "LLM_CACHE_MEMORY_SIZE", 256)),
+            llm_cache_allow_sampling=str(
+                _get_value(config_dict, "LLM_CACHE_ALLOW_SAMPLING", "false")
+            ).lower()
+            in ("true", "1", "yes"),
+            llm_cache_default_temperature=_optional_float(
+                _get_value(config_dict, "LLM_CACHE_DEFAULT_TEMPERATURE")
+            ),
         )
 
 
@@ -148,4 +189,10 @@ def print_config(config: Config):
     print(f"PDF 导出: {config.enable_pdf_export}")
     print(f"图表样式: {config.chart_style}")
     print(f"LLM API Key: {'已配置' if config.llm_api_key else '未配置'}")
+    print(f"LLM响应缓存: {config.llm_cache_enabled}")
+    print(f"LLM缓存文件: {config.llm_cache_path}")
+    print(f"LLM缓存有效期(秒): {config.llm_cache_ttl}")
+    print(f"LLM缓存内存条目数: {config.llm_cache_memory_size}")
+    print(f"允许缓存采样调用: {config.llm_cache_allow_sampling}")
+    print(f"缓存判定使用的默认温度: {config.llm_cache_default_temperature}")
     print("========================\n")
@@ -265,6 +265,18 @@ def execute_research(query: str, config: Config):
         agent = TheoryExpertAgent(config)
         st.session_state.agent = agent
 
+        # 流式预览:总结阶段首个token到达即刷新,每累积一定字符再刷新一次
+        stream_preview = st.empty()
+        stream_buffer = {"text": "", "last_len": 0}
+
+        def on_stream_delta(delta: str):
+            stream_buffer["text"] += delta
+            if stream_buffer["last_len"] == 0 or len(stream_buffer["text"]) - stream_buffer["last_len"] >= 80:
+                stream_buffer["last_len"] = len(stream_buffer["text"])
+                stream_preview.caption(f"正在生成: {stream_buffer['text'][-300:]}")
+
+        agent.stream_callback = on_stream_delta
+
         progress_bar.progress(10)
 
         # 生成报告结构
@@ -278,17 +290,21 @@ def execute_research(query: str, config: Config):
             status_text.markdown(f"**检索进度 {i + 1}/{total_paragraphs}:** {agent.state.paragraphs[i].title}")
 
             # 初始搜索和总结
+            stream_buffer.update(text="", last_len=0)
             agent._initial_search_and_summary(i)
             progress_value = 20 + (i + 0.5) / total_paragraphs * 60
             progress_bar.progress(int(progress_value))
 
             # 反思循环
+            stream_buffer.update(text="", last_len=0)
             agent._reflection_loop(i)
             agent.state.paragraphs[i].research.mark_completed()
 
             progress_value = 20 + (i + 1) / total_paragraphs * 60
             progress_bar.progress(int(progress_value))
 
+        stream_preview.empty()
+
         # 生成最终报告
         status_text.markdown("**正在生成智能分析报告...**")
         final_report = agent._generate_final_report()
@@ -42,6 +42,14 @@ except ImportError as e:
     print(f"配置路由导入失败: {e}")
     SETUP_AVAILABLE = False
 
+# 导入LLM用量统计
+try:
+    from utils.llm_usage import load_all_usage
+    LLM_USAGE_AVAILABLE = True
+except ImportError as e:
+    print(f"LLM用量统计模块导入失败: {e}")
+    LLM_USAGE_AVAILABLE = False
+
 # 导入健康检查
 try:
     from utils.health_check import run_health_check
@@ -665,6 +673,26 @@ def get_forum_log():
     except Exception as e:
         return jsonify({'success': False, 'message': f'读取forum.log失败: {str(e)}'})
 
+@app.route('/api/llm_usage')
+def get_llm_usage():
+    """获取各引擎最近一次运行的LLM token用量与耗时(总计及按节点)"""
+    if not LLM_USAGE_AVAILABLE:
+        return jsonify({'success': False, 'message': 'LLM用量统计模块不可用'})
+    try:
+        engines = load_all_usage()
+        totals = {'calls': 0, 'cached_calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0, 'latency_seconds': 0.0}
+        for usage in engines.values():
+            for key in totals:
+                totals[key] += usage.get('totals', {}).get(key, 0)
+        totals['latency_seconds'] = round(totals['latency_seconds'], 3)
+        return jsonify({
+            'success': True,
+            'engines': engines,
+            'totals': totals
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'读取LLM用量统计失败: {str(e)}'})
+
 @app.route('/api/search', methods=['POST'])
 def search():
     """统一搜索接口"""
@@ -0,0 +1,24 @@
+"""
+离线基准测试套件
+使用本地OpenAI兼容桩服务器、伪造的Tavily/Bocha搜索后端以及SQLite合成训练数据集，
+在不产生任何LLM与搜索API费用的情况下测量三个引擎research()与ReportAgent.generate_report的吞吐
+
+运行方式(项目根目录):
+    python -m benchmarks.run_benchmark --paragraphs 3 --latency 0.2 --token-rate 200
+
+在已记录的运行上对比搜索结果提示词打包前后的大小:
+    python -m benchmarks.prompt_packing <检查点目录或状态JSON>
+"""
+
+from .stats import StageRecorder
+from .fake_llm_server import FakeLLMServer
+from .fake_search import install_fake_tavily, install_fake_bocha
+from .synthetic_data import build_synthetic_training_db
+
+__all__ = [
+    "StageRecorder",
+    "FakeLLMServer",
+    "install_fake_tavily",
+    "install_fake_bocha",
+    "build_synthetic_training_db",
+]
@@ -0,0 +1,290 @@
+"""
+本地OpenAI兼容桩服务器
+实现 POST /v1/chat/completions (含 stream=True 的SSE输出)，按系统提示词识别节点阶段，
+返回符合各阶段输出Schema的JSON(或Markdown/HTML)，并按配置的首包延迟与token速率模拟耗时
+
+阶段通过 register_prompt 注册的各引擎系统提示词精确识别，未注册的提示词按Markdown文本回复
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from .stats import StageRecorder
+
+# 生成正文时使用的词汇表(中长跑训练相关)
+_VOCABULARY = [
+    "乳酸阈值", "最大摄氧量", "有氧基础", "间歇训练", "节奏跑", "长距离慢跑", "恢复跑",
+    "步频", "步幅", "触地时间", "垂直振幅", "心率区间", "训练负荷", "周跑量", "配速",
+    "碳水补给", "电解质", "睡眠质量", "跟腱", "髂胫束", "力量训练", "核心稳定",
+    "比赛配速", "赛前减量", "高原训练", "热适应", "补水策略", "跑鞋缓震", "坡度",
+]
+
+_INSIGHT_TOOL = "search_recent_trainings"
+_MEDIA_TOOL = "comprehensive_search"
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数(中英混合文本约2字符/token)"""
+    return max(1, len(text) // 2)
+
+
+class FakeLLMServer:
+    """在后台线程运行的OpenAI兼容桩服务器"""
+
+    def __init__(
+        self,
+        recorder: Optional[StageRecorder] = None,
+        latency: float = 0.2,
+        token_rate: float = 200.0,
+        completion_chars: int = 800,
+        paragraphs: int = 3,
+        seed: int = 42,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        初始化桩服务器
+
+        Args:
+            recorder: 分阶段统计器
+            latency: 每次调用的首包延迟(秒)
+            token_rate: 生成速率(token/秒)，<=0 表示不模拟生成耗时
+            completion_chars: 段落正文/报告类输出的目标字符数
+            paragraphs: 报告结构阶段返回的段落数
+            seed: 生成内容的随机种子
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+        """
+        self.recorder = recorder or StageRecorder()
+        self.latency = latency
+        self.token_rate = token_rate
+        self.completion_chars = completion_chars
+        self.paragraphs = paragraphs
+        self.seed = seed
+
+        self._prompt_registry: Dict[str, Tuple[str, str]] = {}
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ===== 阶段识别 =====
+
+    def register_prompt(self, system_prompt: str, engine: str, stage: str):
+        """注册精确的系统提示词 → (引擎, 阶段)"""
+        self._prompt_registry[system_prompt] = (engine, stage)
+
+    def classify(self, system_prompt: str) -> Tuple[str, str]:
+        """识别请求所属的引擎与阶段，未注册的提示词记为 unknown"""
+        return self._prompt_registry.get(system_prompt, ("unknown", "unknown"))
+
+    # ===== 响应生成 =====
+
+    def _next_counter(self) -> int:
+        with self._counter_lock:
+            self._counter += 1
+            return self._counter
+
+    def _text(self, rng: random.Random, chars: int) -> str:
+        sentences = []
+        length = 0
+        while length < chars:
+            words = rng.sample(_VOCABULARY, 3)
+            sentence = f"{words[0]}与{words[1]}共同影响{words[2]}，建议结合个人数据循序渐进地调整(样本{rng.randint(1, 9999)})。"
+            sentences.append(sentence)
+            length += len(sentence)
+        return "".join(sentences)
+
+    def build_content(self, engine: str, stage: str, user_prompt: str) -> str:
+        """生成符合阶段输出格式的响应文本"""
+        counter = self._next_counter()
+        digest = hashlib.sha256(f"{self.seed}:{counter}:{user_prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(digest)
+        topic = rng.choice(_VOCABULARY)
+
+        if stage == "report_structure":
+            paragraphs = [
+                {"title": f"第{i + 1}部分: {rng.choice(_VOCABULARY)}", "content": self._text(rng, 60)}
+                for i in range(self.paragraphs)
+            ]
+            return json.dumps(paragraphs, ensure_ascii=False)
+
+        if stage in ("first_search", "reflection"):
+            result: Dict[str, Any] = {
+                "search_query": f"{topic} {rng.choice(_VOCABULARY)} 训练方法 {counter}",
+                "reasoning": self._text(rng, 80),
+            }
+            if engine == "insight":
+                result.update({"search_tool": _INSIGHT_TOOL, "days": 30, "limit": 20})
+            elif engine == "media":
+                result["search_tool"] = _MEDIA_TOOL
+            return json.dumps(result, ensure_ascii=False)
+
+        if stage == "first_summary":
+            return json.dumps({"paragraph_latest_state": self._text(rng, self.completion_chars)}, ensure_ascii=False)
+
+        if stage == "reflection_summary":
+            return json.dumps({"updated_paragraph_latest_state": self._text(rng, self.completion_chars)}, ensure_ascii=False)
+
+        if stage == "template_selection":
+            match = re.search(r"^- ([^:\n]+):", user_prompt, re.MULTILINE)
+            template_name = match.group(1).strip() if match else ""
+            return json.dumps({"template_name": template_name, "selection_reason": self._text(rng, 60)}, ensure_ascii=False)
+
+        if stage == "html_generation":
+            body = "".join(f"<p>{self._text(rng, 200)}</p>" for _ in range(max(1, self.completion_chars // 200)))
+            return (
+                "<!DOCTYPE html>\n<html lang=\"zh-CN\">\n<head><meta charset=\"UTF-8\"><title>基准测试报告</title></head>\n"
+                f"<body><h1>{topic}</h1>{body}</body>\n</html>"
+            )
+
+        # report_formatting 及未注册阶段返回Markdown
+        sections = "\n\n".join(f"## {rng.choice(_VOCABULARY)}\n\n{self._text(rng, 200)}" for _ in range(self.paragraphs))
+        return f"# {topic}训练分析报告\n\n{sections}\n"
+
+    def _generation_delay(self, completion_tokens: int) -> float:
+        if self.token_rate <= 0:
+            return 0.0
+        return completion_tokens / self.token_rate
+
+    # ===== HTTP处理 =====
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json({"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+                else:
+                    self._send_json({"error": {"message": "not found"}}, status=404)
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json({"error": {"message": "not found"}}, status=404)
+                    return
+
+                started = time.perf_counter()
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                try:
+                    body = json.loads(raw or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json({"error": {"message": "invalid json"}}, status=400)
+                    return
+
+                messages = body.get("messages", [])
+                system_prompt = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+                user_prompt = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+                engine, stage = server.classify(system_prompt)
+
+                content = server.build_content(engine, stage, user_prompt)
+                usage = {
+                    "prompt_tokens": estimate_tokens(system_prompt + user_prompt),
+                    "completion_tokens": estimate_tokens(content),
+                }
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                model = body.get("model", "fake-model")
+
+                time.sleep(server.latency)
+                if body.get("stream"):
+                    include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+                    sent = self._send_stream(model, content, usage if include_usage else None)
+                else:
+                    time.sleep(server._generation_delay(usage["completion_tokens"]))
+                    sent = self._send_json({
+                        "id": f"chatcmpl-bench-{server._counter}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": usage,
+                    })
+
+                server.recorder.record(
+                    f"{engine}:{stage}",
+                    request_bytes=len(raw),
+                    response_bytes=sent,
+                    seconds=time.perf_counter() - started,
+                    prompt_tokens=usage["prompt_tokens"],
+                    completion_tokens=usage["completion_tokens"],
+                )
+
+            def _send_json(self, payload: Dict[str, Any], status: int = 200) -> int:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return len(data)
+
+            def _send_stream(self, model: str, content: str, usage: Optional[Dict[str, int]]) -> int:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                sent = 0
+                chunk_chars = 32
+                per_chunk_delay = server._generation_delay(estimate_tokens("x" * chunk_chars))
+
+                def emit(payload: str) -> int:
+                    data = f"data: {payload}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+                    return len(data)
+
+                base = {"id": "chatcmpl-bench-stream", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+                for start in range(0, len(content), chunk_chars):
+                    piece = content[start:start + chunk_chars]
+                    chunk = dict(base, choices=[{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+                    sent += emit(json.dumps(chunk, ensure_ascii=False))
+                    time.sleep(per_chunk_delay)
+
+                final = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                sent += emit(json.dumps(final))
+                if usage is not None:
+                    sent += emit(json.dumps(dict(base, choices=[], usage=usage)))
+                sent += emit("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+                return sent
+
+        return Handler
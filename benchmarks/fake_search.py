@@ -0,0 +1,164 @@
+"""
+伪造的搜索后端
+替换 TavilyNewsAgency._search_internal 与 BochaMultimodalSearch._search_internal，
+按查询内容确定性地生成结果并模拟网络延迟，不访问任何外部API
+
+Bocha替身构造与真实API同构的原始响应字典，再交给原有的 _parse_search_response 解析，
+因此解析开销也计入基准
+"""
+
+import json
+import time
+import random
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from .stats import StageRecorder
+
+_DOMAINS = [
+    "scienceofrunning.com", "trainingpeaks.com", "fellrnr.com", "runnersworld.com",
+    "pubmed.ncbi.nlm.nih.gov", "frontiersin.org", "iranshao.com", "98pao.com",
+]
+
+
+def _rng_for(query: str, salt: str) -> random.Random:
+    return random.Random(hashlib.sha256(f"{salt}:{query}".encode("utf-8")).hexdigest())
+
+
+def _snippet(rng: random.Random, chars: int) -> str:
+    words = ["训练", "心率", "配速", "恢复", "乳酸", "耐力", "步频", "补给", "比赛", "周期化", "力量", "伤病"]
+    text = []
+    while sum(len(t) for t in text) < chars:
+        text.append(f"{rng.choice(words)}{rng.choice(words)}相关研究显示其效果与个体差异有关。")
+    return "".join(text)
+
+
+def _fake_results(query: str, salt: str, count: int, snippet_chars: int) -> List[Dict[str, Any]]:
+    rng = _rng_for(query, salt)
+    results = []
+    for i in range(count):
+        domain = rng.choice(_DOMAINS)
+        results.append({
+            "title": f"{query[:30]} - 结果{i + 1}",
+            "url": f"https://{domain}/article/{rng.randint(1, 10 ** 8)}",
+            "content": _snippet(rng, snippet_chars),
+            "score": round(rng.random(), 4),
+            "published_date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        })
+    return results
+
+
+def install_fake_tavily(
+    agency,
+    recorder: Optional[StageRecorder] = None,
+    latency: float = 0.3,
+    snippet_chars: int = 400,
+):
+    """
+    为TavilyNewsAgency实例安装 _search_internal 替身
+
+    Args:
+        agency: TavilyNewsAgency 实例
+        recorder: 分阶段统计器(记录为 search:tavily)
+        latency: 每次搜索的模拟延迟(秒)
+        snippet_chars: 每条结果的正文字符数
+    """
+    from QueryEngine.tools.search import TavilyResponse, SearchResult
+
+    def _search_internal(**kwargs) -> TavilyResponse:
+        started = time.perf_counter()
+        query = kwargs.get("query", "")
+        time.sleep(latency)
+        raw = {
+            "query": query,
+            "answer": _snippet(_rng_for(query, "tavily-answer"), snippet_chars),
+            "results": _fake_results(query, "tavily", int(kwargs.get("max_results") or 10), snippet_chars),
+            "response_time": latency,
+        }
+        response = TavilyResponse(
+            query=raw["query"],
+            answer=raw["answer"],
+            results=[SearchResult(**item) for item in raw["results"]],
+            response_time=raw["response_time"],
+        )
+        if recorder is not None:
+            recorder.record(
+                "search:tavily",
+                request_bytes=len(json.dumps(kwargs, ensure_ascii=False).encode("utf-8")),
+                response_bytes=len(json.dumps(raw, ensure_ascii=False).encode("utf-8")),
+                seconds=time.perf_counter() - started,
+            )
+        return response
+
+    agency._search_internal = _search_internal
+
+
+def install_fake_bocha(
+    agency,
+    recorder: Optional[StageRecorder] = None,
+    latency: float = 0.3,
+    snippet_chars: int = 300,
+    images: int = 3,
+):
+    """
+    为BochaMultimodalSearch实例安装 _search_internal 替身
+
+    Args:
+        agency: BochaMultimodalSearch 实例
+        recorder: 分阶段统计器(记录为 search:bocha)
+        latency: 每次搜索的模拟延迟(秒)
+        snippet_chars: 每条网页摘要的字符数
+        images: 每次返回的图片数量
+    """
+
+    def _search_internal(**kwargs):
+        started = time.perf_counter()
+        query = kwargs.get("query", "Unknown Query")
+        time.sleep(latency)
+
+        rng = _rng_for(query, "bocha-images")
+        webpages = [
+            {
+                "name": item["title"],
+                "url": item["url"],
+                "snippet": item["content"],
+                "displayUrl": item["url"],
+                "dateLastCrawled": item["published_date"],
+            }
+            for item in _fake_results(query, "bocha", int(kwargs.get("count") or 10), snippet_chars)
+        ]
+        messages = [{
+            "role": "assistant", "type": "source", "content_type": "webpage",
+            "content": json.dumps({"value": webpages}, ensure_ascii=False),
+        }]
+        for i in range(images):
+            url = f"https://img.example.com/{rng.randint(1, 10 ** 8)}.jpg"
+            messages.append({
+                "role": "assistant", "type": "source", "content_type": "image",
+                "content": json.dumps({
+                    "name": f"{query[:20]} 图片{i + 1}", "contentUrl": url, "hostPageUrl": url,
+                    "thumbnailUrl": url, "width": 800, "height": 600,
+                }, ensure_ascii=False),
+            })
+        if kwargs.get("answer"):
+            messages.append({
+                "role": "assistant", "type": "answer", "content_type": "text",
+                "content": _snippet(rng, snippet_chars),
+            })
+            messages.append({
+                "role": "assistant", "type": "follow_up", "content_type": "text",
+                "content": f"{query[:20]}还需要注意什么?",
+            })
+        raw = {"code": 200, "conversation_id": hashlib.md5(query.encode("utf-8")).hexdigest(), "messages": messages}
+
+        response = agency._parse_search_response(raw, query, kwargs.get("sections"))
+        if recorder is not None:
+            recorder.record(
+                "search:bocha",
+                request_bytes=len(json.dumps(kwargs, ensure_ascii=False).encode("utf-8")),
+                response_bytes=len(json.dumps(raw, ensure_ascii=False).encode("utf-8")),
+                seconds=time.perf_counter() - started,
+            )
+        return response
+
+    agency._search_internal = _search_internal
@@ -0,0 +1,122 @@
+"""
+提示词打包基准
+在已记录的运行(检查点或中间状态JSON)上重放每一轮总结的搜索结果，对比
+逐条截断(format_search_results_for_prompt) 与 按token预算打包(pack_search_results_for_prompt)
+得到的提示词大小
+
+每个段落的搜索历史按查询分组: 第一组对应初始总结，其后每组对应一轮反思总结
+
+用法(项目根目录):
+    python -m benchmarks.prompt_packing query_engine_streamlit_reports/checkpoints
+    python -m benchmarks.prompt_packing run1.json run2.json --engine media --first-budget 8000 --output packing.json
+"""
+
+import os
+import sys
+import json
+import glob
+import argparse
+import importlib
+from typing import Any, Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+_ENGINE_PACKAGES = {"query": "QueryEngine", "media": "MediaEngine", "insight": "InsightEngine"}
+
+
+def _collect_files(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.json"), recursive=True)))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"路径不存在，已跳过: {path}")
+    return files
+
+
+def _load_rounds(path: str) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """从状态文件中提取 [(阶段, 本轮搜索结果), ...]"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"无法读取状态文件 {path}: {str(e)}")
+        return []
+
+    rounds = []
+    for paragraph in data.get("paragraphs", []) if isinstance(data, dict) else []:
+        history = paragraph.get("research", {}).get("search_history", [])
+        groups: List[Tuple[str, List[Dict[str, Any]]]] = []
+        for search in history:
+            query = search.get("query", "")
+            if not groups or groups[-1][0] != query:
+                groups.append((query, []))
+            groups[-1][1].append(search)
+        for index, (_, results) in enumerate(groups):
+            rounds.append(("first_summary" if index == 0 else "reflection_summary", results))
+    return rounds
+
+
+def _summarize(sizes: List[int]) -> Dict[str, Any]:
+    if not sizes:
+        return {"prompts": 0, "total": 0, "mean": 0, "max": 0}
+    return {"prompts": len(sizes), "total": sum(sizes), "mean": round(sum(sizes) / len(sizes), 1), "max": max(sizes)}
+
+
+def run(args) -> Dict[str, Any]:
+    text_processing = importlib.import_module(f"{_ENGINE_PACKAGES[args.engine]}.utils.text_processing")
+    budgets = {"first_summary": args.first_budget, "reflection_summary": args.reflection_budget}
+
+    files = _collect_files(args.paths)
+    sizes: Dict[str, Dict[str, List[int]]] = {
+        stage: {"before_chars": [], "before_tokens": [], "after_chars": [], "after_tokens": []}
+        for stage in budgets
+    }
+
+    for path in files:
+        for stage, results in _load_rounds(path):
+            before = "\n".join(text_processing.format_search_results_for_prompt(results, args.max_content_length))
+            after = "\n".join(text_processing.pack_search_results_for_prompt(
+                results, budgets[stage], args.max_content_length
+            ))
+            sizes[stage]["before_chars"].append(len(before))
+            sizes[stage]["before_tokens"].append(text_processing.estimate_tokens(before))
+            sizes[stage]["after_chars"].append(len(after))
+            sizes[stage]["after_tokens"].append(text_processing.estimate_tokens(after))
+
+    report = {"files": len(files), "budgets": budgets, "stages": {}}
+    for stage, stage_sizes in sizes.items():
+        report["stages"][stage] = {name: _summarize(values) for name, values in stage_sizes.items()}
+
+    print(f"状态文件: {len(files)} 个  预算: 初始总结 {args.first_budget} / 反思总结 {args.reflection_budget} tokens")
+    print(f"{'阶段':<22}{'提示词数':>8}{'打包前tokens(均值/最大)':>26}{'打包后tokens(均值/最大)':>26}{'减少':>8}")
+    for stage, stats in report["stages"].items():
+        before, after = stats["before_tokens"], stats["after_tokens"]
+        reduction = 1 - after["total"] / before["total"] if before["total"] else 0.0
+        print(f"{stage:<24}{before['prompts']:>8}{before['mean']:>16.0f}/{before['max']:<10}"
+              f"{after['mean']:>16.0f}/{after['max']:<10}{reduction:>8.1%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="搜索结果提示词打包前后大小对比")
+    parser.add_argument("paths", nargs="+", help="检查点/中间状态JSON文件或其所在目录")
+    parser.add_argument("--engine", choices=sorted(_ENGINE_PACKAGES), default="query", help="使用哪个引擎的文本处理实现")
+    parser.add_argument("--first-budget", type=int, default=12000, help="初始总结的搜索结果token预算")
+    parser.add_argument("--reflection-budget", type=int, default=8000, help="反思总结的搜索结果token预算")
+    parser.add_argument("--max-content-length", type=int, default=20000, help="每条结果的最大字符数")
+    parser.add_argument("--output", default=None, help="JSON结果输出路径")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
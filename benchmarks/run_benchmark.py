@@ -0,0 +1,243 @@
+"""
+离线端到端基准测试入口
+依次运行 QueryEngine/MediaEngine/InsightEngine 的 research() 与 ReportAgent.generate_report，
+输出每个目标的总耗时以及分阶段(LLM节点/搜索工具)的调用次数、字节数与耗时
+
+用法(项目根目录):
+    python -m benchmarks.run_benchmark
+    python -m benchmarks.run_benchmark --engines query media --paragraphs 5 --parallel 3 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.stats import StageRecorder
+from benchmarks.fake_llm_server import FakeLLMServer
+from benchmarks.fake_search import install_fake_tavily, install_fake_bocha
+from benchmarks.synthetic_data import build_synthetic_training_db
+
+ENGINES = ["query", "media", "insight", "report"]
+
+_PROMPT_STAGES = {
+    "SYSTEM_PROMPT_REPORT_STRUCTURE": "report_structure",
+    "SYSTEM_PROMPT_FIRST_SEARCH": "first_search",
+    "SYSTEM_PROMPT_FIRST_SUMMARY": "first_summary",
+    "SYSTEM_PROMPT_REFLECTION": "reflection",
+    "SYSTEM_PROMPT_REFLECTION_SUMMARY": "reflection_summary",
+    "SYSTEM_PROMPT_REPORT_FORMATTING": "report_formatting",
+    "SYSTEM_PROMPT_TEMPLATE_SELECTION": "template_selection",
+    "SYSTEM_PROMPT_HTML_GENERATION": "html_generation",
+}
+
+
+def _payload_bytes(result: Any) -> int:
+    """估算搜索结果的序列化字节数"""
+    if is_dataclass(result):
+        result = asdict(result)
+    # 惰性解析的记录(如Bocha的网页/图片)通过 to_dict 展开
+    return len(json.dumps(
+        result, ensure_ascii=False, default=lambda obj: obj.to_dict() if hasattr(obj, "to_dict") else str(obj)
+    ).encode("utf-8"))
+
+
+def _register_prompts(server: FakeLLMServer, engine: str, prompts_module):
+    for attr, stage in _PROMPT_STAGES.items():
+        prompt = getattr(prompts_module, attr, None)
+        if isinstance(prompt, str):
+            server.register_prompt(prompt, engine, stage)
+
+
+def _wrap_search_tool(agent, recorder: StageRecorder, stage: str):
+    """包装agent.execute_search_tool，记录搜索阶段的端到端耗时与结果大小"""
+    original = agent.execute_search_tool
+
+    def execute_search_tool(*args, **kwargs):
+        started = time.perf_counter()
+        result = original(*args, **kwargs)
+        recorder.record(stage, response_bytes=_payload_bytes(result), seconds=time.perf_counter() - started)
+        return result
+
+    agent.execute_search_tool = execute_search_tool
+
+
+def _engine_config_kwargs(args, server: FakeLLMServer, workdir: str, engine: str) -> Dict[str, Any]:
+    return {
+        "llm_api_key": "benchmark",
+        "llm_base_url": server.base_url,
+        "llm_model_name": "fake-model",
+        "max_reflections": args.max_reflections,
+        "max_paragraphs": args.paragraphs,
+        "output_dir": os.path.join(workdir, engine),
+        "save_intermediate_states": False,
+        "max_parallel_paragraphs": args.parallel,
+        "enable_checkpoint": False,
+    }
+
+
+def _create_agent(engine: str, args, server: FakeLLMServer, recorder: StageRecorder, workdir: str):
+    kwargs = _engine_config_kwargs(args, server, workdir, engine)
+
+    if engine == "query":
+        from QueryEngine import prompts
+        from QueryEngine.agent import TheoryExpertAgent
+        from QueryEngine.utils.config import Config
+        # 关闭搜索结果缓存，保证每次运行都经过伪造的搜索延迟
+        agent = TheoryExpertAgent(Config(tavily_api_key="benchmark", search_cache_enabled=False, **kwargs))
+        install_fake_tavily(agent.search_agency, recorder, latency=args.search_latency)
+    elif engine == "media":
+        from MediaEngine import prompts
+        from MediaEngine.agent import LogisticsIntelligenceAgent
+        from MediaEngine.utils.config import Config
+        agent = LogisticsIntelligenceAgent(Config(bocha_api_key="benchmark", **kwargs))
+        install_fake_bocha(agent.search_agency, recorder, latency=args.search_latency)
+    else:
+        from InsightEngine import prompts
+        from InsightEngine.agent import SportsScientistAgent
+        from InsightEngine.utils.config import Config
+        agent = SportsScientistAgent(Config(**kwargs))
+        _wrap_search_tool(agent, recorder, "search:training_db")
+
+    _register_prompts(server, engine, prompts)
+    # 基准运行不覆盖真实的 logs/llm_usage 汇总
+    agent.usage_tracker.persist_path = None
+    return agent
+
+
+def _create_report_agent(server: FakeLLMServer, workdir: str):
+    from ReportEngine import prompts
+    from ReportEngine.agent import ReportAgent
+    from ReportEngine.utils.config import Config
+
+    config = Config(
+        llm_api_key="benchmark",
+        llm_base_url=server.base_url,
+        llm_model_name="fake-model",
+        output_dir=os.path.join(workdir, "report"),
+        template_dir=os.path.join(PROJECT_ROOT, "ReportEngine", "report_template"),
+        log_file=os.path.join(workdir, "report.log"),
+    )
+    agent = ReportAgent(config)
+    _register_prompts(server, "report", prompts)
+    agent.usage_tracker.persist_path = None
+    return agent
+
+
+def _measure(name: str, recorder: StageRecorder, func) -> Dict[str, Any]:
+    recorder.reset()
+    started = time.perf_counter()
+    error = None
+    output = ""
+    try:
+        output = func() or ""
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        print(f"基准目标 {name} 运行失败: {error}")
+    wall_time = time.perf_counter() - started
+    stages = recorder.snapshot()
+    llm_stages = {k: v for k, v in stages.items() if not k.startswith("search:")}
+    return {
+        "target": name,
+        "wall_time_seconds": round(wall_time, 3),
+        "llm_calls": sum(s["calls"] for s in llm_stages.values()),
+        "llm_request_bytes": sum(s["request_bytes"] for s in llm_stages.values()),
+        "llm_response_bytes": sum(s["response_bytes"] for s in llm_stages.values()),
+        "output_bytes": len(output.encode("utf-8")),
+        "stages": stages,
+        "error": error,
+        "_output": output,
+    }
+
+
+def _print_result(result: Dict[str, Any]):
+    print(f"\n=== {result['target']} ===")
+    print(f"总耗时: {result['wall_time_seconds']:.3f}s  LLM调用: {result['llm_calls']}  "
+          f"请求: {result['llm_request_bytes']}B  响应: {result['llm_response_bytes']}B  输出: {result['output_bytes']}B")
+    if result["error"]:
+        print(f"错误: {result['error']}")
+    print(f"{'阶段':<34}{'调用':>6}{'请求字节':>12}{'响应字节':>12}{'耗时(s)':>10}")
+    for stage, stats in sorted(result["stages"].items()):
+        print(f"{stage:<36}{stats['calls']:>6}{stats['request_bytes']:>14}{stats['response_bytes']:>14}{stats['seconds']:>10.3f}")
+
+
+def run(args) -> List[Dict[str, Any]]:
+    workdir = args.workdir or tempfile.mkdtemp(prefix="synapse_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    print(f"基准工作目录: {workdir}")
+
+    # 必须在导入InsightEngine之前设置 TRAINING_DB_URL
+    if "insight" in args.engines:
+        build_synthetic_training_db(os.path.join(workdir, "training.db"), days=args.days, seed=args.seed)
+
+    recorder = StageRecorder()
+    server = FakeLLMServer(
+        recorder=recorder,
+        latency=args.latency,
+        token_rate=args.token_rate,
+        completion_chars=args.completion_chars,
+        paragraphs=args.paragraphs,
+        seed=args.seed,
+    )
+
+    results = []
+    engine_reports = []
+    with server:
+        print(f"LLM桩服务器: {server.base_url}")
+        for engine in [e for e in ENGINES if e in args.engines and e != "report"]:
+            agent = _create_agent(engine, args, server, recorder, workdir)
+            result = _measure(f"{engine}.research", recorder, lambda: agent.research(args.query, save_report=False))
+            result["llm_usage"] = agent.usage_tracker.get_summary()
+            engine_reports.append(result["_output"])
+            results.append(result)
+
+        if "report" in args.engines:
+            report_agent = _create_report_agent(server, workdir)
+            reports = engine_reports or [f"# 占位报告 {i + 1}\n\n" + "训练数据分析。" * 200 for i in range(3)]
+            result = _measure(
+                "report.generate_report",
+                recorder,
+                lambda: report_agent.generate_report(args.query, reports, forum_logs="", save_report=False),
+            )
+            result["llm_usage"] = report_agent.usage_tracker.get_summary()
+            results.append(result)
+
+    for result in results:
+        result.pop("_output", None)
+        _print_result(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n基准结果已保存: {args.output}")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Synapse Run 离线端到端基准测试")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES, help="要测量的目标")
+    parser.add_argument("--query", default="如何通过乳酸阈值训练提升半程马拉松成绩", help="研究查询")
+    parser.add_argument("--paragraphs", type=int, default=3, help="报告结构段落数")
+    parser.add_argument("--max-reflections", type=int, default=2, help="每段最大反思轮数")
+    parser.add_argument("--parallel", type=int, default=1, help="max_parallel_paragraphs")
+    parser.add_argument("--latency", type=float, default=0.2, help="LLM首包延迟(秒)")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="LLM生成速率(token/秒), <=0不模拟")
+    parser.add_argument("--completion-chars", type=int, default=800, help="段落正文输出字符数")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="伪造搜索延迟(秒)")
+    parser.add_argument("--days", type=int, default=180, help="合成训练数据天数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--workdir", default=None, help="工作目录(默认临时目录)")
+    parser.add_argument("--output", default=None, help="JSON结果输出路径")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,58 @@
+"""
+基准测试分阶段统计
+按阶段(LLM节点类型或搜索工具)累计调用次数、请求/响应字节数与耗时
+"""
+
+import threading
+from typing import Any, Dict
+
+
+def _empty_stage() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "request_bytes": 0,
+        "response_bytes": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "seconds": 0.0,
+    }
+
+
+class StageRecorder:
+    """线程安全的分阶段统计器，LLM桩服务器与搜索替身共用同一实例"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def reset(self):
+        """清空统计(每个被测目标开始前调用)"""
+        with self._lock:
+            self._stages = {}
+
+    def record(
+        self,
+        stage: str,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        seconds: float = 0.0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ):
+        """记录一次调用"""
+        with self._lock:
+            bucket = self._stages.setdefault(stage, _empty_stage())
+            bucket["calls"] += 1
+            bucket["request_bytes"] += request_bytes
+            bucket["response_bytes"] += response_bytes
+            bucket["prompt_tokens"] += prompt_tokens
+            bucket["completion_tokens"] += completion_tokens
+            bucket["seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """获取当前统计的副本"""
+        with self._lock:
+            stages = {name: dict(bucket) for name, bucket in self._stages.items()}
+        for bucket in stages.values():
+            bucket["seconds"] = round(bucket["seconds"], 3)
+        return stages
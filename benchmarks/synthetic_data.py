@@ -0,0 +1,135 @@
+"""
+合成训练数据集
+在本地SQLite文件中生成Keep与Garmin两张训练记录表，供GarminDataSearch/KeepDataSearch在基准测试中查询
+
+通过环境变量 TRAINING_DB_URL 让 InsightEngine 的数据库会话管理器连接到该文件，
+因此必须在导入 InsightEngine 之前调用 build_synthetic_training_db
+"""
+
+import os
+import json
+import time
+import random
+from datetime import datetime, timedelta
+
+
+def build_synthetic_training_db(db_path: str, days: int = 180, seed: int = 42) -> str:
+    """
+    生成合成训练数据库并设置 TRAINING_DB_URL
+
+    Args:
+        db_path: SQLite文件路径(已存在时会被覆盖)
+        days: 生成最近多少天的训练记录(约每天一次，随机休息日)
+        seed: 随机种子
+
+    Returns:
+        SQLAlchemy连接URL
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db_url = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ["TRAINING_DB_URL"] = db_url
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from InsightEngine.tools.db_models import Base, TrainingRecordKeep, TrainingRecordGarmin
+
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+
+    rng = random.Random(seed)
+    now = datetime.now().replace(hour=7, minute=0, second=0, microsecond=0)
+    ts = int(time.time() * 1000)
+    keep_rows = []
+    garmin_rows = []
+
+    for day in range(days):
+        if rng.random() < 0.2:
+            continue  # 休息日
+        start = now - timedelta(days=day, minutes=rng.randint(0, 600))
+        distance = rng.uniform(4000, 22000)
+        pace = rng.uniform(270, 390)  # 秒/公里
+        duration = int(distance / 1000 * pace)
+        end = start + timedelta(seconds=duration)
+        avg_hr = rng.randint(128, 172)
+        max_hr = avg_hr + rng.randint(8, 25)
+        calories = int(distance / 1000 * rng.uniform(60, 75))
+        heart_rate_data = [max(90, min(200, avg_hr + rng.randint(-15, 15))) for _ in range(duration // 10)]
+
+        keep_rows.append(TrainingRecordKeep(
+            user_id="default_user",
+            exercise_type="running",
+            duration_seconds=duration,
+            start_time=start,
+            end_time=end,
+            calories=calories,
+            distance_meters=round(distance, 1),
+            avg_heart_rate=avg_hr,
+            max_heart_rate=max_hr,
+            heart_rate_data=json.dumps(heart_rate_data),
+            add_ts=ts,
+            last_modify_ts=ts,
+            data_source="benchmark",
+        ))
+
+        zones = [rng.randint(0, duration // 3) for _ in range(5)]
+        power_zones = [rng.randint(0, duration // 3) for _ in range(5)]
+        avg_power = rng.randint(200, 320)
+        garmin_rows.append(TrainingRecordGarmin(
+            user_id="default_user",
+            activity_id=f"bench-{day}",
+            activity_name=f"合成跑步 {day}",
+            sport_type="running",
+            start_time_gmt=start,
+            end_time_gmt=end,
+            duration_seconds=duration,
+            distance_meters=round(distance, 1),
+            avg_heart_rate=avg_hr,
+            max_heart_rate=max_hr,
+            hr_zone_1_seconds=zones[0],
+            hr_zone_2_seconds=zones[1],
+            hr_zone_3_seconds=zones[2],
+            hr_zone_4_seconds=zones[3],
+            hr_zone_5_seconds=zones[4],
+            avg_cadence=rng.randint(165, 190),
+            max_cadence=rng.randint(190, 210),
+            avg_stride_length_cm=round(rng.uniform(95, 135), 1),
+            avg_vertical_oscillation_cm=round(rng.uniform(7, 10), 1),
+            avg_ground_contact_time_ms=rng.randint(210, 280),
+            vertical_ratio_percent=round(rng.uniform(6, 9), 1),
+            total_steps=int(duration / 60 * 178),
+            avg_power_watts=avg_power,
+            max_power_watts=avg_power + rng.randint(50, 150),
+            normalized_power_watts=avg_power + rng.randint(0, 20),
+            power_zone_1_seconds=power_zones[0],
+            power_zone_2_seconds=power_zones[1],
+            power_zone_3_seconds=power_zones[2],
+            power_zone_4_seconds=power_zones[3],
+            power_zone_5_seconds=power_zones[4],
+            avg_speed_mps=round(1000 / pace, 2),
+            max_speed_mps=round(1000 / pace * rng.uniform(1.1, 1.4), 2),
+            aerobic_training_effect=round(rng.uniform(2.0, 4.5), 1),
+            anaerobic_training_effect=round(rng.uniform(0.0, 3.0), 1),
+            training_effect_label=rng.choice(["AEROBIC_BASE", "TEMPO", "THRESHOLD", "VO2MAX", "RECOVERY"]),
+            training_load=rng.randint(40, 260),
+            activity_calories=calories,
+            basal_metabolism_calories=rng.randint(60, 120),
+            estimated_sweat_loss_ml=rng.randint(300, 1500),
+            moderate_intensity_minutes=rng.randint(10, 60),
+            vigorous_intensity_minutes=rng.randint(0, 40),
+            body_battery_change=-rng.randint(5, 25),
+            add_ts=ts,
+            last_modify_ts=ts,
+            data_source="benchmark",
+        ))
+
+    session = sessionmaker(bind=engine)()
+    try:
+        session.add_all(keep_rows + garmin_rows)
+        session.commit()
+    finally:
+        session.close()
+    engine.dispose()
+
+    print(f"合成训练数据集已生成: {db_path} (Keep {len(keep_rows)} 条, Garmin {len(garmin_rows)} 条)")
+    return db_url
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+训练汇总表增量刷新
+training_daily_agg 按训练开始时间所在日期汇总, training_weekly_agg 由日汇总按周(周一开始)合并
+
+导入脚本在导入完成后、训练数据管理接口在增删改记录后调用 refresh_training_aggregates,
+只重算受影响的日期及其所在的周; 该数据源在汇总表中还没有任何数据时(例如已有记录的库第一次刷新)改为全量重建,
+避免汇总表只覆盖本次触及的日期。InsightEngine的统计工具优先从汇总表回答, 避免每次全表聚合
+
+手动全量重建:
+    python -m models.training_aggregates [keep|garmin]
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, case
+
+from models.training_record import TrainingRecordManager, TrainingDailyAgg, TrainingWeeklyAgg
+
+# 均值类指标: 汇总字段前缀 -> 原始记录字段 (汇总表中存储 <前缀>_sum 与 <前缀>_count)
+AVERAGED_METRICS = {
+    'heart_rate': 'avg_heart_rate',
+    'cadence': 'avg_cadence',
+    'power': 'avg_power_watts',
+    'training_load': 'training_load',
+    'aerobic_effect': 'aerobic_training_effect',
+    'anaerobic_effect': 'anaerobic_training_effect',
+    'stride_length': 'avg_stride_length_cm',
+    'vertical_oscillation': 'avg_vertical_oscillation_cm',
+    'ground_contact_time': 'avg_ground_contact_time_ms',
+}
+
+# 直接求和的字段 (汇总字段与原始记录字段同名)
+SUMMED_FIELDS = (
+    'hr_zone_1_seconds', 'hr_zone_2_seconds', 'hr_zone_3_seconds', 'hr_zone_4_seconds', 'hr_zone_5_seconds',
+    'moderate_intensity_minutes', 'vigorous_intensity_minutes',
+)
+
+# 训练效果标签计数 (与get_training_effect_analysis的LIKE条件一致)
+LABEL_COUNTS = {
+    'maintaining_count': '%Maintaining%',
+    'improving_count': '%Improving%',
+    'highly_improving_count': '%Highly Improving%',
+}
+
+# 可以跨行相加的汇总字段
+ADDITIVE_FIELDS = tuple(
+    column.name for column in TrainingDailyAgg.__table__.columns
+    if column.name not in ('data_source', 'day', 'peak_heart_rate', 'last_modify_ts')
+)
+
+
+def _to_day(value) -> date:
+    """datetime/date/'YYYY-MM-DD...'字符串 -> date (SQLite的DATE()返回字符串)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _to_number(value):
+    if value is None:
+        return 0
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def week_start_of(day: date) -> date:
+    """日期所在周的周一"""
+    return day - timedelta(days=day.weekday())
+
+
+def _aggregate_columns(manager: TrainingRecordManager) -> List:
+    """构建按日聚合的SELECT列 (数据源没有的字段跳过, 汇总表中保持默认值0)"""
+    model = manager.get_model_class()
+    columns = [
+        func.count(model.id).label('sessions'),
+        func.sum(model.duration_seconds).label('total_duration'),
+        func.sum(model.distance_meters).label('total_distance'),
+        func.count(model.distance_meters).label('distance_count'),
+        func.max(model.max_heart_rate).label('peak_heart_rate'),
+        func.sum(manager.get_field('calories')).label('total_calories'),
+    ]
+    for prefix, field in AVERAGED_METRICS.items():
+        if hasattr(model, field):
+            column = getattr(model, field)
+            columns.append(func.sum(column).label(f'{prefix}_sum'))
+            columns.append(func.count(column).label(f'{prefix}_count'))
+    for field in SUMMED_FIELDS:
+        if hasattr(model, field):
+            columns.append(func.sum(getattr(model, field)).label(field))
+    if hasattr(model, 'training_effect_label'):
+        for name, pattern in LABEL_COUNTS.items():
+            columns.append(func.sum(case((model.training_effect_label.like(pattern), 1), else_=0)).label(name))
+    return columns
+
+
+def _refresh_days(session, manager: TrainingRecordManager, days: Optional[Set[date]], now_ts: int) -> Set[date]:
+    """重算日汇总, 返回写入或清除过的日期"""
+    data_source = manager.data_source
+    start_field = manager.get_field('start_time')
+    day_expr = func.date(start_field)
+
+    full_rebuild = days is None
+
+    query = session.query(day_expr.label('day'), *_aggregate_columns(manager))
+    stale = session.query(TrainingDailyAgg).filter(TrainingDailyAgg.data_source == data_source)
+    if full_rebuild:
+        refreshed = {_to_day(day) for (day,) in stale.with_entities(TrainingDailyAgg.day)}
+    else:
+        query = query.filter(
+            start_field >= datetime.combine(min(days), datetime.min.time()),
+            start_field < datetime.combine(max(days) + timedelta(days=1), datetime.min.time())
+        )
+        stale = stale.filter(TrainingDailyAgg.day.in_(days))
+        refreshed = set(days)
+
+    rows = query.group_by(day_expr).all()
+    stale.delete(synchronize_session=False)
+
+    for row in rows:
+        values = row._asdict()
+        day = _to_day(values.pop('day'))
+        if not full_rebuild and day not in days:
+            continue
+        peak = values.pop('peak_heart_rate')
+        session.add(TrainingDailyAgg(
+            data_source=data_source,
+            day=day,
+            peak_heart_rate=peak,
+            last_modify_ts=now_ts,
+            **{name: _to_number(value) for name, value in values.items()}
+        ))
+        refreshed.add(day)
+    session.flush()
+    return refreshed
+
+
+def _refresh_weeks(session, data_source: str, weeks: Set[date], now_ts: int):
+    """由日汇总重算指定的周汇总"""
+    session.query(TrainingWeeklyAgg).filter(
+        TrainingWeeklyAgg.data_source == data_source,
+        TrainingWeeklyAgg.week_start.in_(weeks)
+    ).delete(synchronize_session=False)
+
+    daily_rows = session.query(TrainingDailyAgg).filter(
+        TrainingDailyAgg.data_source == data_source,
+        TrainingDailyAgg.day >= min(weeks),
+        TrainingDailyAgg.day < max(weeks) + timedelta(days=7)
+    ).all()
+
+    totals: Dict[date, Dict] = {}
+    for daily in daily_rows:
+        week_start = week_start_of(_to_day(daily.day))
+        if week_start not in weeks:
+            continue
+        week = totals.setdefault(week_start, {name: 0 for name in ADDITIVE_FIELDS})
+        for name in ADDITIVE_FIELDS:
+            week[name] += getattr(daily, name) or 0
+        if daily.peak_heart_rate is not None:
+            week['peak_heart_rate'] = max(week.get('peak_heart_rate') or 0, daily.peak_heart_rate)
+
+    for week_start, values in totals.items():
+        session.add(TrainingWeeklyAgg(
+            data_source=data_source,
+            week_start=week_start,
+            last_modify_ts=now_ts,
+            **values
+        ))
+
+
+def refresh_training_aggregates(session, data_source: str, days: Optional[Iterable] = None) -> Dict[str, int]:
+    """
+    增量刷新训练汇总表
+
+    Args:
+        session: 数据库会话 (函数内提交)
+        data_source: 数据源 ('keep' 或 'garmin')
+        days: 受影响的日期(date/datetime, None项忽略); 为None或该数据源尚无汇总数据时全量重建该数据源的汇总
+
+    Returns:
+        dict: {'days': 重算的日数, 'weeks': 重算的周数}
+    """
+    manager = TrainingRecordManager(data_source=data_source)
+    if days is not None:
+        days = {_to_day(day) for day in days if day is not None}
+        if not days:
+            return {'days': 0, 'weeks': 0}
+        has_rollup = session.query(TrainingDailyAgg.day).filter(
+            TrainingDailyAgg.data_source == data_source
+        ).first() is not None
+        if not has_rollup:
+            days = None
+
+    now_ts = int(time.time())
+    try:
+        refreshed_days = _refresh_days(session, manager, days, now_ts)
+        weeks = {week_start_of(day) for day in refreshed_days}
+        if days is None:
+            # 全量重建时清除所有旧的周汇总
+            session.query(TrainingWeeklyAgg).filter(
+                TrainingWeeklyAgg.data_source == data_source
+            ).delete(synchronize_session=False)
+        if weeks:
+            _refresh_weeks(session, data_source, weeks, now_ts)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return {'days': len(refreshed_days), 'weeks': len(weeks)}
+
+
+def refresh_training_aggregates_quietly(session, data_source: str, days: Optional[Iterable] = None) -> Optional[Dict[str, int]]:
+    """刷新汇总表, 失败时只打印警告 (不影响已提交的训练记录写入; 统计工具会回退到全表聚合)"""
+    try:
+        return refresh_training_aggregates(session, data_source, days)
+    except Exception as e:
+        print(f"⚠️ 训练汇总表刷新失败({data_source}): {str(e)}")
+        return None
+
+
+if __name__ == '__main__':
+    import sys
+    from models.training_record import Base, get_engine, get_session_local
+
+    sources = sys.argv[1:] or list(TrainingRecordManager.DATA_SOURCE_MAP.keys())
+    Base.metadata.create_all(bind=get_engine(), tables=[TrainingDailyAgg.__table__, TrainingWeeklyAgg.__table__])
+    session = get_session_local()()
+    try:
+        for source in sources:
+            result = refresh_training_aggregates(session, source)
+            print(f"{source}: 重建 {result['days']} 个日汇总, {result['weeks']} 个周汇总")
+    finally:
+        session.close()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+训练数据版本号
+每次导入或增删改训练记录后递增对应数据源的版本号;
+InsightEngine的查询结果缓存在版本号变化时丢弃该数据源的全部缓存结果
+"""
+
+import time
+from typing import Optional
+
+from models.training_record import TrainingDataVersion
+
+
+def bump_training_data_version(session, data_source: str) -> int:
+    """
+    递增数据源的版本号
+
+    Args:
+        session: 数据库会话 (函数内提交)
+        data_source: 数据源 ('keep' 或 'garmin')
+
+    Returns:
+        int: 递增后的版本号
+    """
+    now_ts = int(time.time())
+    try:
+        updated = session.query(TrainingDataVersion)\
+            .filter(TrainingDataVersion.data_source == data_source)\
+            .update({
+                TrainingDataVersion.version: TrainingDataVersion.version + 1,
+                TrainingDataVersion.last_modify_ts: now_ts
+            }, synchronize_session=False)
+        if not updated:
+            session.add(TrainingDataVersion(data_source=data_source, version=1, last_modify_ts=now_ts))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return session.query(TrainingDataVersion.version)\
+        .filter(TrainingDataVersion.data_source == data_source)\
+        .scalar()
+
+
+def bump_training_data_version_quietly(session, data_source: str) -> Optional[int]:
+    """递增版本号, 失败时只打印警告 (版本号表不可用时InsightEngine不会缓存查询结果)"""
+    try:
+        return bump_training_data_version(session, data_source)
+    except Exception as e:
+        print(f"⚠️ 训练数据版本号更新失败({data_source}): {str(e)}")
+        return None
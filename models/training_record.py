@@ -3,7 +3,7 @@
 训练记录ORM模型
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, BigInteger, Text
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, BigInteger, Float, Text
 from sqlalchemy.dialects.mysql import DECIMAL, LONGTEXT
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -200,6 +200,86 @@ class TrainingRecordGarmin(Base):
         }
 
 
+class TrainingAggColumns:
+    """
+    训练汇总表公共字段
+    均值类指标存储"总和 + 非空计数",使任意多个日/周汇总行可以直接相加后再求均值
+    """
+    sessions = Column(Integer, nullable=False, default=0)
+    total_duration = Column(BigInteger, nullable=False, default=0)
+    total_distance = Column(Float, nullable=False, default=0)
+    distance_count = Column(Integer, nullable=False, default=0)
+    heart_rate_sum = Column(BigInteger, nullable=False, default=0)
+    heart_rate_count = Column(Integer, nullable=False, default=0)
+    peak_heart_rate = Column(Integer, nullable=True)
+    total_calories = Column(BigInteger, nullable=False, default=0)
+
+    # Garmin扩展指标 (Keep数据源为0)
+    cadence_sum = Column(BigInteger, nullable=False, default=0)
+    cadence_count = Column(Integer, nullable=False, default=0)
+    power_sum = Column(BigInteger, nullable=False, default=0)
+    power_count = Column(Integer, nullable=False, default=0)
+    training_load_sum = Column(BigInteger, nullable=False, default=0)
+    training_load_count = Column(Integer, nullable=False, default=0)
+    aerobic_effect_sum = Column(Float, nullable=False, default=0)
+    aerobic_effect_count = Column(Integer, nullable=False, default=0)
+    anaerobic_effect_sum = Column(Float, nullable=False, default=0)
+    anaerobic_effect_count = Column(Integer, nullable=False, default=0)
+    stride_length_sum = Column(Float, nullable=False, default=0)
+    stride_length_count = Column(Integer, nullable=False, default=0)
+    vertical_oscillation_sum = Column(Float, nullable=False, default=0)
+    vertical_oscillation_count = Column(Integer, nullable=False, default=0)
+    ground_contact_time_sum = Column(BigInteger, nullable=False, default=0)
+    ground_contact_time_count = Column(Integer, nullable=False, default=0)
+    hr_zone_1_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_2_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_3_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_4_seconds = Column(BigInteger, nullable=False, default=0)
+    hr_zone_5_seconds = Column(BigInteger, nullable=False, default=0)
+    maintaining_count = Column(Integer, nullable=False, default=0)
+    improving_count = Column(Integer, nullable=False, default=0)
+    highly_improving_count = Column(Integer, nullable=False, default=0)
+    moderate_intensity_minutes = Column(BigInteger, nullable=False, default=0)
+    vigorous_intensity_minutes = Column(BigInteger, nullable=False, default=0)
+
+    # 元数据
+    last_modify_ts = Column(BigInteger, nullable=False)
+
+
+class TrainingDailyAgg(TrainingAggColumns, Base):
+    """训练日汇总表 (按开始时间所在日期聚合)"""
+    __tablename__ = 'training_daily_agg'
+
+    data_source = Column(String(16), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    def __repr__(self):
+        return f'<TrainingDailyAgg(data_source={self.data_source}, day={self.day}, sessions={self.sessions})>'
+
+
+class TrainingWeeklyAgg(TrainingAggColumns, Base):
+    """训练周汇总表 (week_start为周一)"""
+    __tablename__ = 'training_weekly_agg'
+
+    data_source = Column(String(16), primary_key=True)
+    week_start = Column(Date, primary_key=True)
+
+    def __repr__(self):
+        return f'<TrainingWeeklyAgg(data_source={self.data_source}, week_start={self.week_start}, sessions={self.sessions})>'
+
+
+class TrainingDataVersion(Base):
+    """训练数据版本号表: 导入或增删改训练记录后递增, 供InsightEngine的查询结果缓存判断是否失效"""
+    __tablename__ = 'training_data_version'
+
+    data_source = Column(String(16), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    last_modify_ts = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<TrainingDataVersion(data_source={self.data_source}, version={self.version})>'
+
+
 class TrainingRecordManager:
     """
     训练记录数据源管理器
@@ -217,12 +297,14 @@ class TrainingRecordManager:
         'keep': {
             'start_time': 'start_time',
             'end_time': 'end_time',
-            'exercise_type': 'exercise_type'
+            'exercise_type': 'exercise_type',
+            'calories': 'calories'
         },
         'garmin': {
             'start_time': 'start_time_gmt',
             'end_time': 'end_time_gmt',
-            'exercise_type': 'sport_type'
+            'exercise_type': 'sport_type',
+            'calories': 'activity_calories'
         }
     }
 
@@ -285,7 +367,7 @@ class TrainingRecordManager:
         获取当前数据源的实际字段名或字段对象
 
         Args:
-            field_name: 通用字段名 ('start_time', 'end_time', 'exercise_type')
+            field_name: 通用字段名 ('start_time', 'end_time', 'exercise_type', 'calories')
 
         Returns:
             实际的模型字段对象
@@ -6,6 +6,8 @@
 from flask import Blueprint, render_template, request, jsonify
 from datetime import datetime
 from models.training_record import TrainingRecordManager, SessionLocal
+from models.training_aggregates import refresh_training_aggregates_quietly
+from models.training_data_version import bump_training_data_version_quietly
 from utils.config_reloader import get_config_value
 import json
 import time
@@ -23,6 +25,17 @@ def get_record_manager():
     return TrainingRecordManager(data_source=data_source)
 
 
+def on_records_changed(session, record_manager, *start_times):
+    """训练记录增删改后: 刷新所在日期(及所在周)的汇总表, 递增数据版本号使InsightEngine的查询缓存失效"""
+    refresh_training_aggregates_quietly(session, record_manager.data_source, start_times)
+    bump_training_data_version_quietly(session, record_manager.data_source)
+
+
+def get_record_start_time(record_manager, record):
+    """读取记录的开始时间(Keep为start_time, Garmin为start_time_gmt)"""
+    return getattr(record, record_manager.get_field('start_time').key)
+
+
 @training_data_bp.route('/')
 def index():
     """训练数据管理主页 - 根据数据源渲染不同页面"""
@@ -107,7 +120,8 @@ def add_record():
 
         # 创建记录
         current_ts = int(time.time())
-        record = get_record_manager().create_record(
+        record_manager = get_record_manager()
+        record = record_manager.create_record(
             user_id=data.get('user_id', 'default_user'),
             exercise_type=data['exercise_type'],
             duration_seconds=int(data['duration_seconds']),
@@ -126,6 +140,7 @@ def add_record():
         session.add(record)
         session.commit()
         session.refresh(record)
+        on_records_changed(session, record_manager, get_record_start_time(record_manager, record))
 
         return jsonify({
             'success': True,
@@ -164,12 +179,14 @@ def update_record(record_id):
     """更新训练记录"""
     session = SessionLocal()
     try:
-        Model = get_record_manager().get_model_class()
-        record = get_record_manager().query(session).filter(Model.id == record_id).first()
+        record_manager = get_record_manager()
+        Model = record_manager.get_model_class()
+        record = record_manager.query(session).filter(Model.id == record_id).first()
         if not record:
             return jsonify({'success': False, 'message': '记录不存在'}), 404
 
         data = request.get_json()
+        previous_start_time = get_record_start_time(record_manager, record)
 
         # 更新字段
         if 'user_id' in data:
@@ -209,6 +226,7 @@ def update_record(record_id):
 
         session.commit()
         session.refresh(record)
+        on_records_changed(session, record_manager, previous_start_time, get_record_start_time(record_manager, record))
 
         return jsonify({
             'success': True,
@@ -227,13 +245,16 @@ def delete_record(record_id):
     """删除训练记录"""
     session = SessionLocal()
     try:
-        Model = get_record_manager().get_model_class()
-        record = get_record_manager().query(session).filter(Model.id == record_id).first()
+        record_manager = get_record_manager()
+        Model = record_manager.get_model_class()
+        record = record_manager.query(session).filter(Model.id == record_id).first()
         if not record:
             return jsonify({'success': False, 'message': '记录不存在'}), 404
 
+        start_time = get_record_start_time(record_manager, record)
         session.delete(record)
         session.commit()
+        on_records_changed(session, record_manager, start_time)
 
         return jsonify({
             'success': True,
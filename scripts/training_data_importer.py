@@ -20,6 +20,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from garminconnect import Garmin
 from models.training_record import TrainingRecordKeep, TrainingRecordGarmin, Base, TrainingRecordManager, get_session_local
+from models.training_aggregates import refresh_training_aggregates_quietly
+from models.training_data_version import bump_training_data_version_quietly
 
 
 class BaseImporter:
@@ -140,6 +142,7 @@ class KeepDataImporter(BaseImporter):
             success_count = 0
             failed_count = 0
             batch_records = []
+            imported_days = set()
 
             for idx, row in df.iterrows():
                 try:
@@ -160,6 +163,7 @@ class KeepDataImporter(BaseImporter):
                     )
 
                     batch_records.append(record)
+                    imported_days.add(record.start_time.date())
                     success_count += 1
 
                     # 批量提交
@@ -177,6 +181,10 @@ class KeepDataImporter(BaseImporter):
                 session.bulk_save_objects(batch_records)
                 session.commit()
 
+            # 刷新训练汇总表(覆盖写入时全量重建),并使InsightEngine的查询缓存失效
+            refresh_training_aggregates_quietly(session, 'keep', None if truncate_first else imported_days)
+            bump_training_data_version_quietly(session, 'keep')
+
             return {
                 'success': success_count,
                 'failed': failed_count,
@@ -447,6 +455,7 @@ class GarminDataImporter(BaseImporter):
 
         success_count = 0
         failed_count = 0
+        imported_days = set()
 
         try:
             # 是否清空表
@@ -469,6 +478,7 @@ class GarminDataImporter(BaseImporter):
                     session.add(record)
                     session.commit()
 
+                    imported_days.add(record_data['start_time_gmt'])
                     success_count += 1
 
                 except Exception as e:
@@ -476,6 +486,10 @@ class GarminDataImporter(BaseImporter):
                     failed_count += 1
                     continue
 
+            # 刷新训练汇总表(覆盖写入时全量重建),并使InsightEngine的查询缓存失效
+            refresh_training_aggregates_quietly(session, 'garmin', None if truncate_first else imported_days)
+            bump_training_data_version_quietly(session, 'garmin')
+
             return {
                 'success': success_count,
                 'failed': failed_count,
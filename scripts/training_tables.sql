@@ -116,6 +116,120 @@ CREATE TABLE `training_records_garmin` (
     KEY `idx_garmin_activity_id` (`activity_id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='训练记录表 - Garmin数据源';
 
+-- ----------------------------
+-- 训练日汇总表 (由导入脚本和训练数据管理接口增量刷新, 见 models/training_aggregates.py)
+-- 均值类指标存储"总和 + 非空计数", 多行相加后再求均值
+-- ----------------------------
+DROP TABLE IF EXISTS `training_daily_agg`;
+CREATE TABLE `training_daily_agg` (
+    `data_source` VARCHAR(16) NOT NULL COMMENT '数据源 (keep/garmin)',
+    `day` DATE NOT NULL COMMENT '训练开始日期',
+
+    `sessions` INT NOT NULL DEFAULT 0 COMMENT '训练次数',
+    `total_duration` BIGINT NOT NULL DEFAULT 0 COMMENT '总时长(秒)',
+    `total_distance` DOUBLE NOT NULL DEFAULT 0 COMMENT '总距离(米)',
+    `distance_count` INT NOT NULL DEFAULT 0 COMMENT '有距离的记录数',
+    `heart_rate_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均心率之和',
+    `heart_rate_count` INT NOT NULL DEFAULT 0 COMMENT '有平均心率的记录数',
+    `peak_heart_rate` INT DEFAULT NULL COMMENT '最大心率峰值',
+    `total_calories` BIGINT NOT NULL DEFAULT 0 COMMENT '总卡路里',
+
+    -- Garmin扩展指标 (Keep数据源为0)
+    `cadence_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均步频之和',
+    `cadence_count` INT NOT NULL DEFAULT 0,
+    `power_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均功率之和',
+    `power_count` INT NOT NULL DEFAULT 0,
+    `training_load_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '训练负荷之和',
+    `training_load_count` INT NOT NULL DEFAULT 0,
+    `aerobic_effect_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '有氧训练效果之和',
+    `aerobic_effect_count` INT NOT NULL DEFAULT 0,
+    `anaerobic_effect_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '无氧训练效果之和',
+    `anaerobic_effect_count` INT NOT NULL DEFAULT 0,
+    `stride_length_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '平均步幅之和',
+    `stride_length_count` INT NOT NULL DEFAULT 0,
+    `vertical_oscillation_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '平均垂直振幅之和',
+    `vertical_oscillation_count` INT NOT NULL DEFAULT 0,
+    `ground_contact_time_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均触地时间之和',
+    `ground_contact_time_count` INT NOT NULL DEFAULT 0,
+    `hr_zone_1_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间1(秒)',
+    `hr_zone_2_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间2(秒)',
+    `hr_zone_3_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间3(秒)',
+    `hr_zone_4_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间4(秒)',
+    `hr_zone_5_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间5(秒)',
+    `maintaining_count` INT NOT NULL DEFAULT 0 COMMENT '训练效果标签含Maintaining的次数',
+    `improving_count` INT NOT NULL DEFAULT 0 COMMENT '训练效果标签含Improving的次数',
+    `highly_improving_count` INT NOT NULL DEFAULT 0 COMMENT '训练效果标签含Highly Improving的次数',
+    `moderate_intensity_minutes` BIGINT NOT NULL DEFAULT 0 COMMENT '中等强度时长(分)',
+    `vigorous_intensity_minutes` BIGINT NOT NULL DEFAULT 0 COMMENT '高强度时长(分)',
+
+    -- 元数据
+    `last_modify_ts` BIGINT NOT NULL COMMENT '汇总最后刷新时间戳',
+
+    PRIMARY KEY (`data_source`, `day`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='训练日汇总表';
+
+-- ----------------------------
+-- 训练周汇总表 (由日汇总按周合并, week_start为周一)
+-- ----------------------------
+DROP TABLE IF EXISTS `training_weekly_agg`;
+CREATE TABLE `training_weekly_agg` (
+    `data_source` VARCHAR(16) NOT NULL COMMENT '数据源 (keep/garmin)',
+    `week_start` DATE NOT NULL COMMENT '周一日期',
+
+    `sessions` INT NOT NULL DEFAULT 0 COMMENT '训练次数',
+    `total_duration` BIGINT NOT NULL DEFAULT 0 COMMENT '总时长(秒)',
+    `total_distance` DOUBLE NOT NULL DEFAULT 0 COMMENT '总距离(米)',
+    `distance_count` INT NOT NULL DEFAULT 0 COMMENT '有距离的记录数',
+    `heart_rate_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均心率之和',
+    `heart_rate_count` INT NOT NULL DEFAULT 0 COMMENT '有平均心率的记录数',
+    `peak_heart_rate` INT DEFAULT NULL COMMENT '最大心率峰值',
+    `total_calories` BIGINT NOT NULL DEFAULT 0 COMMENT '总卡路里',
+
+    -- Garmin扩展指标 (Keep数据源为0)
+    `cadence_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均步频之和',
+    `cadence_count` INT NOT NULL DEFAULT 0,
+    `power_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均功率之和',
+    `power_count` INT NOT NULL DEFAULT 0,
+    `training_load_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '训练负荷之和',
+    `training_load_count` INT NOT NULL DEFAULT 0,
+    `aerobic_effect_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '有氧训练效果之和',
+    `aerobic_effect_count` INT NOT NULL DEFAULT 0,
+    `anaerobic_effect_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '无氧训练效果之和',
+    `anaerobic_effect_count` INT NOT NULL DEFAULT 0,
+    `stride_length_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '平均步幅之和',
+    `stride_length_count` INT NOT NULL DEFAULT 0,
+    `vertical_oscillation_sum` DOUBLE NOT NULL DEFAULT 0 COMMENT '平均垂直振幅之和',
+    `vertical_oscillation_count` INT NOT NULL DEFAULT 0,
+    `ground_contact_time_sum` BIGINT NOT NULL DEFAULT 0 COMMENT '平均触地时间之和',
+    `ground_contact_time_count` INT NOT NULL DEFAULT 0,
+    `hr_zone_1_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间1(秒)',
+    `hr_zone_2_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间2(秒)',
+    `hr_zone_3_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间3(秒)',
+    `hr_zone_4_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间4(秒)',
+    `hr_zone_5_seconds` BIGINT NOT NULL DEFAULT 0 COMMENT '心率区间5(秒)',
+    `maintaining_count` INT NOT NULL DEFAULT 0 COMMENT '训练效果标签含Maintaining的次数',
+    `improving_count` INT NOT NULL DEFAULT 0 COMMENT '训练效果标签含Improving的次数',
+    `highly_improving_count` INT NOT NULL DEFAULT 0 COMMENT '训练效果标签含Highly Improving的次数',
+    `moderate_intensity_minutes` BIGINT NOT NULL DEFAULT 0 COMMENT '中等强度时长(分)',
+    `vigorous_intensity_minutes` BIGINT NOT NULL DEFAULT 0 COMMENT '高强度时长(分)',
+
+    -- 元数据
+    `last_modify_ts` BIGINT NOT NULL COMMENT '汇总最后刷新时间戳',
+
+    PRIMARY KEY (`data_source`, `week_start`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='训练周汇总表';
+
+-- ----------------------------
+-- 训练数据版本号表 (导入或增删改训练记录后递增, InsightEngine据此使查询结果缓存失效)
+-- ----------------------------
+DROP TABLE IF EXISTS `training_data_version`;
+CREATE TABLE `training_data_version` (
+    `data_source` VARCHAR(16) NOT NULL COMMENT '数据源 (keep/garmin)',
+    `version` BIGINT NOT NULL DEFAULT 0 COMMENT '数据版本号',
+    `last_modify_ts` BIGINT NOT NULL COMMENT '最后递增时间戳',
+    PRIMARY KEY (`data_source`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='训练数据版本号表';
+
 -- ----------------------------
 -- 训练统计视图 - Keep数据源
 -- ----------------------------
@@ -0,0 +1,101 @@
+"""
+InsightEngine反思循环测试
+对每个统计类工具跑一轮反思, 确认工具参数取自反思节点的输出并原样传给数据源工具
+"""
+
+import threading
+
+import pytest
+
+from InsightEngine.agent import SportsScientistAgent
+from InsightEngine.state import State
+from InsightEngine.tools import DBResponse
+from InsightEngine.utils import Config
+
+
+class FakeReflectionNode:
+    """固定返回给定反思输出的反思节点"""
+
+    def __init__(self, output):
+        self.output = output
+
+    def run(self, reflection_input):
+        return dict(self.output)
+
+
+class FakeReflectionSummaryNode:
+    """记录总结输入并更新段落总结的反思总结节点"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def mutate_state(self, summary_input, state, paragraph_index, **kwargs):
+        self.inputs.append(summary_input)
+        state.paragraphs[paragraph_index].research.latest_summary = "反思后的总结"
+        return state
+
+
+class FakeSearchAgency:
+    """记录调用参数并返回统计结果的数据源工具"""
+
+    def __init__(self):
+        self.calls = []
+
+    def _respond(self, tool_name, **kwargs):
+        self.calls.append((tool_name, kwargs))
+        return DBResponse(
+            tool_name=tool_name,
+            parameters=kwargs,
+            data_source="keep",
+            statistics={"sessions_analyzed": 3},
+        )
+
+    def get_load_trend(self, **kwargs):
+        return self._respond("get_load_trend", **kwargs)
+
+    def get_heart_rate_analysis(self, **kwargs):
+        return self._respond("get_heart_rate_analysis", **kwargs)
+
+
+def make_agent(reflection_output):
+    """构建只包含反思循环所需组件的Agent(不连接LLM和数据库)"""
+    agent = SportsScientistAgent.__new__(SportsScientistAgent)
+    agent.config = Config(max_reflections=1, enable_reflection_early_exit=False, enable_result_dedup=False)
+    agent.state = State()
+    agent.state.add_paragraph("负荷与心率", "分析近期训练负荷和心率分布")
+    agent.state.paragraphs[0].research.latest_summary = "首轮总结"
+    agent._state_lock = threading.Lock()
+    agent.stream_callback = None
+    agent.search_agency = FakeSearchAgency()
+    agent.reflection_node = FakeReflectionNode(reflection_output)
+    agent.reflection_summary_node = FakeReflectionSummaryNode()
+    agent._refresh_search_agency_if_needed = lambda: None
+    agent._budget_exhausted = lambda: False
+    agent._save_checkpoint = lambda: None
+    return agent
+
+
+@pytest.mark.parametrize(
+    "reflection_output, expected_call",
+    [
+        (
+            {"search_tool": "get_load_trend", "days": 28, "end_date": "2024-05-01"},
+            ("get_load_trend", {"days": 28, "end_date": "2024-05-01"}),
+        ),
+        (
+            {"search_tool": "get_heart_rate_analysis", "days": 14, "max_heart_rate": 188, "limit": 5},
+            ("get_heart_rate_analysis", {"days": 14, "max_heart_rate": 188, "limit": 5}),
+        ),
+    ],
+)
+def test_reflection_round_uses_reflection_params(reflection_output, expected_call):
+    reflection_output = dict(reflection_output, search_query="补充数据", reasoning="需要更多数据")
+    agent = make_agent(reflection_output)
+
+    agent._reflection_loop(0)
+
+    assert agent.search_agency.calls == [expected_call]
+    summary_input = agent.reflection_summary_node.inputs[0]
+    assert summary_input["search_query"] == "补充数据"
+    assert summary_input["search_results"] == ['{"sessions_analyzed": 3}']
+    assert agent.state.paragraphs[0].research.latest_summary == "反思后的总结"
@@ -0,0 +1,236 @@
+"""
+LLM响应缓存模块
+按 hash(base_url, model, system_prompt, user_prompt, 采样参数) 对LLM响应做内容寻址缓存，
+内存LRU层 + SQLite磁盘层（带TTL），用于演示重跑、重试以及ReportEngine重复选择模板等场景
+
+采样温度 > 0 时结果本身具有随机性，默认绕过缓存，除非显式允许(allow_sampling=True)；
+调用未显式传入temperature时由服务端决定温度（通常 > 0），同样按采样处理，
+除非通过 default_temperature 声明服务端默认温度为 0
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class LLMResponseCache:
+    """两级LLM响应缓存：内存LRU + SQLite(TTL)"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = "cache/llm_cache.db",
+        memory_size: int = 256,
+        ttl_seconds: int = 86400,
+        allow_sampling: bool = False,
+        default_temperature: Optional[float] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite文件路径，为None时仅使用内存层
+            memory_size: 内存LRU最大条目数
+            ttl_seconds: 缓存有效期（秒），<=0 表示永不过期
+            allow_sampling: 是否允许缓存 temperature > 0 的调用
+            default_temperature: 调用未显式传入temperature时服务端使用的温度，None表示未知（按采样处理）
+        """
+        self.db_path = db_path
+        self.memory_size = max(0, int(memory_size))
+        self.ttl_seconds = int(ttl_seconds)
+        self.allow_sampling = allow_sampling
+        self.default_temperature = default_temperature
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "writes": 0,
+        }
+
+        if self.db_path:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        model TEXT,
+                        response TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        expires_at REAL
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache(expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每次操作独立连接，避免跨线程共享连接
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        params: Optional[Dict[str, Any]] = None,
+        base_url: Optional[str] = None,
+    ) -> str:
+        """计算缓存键（同名模型在不同服务商/网关下视为不同模型）"""
+        payload = json.dumps(
+            {
+                "base_url": (base_url or "").rstrip("/"),
+                "model": model,
+                "system_prompt": system_prompt,
+                "user_prompt": user_prompt,
+                "params": params or {},
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def should_bypass(self, params: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        判断本次调用是否绕过缓存
+
+        未显式传入temperature时使用 default_temperature；两者都未知时按采样处理
+        """
+        if self.allow_sampling:
+            return False
+        temperature = (params or {}).get("temperature")
+        if temperature is None:
+            temperature = self.default_temperature
+        if temperature is None or float(temperature) > 0:
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return True
+        return False
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl_seconds if self.ttl_seconds > 0 else None
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT response, expires_at FROM llm_cache WHERE cache_key = ?",
+                        (key,),
+                    ).fetchone()
+                    if row is not None and row[1] is not None and row[1] <= now:
+                        conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                        row = None
+            except sqlite3.Error as e:
+                print(f"LLM缓存读取失败: {str(e)}")
+                row = None
+
+            if row is not None:
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                    self._stats["disk_hits"] += 1
+                return row[0]
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str, model: str = ""):
+        """写入缓存，空响应不缓存"""
+        if not value:
+            return
+        expires_at = self._expires_at()
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._stats["writes"] += 1
+
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (cache_key, model, response, created_at, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, model, value, time.time(), expires_at),
+                    )
+            except sqlite3.Error as e:
+                print(f"LLM缓存写入失败: {str(e)}")
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]):
+        """写入内存LRU层（调用方持有锁）"""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """清理磁盘层中已过期的条目，返回删除数量"""
+        if not self.db_path:
+            return 0
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            return cursor.rowcount
+
+    def clear(self):
+        """清空所有缓存"""
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_caches: Dict[Tuple[Optional[str], int, int, bool, Optional[float]], LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(
+    db_path: Optional[str] = "cache/llm_cache.db",
+    memory_size: int = 256,
+    ttl_seconds: int = 86400,
+    allow_sampling: bool = False,
+    default_temperature: Optional[float] = None,
+) -> LLMResponseCache:
+    """获取进程内共享的缓存实例（相同参数复用同一实例，从而共享内存层与统计）"""
+    key = (db_path, int(memory_size), int(ttl_seconds), bool(allow_sampling), default_temperature)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = LLMResponseCache(db_path, memory_size, ttl_seconds, allow_sampling, default_temperature)
+            _caches[key] = cache
+        return cache
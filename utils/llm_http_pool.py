@@ -0,0 +1,125 @@
+"""
+LLM HTTP连接池模块
+为所有引擎的LLM客户端（同步/异步）以及ForumHost提供进程级共享的httpx连接池，
+避免每个客户端各自维护一套连接
+
+连接池参数通过环境变量配置:
+- LLM_HTTP_MAX_CONNECTIONS: 最大连接数（默认 100）
+- LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: 最大保活连接数（默认 20）
+- LLM_HTTP_KEEPALIVE_EXPIRY: 保活连接的空闲过期秒数（默认 30）
+- LLM_HTTP_TIMEOUT: 调用方没有传入请求级超时时的默认读写超时秒数（默认 600，与OpenAI SDK默认值一致）
+- LLM_HTTP_CONNECT_TIMEOUT: 默认的建连超时秒数（默认 10）
+
+共享客户端注册了response事件钩子，把429与限流响应头反馈给 llm_rate_limiter 的跨进程令牌桶
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+
+from llm_rate_limiter import observe_response_hook, aobserve_response_hook
+
+logger = logging.getLogger(__name__)
+
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+# httpx.AsyncClient 绑定在创建它的事件循环上，因此按事件循环各保留一个共享实例
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_lock = threading.Lock()
+
+
+def _read_env_number(name: str, default: float) -> float:
+    """读取数值型环境变量，非法值回退到默认值"""
+    raw = os.getenv(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"环境变量 {name}={raw} 不是合法数值，使用默认值 {default}")
+        return default
+
+
+def get_pool_limits() -> httpx.Limits:
+    """根据环境变量构造连接池限制"""
+    max_connections = int(_read_env_number("LLM_HTTP_MAX_CONNECTIONS", 100))
+    max_keepalive = int(_read_env_number("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    keepalive_expiry = _read_env_number("LLM_HTTP_KEEPALIVE_EXPIRY", 30.0)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_keepalive, max_connections),
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def get_default_timeout() -> httpx.Timeout:
+    """
+    共享客户端的默认超时
+
+    OpenAI(http_client=...) 未显式指定timeout时沿用http_client的超时，各引擎的LLM客户端在请求级别传入超时，
+    ForumHost等不传超时的调用方依赖这里的默认值，因此不能为None(否则请求可能永久挂起)
+    """
+    return httpx.Timeout(
+        _read_env_number("LLM_HTTP_TIMEOUT", 600.0),
+        connect=_read_env_number("LLM_HTTP_CONNECT_TIMEOUT", 10.0),
+    )
+
+
+def get_shared_sync_client() -> httpx.Client:
+    """获取进程级共享的同步httpx客户端"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        with _sync_lock:
+            if _sync_client is None or _sync_client.is_closed:
+                # 各LLM客户端在请求级别传入超时，这里只是兜底的默认值
+                _sync_client = httpx.Client(
+                    limits=get_pool_limits(),
+                    timeout=get_default_timeout(),
+                    event_hooks={"response": [observe_response_hook]},
+                )
+    return _sync_client
+
+
+def get_shared_async_client() -> httpx.AsyncClient:
+    """
+    获取当前事件循环共享的异步httpx客户端
+
+    必须在运行中的事件循环内调用
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        with _async_lock:
+            client = _async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    limits=get_pool_limits(),
+                    timeout=get_default_timeout(),
+                    event_hooks={"response": [aobserve_response_hook]},
+                )
+                _async_clients[loop] = client
+    return client
+
+
+async def aclose_shared_async_client():
+    """关闭当前事件循环的共享异步客户端（通常在事件循环退出前调用）"""
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def close_shared_sync_client():
+    """关闭共享的同步客户端"""
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is not None and not _sync_client.is_closed:
+            _sync_client.close()
+        _sync_client = None
@@ -0,0 +1,233 @@
+"""
+LLM调用延迟统计与对冲请求模块
+按模型在内存中维护最近调用的耗时窗口(p50/p95/p99)，并据此实现对冲请求(hedged request):
+首个请求在p95耗时内未返回时再发起一个重复请求，取先返回的结果并取消另一个
+
+对冲参数通过环境变量配置(对所有引擎生效):
+- LLM_HEDGE_ENABLED: 是否启用对冲请求（默认 false）
+- LLM_HEDGE_PERCENTILE: 触发对冲的耗时分位数（默认 95）
+- LLM_HEDGE_MIN_SAMPLES: 模型累计多少次调用后才启用对冲（默认 20）
+- LLM_HEDGE_MIN_DELAY: 对冲延迟下限秒数（默认 2）
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 200
+
+
+def _read_env_number(name: str, default: float) -> float:
+    """读取数值型环境变量，非法值回退到默认值"""
+    raw = os.getenv(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"环境变量 {name}={raw} 不是合法数值，使用默认值 {default}")
+        return default
+
+
+def is_hedging_enabled() -> bool:
+    return str(os.getenv("LLM_HEDGE_ENABLED", "false")).lower() in ("true", "1", "yes")
+
+
+class ModelLatencyTracker:
+    """按模型统计最近调用耗时的滑动窗口"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def record(self, model: str, seconds: float):
+        """记录一次成功调用的耗时"""
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, model: str, event: str):
+        """累计对冲相关事件(hedged/hedge_won/deadline_exceeded)"""
+        with self._lock:
+            counters = self._counters.setdefault(model, {})
+            counters[event] = counters.get(event, 0) + 1
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        """获取模型耗时的q分位数(0-100)，无样本时返回None"""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q / 100.0 * (len(samples) - 1)))))
+        return samples[index]
+
+    def sample_count(self, model: str) -> int:
+        with self._lock:
+            return len(self._samples.get(model, ()))
+
+    def get_hedge_delay(self, model: str) -> Optional[float]:
+        """
+        计算对冲延迟；未启用对冲或样本不足时返回None
+        """
+        if not is_hedging_enabled():
+            return None
+        if self.sample_count(model) < int(_read_env_number("LLM_HEDGE_MIN_SAMPLES", 20)):
+            return None
+        delay = self.percentile(model, _read_env_number("LLM_HEDGE_PERCENTILE", 95))
+        if delay is None:
+            return None
+        return max(delay, _read_env_number("LLM_HEDGE_MIN_DELAY", 2.0))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各模型的样本数、分位数耗时与对冲计数"""
+        with self._lock:
+            models = list(self._samples.keys() | self._counters.keys())
+            counters = {model: dict(self._counters.get(model, {})) for model in models}
+        stats = {}
+        for model in models:
+            entry = {"samples": self.sample_count(model)}
+            for q in (50, 95, 99):
+                value = self.percentile(model, q)
+                entry[f"p{q}_seconds"] = round(value, 3) if value is not None else None
+            entry.update(counters[model])
+            stats[model] = entry
+        return stats
+
+
+_tracker = ModelLatencyTracker()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class HedgeCancelledError(Exception):
+    """对冲中落败(或整体已放弃)的同步请求主动中止时抛出"""
+
+
+def get_latency_tracker() -> ModelLatencyTracker:
+    """获取进程级共享的延迟统计器"""
+    return _tracker
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+    return _executor
+
+
+def run_hedged(
+    call: Callable[[threading.Event], Any],
+    hedge_delay: float,
+    model: str = "",
+    before_hedge: Optional[Callable[[], Any]] = None,
+) -> Tuple[Any, bool]:
+    """
+    以对冲方式执行同步调用
+
+    主请求在 hedge_delay 秒内未完成时发起一个重复请求，返回最先成功的结果；
+    两个请求都失败时抛出主请求的异常。工作线程无法被强行中断，因此每个请求都会收到一个取消事件，
+    有结果后落败请求的事件被置位，call 应在下一次读取响应时关闭连接并抛出 HedgeCancelledError
+
+    Args:
+        call: 实际发起请求的函数，参数为该请求的取消事件
+        hedge_delay: 发起对冲请求前等待的秒数
+        model: 模型名称(用于统计)
+        before_hedge: 发起对冲请求前在工作线程中调用(如获取限流配额)
+
+    Returns:
+        (结果, 是否发起了对冲请求)
+    """
+    executor = _get_executor()
+    primary_cancelled = threading.Event()
+    primary = executor.submit(call, primary_cancelled)
+    done, _ = wait([primary], timeout=hedge_delay)
+    if done:
+        return primary.result(), False
+
+    _tracker.count(model, "hedged")
+    hedge_cancelled = threading.Event()
+
+    def hedged_call():
+        if before_hedge is not None:
+            before_hedge()
+        if hedge_cancelled.is_set():
+            raise HedgeCancelledError("主请求已返回，放弃对冲请求")
+        return call(hedge_cancelled)
+
+    hedge = executor.submit(hedged_call)
+    cancel_events = {primary: primary_cancelled, hedge: hedge_cancelled}
+    pending = {primary, hedge}
+    first_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is hedge:
+                        _tracker.count(model, "hedge_won")
+                    return future.result(), True
+                if first_error is None or future is primary:
+                    first_error = error
+        raise first_error
+    finally:
+        for future in pending:
+            cancel_events[future].set()
+            future.cancel()
+
+
+async def arun_hedged(
+    call: Callable[[], Awaitable[Any]],
+    hedge_delay: float,
+    model: str = "",
+    before_hedge: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> Tuple[Any, bool]:
+    """
+    run_hedged 的异步版本，落败的请求会被真正取消(连接随之释放)
+
+    Returns:
+        (结果, 是否发起了对冲请求)
+    """
+    primary = asyncio.ensure_future(call())
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+    except asyncio.CancelledError:
+        primary.cancel()
+        raise
+    if done:
+        return primary.result(), False
+
+    _tracker.count(model, "hedged")
+
+    async def hedged_call():
+        if before_hedge is not None:
+            await before_hedge()
+        return await call()
+
+    hedge = asyncio.ensure_future(hedged_call())
+    pending = {primary, hedge}
+    first_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    if task is hedge:
+                        _tracker.count(model, "hedge_won")
+                    return task.result(), True
+                if first_error is None or task is primary:
+                    first_error = error
+        raise first_error
+    finally:
+        for task in pending:
+            task.cancel()
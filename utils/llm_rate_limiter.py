@@ -0,0 +1,466 @@
+"""
+LLM客户端自适应限流模块
+三个Streamlit引擎进程、ForumHost与ReportEngine共用同一个服务商API Key，
+这里用SQLite持久化的令牌桶(请求数/分钟 + token数/分钟)在多进程间协调调用速率，
+并根据服务端返回的 Retry-After 与 x-ratelimit-* 响应头自适应调整:
+
+- 收到429时: 所有进程在 Retry-After 期间暂停取令牌，同时速率系数减半
+- 请求成功时: 速率系数线性恢复(AIMD)，吞吐随负载平滑升降而不是陷入退避风暴
+
+限流参数通过环境变量配置(与 llm_http_pool 一致，对所有进程生效):
+- LLM_RATE_LIMIT_RPM: 每分钟请求数上限（默认 0，表示不启用限流）
+- LLM_RATE_LIMIT_TPM: 每分钟token数上限（默认 0，表示不限制token）
+- LLM_RATE_LIMIT_DB: 共享状态的SQLite文件（默认 cache/llm_rate_limit.db）
+- LLM_RATE_LIMIT_MAX_WAIT: 单次调用最长排队秒数，超时后放行（默认 600）
+"""
+
+import os
+import time
+import random
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# 令牌桶容量对应的秒数(允许的突发量)，避免一分钟的额度在瞬间被耗尽
+BURST_SECONDS = 10.0
+# 收到429且没有Retry-After时的默认暂停秒数
+DEFAULT_RATE_LIMITED_PAUSE = 5.0
+MIN_RATE_SCALE = 0.1
+RATE_SCALE_RECOVERY = 0.05
+
+
+def _read_env_number(name: str, default: float) -> float:
+    """读取数值型环境变量，非法值回退到默认值"""
+    raw = os.getenv(name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"环境变量 {name}={raw} 不是合法数值，使用默认值 {default}")
+        return default
+
+
+def estimate_prompt_tokens(*texts: str) -> int:
+    """粗略估算prompt的token数(中英混合文本约2字符/token)，仅用于限流排队"""
+    return max(1, sum(len(text or "") for text in texts) // 2)
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    解析限流相关的时长字段，返回秒数
+
+    支持纯数字秒数("12"/"0.5")、OpenAI风格的 "6m0s"/"1s"/"250ms"，以及HTTP日期格式的Retry-After
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    total = 0.0
+    number = ""
+    matched = False
+    i = 0
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0}
+    while i < len(value):
+        char = value[i]
+        if char.isdigit() or char == ".":
+            number += char
+        elif value.startswith("ms", i) and number:
+            total += float(number) / 1000.0
+            number = ""
+            matched = True
+            i += 1
+        elif char in units and number:
+            total += float(number) * units[char]
+            number = ""
+            matched = True
+        else:
+            matched = False
+            break
+        i += 1
+    if matched and not number:
+        return total
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def get_retry_after(headers: Any) -> Optional[float]:
+    """从响应头中读取建议的等待秒数(retry-after-ms 优先于 retry-after)"""
+    if headers is None:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+def make_scope(host: Optional[str], api_key: Optional[str]) -> str:
+    """限流作用域: 同一服务商主机 + 同一API Key共享一个令牌桶"""
+    key_digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return f"{(host or 'api.openai.com').lower()}:{key_digest}"
+
+
+def scope_for_base_url(base_url: Optional[str], api_key: Optional[str]) -> str:
+    return make_scope(urlparse(base_url or "https://api.openai.com/v1").hostname, api_key)
+
+
+class SharedRateLimiter:
+    """基于SQLite的跨进程令牌桶限流器"""
+
+    def __init__(
+        self,
+        scope: str,
+        requests_per_minute: float,
+        tokens_per_minute: float = 0,
+        db_path: str = "cache/llm_rate_limit.db",
+        max_wait: float = 600.0,
+    ):
+        """
+        初始化限流器
+
+        Args:
+            scope: 限流作用域(服务商主机 + API Key摘要)
+            requests_per_minute: 每分钟请求数上限
+            tokens_per_minute: 每分钟token数上限，<=0 表示不限制token
+            db_path: 共享状态SQLite文件路径
+            max_wait: 单次调用最长排队秒数，超时后放行并记录警告
+        """
+        self.scope = scope
+        self.requests_per_minute = float(requests_per_minute)
+        self.tokens_per_minute = float(tokens_per_minute or 0)
+        self.db_path = db_path
+        self.max_wait = max_wait
+
+        self.request_capacity = max(1.0, self.requests_per_minute * BURST_SECONDS / 60.0)
+        self.token_capacity = self.tokens_per_minute * BURST_SECONDS / 60.0 if self.tokens_per_minute > 0 else 0.0
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "acquired": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+            "rate_limited": 0,
+            "timeouts": 0,
+        }
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    scope TEXT PRIMARY KEY,
+                    request_level REAL NOT NULL,
+                    token_level REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0,
+                    rate_scale REAL NOT NULL DEFAULT 1.0
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每次操作独立连接；isolation_level=None 以便手动 BEGIN IMMEDIATE 获取写锁
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _update_bucket(self, mutate) -> Any:
+        """
+        在写事务中读取并补充令牌桶，调用 mutate(bucket, now) 修改后写回
+
+        bucket 为包含 request_level/token_level/blocked_until/rate_scale 的字典
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute(
+                "SELECT request_level, token_level, updated_at, blocked_until, rate_scale FROM rate_buckets WHERE scope = ?",
+                (self.scope,),
+            ).fetchone()
+            if row is None:
+                bucket = {
+                    "request_level": self.request_capacity,
+                    "token_level": self.token_capacity,
+                    "blocked_until": 0.0,
+                    "rate_scale": 1.0,
+                }
+            else:
+                elapsed = max(0.0, now - row[2])
+                scale = row[4]
+                bucket = {
+                    "request_level": min(self.request_capacity, row[0] + elapsed * self.requests_per_minute / 60.0 * scale),
+                    "token_level": min(self.token_capacity, row[1] + elapsed * self.tokens_per_minute / 60.0 * scale),
+                    "blocked_until": row[3],
+                    "rate_scale": scale,
+                }
+
+            result = mutate(bucket, now)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (scope, request_level, token_level, updated_at, blocked_until, rate_scale) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.scope, bucket["request_level"], bucket["token_level"], now, bucket["blocked_until"], bucket["rate_scale"]),
+            )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            conn.close()
+
+    def _try_acquire(self, tokens: int) -> float:
+        """尝试取令牌，成功返回0，否则返回建议等待的秒数"""
+
+        def mutate(bucket, now):
+            if bucket["blocked_until"] > now:
+                return bucket["blocked_until"] - now
+
+            scale = bucket["rate_scale"]
+            wait = 0.0
+            if bucket["request_level"] < 1.0:
+                wait = (1.0 - bucket["request_level"]) / (self.requests_per_minute / 60.0 * scale)
+            # 单次请求超过桶容量时只要求桶满即可放行(允许透支，由后续补充偿还)
+            token_need = min(tokens, self.token_capacity)
+            if self.token_capacity > 0 and bucket["token_level"] < token_need:
+                wait = max(wait, (token_need - bucket["token_level"]) / (self.tokens_per_minute / 60.0 * scale))
+            if wait > 0:
+                return wait
+
+            bucket["request_level"] -= 1.0
+            if self.token_capacity > 0:
+                bucket["token_level"] -= tokens
+            return 0.0
+
+        return self._update_bucket(mutate)
+
+    def _next_sleep(self, wait: float, waited: float) -> Optional[float]:
+        """计算下一次休眠时长；超过最长排队时间时返回None(放行)"""
+        if waited >= self.max_wait:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            logger.warning(f"LLM限流排队超过 {self.max_wait:.0f} 秒，直接放行")
+            return None
+        # 分段休眠并加入少量抖动，避免多个进程同时醒来争抢
+        return min(wait, 2.0, self.max_wait - waited) + random.uniform(0, 0.05)
+
+    def _record_acquired(self, waited: float):
+        with self._lock:
+            self._stats["acquired"] += 1
+            if waited > 0:
+                self._stats["throttled"] += 1
+                self._stats["wait_seconds"] += waited
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        阻塞直到获得一次调用的配额
+
+        Args:
+            tokens: 本次调用预计消耗的token数
+
+        Returns:
+            实际排队等待的秒数
+        """
+        waited = 0.0
+        while True:
+            try:
+                wait = self._try_acquire(tokens)
+            except sqlite3.Error as e:
+                # 共享状态不可用时不阻塞业务调用
+                logger.warning(f"LLM限流状态读取失败，本次不限流: {str(e)}")
+                break
+            if wait <= 0:
+                break
+            sleep_for = self._next_sleep(wait, waited)
+            if sleep_for is None:
+                break
+            time.sleep(sleep_for)
+            waited += sleep_for
+        self._record_acquired(waited)
+        return waited
+
+    async def aacquire(self, tokens: int = 1) -> float:
+        """acquire 的异步版本，SQLite读写放到线程池执行，排队期间不阻塞事件循环"""
+        waited = 0.0
+        while True:
+            try:
+                wait = await asyncio.to_thread(self._try_acquire, tokens)
+            except sqlite3.Error as e:
+                logger.warning(f"LLM限流状态读取失败，本次不限流: {str(e)}")
+                break
+            if wait <= 0:
+                break
+            sleep_for = self._next_sleep(wait, waited)
+            if sleep_for is None:
+                break
+            await asyncio.sleep(sleep_for)
+            waited += sleep_for
+        self._record_acquired(waited)
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """调用完成后按实际token用量修正令牌桶(多退少补)"""
+        if self.token_capacity <= 0 or not actual_tokens:
+            return
+        delta = estimated_tokens - int(actual_tokens)
+        if delta == 0:
+            return
+
+        def mutate(bucket, now):
+            bucket["token_level"] = min(self.token_capacity, bucket["token_level"] + delta)
+
+        self._safe_update(mutate)
+
+    def observe_response(self, status_code: int, headers: Any):
+        """
+        根据响应状态与限流响应头调整共享状态
+
+        - 429: 暂停到 Retry-After 之后，并将速率系数减半
+        - 其他: 速率系数线性恢复；x-ratelimit-remaining-* 为0时暂停到对应的reset时间
+        """
+        retry_after = get_retry_after(headers)
+        remaining_requests = self._header_number(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = self._header_number(headers, "x-ratelimit-remaining-tokens")
+        reset_requests = parse_duration(headers.get("x-ratelimit-reset-requests")) if headers is not None else None
+        reset_tokens = parse_duration(headers.get("x-ratelimit-reset-tokens")) if headers is not None else None
+
+        if status_code == 429:
+            with self._lock:
+                self._stats["rate_limited"] += 1
+            pause = retry_after if retry_after is not None else DEFAULT_RATE_LIMITED_PAUSE
+
+            def mutate(bucket, now):
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + pause)
+                bucket["rate_scale"] = max(MIN_RATE_SCALE, bucket["rate_scale"] * 0.5)
+                bucket["request_level"] = min(bucket["request_level"], 0.0)
+        else:
+            def mutate(bucket, now):
+                bucket["rate_scale"] = min(1.0, bucket["rate_scale"] + RATE_SCALE_RECOVERY)
+                if remaining_requests is not None:
+                    bucket["request_level"] = min(bucket["request_level"], remaining_requests)
+                    if remaining_requests <= 0 and reset_requests:
+                        bucket["blocked_until"] = max(bucket["blocked_until"], now + reset_requests)
+                if remaining_tokens is not None and self.token_capacity > 0:
+                    bucket["token_level"] = min(bucket["token_level"], remaining_tokens)
+                    if remaining_tokens <= 0 and reset_tokens:
+                        bucket["blocked_until"] = max(bucket["blocked_until"], now + reset_tokens)
+
+        self._safe_update(mutate)
+
+    @staticmethod
+    def _header_number(headers: Any, name: str) -> Optional[float]:
+        if headers is None:
+            return None
+        value = headers.get(name)
+        if value is None or value == "":
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    def _safe_update(self, mutate):
+        try:
+            self._update_bucket(mutate)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM限流状态更新失败: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取本进程的限流统计与共享的速率系数"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats["requests_per_minute"] = self.requests_per_minute
+        stats["tokens_per_minute"] = self.tokens_per_minute
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT rate_scale, blocked_until FROM rate_buckets WHERE scope = ?", (self.scope,)
+                ).fetchone()
+            if row is not None:
+                stats["rate_scale"] = round(row[0], 3)
+                stats["blocked_for_seconds"] = round(max(0.0, row[1] - time.time()), 3)
+        except sqlite3.Error:
+            pass
+        return stats
+
+
+_limiters: Dict[Tuple[str, float, float, str], SharedRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(scope: str) -> Optional[SharedRateLimiter]:
+    """
+    获取作用域对应的进程内共享限流器
+
+    未配置 LLM_RATE_LIMIT_RPM 时返回None(不限流)
+    """
+    requests_per_minute = _read_env_number("LLM_RATE_LIMIT_RPM", 0)
+    if requests_per_minute <= 0:
+        return None
+    tokens_per_minute = _read_env_number("LLM_RATE_LIMIT_TPM", 0)
+    db_path = os.getenv("LLM_RATE_LIMIT_DB") or os.path.join("cache", "llm_rate_limit.db")
+
+    key = (scope, requests_per_minute, tokens_per_minute, db_path)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = SharedRateLimiter(
+                scope,
+                requests_per_minute,
+                tokens_per_minute,
+                db_path=db_path,
+                max_wait=_read_env_number("LLM_RATE_LIMIT_MAX_WAIT", 600.0),
+            )
+            _limiters[key] = limiter
+        return limiter
+
+
+def get_rate_limiter_for(base_url: Optional[str], api_key: Optional[str]) -> Optional[SharedRateLimiter]:
+    """按LLM客户端的base_url与API Key获取限流器"""
+    return get_rate_limiter(scope_for_base_url(base_url, api_key))
+
+
+def _limiter_for_response(response) -> Optional[SharedRateLimiter]:
+    request = response.request
+    authorization = request.headers.get("authorization", "")
+    api_key = authorization[7:] if authorization.lower().startswith("bearer ") else authorization
+    return get_rate_limiter(make_scope(request.url.host, api_key))
+
+
+def observe_response_hook(response):
+    """httpx同步客户端的response事件钩子，把限流响应头反馈给共享限流器"""
+    try:
+        limiter = _limiter_for_response(response)
+        if limiter is not None:
+            limiter.observe_response(response.status_code, response.headers)
+    except Exception as e:
+        logger.warning(f"LLM限流响应头处理失败: {str(e)}")
+
+
+async def aobserve_response_hook(response):
+    """httpx异步客户端的response事件钩子，SQLite写入放到线程池执行"""
+    await asyncio.to_thread(observe_response_hook, response)
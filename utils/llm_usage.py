@@ -0,0 +1,159 @@
+"""
+LLM调用用量统计模块
+记录每次LLM调用的token用量(response.usage)与耗时，按调用节点和整次运行汇总
+
+各引擎运行在独立进程(Streamlit)中，统计结果会原子写入 logs/llm_usage/<engine>.json，
+供主Flask应用的 /api/llm_usage 接口统一读取
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+USAGE_DIR = os.path.join("logs", "llm_usage")
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "cached_calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "latency_seconds": 0.0,
+        "max_latency_seconds": 0.0,
+    }
+
+
+class LLMUsageTracker:
+    """线程安全的LLM用量统计器，一次研究运行对应一个统计周期"""
+
+    def __init__(self, engine_name: str, persist_path: Optional[str] = None):
+        """
+        初始化统计器
+
+        Args:
+            engine_name: 引擎名称(insight/query/media/report)
+            persist_path: 汇总结果的持久化路径，为None时不落盘
+        """
+        self.engine_name = engine_name
+        self.persist_path = persist_path
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """开始新的统计周期(新的研究运行)"""
+        with self._lock:
+            self._run_started_at = time.time()
+            self._totals = _empty_bucket()
+            self._by_node: Dict[str, Dict[str, Any]] = {}
+        self._persist()
+
+    def record(
+        self,
+        node_name: Optional[str],
+        model: str,
+        usage: Any = None,
+        latency_seconds: float = 0.0,
+        cached: bool = False,
+        first_token_seconds: Optional[float] = None,
+    ):
+        """
+        记录一次LLM调用
+
+        Args:
+            node_name: 调用方节点名称，未知时记为"unknown"
+            model: 模型名称
+            usage: OpenAI响应中的usage对象或字典(可为None)
+            latency_seconds: 调用耗时(秒)
+            cached: 是否命中响应缓存
+            first_token_seconds: 流式调用的首token延迟(秒)
+        """
+        prompt_tokens = self._usage_value(usage, "prompt_tokens")
+        completion_tokens = self._usage_value(usage, "completion_tokens")
+        total_tokens = self._usage_value(usage, "total_tokens") or (prompt_tokens + completion_tokens)
+
+        with self._lock:
+            node_bucket = self._by_node.setdefault(node_name or "unknown", _empty_bucket())
+            node_bucket["model"] = model
+            for bucket in (self._totals, node_bucket):
+                bucket["calls"] += 1
+                if cached:
+                    bucket["cached_calls"] += 1
+                bucket["prompt_tokens"] += prompt_tokens
+                bucket["completion_tokens"] += completion_tokens
+                bucket["total_tokens"] += total_tokens
+                bucket["latency_seconds"] += latency_seconds
+                bucket["max_latency_seconds"] = max(bucket["max_latency_seconds"], latency_seconds)
+            if first_token_seconds is not None:
+                node_bucket["last_first_token_seconds"] = round(first_token_seconds, 3)
+        self._persist()
+
+    @staticmethod
+    def _usage_value(usage: Any, key: str) -> int:
+        if usage is None:
+            return 0
+        value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+        try:
+            return int(value or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def get_summary(self) -> Dict[str, Any]:
+        """获取本次运行的汇总(总计 + 按节点)"""
+        with self._lock:
+            totals = dict(self._totals)
+            by_node = {name: dict(bucket) for name, bucket in self._by_node.items()}
+            started_at = self._run_started_at
+
+        for bucket in [totals] + list(by_node.values()):
+            bucket["latency_seconds"] = round(bucket["latency_seconds"], 3)
+            bucket["max_latency_seconds"] = round(bucket["max_latency_seconds"], 3)
+            real_calls = bucket["calls"] - bucket["cached_calls"]
+            bucket["avg_latency_seconds"] = round(bucket["latency_seconds"] / real_calls, 3) if real_calls else 0.0
+
+        return {
+            "engine": self.engine_name,
+            "run_started_at": started_at,
+            "wall_time_seconds": round(time.time() - started_at, 3),
+            "totals": totals,
+            "by_node": by_node,
+        }
+
+    def _persist(self):
+        """原子写入汇总文件"""
+        if not self.persist_path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".usage_", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.get_summary(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            print(f"LLM用量统计写入失败: {str(e)}")
+
+
+def get_usage_path(engine_name: str) -> str:
+    """获取引擎用量汇总文件路径"""
+    return os.path.join(USAGE_DIR, f"{engine_name}.json")
+
+
+def load_all_usage() -> Dict[str, Any]:
+    """读取所有引擎最近一次运行的用量汇总"""
+    results = {}
+    if not os.path.isdir(USAGE_DIR):
+        return results
+    for filename in sorted(os.listdir(USAGE_DIR)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(USAGE_DIR, filename), "r", encoding="utf-8") as f:
+                results[filename[:-5]] = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            results[filename[:-5]] = {"error": str(e)}
+    return results
@@ -4,12 +4,19 @@
 """
 
 import time
+import random
+import asyncio
 import logging
 from functools import wraps
 from typing import Callable, Any, Union, List, Type
 import requests
 from openai import OpenAI
 
+try:
+    from llm_rate_limiter import get_retry_after
+except ImportError:
+    get_retry_after = None
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -55,9 +62,52 @@ class RetryConfig:
         else:
             self.retry_on_exceptions = retry_on_exceptions
 
+class DeadlineExceededError(TimeoutError):
+    """调用方的时间预算已耗尽，重试装饰器遇到此异常时直接抛出，不再重试"""
+
+
+class StreamInterruptedError(Exception):
+    """流式输出已向调用方产出部分内容后中断，重新发起会让调用方收到重复内容，因此不再重试"""
+    retryable = False
+
+
 # 默认配置
 DEFAULT_RETRY_CONFIG = RetryConfig()
 
+def _remaining_budget(args: tuple):
+    """
+    读取被装饰方法所属对象的剩余时间预算(秒)
+
+    对象提供 remaining_budget() 方法时生效(如设置了截止时间的LLMClient)，否则返回None
+    """
+    owner = args[0] if args else None
+    getter = getattr(owner, "remaining_budget", None)
+    if not callable(getter):
+        return None
+    try:
+        return getter()
+    except Exception:
+        return None
+
+def _compute_delay(config: RetryConfig, attempt: int, exception: Exception) -> float:
+    """
+    计算下一次重试前的等待时间
+
+    服务端在429/503等响应中给出 Retry-After 时按其等待(不超过max_delay)，
+    避免固定指数退避在限流场景下长时间空等；否则使用指数退避
+    """
+    response = getattr(exception, "response", None)
+    headers = getattr(response, "headers", None)
+    if get_retry_after is not None and headers is not None:
+        retry_after = get_retry_after(headers)
+        if retry_after is not None:
+            # 加入少量抖动，避免多个进程在同一时刻重试
+            return min(retry_after + random.uniform(0, 1.0), config.max_delay)
+    return min(
+        config.initial_delay * (config.backoff_factor ** attempt),
+        config.max_delay
+    )
+
 def with_retry(config: RetryConfig = None):
     """
     重试装饰器
@@ -83,9 +133,16 @@ def with_retry(config: RetryConfig = None):
                         logger.info(f"函数 {func.__name__} 在第 {attempt + 1} 次尝试后成功")
                     return result
                     
+                except DeadlineExceededError:
+                    raise
+                    
                 except config.retry_on_exceptions as e:
                     last_exception = e
                     
+                    if getattr(e, "retryable", True) is False:
+                        # 异常声明自身不可重试
+                        raise
+                    
                     if attempt == config.max_retries:
                         # 最后一次尝试也失败了
                         logger.error(f"函数 {func.__name__} 在 {config.max_retries + 1} 次尝试后仍然失败")
@@ -93,10 +150,12 @@ def with_retry(config: RetryConfig = None):
                         raise e
                     
                     # 计算延迟时间
-                    delay = min(
-                        config.initial_delay * (config.backoff_factor ** attempt),
-                        config.max_delay
-                    )
+                    delay = _compute_delay(config, attempt, e)
+                    
+                    remaining = _remaining_budget(args)
+                    if remaining is not None and remaining <= delay:
+                        logger.error(f"函数 {func.__name__} 剩余时间预算 {remaining:.1f} 秒不足以等待重试")
+                        raise DeadlineExceededError(f"时间预算不足以在 {delay:.1f} 秒后重试: {str(e)}") from e
                     
                     logger.warning(f"函数 {func.__name__} 第 {attempt + 1} 次尝试失败: {str(e)}")
                     logger.info(f"将在 {delay:.1f} 秒后进行第 {attempt + 2} 次尝试...")
@@ -115,6 +174,68 @@ def with_retry(config: RetryConfig = None):
         return wrapper
     return decorator
 
+def with_async_retry(config: RetryConfig = None):
+    """
+    异步重试装饰器，重试语义与 with_retry 完全一致，只是用 asyncio.sleep 代替 time.sleep
+    
+    Args:
+        config: 重试配置，如果不提供则使用默认配置
+    
+    Returns:
+        装饰器函数
+    """
+    if config is None:
+        config = DEFAULT_RETRY_CONFIG
+    
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            last_exception = None
+            
+            for attempt in range(config.max_retries + 1):  # +1 因为第一次不算重试
+                try:
+                    result = await func(*args, **kwargs)
+                    if attempt > 0:
+                        logger.info(f"函数 {func.__name__} 在第 {attempt + 1} 次尝试后成功")
+                    return result
+                    
+                except (asyncio.CancelledError, DeadlineExceededError):
+                    # 任务取消与预算耗尽不属于可重试错误
+                    raise
+                    
+                except config.retry_on_exceptions as e:
+                    last_exception = e
+                    
+                    if getattr(e, "retryable", True) is False:
+                        raise
+                    
+                    if attempt == config.max_retries:
+                        logger.error(f"函数 {func.__name__} 在 {config.max_retries + 1} 次尝试后仍然失败")
+                        logger.error(f"最终错误: {str(e)}")
+                        raise e
+                    
+                    delay = _compute_delay(config, attempt, e)
+                    
+                    remaining = _remaining_budget(args)
+                    if remaining is not None and remaining <= delay:
+                        logger.error(f"函数 {func.__name__} 剩余时间预算 {remaining:.1f} 秒不足以等待重试")
+                        raise DeadlineExceededError(f"时间预算不足以在 {delay:.1f} 秒后重试: {str(e)}") from e
+                    
+                    logger.warning(f"函数 {func.__name__} 第 {attempt + 1} 次尝试失败: {str(e)}")
+                    logger.info(f"将在 {delay:.1f} 秒后进行第 {attempt + 2} 次尝试...")
+                    
+                    await asyncio.sleep(delay)
+                
+                except Exception as e:
+                    logger.error(f"函数 {func.__name__} 遇到不可重试的异常: {str(e)}")
+                    raise e
+            
+            if last_exception:
+                raise last_exception
+            
+        return wrapper
+    return decorator
+
 def retry_on_network_error(
     max_retries: int = 3,
     initial_delay: float = 1.0,
@@ -172,6 +293,11 @@ def with_graceful_retry(config: RetryConfig = None, default_return=None):
                 except config.retry_on_exceptions as e:
                     last_exception = e
                     
+                    if getattr(e, "retryable", True) is False:
+                        # 异常声明自身不可重试(如搜索回放未命中)，直接返回默认值
+                        logger.warning(f"非关键API {func.__name__} 遇到不可重试的异常: {str(e)}")
+                        return default_return
+                    
                     if attempt == config.max_retries:
                         # 最后一次尝试也失败了，返回默认值而不抛出异常
                         logger.warning(f"非关键API {func.__name__} 在 {config.max_retries + 1} 次尝试后仍然失败")
@@ -180,10 +306,7 @@ def with_graceful_retry(config: RetryConfig = None, default_return=None):
                         return default_return
                     
                     # 计算延迟时间
-                    delay = min(
-                        config.initial_delay * (config.backoff_factor ** attempt),
-                        config.max_delay
-                    )
+                    delay = _compute_delay(config, attempt, e)
                     
                     logger.warning(f"非关键API {func.__name__} 第 {attempt + 1} 次尝试失败: {str(e)}")
                     logger.info(f"将在 {delay:.1f} 秒后进行第 {attempt + 2} 次尝试...")
@@ -0,0 +1,308 @@
+"""
+搜索后端抽象
+- SearchBackend: 各搜索后端(Tavily、Bocha、本地语料库)共同实现的最小接口 search(query, max_results) -> List[SearchHit]
+- LocalCorpusSearch: 把一个目录下保存的文章/论文索引到SQLite FTS5，在本地完成检索
+
+本地后端适合指向离线整理的跑步运动科学文献库: 检索耗时为毫秒级，没有API限流，结果完全确定，
+便于性能测试。支持的文件类型: .md / .markdown / .txt / .html / .htm / .json
+(.json 可以是单篇 {"title","url","content","published_date"} 或其列表)
+
+分词: FTS5默认分词器不切分中文，这里在建索引和查询时自行把中文片段切成单字+二元组、英文按词小写化，
+再交给FTS5的unicode61分词器；查询词之间为OR关系，按bm25排序，以"-"开头的词表示排除
+"""
+
+import os
+import re
+import json
+import html
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple, runtime_checkable
+
+
+@dataclass
+class SearchHit:
+    """后端无关的单条搜索结果"""
+    title: str
+    url: str
+    content: str
+    score: Optional[float] = None
+    published_date: Optional[str] = None
+    source: str = ""
+
+
+@runtime_checkable
+class SearchBackend(Protocol):
+    """搜索后端接口"""
+
+    name: str
+
+    def search(self, query: str, max_results: int = 10) -> List[SearchHit]:
+        """执行一次搜索，按相关度降序返回结果"""
+        ...
+
+
+SUPPORTED_EXTENSIONS = (".md", ".markdown", ".txt", ".html", ".htm", ".json")
+
+_CJK_RUN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]+')
+_WORD_PATTERN = re.compile(r'[0-9a-z]+')
+_TAG_PATTERN = re.compile(r'<(script|style)[^>]*>.*?</\1>|<[^>]+>', re.S | re.I)
+_HTML_TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title>', re.S | re.I)
+_DATE_PATTERN = re.compile(r'(20\d{2}|19\d{2})[-/.](\d{1,2})[-/.](\d{1,2})')
+
+
+def segment(text: str) -> List[str]:
+    """把中英文混合文本切成索引词: 中文为单字+二元组，英文/数字为小写的词"""
+    tokens: List[str] = []
+    lowered = (text or "").lower()
+    position = 0
+    for match in _CJK_RUN_PATTERN.finditer(lowered):
+        tokens.extend(_WORD_PATTERN.findall(lowered[position:match.start()]))
+        run = match.group()
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        position = match.end()
+    tokens.extend(_WORD_PATTERN.findall(lowered[position:]))
+    return tokens
+
+
+def _quote(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+
+def build_match_expression(query: str) -> Optional[str]:
+    """把自由文本查询转换为FTS5 MATCH表达式；没有可检索的词时返回None"""
+    include: List[str] = []
+    exclude: List[str] = []
+    for part in (query or "").split():
+        target = exclude if part.startswith("-") and len(part) > 1 else include
+        for token in segment(part.lstrip("-") if target is exclude else part):
+            if token not in target:
+                target.append(token)
+    if not include:
+        return None
+    expression = " OR ".join(_quote(token) for token in include)
+    if exclude:
+        expression = f"({expression}) NOT ({' OR '.join(_quote(token) for token in exclude)})"
+    return expression
+
+
+def _read_documents(path: str) -> List[Dict[str, Any]]:
+    """读取一个语料文件，返回 [{title, url, content, published_date}, ...]"""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        raw = f.read()
+    name = os.path.splitext(os.path.basename(path))[0]
+    extension = os.path.splitext(path)[1].lower()
+    url = "file://" + os.path.abspath(path)
+
+    if extension == ".json":
+        data = json.loads(raw)
+        items = data if isinstance(data, list) else [data]
+        documents = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get("content"):
+                continue
+            documents.append({
+                "title": item.get("title") or f"{name} #{index + 1}",
+                "url": item.get("url") or f"{url}#{index + 1}",
+                "content": str(item["content"]),
+                "published_date": item.get("published_date"),
+            })
+        return documents
+
+    title = name
+    if extension in (".html", ".htm"):
+        match = _HTML_TITLE_PATTERN.search(raw)
+        if match:
+            title = html.unescape(match.group(1)).strip() or name
+        raw = html.unescape(_TAG_PATTERN.sub(" ", raw))
+    elif extension in (".md", ".markdown"):
+        for line in raw.splitlines():
+            if line.startswith("# "):
+                title = line[2:].strip() or name
+                break
+    content = re.sub(r'[ \t]+', ' ', raw).strip()
+    date_match = _DATE_PATTERN.search(content[:500])
+    published_date = None
+    if date_match:
+        published_date = f"{date_match.group(1)}-{int(date_match.group(2)):02d}-{int(date_match.group(3)):02d}"
+    return [{"title": title, "url": url, "content": content, "published_date": published_date}]
+
+
+def _make_snippet(content: str, terms: Iterable[str], length: int) -> str:
+    """截取内容中首个查询词附近的一段作为摘要"""
+    lowered = content.lower()
+    positions = [lowered.find(term) for term in terms if term]
+    positions = [p for p in positions if p >= 0]
+    if not positions or len(content) <= length:
+        return content[:length]
+    start = max(0, min(positions) - length // 4)
+    snippet = content[start:start + length]
+    return ("…" if start > 0 else "") + snippet
+
+
+class LocalCorpusSearch:
+    """基于SQLite FTS5的本地语料库检索后端"""
+
+    name = "local"
+
+    def __init__(self, corpus_dir: str, index_path: str = "cache/local_corpus.db", snippet_length: int = 1500):
+        """
+        Args:
+            corpus_dir: 语料目录(递归索引其中支持的文件)
+            index_path: 索引数据库路径
+            snippet_length: 每条结果返回的内容长度(字符)
+        """
+        self.corpus_dir = corpus_dir
+        self.index_path = index_path
+        self.snippet_length = snippet_length
+        self._lock = threading.Lock()
+
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    mtime REAL NOT NULL,
+                    title TEXT,
+                    url TEXT,
+                    content TEXT,
+                    published_date TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_path ON documents(path)")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, body, tokenize = 'unicode61')"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每次操作独立连接，可在多线程(并行段落、批量搜索)中安全使用
+        return sqlite3.connect(self.index_path, timeout=10)
+
+    def build_index(self, rebuild: bool = False) -> Dict[str, int]:
+        """
+        增量索引语料目录: 新增或修改过的文件重新索引，已删除的文件从索引中移除
+
+        Args:
+            rebuild: 是否清空后全量重建
+
+        Returns:
+            {"indexed": 新索引文件数, "removed": 移除文件数, "documents": 索引中的文档总数}
+        """
+        files: Dict[str, float] = {}
+        if os.path.isdir(self.corpus_dir):
+            for root, _, names in os.walk(self.corpus_dir):
+                for name in names:
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        files[path] = os.path.getmtime(path)
+        else:
+            print(f"⚠️ 本地语料目录不存在: {self.corpus_dir}")
+
+        indexed = removed = 0
+        with self._lock, self._connect() as conn:
+            if rebuild:
+                conn.execute("DELETE FROM documents")
+                conn.execute("DELETE FROM documents_fts")
+            known = dict(conn.execute("SELECT path, MAX(mtime) FROM documents GROUP BY path").fetchall())
+
+            for path in set(known) - set(files):
+                self._remove_path(conn, path)
+                removed += 1
+
+            for path, mtime in files.items():
+                if known.get(path) == mtime:
+                    continue
+                try:
+                    documents = _read_documents(path)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ 跳过无法读取的语料文件 {path}: {str(e)}")
+                    continue
+                self._remove_path(conn, path)
+                for document in documents:
+                    cursor = conn.execute(
+                        "INSERT INTO documents (path, mtime, title, url, content, published_date) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, mtime, document["title"], document["url"], document["content"],
+                         document["published_date"]),
+                    )
+                    conn.execute(
+                        "INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, " ".join(segment(document["title"])),
+                         " ".join(segment(document["content"]))),
+                    )
+                indexed += 1
+            total = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+        print(f"本地语料索引: 新索引 {indexed} 个文件, 移除 {removed} 个, 共 {total} 篇文档")
+        return {"indexed": indexed, "removed": removed, "documents": total}
+
+    @staticmethod
+    def _remove_path(conn: sqlite3.Connection, path: str):
+        ids = [row[0] for row in conn.execute("SELECT id FROM documents WHERE path = ?", (path,))]
+        conn.executemany("DELETE FROM documents_fts WHERE rowid = ?", [(i,) for i in ids])
+        conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+
+    def search(self, query: str, max_results: int = 10) -> List[SearchHit]:
+        """
+        检索本地语料
+
+        Args:
+            query: 查询文本
+            max_results: 返回结果数上限
+
+        Returns:
+            按bm25相关度降序的结果(score越大越相关)
+        """
+        expression = build_match_expression(query)
+        if expression is None:
+            return []
+        sql = (
+            "SELECT d.title, d.url, d.content, d.published_date, bm25(documents_fts, 5.0, 1.0) AS rank "
+            "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+            "WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?"
+        )
+        params = (expression, max(1, int(max_results)))
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"本地语料检索失败: {str(e)}")
+            return []
+
+        terms = [part.lstrip("-") for part in query.lower().split() if not part.startswith("-")]
+        return [
+            SearchHit(
+                title=title,
+                url=url,
+                content=_make_snippet(content, terms, self.snippet_length),
+                # FTS5的bm25越小越相关，取相反数使得分越大越相关
+                score=round(-rank, 4),
+                published_date=published_date,
+                source=self.name,
+            )
+            for title, url, content, published_date, rank in rows
+        ]
+
+
+_backends: Dict[Tuple[str, str], LocalCorpusSearch] = {}
+_backends_lock = threading.Lock()
+
+
+def get_local_corpus_search(corpus_dir: str, index_path: str = "cache/local_corpus.db") -> LocalCorpusSearch:
+    """获取进程内共享的本地语料后端，首次创建时增量更新索引"""
+    key = (os.path.abspath(corpus_dir), os.path.abspath(index_path))
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = LocalCorpusSearch(corpus_dir, index_path)
+            backend.build_index()
+            _backends[key] = backend
+        return backend
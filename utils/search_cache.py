@@ -0,0 +1,262 @@
+"""
+搜索结果缓存模块
+按 hash(命名空间, 搜索参数) 将搜索API的返回结果持久化到SQLite，供多次运行、多用户及反思轮次复用
+
+有效期分两段:
+- 新鲜期(ttl_seconds): 直接返回缓存
+- 过期宽限期(stale_seconds): 仍先返回旧结果，同时在后台线程刷新(stale-while-revalidate)
+超过宽限期的条目视为未命中，同步重新请求
+
+条目总数超过 max_entries 时按最近访问时间淘汰
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+
+class SearchResultCache:
+    """SQLite持久化的搜索结果缓存(TTL + 过期后台刷新 + 容量淘汰)"""
+
+    def __init__(
+        self,
+        db_path: str = "cache/search_cache.db",
+        ttl_seconds: int = 604800,
+        stale_seconds: int = 86400,
+        max_entries: int = 2000,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite文件路径
+            ttl_seconds: 新鲜期（秒），<=0 表示永不过期
+            stale_seconds: 新鲜期之后仍可返回旧结果并后台刷新的宽限期（秒）
+            max_entries: 最大条目数，<=0 表示不限制
+        """
+        self.db_path = db_path
+        self.ttl_seconds = int(ttl_seconds)
+        self.stale_seconds = max(0, int(stale_seconds))
+        self.max_entries = int(max_entries)
+
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "evictions": 0,
+        }
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    namespace TEXT,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache(accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每次操作独立连接，避免跨线程共享连接
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """计算缓存键(参数中的列表按原顺序参与计算，调用方需保证顺序稳定)"""
+        payload = json.dumps({"namespace": namespace, "params": params}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _freshness(self, created_at: float, now: float) -> str:
+        """返回 fresh / stale / expired"""
+        if self.ttl_seconds <= 0:
+            return "fresh"
+        age = now - created_at
+        if age < self.ttl_seconds:
+            return "fresh"
+        if age < self.ttl_seconds + self.stale_seconds:
+            return "stale"
+        return "expired"
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """
+        读取缓存
+
+        Returns:
+            (结果, 是否已过新鲜期)；未命中或超过宽限期时返回None
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload, created_at FROM search_cache WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                freshness = self._freshness(row[1], now)
+                if freshness == "expired":
+                    conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (key,))
+                    return None
+                conn.execute("UPDATE search_cache SET accessed_at = ? WHERE cache_key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"搜索缓存读取失败: {str(e)}")
+            return None
+
+        try:
+            value = json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+        return value, freshness == "stale"
+
+    def set(self, key: str, value: Any, namespace: str = ""):
+        """写入缓存并按容量淘汰最久未访问的条目"""
+        now = time.time()
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (cache_key, namespace, payload, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, namespace, payload, now, now),
+                )
+                evicted = 0
+                if self.max_entries > 0:
+                    evicted = conn.execute(
+                        "DELETE FROM search_cache WHERE cache_key IN ("
+                        "SELECT cache_key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    ).rowcount
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"搜索缓存写入失败: {str(e)}")
+            return
+
+        with self._lock:
+            self._stats["writes"] += 1
+            self._stats["evictions"] += max(0, evicted)
+
+    def fetch(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        namespace: str = "",
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        读取缓存，未命中时调用loader并写入；命中过期条目时先返回旧结果再后台刷新
+
+        Args:
+            key: 缓存键
+            loader: 实际请求搜索API的无参函数，返回可JSON序列化的结果
+            namespace: 命名空间(仅用于记录来源)
+            cacheable: 判断结果是否应写入缓存(如失败时的默认返回值不应缓存)
+
+        Returns:
+            缓存中或新请求得到的结果
+        """
+        cached = self.get(key)
+        if cached is not None:
+            value, stale = cached
+            with self._lock:
+                self._stats["stale_hits" if stale else "hits"] += 1
+            if stale:
+                self._refresh_in_background(key, loader, namespace, cacheable)
+            return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        value = loader()
+        if cacheable is None or cacheable(value):
+            self.set(key, value, namespace)
+        return value
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any], namespace: str,
+                               cacheable: Optional[Callable[[Any], bool]]):
+        """后台刷新过期条目，同一个键同时只刷新一次"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = loader()
+                if cacheable is None or cacheable(value):
+                    self.set(key, value, namespace)
+                    with self._lock:
+                        self._stats["refreshes"] += 1
+                else:
+                    with self._lock:
+                        self._stats["refresh_failures"] += 1
+            except Exception as e:
+                print(f"搜索缓存后台刷新失败: {str(e)}")
+                with self._lock:
+                    self._stats["refresh_failures"] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="search-cache-refresh", daemon=True).start()
+
+    def purge_expired(self) -> int:
+        """清理已超过宽限期的条目，返回删除数量"""
+        if self.ttl_seconds <= 0:
+            return 0
+        cutoff = time.time() - self.ttl_seconds - self.stale_seconds
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM search_cache WHERE created_at <= ?", (cutoff,))
+            return cursor.rowcount
+
+    def clear(self):
+        """清空所有缓存"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM search_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["hits"] + stats["stale_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        try:
+            with self._connect() as conn:
+                stats["entries"] = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        except sqlite3.Error:
+            stats["entries"] = None
+        return stats
+
+
+_caches: Dict[Tuple[str, int, int, int], SearchResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(
+    db_path: str = "cache/search_cache.db",
+    ttl_seconds: int = 604800,
+    stale_seconds: int = 86400,
+    max_entries: int = 2000,
+) -> SearchResultCache:
+    """获取进程内共享的缓存实例（相同参数复用同一实例，从而共享统计与刷新状态）"""
+    key = (db_path, int(ttl_seconds), int(stale_seconds), int(max_entries))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = SearchResultCache(db_path, ttl_seconds, stale_seconds, max_entries)
+            _caches[key] = cache
+        return cache
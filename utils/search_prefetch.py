@@ -0,0 +1,137 @@
+"""
+推测式搜索预取模块
+在总结节点等待LLM生成时，后台预先执行下一轮反思"可能"使用的搜索查询；
+反思节点给出实际查询后，若与某个预取查询足够相似则直接使用其结果，从而让网络I/O与LLM生成重叠
+
+预取结果按作用域(如段落索引)隔离，只在短时间内有效，过期或未被使用的预取会被丢弃
+"""
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class SearchPrefetcher:
+    """按作用域管理的推测式搜索预取器"""
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        similarity: Callable[[str, str], float],
+        threshold: float = 0.85,
+        ttl_seconds: float = 120,
+        max_workers: int = 2,
+        wait_timeout: float = 30,
+    ):
+        """
+        初始化预取器
+
+        Args:
+            fetch: 执行一次搜索的函数，参数为查询
+            similarity: 计算两个查询相似度(0~1)的函数
+            threshold: 实际查询与预取查询的相似度不低于该值时复用预取结果
+            ttl_seconds: 预取结果的有效期（秒）
+            max_workers: 后台预取线程数
+            wait_timeout: 命中的预取仍在进行时最多等待的秒数
+        """
+        self.fetch = fetch
+        self.similarity = similarity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.wait_timeout = wait_timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="search-prefetch")
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, List[Tuple[str, Future, float]]] = {}
+        self._stats = {"prefetched": 0, "hits": 0, "misses": 0, "failed": 0, "discarded": 0}
+
+    def prefetch(self, scope: Hashable, queries: List[str]) -> int:
+        """
+        在后台预取一组候选查询（作用域内已在预取的查询不重复提交）
+
+        Returns:
+            本次新提交的预取数量
+        """
+        submitted = 0
+        now = time.time()
+        with self._lock:
+            entries = self._entries.setdefault(scope, [])
+            pending = {query for query, _, _ in entries}
+            for query in queries:
+                if not query or query in pending:
+                    continue
+                entries.append((query, self._executor.submit(self.fetch, query), now))
+                pending.add(query)
+                submitted += 1
+            self._stats["prefetched"] += submitted
+        return submitted
+
+    def take(self, scope: Hashable, query: str) -> Optional[Tuple[Any, str, float]]:
+        """
+        取出与实际查询最相似的预取结果
+
+        Returns:
+            (搜索结果, 命中的预取查询, 相似度)；没有足够相似的预取或预取失败时返回None
+        """
+        now = time.time()
+        best = None
+        with self._lock:
+            entries = self._entries.get(scope, [])
+            fresh = []
+            for entry in entries:
+                if now - entry[2] > self.ttl_seconds:
+                    entry[1].cancel()
+                    self._stats["discarded"] += 1
+                else:
+                    fresh.append(entry)
+            best_score = self.threshold
+            for entry in fresh:
+                score = self.similarity(query, entry[0])
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is not None:
+                fresh.remove(best)
+            self._entries[scope] = fresh
+            if best is None:
+                self._stats["misses"] += 1
+                return None
+
+        prefetched_query, future, _ = best
+        try:
+            result = future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            result = None
+        except Exception as e:
+            print(f"预取搜索失败: {str(e)}")
+            result = None
+
+        with self._lock:
+            self._stats["hits" if result is not None else "failed"] += 1
+        if result is None:
+            return None
+        return result, prefetched_query, best_score
+
+    def discard(self, scope: Hashable):
+        """丢弃作用域内剩余的预取（尚未开始的会被取消）"""
+        with self._lock:
+            entries = self._entries.pop(scope, [])
+            for _, future, _ in entries:
+                future.cancel()
+            self._stats["discarded"] += len(entries)
+
+    def clear(self):
+        """丢弃所有作用域的预取"""
+        with self._lock:
+            scopes = list(self._entries.keys())
+        for scope in scopes:
+            self.discard(scope)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取预取统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"] + stats["failed"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
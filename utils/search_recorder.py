@@ -0,0 +1,380 @@
+"""
+搜索后端录制/回放模块
+在搜索后端的请求边界(Tavily/Bocha的HTTP请求、InsightEngine的数据库查询工具)外包一层:
+- record: 照常访问网络或数据库，同时把每次请求参数与响应追加写入JSONL归档
+- replay: 直接从归档返回响应，不访问网络与数据库；同一请求被录制多次时按录制顺序依次返回
+用于离线性能剖析、回归对比以及对 /api/search 的离线压测
+
+通过环境变量配置(对所有引擎生效):
+- SEARCH_RECORD_MODE: off / record / replay（默认 off）
+- SEARCH_RECORD_PATH: 归档路径（默认 cache/search_records.jsonl）
+  以 .zst 结尾时使用zstd压缩(需安装zstandard，未安装时退回未压缩文件)，以 .gz 结尾时使用gzip压缩
+- SEARCH_REPLAY_LATENCY: 回放时按录制耗时的倍数模拟延迟（默认 0，即立即返回）
+
+压缩归档按批次写入独立的压缩帧(zstd frame / gzip member)，进程退出时写入剩余记录
+"""
+
+import os
+import gzip
+import json
+import time
+import atexit
+import inspect
+import hashlib
+import threading
+import importlib
+import dataclasses
+from datetime import date, datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+MODES = ("off", "record", "replay")
+
+
+class ReplayMissError(LookupError):
+    """回放模式下归档中没有对应请求"""
+
+    # 重试装饰器遇到不可重试的异常时直接返回默认值，不做无意义的等待
+    retryable = False
+
+
+def _encode(value: Any) -> Any:
+    """将响应对象编码为JSON兼容结构，数据类与日期带类型标记以便回放时还原"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        cls = type(value)
+        return {
+            "__dataclass__": f"{cls.__module__}:{cls.__qualname__}",
+            "fields": {f.name: _encode(getattr(value, f.name)) for f in dataclasses.fields(value)},
+        }
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_encode(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _decode(value: Any) -> Any:
+    """_encode的逆过程"""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__dataclass__" in value:
+        module_name, qualname = value["__dataclass__"].split(":", 1)
+        cls: Any = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            cls = getattr(cls, part)
+        fields = {name: _decode(v) for name, v in value["fields"].items()}
+        init_fields = {f.name for f in dataclasses.fields(cls) if f.init}
+        obj = cls(**{k: v for k, v in fields.items() if k in init_fields})
+        # init=False 的字段(以及 __post_init__ 推导出的值)按录制时的值恢复
+        for name, v in fields.items():
+            if name not in init_fields:
+                object.__setattr__(obj, name, v)
+        return obj
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__date__" in value:
+        return date.fromisoformat(value["__date__"])
+    return {k: _decode(v) for k, v in value.items()}
+
+
+class SearchRecorder:
+    """搜索请求/响应的录制与回放"""
+
+    def __init__(self, path: str, mode: str = "record", flush_every: int = 50, replay_latency: float = 0.0):
+        """
+        初始化录制器
+
+        Args:
+            path: 归档路径(.jsonl / .jsonl.zst / .jsonl.gz)
+            mode: record 或 replay
+            flush_every: 压缩归档每累计多少条记录写出一个压缩帧(未压缩归档逐条写入)
+            replay_latency: 回放时按录制耗时的倍数模拟延迟，0表示立即返回
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"不支持的录制模式: {mode}")
+        if path.endswith(".zst") and not ZSTD_AVAILABLE:
+            print(f"⚠️ 未安装zstandard，搜索录制改用未压缩归档: {path[:-4]}")
+            path = path[:-4]
+        self.path = path
+        self.mode = mode
+        self.flush_every = max(1, int(flush_every))
+        self.replay_latency = max(0.0, float(replay_latency))
+
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0, "errors": 0}
+
+        if mode == "record":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            atexit.register(self.flush)
+        else:
+            self._load()
+
+    @property
+    def compression(self) -> Optional[str]:
+        if self.path.endswith(".zst"):
+            return "zstd"
+        if self.path.endswith(".gz"):
+            return "gzip"
+        return None
+
+    @staticmethod
+    def make_key(backend: str, method: str, params: Dict[str, Any]) -> str:
+        """请求键: hash(后端, 方法, 参数)"""
+        payload = json.dumps(
+            {"backend": backend, "method": method, "params": _encode(params)},
+            ensure_ascii=False, sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ===== 归档读写 =====
+
+    def _load(self):
+        """读取整个归档并按请求键建立索引"""
+        if not os.path.exists(self.path):
+            print(f"⚠️ 搜索回放归档不存在，所有请求都将未命中: {self.path}")
+            return
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        if self.compression == "zstd":
+            data = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True).read()
+        elif self.compression == "gzip":
+            data = gzip.decompress(raw)
+        else:
+            data = raw
+
+        count = 0
+        for line in data.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # 进程异常退出时最后一行可能不完整
+                continue
+            self._records.setdefault(entry["key"], []).append(entry)
+            count += 1
+        print(f"搜索回放归档已加载: {count} 条记录, {len(self._records)} 个不同请求 ({self.path})")
+
+    def _append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._pending.append(line)
+            self._stats["recorded"] += 1
+            if self.compression is None or len(self._pending) >= self.flush_every:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        data = ("\n".join(self._pending) + "\n").encode("utf-8")
+        self._pending = []
+        if self.compression == "zstd":
+            data = zstandard.ZstdCompressor(level=10).compress(data)
+        elif self.compression == "gzip":
+            data = gzip.compress(data)
+        try:
+            with open(self.path, "ab") as f:
+                f.write(data)
+        except OSError as e:
+            self._stats["errors"] += 1
+            print(f"搜索录制写入失败: {str(e)}")
+
+    def flush(self):
+        """写出尚未落盘的记录"""
+        with self._lock:
+            self._flush_locked()
+
+    # ===== 录制与回放 =====
+
+    def call(
+        self,
+        backend: str,
+        method: str,
+        params: Dict[str, Any],
+        invoke: Callable[[], Any],
+        on_miss: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        录制模式下执行invoke并记录结果；回放模式下返回归档中的结果
+
+        Args:
+            backend: 后端名称(如 tavily / bocha / keep / garmin)
+            method: 方法名
+            params: 请求参数(参与请求键计算)
+            invoke: 实际访问网络/数据库的无参函数
+            on_miss: 回放未命中时生成返回值的函数，未提供时抛出ReplayMissError
+
+        Returns:
+            响应对象
+        """
+        key = self.make_key(backend, method, params)
+        if self.mode == "replay":
+            return self._replay(key, backend, method, on_miss)
+
+        started = time.perf_counter()
+        response = invoke()
+        elapsed = time.perf_counter() - started
+        try:
+            self._append({
+                "key": key,
+                "backend": backend,
+                "method": method,
+                "params": _encode(params),
+                "response": _encode(response),
+                "elapsed": round(elapsed, 4),
+                "recorded_at": time.time(),
+            })
+        except (TypeError, ValueError) as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            print(f"搜索录制失败({backend}.{method}): {str(e)}")
+        return response
+
+    def _replay(self, key: str, backend: str, method: str, on_miss: Optional[Callable[[], Any]]) -> Any:
+        with self._lock:
+            entries = self._records.get(key)
+            if not entries:
+                self._stats["misses"] += 1
+                entry = None
+            else:
+                # 同一请求按录制顺序依次返回，用完后重复最后一条
+                cursor = self._cursors.get(key, 0)
+                entry = entries[min(cursor, len(entries) - 1)]
+                self._cursors[key] = cursor + 1
+                self._stats["replayed"] += 1
+
+        if entry is None:
+            print(f"⚠️ 搜索回放未命中: {backend}.{method}")
+            if on_miss is not None:
+                return on_miss()
+            raise ReplayMissError(f"回放归档中没有该请求: {backend}.{method}")
+
+        if self.replay_latency > 0:
+            time.sleep(entry.get("elapsed", 0) * self.replay_latency)
+        # 每次都重新解码，调用方修改返回对象不会影响后续回放
+        return _decode(entry["response"])
+
+    def wrap(
+        self,
+        backend: str,
+        func: Callable,
+        on_miss: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    ) -> Callable:
+        """
+        包装一个(绑定)方法，参数按签名规范化(补齐默认值)后参与请求键计算
+
+        Args:
+            backend: 后端名称
+            func: 被包装的方法
+            on_miss: 回放未命中时调用，参数为 (方法名, 规范化后的参数)
+        """
+        method = func.__name__
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = dict(bound.arguments)
+            except TypeError:
+                params = {"args": list(args), "kwargs": kwargs}
+            miss = (lambda: on_miss(method, params)) if on_miss is not None else None
+            return self.call(backend, method, params, lambda: func(*args, **kwargs), miss)
+
+        wrapper.__wrapped_by_recorder__ = True
+        return wrapper
+
+    def install(
+        self,
+        obj: Any,
+        backend: str,
+        methods: Iterable[str],
+        on_miss: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+    ):
+        """在实例上用录制包装替换指定方法(不影响类本身及其他实例)"""
+        for name in methods:
+            func = getattr(obj, name, None)
+            if func is None or getattr(func, "__wrapped_by_recorder__", False):
+                continue
+            setattr(obj, name, self.wrap(backend, func, on_miss))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取录制/回放统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mode"] = self.mode
+        stats["path"] = self.path
+        if self.mode == "replay":
+            stats["archived_requests"] = len(self._records)
+        return stats
+
+
+_recorder: Optional[SearchRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_record_mode() -> str:
+    mode = str(os.getenv("SEARCH_RECORD_MODE", "off")).strip().lower()
+    if mode not in MODES:
+        print(f"⚠️ 未知的SEARCH_RECORD_MODE={mode}，已关闭搜索录制")
+        return "off"
+    return mode
+
+
+def is_replaying() -> bool:
+    """当前进程是否处于回放模式(此时搜索后端不应创建网络/数据库客户端)"""
+    return get_record_mode() == "replay"
+
+
+def get_search_recorder() -> Optional[SearchRecorder]:
+    """获取进程级共享的录制器；未开启录制/回放时返回None"""
+    global _recorder
+    mode = get_record_mode()
+    if mode == "off":
+        return None
+    with _recorder_lock:
+        if _recorder is None or _recorder.mode != mode:
+            try:
+                latency = float(os.getenv("SEARCH_REPLAY_LATENCY", "0") or 0)
+            except ValueError:
+                latency = 0.0
+            _recorder = SearchRecorder(
+                os.getenv("SEARCH_RECORD_PATH", "cache/search_records.jsonl"),
+                mode=mode,
+                replay_latency=latency,
+            )
+            print(f"搜索{'录制' if mode == 'record' else '回放'}已开启: {_recorder.path}")
+        return _recorder
+
+
+def install_search_recorder(
+    obj: Any,
+    backend: str,
+    methods: Iterable[str],
+    on_miss: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+) -> Optional[SearchRecorder]:
+    """按环境变量为搜索后端实例安装录制/回放包装，未开启时不做任何修改"""
+    recorder = get_search_recorder()
+    if recorder is not None:
+        recorder.install(obj, backend, methods, on_miss)
+    return recorder
@@ -0,0 +1,243 @@
+"""
+语义查询缓存模块
+Agent生成的查询常常只是措辞不同(大小写、空格、标点)，精确匹配的缓存无法命中。
+这里把查询表示为字符n-gram的TF-IDF向量(NumPy实现，哈希到固定维度)，在时间窗口内若新查询与某个
+已缓存查询的余弦相似度不低于阈值，则直接复用其结果，省去一次搜索API调用
+
+阈值取舍: 字符n-gram分不清只差一个词的不同查询("lactate threshold training"与"testing"约0.63~0.69)，
+因此默认阈值为0.85，只复用几乎相同的改写；增删词语的改写(如"马拉松配速策略"与"马拉松比赛配速策略研究")
+不会命中，照常搜索
+
+缓存按命名空间隔离(工具名 + 除查询外的其他参数)，只在进程内存中保存；
+命中时返回结果的深拷贝，调用方修改返回值不会影响缓存
+
+注意: 字符n-gram只能识别同一语言内的改写，无法匹配跨语言的同义查询
+"""
+
+import re
+import copy
+import time
+import zlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_CJK_RUN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]+')
+_PUNCT_PATTERN = re.compile(r'[\s\-_,.;:!?()\[\]{}"\'/\\|<>\u3000-\u303f\uff00-\uffef]+')
+
+
+def normalize_query(query: str) -> str:
+    """小写化并把标点、空白统一为单个空格"""
+    return _PUNCT_PATTERN.sub(" ", (query or "").lower()).strip()
+
+
+class CharNgramVectorizer:
+    """
+    字符n-gram哈希向量化(词频取对数缩放)
+
+    中文片段取单字与二元组；英文/数字按词切分后取词内的3~4元组(两端补空格区分词首词尾)，
+    避免英文短n-gram在不相关查询之间大量重合
+    """
+
+    def __init__(
+        self,
+        cjk_ngram_range: Tuple[int, int] = (1, 2),
+        latin_ngram_range: Tuple[int, int] = (3, 4),
+        dimensions: int = 4096,
+    ):
+        self.cjk_ngram_range = cjk_ngram_range
+        self.latin_ngram_range = latin_ngram_range
+        self.dimensions = int(dimensions)
+
+    @staticmethod
+    def _ngrams(text: str, ngram_range: Tuple[int, int]):
+        low, high = ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(text) - n + 1):
+                yield text[i:i + n]
+
+    def _grams(self, text: str):
+        normalized = normalize_query(text)
+        position = 0
+        segments = []
+        for match in _CJK_RUN_PATTERN.finditer(normalized):
+            segments.append((normalized[position:match.start()], False))
+            segments.append((match.group(), True))
+            position = match.end()
+        segments.append((normalized[position:], False))
+
+        for segment, is_cjk in segments:
+            if is_cjk:
+                yield from self._ngrams(segment, self.cjk_ngram_range)
+            else:
+                for word in segment.split():
+                    yield from self._ngrams(f" {word} ", self.latin_ngram_range)
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for gram in self._grams(text):
+            vector[zlib.crc32(gram.encode("utf-8")) % self.dimensions] += 1.0
+        np.log1p(vector, out=vector)
+        return vector
+
+
+class SemanticQueryCache:
+    """基于查询向量相似度的搜索结果缓存"""
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        ttl_seconds: float = 3600,
+        max_entries: int = 500,
+        dimensions: int = 4096,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            threshold: 余弦相似度不低于该值时复用缓存结果(1.0 相当于精确匹配)
+            ttl_seconds: 缓存结果的有效时间窗口（秒）
+            max_entries: 最多保存的查询数，超过时淘汰最早写入的
+            dimensions: 哈希向量维度
+        """
+        self.threshold = float(threshold)
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self.vectorizer = CharNgramVectorizer(dimensions=dimensions)
+
+        self._lock = threading.Lock()
+        # 各行对应一个已缓存查询: 词频向量矩阵 + 元数据
+        self._matrix = np.zeros((0, self.vectorizer.dimensions), dtype=np.float32)
+        self._entries: List[Dict[str, Any]] = []
+        self._stats = {"lookups": 0, "hits": 0, "exact_hits": 0, "misses": 0, "stores": 0, "expired": 0}
+        self._hit_similarity_sum = 0.0
+
+    def _expire_locked(self, now: float):
+        keep = [i for i, entry in enumerate(self._entries) if now - entry["created_at"] <= self.ttl_seconds]
+        if len(keep) == len(self._entries):
+            return
+        self._stats["expired"] += len(self._entries) - len(keep)
+        self._entries = [self._entries[i] for i in keep]
+        self._matrix = self._matrix[keep]
+
+    def _weighted(self, matrix: np.ndarray) -> np.ndarray:
+        """以当前缓存中的查询为语料计算IDF，返回L2归一化后的TF-IDF矩阵"""
+        document_frequency = np.count_nonzero(self._matrix, axis=0)
+        idf = np.log((1.0 + len(self._entries)) / (1.0 + document_frequency)) + 1.0
+        weighted = matrix * idf
+        norms = np.linalg.norm(weighted, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return weighted / norms
+
+    def lookup(self, namespace: str, query: str) -> Optional[Tuple[Any, str, float]]:
+        """
+        查找与查询足够相似的缓存结果
+
+        Returns:
+            (结果的深拷贝, 命中的缓存查询, 相似度)；未命中时返回None
+        """
+        now = time.time()
+        vector = self.vectorizer.transform(query)
+        normalized = normalize_query(query)
+        with self._lock:
+            self._stats["lookups"] += 1
+            self._expire_locked(now)
+            rows = [i for i, entry in enumerate(self._entries) if entry["namespace"] == namespace]
+            best = None
+            if rows and vector.any():
+                candidates = self._weighted(self._matrix[rows])
+                similarities = candidates @ self._weighted(vector[np.newaxis, :])[0]
+                position = int(np.argmax(similarities))
+                if similarities[position] >= self.threshold:
+                    best = (self._entries[rows[position]], float(similarities[position]))
+            if best is None:
+                self._stats["misses"] += 1
+                return None
+            entry, similarity = best
+            self._stats["hits"] += 1
+            if entry["normalized"] == normalized:
+                self._stats["exact_hits"] += 1
+            self._hit_similarity_sum += similarity
+            value = entry["value"]
+        return copy.deepcopy(value), entry["query"], similarity
+
+    def store(self, namespace: str, query: str, value: Any):
+        """写入一条缓存(同一命名空间下相同的查询会被替换)"""
+        vector = self.vectorizer.transform(query)
+        normalized = normalize_query(query)
+        entry = {
+            "namespace": namespace,
+            "query": query,
+            "normalized": normalized,
+            "value": copy.deepcopy(value),
+            "created_at": time.time(),
+        }
+        with self._lock:
+            keep = [i for i, e in enumerate(self._entries)
+                    if not (e["namespace"] == namespace and e["normalized"] == normalized)]
+            keep = keep[-(self.max_entries - 1):] if self.max_entries > 1 else []
+            self._entries = [self._entries[i] for i in keep] + [entry]
+            self._matrix = np.vstack([self._matrix[keep], vector[np.newaxis, :]])
+            self._stats["stores"] += 1
+
+    def fetch(
+        self,
+        namespace: str,
+        query: str,
+        loader: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        命中时返回缓存结果，否则调用loader并写入缓存
+
+        Args:
+            namespace: 命名空间(工具名 + 其他参数)
+            query: 搜索查询
+            loader: 实际执行搜索的无参函数
+            cacheable: 判断结果是否应写入缓存(如失败时的默认返回值不应缓存)
+        """
+        cached = self.lookup(namespace, query)
+        if cached is not None:
+            value, cached_query, similarity = cached
+            if cached_query != query:
+                print(f"语义缓存命中: '{query}' ≈ '{cached_query}' (相似度 {similarity:.2f})")
+            return value
+
+        value = loader()
+        if cacheable is None or cacheable(value):
+            self.store(namespace, query, value)
+        return value
+
+    def clear(self):
+        """清空缓存(统计保留)"""
+        with self._lock:
+            self._entries = []
+            self._matrix = np.zeros((0, self.vectorizer.dimensions), dtype=np.float32)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计，hits 即节省的搜索API调用次数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            similarity_sum = self._hit_similarity_sum
+        stats["threshold"] = self.threshold
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+        stats["semantic_hits"] = stats["hits"] - stats["exact_hits"]
+        stats["avg_hit_similarity"] = round(similarity_sum / stats["hits"], 4) if stats["hits"] else None
+        return stats
+
+
+_caches: Dict[Tuple[float, float, int], SemanticQueryCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(threshold: float = 0.85, ttl_seconds: float = 3600, max_entries: int = 500) -> SemanticQueryCache:
+    """获取进程内共享的语义缓存实例（相同参数复用同一实例，跨多次运行共享时间窗口内的结果）"""
+    key = (float(threshold), float(ttl_seconds), int(max_entries))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = SemanticQueryCache(threshold, ttl_seconds, max_entries)
+            _caches[key] = cache
+        return cache